@@ -0,0 +1,60 @@
+"""
+Benchmark adding N sample transcriptomes to a SwanGraph one at a time with
+add_transcriptome against all at once with add_transcriptomes, which only
+reindexes, sorts, and builds the graph once at the end.
+
+Usage:
+	python bench_batch_add.py [n_genes] [n_samples ...]
+"""
+import os
+import sys
+import tempfile
+import pandas as pd
+
+import swan_vis as swan
+from bench_utils import write_synthetic_gtf, time_call
+
+def add_each(fnames):
+	sg = swan.SwanGraph()
+	for fname in fnames:
+		sg.add_transcriptome(fname)
+	return sg
+
+def add_batch(fnames):
+	sg = swan.SwanGraph()
+	sg.add_transcriptomes(fnames)
+	return sg
+
+def main():
+	n_genes = 5000
+	sizes = [1, 2, 4, 8, 16]
+	if len(sys.argv) > 1:
+		n_genes = int(sys.argv[1])
+	if len(sys.argv) > 2:
+		sizes = [int(n) for n in sys.argv[2:]]
+
+	with tempfile.TemporaryDirectory() as tmp:
+
+		# one GTF per sample, w/ different transcripts from the same genes
+		fnames = []
+		for i in range(max(sizes)):
+			fname = os.path.join(tmp, 'sample_{}.gtf'.format(i))
+			write_synthetic_gtf(fname, n_genes=n_genes, seed=i,
+				tid_prefix='S{}_ENST'.format(i))
+			fnames.append(fname)
+
+		print('n_samples\tn_transcripts\teach_s\tbatch_s\tspeedup')
+		for n in sizes:
+			t_each, ctrl = time_call(add_each, fnames[:n], n_reps=1)
+			t_batch, test = time_call(add_batch, fnames[:n], n_reps=1)
+
+			# make sure both give the same result
+			pd.testing.assert_frame_equal(ctrl.t_df, test.t_df)
+			pd.testing.assert_frame_equal(ctrl.edge_df, test.edge_df)
+			pd.testing.assert_frame_equal(ctrl.loc_df, test.loc_df)
+
+			print('{}\t{}\t{:.2f}\t{:.2f}\t{:.1f}x'.format(n,
+				len(test.t_df.index), t_each, t_batch, t_each/t_batch))
+
+if __name__ == '__main__':
+	main()
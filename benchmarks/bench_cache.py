@@ -0,0 +1,42 @@
+"""
+Benchmark parsing a GTF against loading it from the parsed input cache.
+
+Usage:
+	python bench_cache.py [n_genes ...]
+"""
+import os
+import sys
+import tempfile
+import pandas as pd
+
+from swan_vis.utils import parse_gtf_vectorized
+from swan_vis.cache_utils import get_cache_key, save_parsed, load_parsed
+from bench_utils import write_synthetic_gtf, time_call
+
+def main():
+	sizes = [int(n) for n in sys.argv[1:]]
+	if not sizes:
+		sizes = [1000, 10000, 50000]
+
+	print('n_transcripts\tgtf_MB\tparse_s\tcache_s\tspeedup')
+	with tempfile.TemporaryDirectory() as tmp:
+		cache_dir = os.path.join(tmp, 'cache')
+		for n_genes in sizes:
+			fname = os.path.join(tmp, 'bench_{}.gtf'.format(n_genes))
+			n = write_synthetic_gtf(fname, n_genes=n_genes)
+			mb = os.path.getsize(fname)/1e6
+			t_parse, ctrl = time_call(parse_gtf_vectorized, fname, False, False)
+
+			key = get_cache_key([fname, None], cache_dir)
+			save_parsed(cache_dir, key, *ctrl)
+			t_cache, test = time_call(load_parsed, cache_dir, key)
+
+			# make sure the cached entry is the same
+			pd.testing.assert_frame_equal(ctrl[0], test[0])
+			pd.testing.assert_frame_equal(ctrl[1], test[1])
+
+			print('{}\t{:.1f}\t{:.2f}\t{:.2f}\t{:.1f}x'.format(n, mb, t_parse,
+				t_cache, t_parse/t_cache))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,40 @@
+"""
+Benchmark building the loc / edge / transcript tables w/ create_dfs, both
+into an empty SwanGraph and into one that already has data.
+
+Usage:
+	python bench_create_dfs.py [n_genes ...]
+"""
+import os
+import sys
+import tempfile
+
+import swan_vis as swan
+from swan_vis.utils import parse_gtf_vectorized
+from bench_utils import write_synthetic_gtf, time_call
+
+def main():
+	sizes = [int(n) for n in sys.argv[1:]]
+	if not sizes:
+		sizes = [1000, 10000, 50000]
+
+	print('n_transcripts\tstep\tcreate_dfs_s')
+	with tempfile.TemporaryDirectory() as tmp:
+		for n_genes in sizes:
+			annot = os.path.join(tmp, 'annot_{}.gtf'.format(n_genes))
+			fname = os.path.join(tmp, 'bench_{}.gtf'.format(n_genes))
+			write_synthetic_gtf(annot, n_genes=n_genes, talon=False, seed=1)
+			n = write_synthetic_gtf(fname, n_genes=n_genes)
+
+			# into an empty SwanGraph and then one that already has data
+			sg = swan.SwanGraph()
+			for step, gtf in [('empty', annot), ('append', fname)]:
+				t_df, exon_df, from_talon, from_cerberus = \
+					parse_gtf_vectorized(gtf, True, False)
+				t_dfs, dfs = time_call(sg.create_dfs, t_df, exon_df,
+					from_talon, from_cerberus)
+				sg.loc_df, sg.edge_df, sg.t_df = dfs
+				print('{}\t{}\t{:.2f}'.format(n, step, t_dfs))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,65 @@
+"""
+Benchmark building the whole-transcriptome graph as a networkx DiGraph
+against the array-backed GenomeGraph, in time and pickled size, and
+finding the edges between two vertices in each.
+
+Usage:
+	python bench_genomegraph.py [n_genes ...]
+"""
+import os
+import pickle
+import sys
+import tempfile
+import networkx as nx
+
+import swan_vis as swan
+from swan_vis.pathstore import PathStore
+from swan_vis.genomegraph import GenomeGraph
+from bench_utils import write_synthetic_gtf, time_call
+
+def build_nx(paths):
+	G = nx.DiGraph()
+	for path in paths:
+		nx.add_path(G, path)
+	return G
+
+def nx_edges_between(G, edge_df):
+	for v1, v2 in zip(edge_df.v1.tolist(), edge_df.v2.tolist()):
+		list(G.subgraph(range(v1+1, v2)).edges())
+
+def gg_edges_between(G, edge_df):
+	for v1, v2 in zip(edge_df.v1.tolist(), edge_df.v2.tolist()):
+		G.edges_between(v1, v2)
+
+def main():
+	sizes = [int(n) for n in sys.argv[1:]]
+	if not sizes:
+		sizes = [1000, 10000, 50000]
+
+	print('n_transcripts\tnx_build_s\tarray_build_s\tspeedup\tnx_pickle_mb\tarray_pickle_mb\tnx_between_s\tarray_between_s')
+	with tempfile.TemporaryDirectory() as tmp:
+		for n_genes in sizes:
+			fname = os.path.join(tmp, 'bench_{}.gtf'.format(n_genes))
+			n = write_synthetic_gtf(fname, n_genes=n_genes)
+			sg = swan.SwanGraph()
+			sg.add_transcriptome(fname, verbose=False)
+			paths = sg.t_df.loc_path.tolist()
+
+			t_nx, nx_G = time_call(build_nx, paths)
+			t_gg, gg = time_call(lambda: GenomeGraph.from_paths(
+				PathStore.from_lists(sg.t_df.index, paths)))
+			assert set(nx_G.edges) == set(gg.edges)
+
+			nx_mb = len(pickle.dumps(nx_G))/1e6
+			gg_mb = len(pickle.dumps(gg))/1e6
+
+			# edges between the vertices of the first 1000 exons
+			edge_df = sg.edge_df.loc[sg.edge_df.edge_type == 'exon'].head(1000)
+			t_nx_between, _ = time_call(nx_edges_between, nx_G, edge_df, n_reps=1)
+			t_gg_between, _ = time_call(gg_edges_between, gg, edge_df, n_reps=1)
+
+			print('{}\t{:.2f}\t{:.2f}\t{:.1f}x\t{:.1f}\t{:.1f}\t{:.2f}\t{:.2f}'.format(n,
+				t_nx, t_gg, t_nx/t_gg, nx_mb, gg_mb, t_nx_between, t_gg_between))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,58 @@
+"""
+Benchmark adding a transcriptome to a SwanGraph that already has data with
+the persistent location / edge indexes against rebuilding them each time.
+
+Usage:
+	python bench_index.py [n_genes ...]
+"""
+import os
+import sys
+import tempfile
+import pandas as pd
+
+import swan_vis as swan
+from swan_vis.utils import parse_gtf_vectorized
+from bench_utils import write_synthetic_gtf, time_call
+
+def create_dfs_rebuild(sg, *args):
+	sg.loc_index = None
+	sg.edge_index = None
+	return sg.create_dfs(*args)
+
+def main():
+	sizes = [int(n) for n in sys.argv[1:]]
+	if not sizes:
+		sizes = [1000, 10000, 50000]
+
+	print('n_locs\tn_edges\trebuild_s\tpersistent_s\tspeedup')
+	with tempfile.TemporaryDirectory() as tmp:
+		for n_genes in sizes:
+
+			# a SwanGraph w/ a few datasets in it already
+			sg = swan.SwanGraph()
+			for seed in range(3):
+				fname = os.path.join(tmp, 'bench_{}_{}.gtf'.format(n_genes, seed))
+				write_synthetic_gtf(fname, n_genes=n_genes, seed=seed)
+				t_df, exon_df, from_talon, from_cerberus = \
+					parse_gtf_vectorized(fname, True, False)
+				sg.loc_df, sg.edge_df, sg.t_df = sg.create_dfs(t_df, exon_df,
+					from_talon, from_cerberus)
+
+			# and one more dataset, w/ a small number of transcripts
+			fname = os.path.join(tmp, 'bench_{}_new.gtf'.format(n_genes))
+			write_synthetic_gtf(fname, n_genes=100, seed=3)
+			args = parse_gtf_vectorized(fname, True, False)
+			index = (sg.loc_index, sg.edge_index)
+			t_rebuild, ctrl = time_call(create_dfs_rebuild, sg, *args)
+			sg.loc_index, sg.edge_index = index
+			t_persist, test = time_call(sg.create_dfs, *args)
+
+			# make sure both give the same result
+			for ctrl_df, test_df in zip(ctrl, test):
+				pd.testing.assert_frame_equal(ctrl_df, test_df)
+
+			print('{}\t{}\t{:.3f}\t{:.3f}\t{:.1f}x'.format(len(sg.loc_df.index),
+				len(sg.edge_df.index), t_rebuild, t_persist, t_rebuild/t_persist))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,73 @@
+"""
+Benchmark finding the transcripts, edges, and genes that overlap the
+regions in a BED file w/ the interval indexes against scanning the
+transcript spans for each region.
+
+Usage:
+	python bench_intervalindex.py [n_genes ...]
+"""
+import os
+import sys
+import tempfile
+import numpy as np
+
+import swan_vis as swan
+from bench_utils import write_synthetic_gtf, time_call
+
+def write_bed(fname, n_regions=1000, seed=0):
+	rng = np.random.default_rng(seed)
+	with open(fname, 'w') as ofile:
+		for _ in range(n_regions):
+			chrom = 'chr{}'.format(int(rng.integers(1, 23)))
+			start = int(rng.integers(0, 5000000))
+			ofile.write('{}\t{}\t{}\n'.format(chrom, start, start+5000))
+
+def scan_tids(sg, regions):
+	paths = sg.t_df.loc_path.tolist()
+	starts = sg.loc_df.loc[[path[0] for path in paths]]
+	stops = sg.loc_df.loc[[path[-1] for path in paths]]
+	chroms = starts.chrom.to_numpy()
+	t_min = np.minimum(starts.coord.to_numpy(), stops.coord.to_numpy())
+	t_max = np.maximum(starts.coord.to_numpy(), stops.coord.to_numpy())
+
+	keep = np.zeros(len(sg.t_df.index), dtype=bool)
+	for chrom, start, stop in regions:
+		keep |= (chroms == chrom)&(t_min <= stop)&(t_max >= start)
+	return sg.t_df.index[keep].tolist()
+
+def main():
+	sizes = [int(n) for n in sys.argv[1:]]
+	if not sizes:
+		sizes = [1000, 10000, 50000]
+
+	print('n_transcripts\tn_regions\tscan_s\tbuild_s\ttid_query_s\tedge_query_s\tgene_query_s\tspeedup')
+	with tempfile.TemporaryDirectory() as tmp:
+		bed = os.path.join(tmp, 'bench.bed')
+		write_bed(bed)
+		regions = swan.read_bed_regions(bed)
+
+		for n_genes in sizes:
+			fname = os.path.join(tmp, 'bench_{}.gtf'.format(n_genes))
+			n = write_synthetic_gtf(fname, n_genes=n_genes)
+			sg = swan.SwanGraph()
+			sg.add_transcriptome(fname, verbose=False)
+
+			t_scan, ctrl = time_call(scan_tids, sg, regions, n_reps=1)
+
+			def build():
+				sg.interval_index = None
+				for kind in ['edge', 'transcript', 'gene']:
+					sg.get_interval_index(kind)
+			t_build, _ = time_call(build)
+
+			t_tid, test = time_call(sg.get_region_tids, regions)
+			assert test == ctrl
+			t_edge, _ = time_call(sg.get_region_edges, regions)
+			t_gene, _ = time_call(sg.get_region_gids, regions)
+
+			print('{}\t{}\t{:.3f}\t{:.3f}\t{:.3f}\t{:.3f}\t{:.3f}\t{:.1f}x'.format(n,
+				len(regions), t_scan, t_build, t_tid, t_edge, t_gene,
+				t_scan/t_tid))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,87 @@
+"""
+Benchmark finding novel intron retention and exon skipping events by
+testing one novel edge at a time against finding them all at once w/
+find_novel_events, and check that both give the same events.
+
+Usage:
+	python bench_ir_es.py [n_genes ...]
+"""
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+import swan_vis as swan
+from bench_utils import write_synthetic_gtf, time_call
+
+def find_events_loop(sg, event):
+	"""
+	Find events the way find_ir_genes / find_es_genes did before
+	find_novel_events, one novel edge at a time.
+	"""
+	cand_type, span_type = ('exon', 'intron') if event == 'ir' else ('intron', 'exon')
+	edge_ids = sg.edge_df.loc[(sg.edge_df.annotation == False)&\
+		(sg.edge_df.edge_type == cand_type), 'edge_id']
+	nt_df = sg.t_df.loc[sg.t_df.annotation == False]
+	n_locs, edge_keys = sg.get_graph_edge_keys()
+
+	genes = []
+	rows = []
+	for eid in edge_ids:
+		entry = sg.edge_df.loc[eid]
+		sub_v1s, sub_v2s = sg.G.edges_between(entry.v1, entry.v2)
+		sub_edges = sg.edge_df.loc[np.isin(edge_keys, sub_v1s*n_locs+sub_v2s)]
+		sub_edges = sub_edges.loc[sub_edges.edge_type == span_type]
+		if len(sub_edges.index) == 0:
+			continue
+
+		cand_t_df = nt_df[[eid in path for path in nt_df.path.tolist()]]
+		if len(cand_t_df.index) == 0:
+			continue
+		cand_genes = cand_t_df.gid.tolist()
+		cand_g_df = sg.t_df.loc[sg.t_df.gid.isin(cand_genes)]
+		for gid in cand_genes:
+			if gid in genes:
+				continue
+			for sub_eid in sub_edges.index:
+				if event == 'es':
+					temp = cand_g_df[[sub_eid in path for path in cand_g_df.path.tolist()]]
+					if len(temp.index) == 0:
+						continue
+				for tid in cand_t_df.tid.tolist():
+					rows.append([gid, tid, eid])
+					genes.append(gid)
+	return pd.DataFrame(data=rows, columns=['gid', 'tid', 'edge_id'])
+
+def main():
+	sizes = [int(n) for n in sys.argv[1:]]
+	if not sizes:
+		sizes = [250, 1000, 4000]
+
+	print('n_genes\tn_transcripts\tevent\tn_events\tloop_s\tvectorized_s\tspeedup')
+	with tempfile.TemporaryDirectory() as tmp:
+		for n_genes in sizes:
+
+			# annotation and novel transcripts from the same genes, which
+			# use different subsets of each gene's exons
+			annot = os.path.join(tmp, 'annot_{}.gtf'.format(n_genes))
+			novel = os.path.join(tmp, 'novel_{}.gtf'.format(n_genes))
+			write_synthetic_gtf(annot, n_genes=n_genes, talon=False, seed=0)
+			write_synthetic_gtf(novel, n_genes=n_genes, seed=1,
+				tid_prefix='NOVEL')
+			sg = swan.SwanGraph()
+			sg.add_annotation(annot, verbose=False)
+			sg.add_transcriptome(novel, verbose=False)
+
+			for event in ['ir', 'es']:
+				t_loop, ctrl = time_call(find_events_loop, sg, event, n_reps=1)
+				t_vec, test = time_call(sg.find_novel_events, event)
+				pd.testing.assert_frame_equal(ctrl, test, check_dtype=False)
+
+				print('{}\t{}\t{}\t{}\t{:.2f}\t{:.3f}\t{:.1f}x'.format(n_genes,
+					len(sg.t_df.index), event, len(test.index), t_loop, t_vec,
+					t_loop/t_vec))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,46 @@
+"""
+Benchmark parsing a GTF with the vectorized GTF parser using different
+numbers of processes. Each worker process imports swan_vis when it
+starts, so processes only pay off for large GTFs and when there are at
+least as many CPUs as processes; the number of CPUs is printed w/ the
+results.
+
+Usage:
+	python bench_parallel_gtf.py [n_genes] [n_jobs ...]
+"""
+import os
+import sys
+import tempfile
+import pandas as pd
+
+from swan_vis.utils import parse_gtf_vectorized
+from bench_utils import write_synthetic_gtf, time_call
+
+def main():
+	n_genes = 40000
+	jobs = [1, 2, 4, 8]
+	if len(sys.argv) > 1:
+		n_genes = int(sys.argv[1])
+	if len(sys.argv) > 2:
+		jobs = [int(n) for n in sys.argv[2:]]
+
+	with tempfile.TemporaryDirectory() as tmp:
+		fname = os.path.join(tmp, 'bench.gtf')
+		n = write_synthetic_gtf(fname, n_genes=n_genes)
+		print('{} transcripts, {:.1f} MB, {} CPUs'.format(n,
+			os.path.getsize(fname)/1e6, os.cpu_count()))
+		print('n_jobs\ttime_s\tspeedup')
+		ctrl = None
+		for n_jobs in jobs:
+			t, res = time_call(parse_gtf_vectorized, fname, False, False,
+							   n_jobs=n_jobs)
+			if ctrl is None:
+				ctrl = res
+				t_ctrl = t
+			else:
+				pd.testing.assert_frame_equal(ctrl[0], res[0])
+				pd.testing.assert_frame_equal(ctrl[1], res[1])
+			print('{}\t{:.2f}\t{:.1f}x'.format(n_jobs, t, t_ctrl/t))
+
+if __name__ == '__main__':
+	main()
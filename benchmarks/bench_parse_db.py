@@ -0,0 +1,51 @@
+"""
+Benchmark the transcript-by-transcript TALON DB parser against the
+vectorized TALON DB parser, in time and peak memory (from tracemalloc).
+
+Usage:
+	python bench_parse_db.py [n_genes ...]
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+import pandas as pd
+
+from swan_vis.utils import parse_db, parse_db_vectorized
+from bench_utils import write_synthetic_talon_db, time_call
+
+def peak_mb(func, *args, **kwargs):
+	tracemalloc.start()
+	func(*args, **kwargs)
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	return peak/1e6
+
+def main():
+	sizes = [int(n) for n in sys.argv[1:]]
+	if not sizes:
+		sizes = [1000, 10000, 50000]
+
+	print('n_transcripts\tdb_MB\tpython_s\tvectorized_s\tspeedup\tpython_peak_MB\tvectorized_peak_MB')
+	with tempfile.TemporaryDirectory() as tmp:
+		for n_genes in sizes:
+			db = os.path.join(tmp, 'bench_{}.db'.format(n_genes))
+			n = write_synthetic_talon_db(db, n_genes=n_genes)
+			mb = os.path.getsize(db)/1e6
+			t_py, ctrl = time_call(parse_db, db, None, True, False, False,
+				n_reps=1)
+			t_vec, test = time_call(parse_db_vectorized, db, None, True,
+				False, False)
+
+			# make sure the parsers agree
+			pd.testing.assert_frame_equal(ctrl[0], test[0])
+			pd.testing.assert_frame_equal(ctrl[1], test[1])
+
+			py_mb = peak_mb(parse_db, db, None, True, False, False)
+			vec_mb = peak_mb(parse_db_vectorized, db, None, True, False, False)
+
+			print('{}\t{:.1f}\t{:.2f}\t{:.2f}\t{:.1f}x\t{:.0f}\t{:.0f}'.format(n,
+				mb, t_py, t_vec, t_py/t_vec, py_mb, vec_mb))
+
+if __name__ == '__main__':
+	main()
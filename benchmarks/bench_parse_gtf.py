@@ -0,0 +1,37 @@
+"""
+Benchmark the line-by-line GTF parser against the vectorized GTF parser.
+
+Usage:
+	python bench_parse_gtf.py [n_genes ...]
+"""
+import os
+import sys
+import tempfile
+import pandas as pd
+
+from swan_vis.utils import parse_gtf, parse_gtf_vectorized
+from bench_utils import write_synthetic_gtf, time_call
+
+def main():
+	sizes = [int(n) for n in sys.argv[1:]]
+	if not sizes:
+		sizes = [1000, 10000, 50000]
+
+	print('n_transcripts\tgtf_MB\tpython_s\tvectorized_s\tspeedup')
+	with tempfile.TemporaryDirectory() as tmp:
+		for n_genes in sizes:
+			fname = os.path.join(tmp, 'bench_{}.gtf'.format(n_genes))
+			n = write_synthetic_gtf(fname, n_genes=n_genes)
+			mb = os.path.getsize(fname)/1e6
+			t_py, ctrl = time_call(parse_gtf, fname, False, False, n_reps=1)
+			t_vec, test = time_call(parse_gtf_vectorized, fname, False, False)
+
+			# make sure the parsers agree
+			pd.testing.assert_frame_equal(ctrl[0], test[0])
+			pd.testing.assert_frame_equal(ctrl[1], test[1])
+
+			print('{}\t{:.1f}\t{:.2f}\t{:.2f}\t{:.1f}x'.format(n, mb, t_py,
+				t_vec, t_py/t_vec))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,52 @@
+"""
+Benchmark the memory used by the transcript paths of a live SwanGraph,
+stored as a PathArray w/ location paths derived on demand, against the
+list-per-transcript path / location path columns, and pickling a
+SwanGraph. Also reports the process RSS after loading the SwanGraph.
+
+Usage:
+	python bench_paths.py [n_genes ...]
+"""
+import os
+import pickle
+import resource
+import sys
+import tempfile
+
+import swan_vis as swan
+from bench_utils import write_synthetic_gtf, time_call
+
+def main():
+	sizes = [int(n) for n in sys.argv[1:]]
+	if not sizes:
+		sizes = [1000, 10000, 50000]
+
+	print('n_transcripts\tlists_mb\tarray_mb\tloc_store_mb\tt_df_mb\tsg_pickle_mb\tsg_pickle_s\tsg_unpickle_s\tmax_rss_mb')
+	with tempfile.TemporaryDirectory() as tmp:
+		for n_genes in sizes:
+			fname = os.path.join(tmp, 'bench_{}.gtf'.format(n_genes))
+			n = write_synthetic_gtf(fname, n_genes=n_genes)
+			sg = swan.SwanGraph()
+			sg.add_transcriptome(fname, verbose=False)
+
+			# path columns as lists vs. the PathArray and the derived
+			# location paths
+			loc_paths = sg.get_paths('loc')
+			lists = sg.t_df[['path']].astype(object)
+			lists['loc_path'] = loc_paths.to_lists()
+			lists_mb = lists.memory_usage(deep=True, index=False).sum()/1e6
+			array_mb = sg.t_df.path.array.nbytes/1e6
+			loc_store_mb = loc_paths.nbytes()/1e6
+			t_df_mb = sg.t_df.memory_usage(deep=True).sum()/1e6
+			del lists
+
+			t_dump, store = time_call(pickle.dumps, sg, n_reps=1)
+			t_load, _ = time_call(pickle.loads, store, n_reps=1)
+			max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1e3
+
+			print('{}\t{:.1f}\t{:.1f}\t{:.1f}\t{:.1f}\t{:.1f}\t{:.2f}\t{:.2f}\t{:.0f}'.format(n,
+				lists_mb, array_mb, loc_store_mb, t_df_mb, len(store)/1e6,
+				t_dump, t_load, max_rss))
+
+if __name__ == '__main__':
+	main()
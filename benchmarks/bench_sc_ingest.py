@@ -0,0 +1,108 @@
+"""
+Benchmark single-cell ingest, where each cell is added to a SwanGraph as
+its own dataset. First times checking N new datasets against N datasets
+already in the SwanGraph by scanning the dataset list against the hashed
+dataset index, then times add_adata for a synthetic AnnData of n_cells
+cells over the transcripts of n_genes genes, both in memory and backed.
+
+The defaults load 1M cells x 75k transcripts (20k genes, ISMs collapsed);
+pass smaller sizes to run on a laptop. In memory, the counts and their tpm
+are all held at once, so large sizes need a lot of memory (200k cells
+peaks at ~3.2 GB, 1M cells doesn't fit in 5 GB); pass modes=backed to
+skip it.
+
+Usage:
+	python bench_sc_ingest.py [n_cells] [n_genes] [nnz_per_cell] [modes]
+"""
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+
+import swan_vis as swan
+from bench_utils import write_synthetic_gtf, time_call
+
+def scan_check(dataset_list, datasets):
+	for d in datasets:
+		if d in dataset_list:
+			raise ValueError('Dataset {} already present'.format(d))
+
+def index_check(dataset_index, datasets):
+	dupes = pd.Index(datasets).isin(dataset_index)
+	if dupes.any():
+		raise ValueError('Dataset {} already present'.format(
+			datasets[dupes.argmax()]))
+
+def iter_cell_blocks(n_cells, n_transcripts, nnz_per_cell,
+	chunksize=50000, seed=0):
+	rng = np.random.default_rng(seed)
+	for start in range(0, n_cells, chunksize):
+		n = min(chunksize, n_cells-start)
+		rows = np.repeat(np.arange(n), nnz_per_cell)
+		cols = rng.integers(0, n_transcripts, size=n*nnz_per_cell)
+		data = rng.integers(1, 10, size=n*nnz_per_cell).astype(np.float32)
+		X = sparse.csr_matrix((data, (rows, cols)), shape=(n, n_transcripts))
+		X.sum_duplicates()
+		yield X
+
+def load_graph(gtf, backed=None):
+	sg = swan.SwanGraph(sc=True, backed=backed)
+	sg.add_transcriptome(gtf)
+	return sg
+
+def main():
+	n_cells = 1000000
+	n_genes = 20000
+	nnz_per_cell = 50
+	modes = ['backed', 'memory']
+	if len(sys.argv) > 1:
+		n_cells = int(sys.argv[1])
+	if len(sys.argv) > 2:
+		n_genes = int(sys.argv[2])
+	if len(sys.argv) > 3:
+		nnz_per_cell = int(sys.argv[3])
+	if len(sys.argv) > 4:
+		modes = sys.argv[4].split(',')
+
+	# duplicate dataset checks; the list scan is quadratic so only run it
+	# on sizes that finish
+	print('n_datasets\tscan_s\tindex_s\tspeedup')
+	for n in [1000, 10000, 30000]:
+		old = ['cell_{}'.format(i) for i in range(n)]
+		new = ['cell_{}'.format(i) for i in range(n, 2*n)]
+		t_scan, _ = time_call(scan_check, old, new, n_reps=1)
+		t_index, _ = time_call(index_check, pd.Index(old), new)
+		print('{}\t{:.3f}\t{:.3f}\t{:.1f}x'.format(n, t_scan, t_index,
+			t_scan/t_index))
+	print()
+
+	with tempfile.TemporaryDirectory() as tmp:
+		gtf = os.path.join(tmp, 'cells.gtf')
+		write_synthetic_gtf(gtf, n_genes=n_genes)
+
+		# transcript IDs in the SwanGraph, ie w/o ISMs
+		tids = load_graph(gtf).t_df.index.tolist()
+		n_transcripts = len(tids)
+
+		fname = os.path.join(tmp, 'cells.h5ad')
+		obs = pd.DataFrame(index=pd.Index(['cell_{}'.format(i)
+			for i in range(n_cells)]))
+		var = pd.DataFrame(index=pd.Index(tids))
+		swan.write_backed_adata(fname, obs, var,
+			iter_cell_blocks(n_cells, n_transcripts, nnz_per_cell))
+
+		backed = os.path.join(tmp, 'backed')
+		os.makedirs(backed)
+
+		print('n_cells\tn_transcripts\tmode\tadd_adata_s')
+		for mode in modes:
+			sg = load_graph(gtf, backed=backed if mode == 'backed' else None)
+			t, _ = time_call(sg.add_adata, fname, n_reps=1)
+			assert len(sg.datasets) == n_cells
+			del sg
+			print('{}\t{}\t{}\t{:.2f}'.format(n_cells, n_transcripts, mode, t))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,110 @@
+"""
+Benchmark the TALON DB queries that build the whole pass list into
+`IN (...)` strings on separate connections against loading the pass list
+into a temporary table on one shared connection and joining against it.
+
+Usage:
+	python bench_talon_db.py [n_genes ...]
+"""
+import itertools
+import operator
+import os
+import sqlite3
+import sys
+import tempfile
+
+from swan_vis.talon_utils import *
+from bench_utils import write_synthetic_talon_db, time_call
+
+def query_in_lists(database, pass_list_file):
+
+	# filter pass list to observed transcripts
+	conn = sqlite3.connect(database)
+	cursor = conn.cursor()
+	datasets = fetch_all_datasets(cursor)
+	pass_list = parse_pass_list(pass_list_file)
+	query = """ SELECT DISTINCT gene_ID, transcript_ID
+				FROM observed
+				WHERE transcript_ID IN %s
+				AND dataset in %s """
+	cursor.execute(query % (format_for_in([x[1] for x in pass_list]),
+		format_for_in(datasets)))
+	pass_list = cursor.fetchall()
+	conn.close()
+
+	gids = []
+	tids = []
+	for key, group in itertools.groupby(pass_list, operator.itemgetter(0)):
+		gids.append(key)
+		tids += [x[1] for x in group]
+
+	# annotations, each on a new connection
+	res = []
+	for table, ids in [('gene_annotations', gids), ('transcript_annotations', tids)]:
+		conn = sqlite3.connect(database)
+		query = 'SELECT * FROM {} WHERE ID IN ({})'.format(table,
+			','.join([str(x) for x in ids]))
+		rows = sorted(conn.execute(query).fetchall(), key=lambda x: x[0])
+		res.append({key: list(group) for key, group in \
+			itertools.groupby(rows, operator.itemgetter(0))})
+		conn.close()
+
+	# and transcripts grouped by gene
+	conn = sqlite3.connect(database)
+	conn.row_factory = sqlite3.Row
+	query = """ SELECT t.gene_ID, t.transcript_ID, loc1.chromosome,
+				MIN(loc1.position,loc2.position) AS min_pos,
+				MAX(loc1.position,loc2.position) AS max_pos,
+				genes.strand, t.jn_path, t.start_exon, t.end_exon, t.n_exons
+				FROM transcripts t
+				LEFT JOIN location loc1 ON t.start_vertex = loc1.location_ID
+				LEFT JOIN location loc2 ON t.end_vertex = loc2.location_ID
+				LEFT JOIN genes ON t.gene_ID = genes.gene_ID
+				WHERE t.transcript_ID IN ({}) """.format(','.join([str(x) for x in tids]))
+	rows = sorted(conn.execute(query).fetchall(), key=lambda x: x['gene_ID'])
+	res.append({key: sorted(list(group), key=lambda x: x['min_pos']) for key, group in \
+		itertools.groupby(rows, operator.itemgetter(0))})
+	conn.close()
+	return [sum([len(v) for v in r.values()]) for r in res]
+
+def query_joins(database, pass_list_file):
+	conn = connect_db(database)
+	handle_filtering(database, True, pass_list_file, conn=conn)
+	res = [get_annotations(database, 'gene', conn=conn, filtered=True),
+		   get_annotations(database, 'transcript', conn=conn, filtered=True),
+		   get_gene_2_transcripts(database, None, conn=conn, filtered=True)]
+	conn.close()
+	return [sum([len(v) for v in r.values()]) for r in res]
+
+def main():
+	sizes = [int(n) for n in sys.argv[1:]]
+	if not sizes:
+		sizes = [10000, 50000, 100000]
+
+	print('n_transcripts\tn_pass_list\tin_lists_s\tjoins_s\tspeedup')
+	with tempfile.TemporaryDirectory() as tmp:
+		for n_genes in sizes:
+			db = os.path.join(tmp, 'bench_{}.db'.format(n_genes))
+			n = write_synthetic_talon_db(db, n_genes=n_genes)
+
+			# pass list of most of the transcripts in the database
+			pass_list_file = os.path.join(tmp, 'pass_list_{}.csv'.format(n_genes))
+			conn = sqlite3.connect(db)
+			pairs = conn.execute(""" SELECT gene_ID, transcript_ID FROM transcripts
+									 WHERE transcript_ID % 4 != 0 """).fetchall()
+			conn.close()
+			with open(pass_list_file, 'w') as ofile:
+				for gene_ID, transcript_ID in pairs:
+					ofile.write('{},{}\n'.format(gene_ID, transcript_ID))
+
+			t_in, ctrl = time_call(query_in_lists, db, pass_list_file)
+			t_join, test = time_call(query_joins, db, pass_list_file)
+
+			# make sure both get the same number of entries
+			assert ctrl == test
+
+			print('{}\t{}\t{:.2f}\t{:.2f}\t{:.1f}x'.format(n, len(pairs),
+				t_in, t_join, t_in/t_join))
+
+if __name__ == '__main__':
+	main()
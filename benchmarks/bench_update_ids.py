@@ -0,0 +1,46 @@
+"""
+Benchmark renumbering vertices with update_ids, on the whole graph and for
+subset_on_gene.
+
+Usage:
+	python bench_update_ids.py [n_genes ...]
+"""
+import os
+import sys
+import tempfile
+
+import swan_vis as swan
+from swan_vis.utils import parse_gtf_vectorized
+from bench_utils import write_synthetic_gtf, time_call
+
+def subset_genes(sg, gids):
+	for gid in gids:
+		sg.subset_on_gene(gid)
+
+def main():
+	sizes = [int(n) for n in sys.argv[1:]]
+	if not sizes:
+		sizes = [100, 1000, 10000]
+
+	print('n_transcripts\tn_locs\tupdate_ids_s\tsubset_ms_per_gene')
+	with tempfile.TemporaryDirectory() as tmp:
+		for n_genes in sizes:
+			fname = os.path.join(tmp, 'bench_{}.gtf'.format(n_genes))
+			n = write_synthetic_gtf(fname, n_genes=n_genes)
+			sg = swan.SwanGraph()
+			t_df, exon_df, from_talon, from_cerberus = \
+				parse_gtf_vectorized(fname, True, False)
+			sg.loc_df, sg.edge_df, sg.t_df = sg.create_dfs(t_df, exon_df,
+				from_talon, from_cerberus)
+			sg.get_loc_path()
+
+			t_vec, _ = time_call(sg.update_ids, n_reps=1)
+
+			gids = sg.t_df.gid.unique()[:50]
+			t_subset, _ = time_call(subset_genes, sg, gids, n_reps=1)
+
+			print('{}\t{}\t{:.2f}\t{:.1f}'.format(n, len(sg.loc_df.index),
+				t_vec, 1000*t_subset/len(gids)))
+
+if __name__ == '__main__':
+	main()
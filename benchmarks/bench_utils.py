@@ -0,0 +1,224 @@
+import os
+import sqlite3
+import time
+import numpy as np
+
+def write_synthetic_gtf(fname, n_genes=1000, t_per_gene=5, exons_per_t=8,
+						talon=True, seed=0, tid_prefix='ENST'):
+	"""
+	Write a synthetic TALON-style GTF to benchmark parsing / ingestion.
+	Transcripts from each gene share a pool of splice sites so that
+	exons, introns, and locations get reused the way they do in real data.
+
+	Parameters:
+		fname (str): Path to output GTF
+		n_genes (int): Number of genes to simulate
+			Default: 1000
+		t_per_gene (int): Number of transcripts per gene
+			Default: 5
+		exons_per_t (int): Max. number of exons per transcript
+			Default: 8
+		talon (bool): Whether to include TALON novelty attributes
+			Default: True
+		seed (int): Random seed
+			Default: 0
+		tid_prefix (str): Prefix of transcript IDs, ie to simulate samples
+			with different transcripts from the same genes
+			Default: 'ENST'
+
+	Returns:
+		n_transcripts (int): Number of transcripts written
+	"""
+	rng = np.random.default_rng(seed)
+	novs = ['KNOWN', 'ISM_transcript', 'NIC_transcript', 'NNC_transcript']
+	n_transcripts = 0
+	with open(fname, 'w') as ofile:
+		ofile.write('##description: synthetic swan_vis benchmark GTF\n')
+		for g in range(n_genes):
+			chrom = 'chr{}'.format(g%22+1)
+			strand = '+' if g%2 == 0 else '-'
+			g_start = 10000+(g//22)*100000
+			sites = g_start+np.cumsum(rng.integers(50, 500, size=2*exons_per_t+2))
+			gid = 'ENSG{:011d}.1'.format(g)
+			gname = 'GENE{}'.format(g)
+			for t in range(t_per_gene):
+				tid = '{}{:011d}.1'.format(tid_prefix, g*t_per_gene+t)
+				n_exons = int(rng.integers(1, exons_per_t+1))
+				inds = np.sort(rng.choice(len(sites)//2, size=n_exons, replace=False))
+				exons = [(sites[2*i], sites[2*i+1]) for i in inds]
+				attrs = 'gene_id "{}"; gene_name "{}"; transcript_id "{}"; '\
+						'transcript_name "{}-{}";'.format(gid, gname, tid, gname, t)
+				if talon:
+					nov = novs[int(rng.integers(0, len(novs)))]
+					if nov == 'KNOWN':
+						attrs += ' transcript_status "KNOWN"; talon_transcript "{}";'.format(n_transcripts)
+					else:
+						attrs += ' transcript_status "NOVEL"; {} "TRUE"; talon_transcript "{}";'.format(nov, n_transcripts)
+				if strand == '-':
+					exons = exons[::-1]
+				ofile.write('\t'.join([chrom, 'bench', 'transcript',
+					str(exons[0][0] if strand == '+' else exons[-1][0]),
+					str(exons[-1][1] if strand == '+' else exons[0][1]),
+					'.', strand, '.', attrs])+'\n')
+				for start, stop in exons:
+					ofile.write('\t'.join([chrom, 'bench', 'exon', str(start),
+						str(stop), '.', strand, '.', attrs])+'\n')
+				n_transcripts += 1
+	return n_transcripts
+
+def write_synthetic_talon_db(fname, n_genes=1000, t_per_gene=5,
+							 exons_per_t=8, n_datasets=4, seed=0):
+	"""
+	Write a synthetic TALON database to benchmark parsing TALON DBs. Has
+	the tables that swan_vis reads, with genes laid out the same way as
+	write_synthetic_gtf. Each transcript is observed in a random subset
+	of the datasets.
+
+	Parameters:
+		fname (str): Path to output database
+		n_genes (int): Number of genes to simulate
+			Default: 1000
+		t_per_gene (int): Number of transcripts per gene
+			Default: 5
+		exons_per_t (int): Max. number of exons per transcript
+			Default: 8
+		n_datasets (int): Number of datasets
+			Default: 4
+		seed (int): Random seed
+			Default: 0
+
+	Returns:
+		n_transcripts (int): Number of transcripts written
+	"""
+	rng = np.random.default_rng(seed)
+	novs = ['KNOWN', 'ISM_transcript', 'NIC_transcript', 'NNC_transcript']
+	datasets = ['dataset_{}'.format(i) for i in range(n_datasets)]
+
+	genes = []
+	locs = []
+	edges = []
+	transcripts = []
+	gene_annot = []
+	t_annot = []
+	exon_annot = []
+	observed = []
+	for g in range(n_genes):
+		gene_ID = g+1
+		chrom = 'chr{}'.format(g%22+1)
+		strand = '+' if g%2 == 0 else '-'
+		g_start = 10000+(g//22)*100000
+		sites = g_start+np.cumsum(rng.integers(50, 500, size=2*exons_per_t+2))
+		genes.append((gene_ID, strand))
+		for attr, val in [('gene_id', 'ENSG{:011d}.1'.format(g)),
+						  ('gene_name', 'GENE{}'.format(g)),
+						  ('source', 'bench')]:
+			gene_annot.append((gene_ID, 'bench', 'bench', attr, val))
+
+		# locations and exons / introns between adjacent sites
+		# in the direction of transcription
+		loc_IDs = list(range(len(locs)+1, len(locs)+len(sites)+1))
+		locs += [(l, 1, chrom, int(site)) for l, site in zip(loc_IDs, sites)]
+		if strand == '-':
+			loc_IDs = loc_IDs[::-1]
+		edge_IDs = {}
+		for i in range(len(loc_IDs)-1):
+			edge_ID = len(edges)+1
+			edge_type = 'exon' if i%2 == 0 else 'intron'
+			edges.append((edge_ID, loc_IDs[i], loc_IDs[i+1], edge_type, strand))
+			edge_IDs[(loc_IDs[i], loc_IDs[i+1])] = edge_ID
+			if edge_type == 'exon':
+				exon_annot.append((edge_ID, 'bench', 'bench', 'source', 'bench'))
+
+		for t in range(t_per_gene):
+			transcript_ID = len(transcripts)+1
+			n_exons = int(rng.integers(1, exons_per_t+1))
+			inds = np.sort(rng.choice(len(loc_IDs)//2, size=n_exons, replace=False))
+			path_locs = [loc_IDs[j] for i in inds for j in (2*i, 2*i+1)]
+			path = [edge_IDs.get((v1, v2)) for v1, v2 in zip(path_locs[:-1], path_locs[1:])]
+
+			# introns that skip exons aren't in the gene's edges yet
+			for i, edge_ID in enumerate(path):
+				if edge_ID is None:
+					edge_ID = len(edges)+1
+					edges.append((edge_ID, path_locs[i], path_locs[i+1], 'intron', strand))
+					edge_IDs[(path_locs[i], path_locs[i+1])] = edge_ID
+					path[i] = edge_ID
+			jn_path = ','.join([str(e) for e in path[1:-1]]) if n_exons > 1 else None
+			transcripts.append((transcript_ID, gene_ID, path[0], jn_path,
+				path[-1], path_locs[0], path_locs[-1], n_exons))
+
+			tid = 'ENST{:011d}.1'.format(transcript_ID-1)
+			nov = novs[int(rng.integers(0, len(novs)))]
+			attrs = [('transcript_id', tid),
+					 ('transcript_name', 'GENE{}-{}'.format(g, t)),
+					 ('source', 'bench')]
+			if nov == 'KNOWN':
+				attrs.append(('transcript_status', 'KNOWN'))
+			else:
+				attrs += [('transcript_status', 'NOVEL'), (nov, 'TRUE')]
+			for attr, val in attrs:
+				t_annot.append((transcript_ID, 'bench', 'bench', attr, val))
+
+			for d in rng.choice(datasets, size=int(rng.integers(0, n_datasets+1)),
+								replace=False):
+				observed.append((len(observed)+1, gene_ID, transcript_ID,
+					'read_{}'.format(len(observed)+1), d))
+
+	if os.path.exists(fname):
+		os.remove(fname)
+	conn = sqlite3.connect(fname)
+	cursor = conn.cursor()
+	cursor.execute('CREATE TABLE genes (gene_ID INTEGER PRIMARY KEY, strand TEXT)')
+	cursor.execute('CREATE TABLE location (location_ID INTEGER, '
+		'genome_build INTEGER, chromosome TEXT, position INTEGER, '
+		'PRIMARY KEY(location_ID, genome_build))')
+	cursor.execute('CREATE TABLE edge (edge_ID INTEGER PRIMARY KEY, v1 INTEGER, '
+		'v2 INTEGER, edge_type TEXT, strand TEXT)')
+	cursor.execute('CREATE TABLE transcripts (transcript_ID INTEGER PRIMARY KEY, '
+		'gene_ID INTEGER, start_exon INTEGER, jn_path TEXT, end_exon INTEGER, '
+		'start_vertex INTEGER, end_vertex INTEGER, n_exons INTEGER)')
+	for feat in ['gene', 'transcript', 'exon']:
+		cursor.execute('CREATE TABLE {}_annotations (ID INTEGER, annot_name TEXT, '
+			'source TEXT, attribute TEXT, value TEXT, '
+			'PRIMARY KEY (ID, source, attribute))'.format(feat))
+	cursor.execute('CREATE TABLE dataset (dataset_ID INTEGER PRIMARY KEY, '
+		'dataset_name TEXT, sample TEXT, platform TEXT)')
+	cursor.execute('CREATE TABLE observed (obs_ID INTEGER PRIMARY KEY, '
+		'gene_ID INTEGER, transcript_ID INTEGER, read_name TEXT, dataset TEXT)')
+
+	cursor.executemany('INSERT INTO genes VALUES (?,?)', genes)
+	cursor.executemany('INSERT INTO location VALUES (?,?,?,?)', locs)
+	cursor.executemany('INSERT INTO edge VALUES (?,?,?,?,?)', edges)
+	cursor.executemany('INSERT INTO transcripts VALUES (?,?,?,?,?,?,?,?)', transcripts)
+	cursor.executemany('INSERT INTO gene_annotations VALUES (?,?,?,?,?)', gene_annot)
+	cursor.executemany('INSERT INTO transcript_annotations VALUES (?,?,?,?,?)', t_annot)
+	cursor.executemany('INSERT INTO exon_annotations VALUES (?,?,?,?,?)', exon_annot)
+	cursor.executemany('INSERT INTO dataset VALUES (?,?,?,?)',
+		[(i+1, d, d, 'bench') for i, d in enumerate(datasets)])
+	cursor.executemany('INSERT INTO observed VALUES (?,?,?,?,?)', observed)
+	conn.commit()
+	conn.close()
+
+	return len(transcripts)
+
+def time_call(func, *args, n_reps=3, **kwargs):
+	"""
+	Time a function call, reporting the best of several repetitions.
+
+	Parameters:
+		func (function): Function to time
+		n_reps (int): Number of repetitions
+			Default: 3
+
+	Returns:
+		best (float): Fastest time in seconds
+		res: Return value of the last call
+	"""
+	best = None
+	for i in range(n_reps):
+		start = time.perf_counter()
+		res = func(*args, **kwargs)
+		elapsed = time.perf_counter()-start
+		if best is None or elapsed < best:
+			best = elapsed
+	return best, res
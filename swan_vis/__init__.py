@@ -1,5 +1,13 @@
 from swan_vis.utils import *
 from swan_vis.talon_utils import *
+from swan_vis.tabix_utils import *
+from swan_vis.cache_utils import *
+from swan_vis.pathstore import *
+from swan_vis.rangereader import *
+from swan_vis.genomegraph import *
+from swan_vis.geneindex import *
+from swan_vis.intervalindex import *
+from swan_vis.pathindex import *
 from swan_vis.graph import *
 from swan_vis.swangraph import *
 from swan_vis.plottedgraph import *
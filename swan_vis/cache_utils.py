@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# On-disk cache of parsed GTFs / TALON DBs. Entries are keyed by a hash of
+# the input file's contents and the options that it was parsed with, and
+# are stored as one .npz file of columnar arrays per entry.
+
+def hash_file(fname, cache_dir=None):
+	"""
+	Get a hash of the contents of a file. If a cache directory is given, the
+	hash is stored there along with the file's size and modification time so
+	that unchanged files don't have to be read again.
+
+	Parameters:
+		fname (str): Path to file
+		cache_dir (str): Path to cache directory
+			Default: None
+
+	Returns:
+		file_hash (str): Hex digest of the file's contents
+	"""
+	fname = os.path.abspath(fname)
+	stat = os.stat(fname)
+
+	# check if we've already hashed this version of the file
+	if cache_dir:
+		hashes = read_file_hashes(cache_dir)
+		entry = hashes.get(fname)
+		if entry and entry['size'] == stat.st_size and \
+		   entry['mtime_ns'] == stat.st_mtime_ns:
+			return entry['hash']
+
+	h = hashlib.blake2b(digest_size=20)
+	with open(fname, 'rb') as infile:
+		for block in iter(lambda: infile.read(1<<20), b''):
+			h.update(block)
+	file_hash = h.hexdigest()
+
+	if cache_dir:
+		os.makedirs(cache_dir, exist_ok=True)
+		hashes = read_file_hashes(cache_dir)
+		hashes[fname] = {'size': stat.st_size,
+						 'mtime_ns': stat.st_mtime_ns,
+						 'hash': file_hash}
+		write_json(hashes, os.path.join(cache_dir, 'file_hashes.json'))
+
+	return file_hash
+
+def read_file_hashes(cache_dir):
+	"""
+	Read the file hashes stored in a cache directory.
+
+	Parameters:
+		cache_dir (str): Path to cache directory
+
+	Returns:
+		hashes (dict): Absolute file path mapped to the size, modification
+			time, and hash of the file
+	"""
+	fname = os.path.join(cache_dir, 'file_hashes.json')
+	try:
+		with open(fname) as infile:
+			hashes = json.load(infile)
+	except (OSError, ValueError):
+		hashes = {}
+	return hashes
+
+def write_json(obj, fname):
+	"""
+	Atomically write an object to a JSON file so that concurrent readers
+	never see a partially written file.
+
+	Parameters:
+		obj (dict): Object to write
+		fname (str): Path to output file
+	"""
+	d = os.path.dirname(fname)
+	fd, tmp = tempfile.mkstemp(dir=d, suffix='.tmp')
+	with os.fdopen(fd, 'w') as ofile:
+		json.dump(obj, ofile)
+	os.replace(tmp, fname)
+
+def get_cache_key(fnames, cache_dir=None, **kwargs):
+	"""
+	Get the key for a cache entry from the contents of the input file(s)
+	and the options used to parse them.
+
+	Parameters:
+		fnames (list of str): Input files. None entries are skipped.
+		cache_dir (str): Path to cache directory, used to store file hashes
+			Default: None
+		**kwargs: Parsing options
+
+	Returns:
+		key (str): Cache key
+	"""
+	h = hashlib.blake2b(digest_size=20)
+	for fname in fnames:
+		if fname is None:
+			h.update(b'None')
+		else:
+			h.update(hash_file(fname, cache_dir).encode())
+	h.update(json.dumps(kwargs, sort_keys=True, default=str).encode())
+	return h.hexdigest()
+
+def df_to_arrays(df, prefix):
+	"""
+	Convert the columns of a DataFrame into numpy arrays that can be saved
+	without pickling.
+
+	Parameters:
+		df (pandas DataFrame): DataFrame with object columns of str, int,
+			or list of str
+		prefix (str): Prefix to add to array names
+
+	Returns:
+		arrays (dict): Array name mapped to array
+		cols (list of list): Name and kind ('str', 'int', or 'list') of
+			each column
+	"""
+	arrays = {}
+	cols = []
+	if pd.api.types.is_integer_dtype(df.index.dtype):
+		arrays[prefix+'index'] = df.index.to_numpy(dtype=np.int64)
+	else:
+		arrays[prefix+'index'] = np.array(df.index.tolist(), dtype=str)
+	for i, c in enumerate(df.columns):
+		name = '{}{}'.format(prefix, i)
+		vals = df[c]
+		nulls = vals.isnull().to_numpy()
+		non_null = vals.loc[~nulls]
+		if len(non_null.index) and isinstance(non_null.iloc[0], list):
+			lens = np.array([len(v) for v in vals], dtype=np.int64)
+			flat = [item for v in vals for item in v]
+			arrays[name] = np.array(flat, dtype=str)
+			arrays[name+'_offsets'] = np.concatenate([[0], np.cumsum(lens)])
+			kind = 'list'
+		elif len(non_null.index) and all(isinstance(v, (int, np.integer)) \
+			 and not isinstance(v, bool) for v in non_null):
+			arrays[name] = vals.fillna(0).to_numpy(dtype=np.int64)
+			kind = 'int'
+		else:
+			arrays[name] = vals.fillna('').to_numpy(dtype=str)
+			kind = 'str'
+		arrays[name+'_nulls'] = nulls
+		cols.append([c, kind])
+	return arrays, cols
+
+def arrays_to_df(arrays, cols, prefix):
+	"""
+	Convert the output of df_to_arrays back into a DataFrame.
+
+	Parameters:
+		arrays (dict): Array name mapped to array
+		cols (list of list): Name and kind ('str', 'int', or 'list') of
+			each column
+		prefix (str): Prefix of array names
+
+	Returns:
+		df (pandas DataFrame): DataFrame with object columns
+	"""
+	# int indexes, ie of empty DataFrames, are saved as int arrays
+	index = arrays[prefix+'index']
+	if index.dtype.kind == 'i':
+		index = pd.Index(index, dtype=np.int64)
+	else:
+		index = pd.Index(index.astype(object).tolist(), dtype=object)
+	data = {}
+	for i, (c, kind) in enumerate(cols):
+		name = '{}{}'.format(prefix, i)
+		if kind == 'list':
+			flat = arrays[name].astype(object).tolist()
+			offsets = arrays[name+'_offsets']
+			vals = [flat[offsets[j]:offsets[j+1]] for j in range(len(offsets)-1)]
+			vals = pd.Series(vals, index=index, dtype=object)
+		else:
+			vals = pd.Series(arrays[name].astype(object), index=index,
+							 dtype=object)
+		nulls = arrays[name+'_nulls']
+		if nulls.any():
+			vals.loc[nulls] = np.nan
+		data[c] = vals
+	# w/o columns, let pandas pick the same default columns as the
+	# DataFrame that was saved
+	if not cols:
+		return pd.DataFrame(data, index=index)
+	df = pd.DataFrame(data, index=index, columns=[c for c, kind in cols])
+	return df
+
+def save_parsed(cache_dir, key, t_df, exon_df, from_talon, from_cerberus,
+				cache_size=None):
+	"""
+	Save parsed transcripts and exons to the cache.
+
+	Parameters:
+		cache_dir (str): Path to cache directory
+		key (str): Cache key, from get_cache_key
+		t_df (pandas DataFrame): Transcripts from parse_gtf / parse_db
+		exon_df (pandas DataFrame): Exons from parse_gtf / parse_db
+		from_talon (bool): Whether the input was from TALON
+		from_cerberus (bool): Whether the input was from cerberus
+		cache_size (float): Maximum size of the cache in GB. Least recently
+			used entries are removed to stay under it.
+			Default: None, no limit
+	"""
+	os.makedirs(cache_dir, exist_ok=True)
+	t_arrays, t_cols = df_to_arrays(t_df, 't_')
+	e_arrays, e_cols = df_to_arrays(exon_df, 'e_')
+	meta = {'t_cols': t_cols, 'e_cols': e_cols,
+			'from_talon': bool(from_talon),
+			'from_cerberus': bool(from_cerberus)}
+	arrays = {**t_arrays, **e_arrays}
+	arrays['meta'] = np.array(json.dumps(meta))
+
+	# write to a temporary file first so that other processes
+	# never read a partial entry
+	fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+	with os.fdopen(fd, 'wb') as ofile:
+		np.savez(ofile, **arrays)
+	os.replace(tmp, os.path.join(cache_dir, key+'.npz'))
+
+	if cache_size is not None:
+		evict_cache(cache_dir, cache_size)
+
+def load_parsed(cache_dir, key):
+	"""
+	Load parsed transcripts and exons from the cache.
+
+	Parameters:
+		cache_dir (str): Path to cache directory
+		key (str): Cache key, from get_cache_key
+
+	Returns:
+		t_df (pandas DataFrame): Transcripts, or None if not in the cache
+		exon_df (pandas DataFrame): Exons, or None if not in the cache
+		from_talon (bool): Whether the input was from TALON
+		from_cerberus (bool): Whether the input was from cerberus
+	"""
+	fname = os.path.join(cache_dir, key+'.npz')
+	try:
+		with np.load(fname, allow_pickle=False) as npz:
+			arrays = dict(npz.items())
+	except (OSError, ValueError):
+		return None, None, None, None
+
+	meta = json.loads(str(arrays['meta']))
+	t_df = arrays_to_df(arrays, meta['t_cols'], 't_')
+	exon_df = arrays_to_df(arrays, meta['e_cols'], 'e_')
+
+	# mark as recently used
+	try:
+		os.utime(fname)
+	except OSError:
+		pass
+
+	return t_df, exon_df, meta['from_talon'], meta['from_cerberus']
+
+def evict_cache(cache_dir, cache_size):
+	"""
+	Remove the least recently used cache entries until the cache is
+	under the size limit.
+
+	Parameters:
+		cache_dir (str): Path to cache directory
+		cache_size (float): Maximum size of the cache in GB
+	"""
+	entries = []
+	for f in os.listdir(cache_dir):
+		if not f.endswith('.npz'):
+			continue
+		f = os.path.join(cache_dir, f)
+		try:
+			stat = os.stat(f)
+		except OSError:
+			continue
+		entries.append((stat.st_mtime, stat.st_size, f))
+
+	total = sum(e[1] for e in entries)
+	max_bytes = cache_size*1e9
+	for mtime, size, f in sorted(entries):
+		if total <= max_bytes:
+			break
+		try:
+			os.remove(f)
+		except OSError:
+			pass
+		total -= size
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+
+from swan_vis.pathstore import PathStore, get_min_int_array
+
+class GeneIndex:
+	def __init__(self, gids, t_inds, offsets, df, gnames=None):
+		"""
+		Index of the genes in a transcript table. The transcripts of gene i
+		are the t_df rows t_inds[offsets[i]:offsets[i+1]], in t_df order.
+
+		Attributes
+		----------
+		gids (pandas Index):
+			Gene IDs, in the order they first appear in t_df
+		t_inds (numpy array of int):
+			t_df row numbers of every gene's transcripts, concatenated
+		offsets (numpy array of int):
+			Start of each gene's transcripts in t_inds, followed by the
+			number of transcripts
+		df (pandas DataFrame):
+			Strand, chromosome, min. and max. coordinate (min_coord,
+			max_coord), and min. and max. vertex ID (min_vertex,
+			max_vertex) of each gene, indexed by gene ID. Only has the
+			columns that could be computed from the input tables.
+		gnames (pandas Series):
+			Gene ID of the first gene w/ each gene name, indexed by gene
+			name, or None if there are no gene names
+
+		Parameters:
+			gids (list-like): Gene IDs
+			t_inds (numpy array of int): t_df row numbers of every gene's
+				transcripts, concatenated
+			offsets (numpy array of int): Start of each gene's transcripts
+				in t_inds, followed by the number of transcripts
+			df (pandas DataFrame): Attributes of each gene
+			gnames (pandas Series): Gene ID of each gene name
+				Default: None
+		"""
+		self.gids = pd.Index(gids)
+		self.t_inds = get_min_int_array(t_inds)
+		self.offsets = get_min_int_array(offsets)
+		self.df = df
+		self.gnames = gnames
+
+	@classmethod
+	def from_dfs(cls, t_df, loc_df=None, edge_df=None, loc_paths=None):
+		"""
+		Create a GeneIndex from the transcript, location, and edge tables
+		of a Graph.
+
+		Parameters:
+			t_df (pandas DataFrame): Graph t_df
+			loc_df (pandas DataFrame): Graph loc_df, indexed by vertex ID.
+				Needed for chromosomes and coordinates.
+				Default: None
+			edge_df (pandas DataFrame): Graph edge_df, indexed by edge ID.
+				Needed for strands.
+				Default: None
+			loc_paths (PathStore): Location path of each transcript in
+				t_df. Needed for chromosomes and coordinates.
+				Default: None, use the loc_path column of t_df if it has one
+
+		Returns:
+			index (GeneIndex): Index of the genes in t_df
+		"""
+		codes, gids = pd.factorize(t_df.gid.to_numpy())
+
+		# group transcript rows by gene, keeping them in t_df order
+		pos = np.flatnonzero(codes >= 0)
+		t_inds = pos[np.argsort(codes[pos], kind='stable')]
+		counts = np.bincount(codes[pos], minlength=len(gids))
+		offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+		first_rows = t_inds[offsets[:-1]]
+
+		df = pd.DataFrame(index=pd.Index(gids, name='gid'))
+
+		# strand of the first transcript of each gene that isn't antisense,
+		# or of the first transcript if they all are
+		cols = t_df.columns
+		if len(gids) and 'path' in cols and edge_df is not None and \
+		   'strand' in edge_df.columns:
+			first_edges = PathStore.from_series(t_df.path).get_ends('tss')
+			strands = get_values(edge_df, 'strand', first_edges)
+			strand_rows = first_rows.copy()
+			if 'novelty' in cols:
+				sense = pos[(t_df.novelty.to_numpy()[pos] != 'Antisense')]
+			else:
+				sense = pos
+			genes, first = np.unique(codes[sense], return_index=True)
+			strand_rows[genes] = sense[first]
+			df['strand'] = strands[strand_rows]
+
+		# chromosome of the first transcript of each gene, and the span and
+		# vertex range of each gene
+		if loc_paths is None and 'loc_path' in cols:
+			loc_paths = PathStore.from_series(t_df.loc_path)
+		if len(gids) and loc_paths is not None and loc_df is not None and \
+		   {'chrom', 'coord'} <= set(loc_df.columns):
+			paths = loc_paths
+			starts = paths.ids[paths.offsets[:-1]]
+			stops = paths.ids[paths.offsets[1:]-1]
+			df['chrom'] = get_values(loc_df, 'chrom', starts[first_rows])
+
+			start_coords = get_values(loc_df, 'coord', starts).astype(np.int64)
+			stop_coords = get_values(loc_df, 'coord', stops).astype(np.int64)
+			t_min = np.minimum(start_coords, stop_coords)[t_inds]
+			t_max = np.maximum(start_coords, stop_coords)[t_inds]
+			df['min_coord'] = np.minimum.reduceat(t_min, offsets[:-1])
+			df['max_coord'] = np.maximum.reduceat(t_max, offsets[:-1])
+
+			v_min = np.minimum.reduceat(paths.ids, paths.offsets[:-1])[t_inds]
+			v_max = np.maximum.reduceat(paths.ids, paths.offsets[:-1])[t_inds]
+			df['min_vertex'] = np.minimum.reduceat(v_min, offsets[:-1])
+			df['max_vertex'] = np.maximum.reduceat(v_max, offsets[:-1])
+
+		# first gene w/ each name
+		gnames = None
+		if 'gname' in cols:
+			gn = t_df.gname
+			first = (~gn.duplicated(keep='first')&gn.notnull()).to_numpy()
+			gnames = pd.Series(t_df.gid.to_numpy()[first],
+							   index=gn.to_numpy()[first])
+
+		return cls(gids, t_inds, offsets, df, gnames)
+
+	def __len__(self):
+		return len(self.gids)
+
+	def __contains__(self, gid):
+		return gid in self.gids
+
+	def get_rows(self, gid):
+		"""
+		Get the t_df row numbers of the transcripts of a gene.
+
+		Parameters:
+			gid (str): Gene ID
+
+		Returns:
+			rows (numpy array of int): Row numbers, in t_df order
+		"""
+		i = self.gids.get_loc(gid)
+		return self.t_inds[self.offsets[i]:self.offsets[i+1]]
+
+	def get(self, gid, col):
+		"""
+		Get an attribute of a gene.
+
+		Parameters:
+			gid (str): Gene ID
+			col (str): {'strand', 'chrom', 'min_coord', 'max_coord',
+				'min_vertex', 'max_vertex'}
+
+		Returns:
+			val: Value of the attribute
+		"""
+		return self.df.at[gid, col]
+
+	def get_gid(self, gname):
+		"""
+		Get the gene ID of the first gene w/ a gene name.
+
+		Parameters:
+			gname (str): Gene name
+
+		Returns:
+			gid (str): Gene ID, or None if no gene has the name
+		"""
+		if self.gnames is None or gname not in self.gnames.index:
+			return None
+		return self.gnames.loc[gname]
+
+def get_values(df, col, ids):
+	"""
+	Get the values of a column for some index values of a DataFrame.
+
+	Parameters:
+		df (pandas DataFrame): DataFrame w/ a unique index
+		col (str): Column to get values from
+		ids (list-like): Index values
+
+	Returns:
+		vals (numpy array): Value of the column for each index value
+	"""
+	inds = df.index.get_indexer(ids)
+	if (inds == -1).any():
+		raise KeyError(np.asarray(ids)[np.flatnonzero(inds == -1)[0]])
+	return df[col].to_numpy()[inds]
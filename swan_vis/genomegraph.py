@@ -0,0 +1,263 @@
+import networkx as nx
+import numpy as np
+
+from swan_vis.pathstore import get_min_int_array
+
+class GenomeGraph:
+	def __init__(self, nodes, indptr, indices):
+		"""
+		Compact, read-only directed graph over vertex IDs in CSR form. The
+		successors of vertex nodes[i] are indices[indptr[i]:indptr[i+1]],
+		sorted by vertex ID.
+
+		Attributes
+		----------
+		node_ids (numpy array of int):
+			Sorted vertex IDs in the graph
+		indptr (numpy array of int):
+			Start of each vertex's successors in indices, followed by the
+			total number of edges
+		indices (numpy array of int):
+			Vertex IDs of the successors of every vertex, concatenated
+
+		Parameters:
+			nodes (numpy array of int): Sorted vertex IDs in the graph
+			indptr (numpy array of int): Start of each vertex's successors
+				in indices, followed by the total number of edges
+			indices (numpy array of int): Vertex IDs of the successors of
+				every vertex, concatenated
+		"""
+		self.node_ids = get_min_int_array(nodes)
+		self.indptr = get_min_int_array(indptr)
+		self.indices = get_min_int_array(indices)
+
+	@classmethod
+	def from_edges(cls, nodes, v1s, v2s):
+		"""
+		Create a GenomeGraph from its vertices and edges. Duplicate edges
+		are only added once.
+
+		Parameters:
+			nodes (list-like of int): Vertex IDs. Vertices in the edges
+				are added even if they're not in nodes.
+			v1s (list-like of int): Start vertex of each edge
+			v2s (list-like of int): End vertex of each edge
+
+		Returns:
+			G (GenomeGraph): Graph
+		"""
+		v1s = np.asarray(v1s, dtype=np.int64)
+		v2s = np.asarray(v2s, dtype=np.int64)
+		nodes = np.unique(np.concatenate([np.asarray(nodes, dtype=np.int64),
+			v1s, v2s]))
+
+		# sort edges by start, then end vertex, and remove duplicates
+		if len(v1s):
+			edges = np.unique(np.stack([v1s, v2s], axis=1), axis=0)
+		else:
+			edges = np.empty((0, 2), dtype=np.int64)
+		rows = np.searchsorted(nodes, edges[:, 0])
+		counts = np.bincount(rows, minlength=len(nodes))
+		indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+		return cls(nodes, indptr, edges[:, 1])
+
+	@classmethod
+	def from_paths(cls, paths):
+		"""
+		Create a GenomeGraph from location paths, where each pair of
+		consecutive vertices in a path is an edge.
+
+		Parameters:
+			paths (PathStore): Location path of each transcript
+
+		Returns:
+			G (GenomeGraph): Graph
+		"""
+		ids = paths.ids.astype(np.int64)
+
+		# don't connect the last vertex of one path to the first of the next
+		keep = np.ones(max(len(ids)-1, 0), dtype=bool)
+		ends = paths.offsets[1:-1].astype(np.int64)-1
+		keep[ends[(ends >= 0)&(ends < len(keep))]] = False
+		return cls.from_edges(ids, ids[:-1][keep], ids[1:][keep])
+
+	def __len__(self):
+		return len(self.node_ids)
+
+	def __contains__(self, v):
+		return self.has_node(v)
+
+	@property
+	def nodes(self):
+		"""
+		Vertex IDs in the graph, in order.
+		"""
+		return self.node_ids.tolist()
+
+	@property
+	def edges(self):
+		"""
+		(v1, v2) tuple of each edge in the graph, ordered by v1 then v2.
+		"""
+		v1s, v2s = self.edge_arrays()
+		return list(zip(v1s.tolist(), v2s.tolist()))
+
+	def number_of_nodes(self):
+		"""
+		Get the number of vertices in the graph.
+
+		Returns:
+			n (int): Number of vertices
+		"""
+		return len(self.node_ids)
+
+	def number_of_edges(self):
+		"""
+		Get the number of edges in the graph.
+
+		Returns:
+			n (int): Number of edges
+		"""
+		return len(self.indices)
+
+	def nbytes(self):
+		"""
+		Get the memory used by the vertex, offset, and successor arrays.
+
+		Returns:
+			nbytes (int): Number of bytes
+		"""
+		return self.node_ids.nbytes+self.indptr.nbytes+self.indices.nbytes
+
+	def get_node_ind(self, v):
+		"""
+		Get the position of a vertex in node_ids.
+
+		Parameters:
+			v (int): Vertex ID
+
+		Returns:
+			i (int): Position of the vertex, or -1 if it's not in the graph
+		"""
+		i = np.searchsorted(self.node_ids, v)
+		if i < len(self.node_ids) and self.node_ids[i] == v:
+			return int(i)
+		return -1
+
+	def has_node(self, v):
+		"""
+		Check if a vertex is in the graph.
+
+		Parameters:
+			v (int): Vertex ID
+
+		Returns:
+			has_node (bool): Whether the vertex is in the graph
+		"""
+		return self.get_node_ind(v) != -1
+
+	def has_edge(self, v1, v2):
+		"""
+		Check if an edge is in the graph.
+
+		Parameters:
+			v1 (int): Start vertex ID
+			v2 (int): End vertex ID
+
+		Returns:
+			has_edge (bool): Whether the edge is in the graph
+		"""
+		return v2 in self.successors(v1)
+
+	def successors(self, v):
+		"""
+		Get the vertices that a vertex has edges to.
+
+		Parameters:
+			v (int): Vertex ID
+
+		Returns:
+			successors (list of int): Vertex IDs, in order
+		"""
+		i = self.get_node_ind(v)
+		if i == -1:
+			raise KeyError('Vertex {} not in graph'.format(v))
+		return self.indices[self.indptr[i]:self.indptr[i+1]].tolist()
+
+	def predecessors(self, v):
+		"""
+		Get the vertices that have edges to a vertex.
+
+		Parameters:
+			v (int): Vertex ID
+
+		Returns:
+			predecessors (list of int): Vertex IDs, in order
+		"""
+		if not self.has_node(v):
+			raise KeyError('Vertex {} not in graph'.format(v))
+		v1s, v2s = self.edge_arrays()
+		return v1s[v2s == v].tolist()
+
+	def edge_arrays(self):
+		"""
+		Get the start and end vertex of each edge, ordered by start vertex
+		then end vertex.
+
+		Returns:
+			v1s (numpy array of int): Start vertex of each edge
+			v2s (numpy array of int): End vertex of each edge
+		"""
+		v1s = np.repeat(self.node_ids, np.diff(self.indptr))
+		return v1s, self.indices
+
+	def edges_between(self, v1, v2):
+		"""
+		Get the edges between vertices whose IDs are strictly between two
+		vertex IDs. Same as the edges of subgraph(range(v1+1, v2)), but
+		without building the subgraph.
+
+		Parameters:
+			v1 (int): Lower vertex ID
+			v2 (int): Upper vertex ID
+
+		Returns:
+			v1s (numpy array of int): Start vertex of each edge
+			v2s (numpy array of int): End vertex of each edge
+		"""
+		lo = np.searchsorted(self.node_ids, v1, side='right')
+		hi = max(np.searchsorted(self.node_ids, v2, side='left'), lo)
+		v1s = np.repeat(self.node_ids[lo:hi],
+			np.diff(self.indptr[lo:hi+1]))
+		v2s = self.indices[self.indptr[lo]:self.indptr[hi]]
+		keep = (v2s > v1)&(v2s < v2)
+		return v1s[keep], v2s[keep]
+
+	def subgraph(self, nodes):
+		"""
+		Get the subgraph on some vertices and the edges between them.
+		Vertices that aren't in the graph are ignored.
+
+		Parameters:
+			nodes (list-like of int): Vertex IDs
+
+		Returns:
+			G (GenomeGraph): Subgraph
+		"""
+		nodes = np.unique(np.asarray(list(nodes), dtype=np.int64))
+		nodes = nodes[np.isin(nodes, self.node_ids)]
+		v1s, v2s = self.edge_arrays()
+		keep = np.isin(v1s, nodes)&np.isin(v2s, nodes)
+		return GenomeGraph.from_edges(nodes, v1s[keep], v2s[keep])
+
+	def to_networkx(self):
+		"""
+		Get the graph as a networkx DiGraph, ie for drawing.
+
+		Returns:
+			G (networkx DiGraph): Graph
+		"""
+		G = nx.DiGraph()
+		G.add_nodes_from(self.nodes)
+		G.add_edges_from(self.edges)
+		return G
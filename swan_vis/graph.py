@@ -2,10 +2,14 @@ import networkx as nx
 import numpy as np
 import pandas as pd
 import copy
-from tqdm import tqdm
 import anndata
 import swan_vis
 from swan_vis.utils import *
+from swan_vis.pathstore import PathStore, PathArray, get_path_arrays
+from swan_vis.genomegraph import GenomeGraph
+from swan_vis.geneindex import GeneIndex, get_values
+from swan_vis.intervalindex import IntervalIndex
+from swan_vis.pathindex import PathIndex
 
 # super class that both SwanGraph and PlottedGraph inherit from.
 # all functions that both subclasses will use are in here.
@@ -34,7 +38,9 @@ class Graph:
 			combinations of splice sites in the transcriptome
 		t_df (pandas DataFrame):
 			DataFrame of all unique transcripts found
-			in the transcriptome
+			in the transcriptome. The edge path of each transcript is
+			stored compactly as a PathArray; location paths are derived
+			from them (see get_paths)
 		adata (anndata AnnData):
 			Annotated data object to hold transcript expression values
 			and metadata
@@ -48,6 +54,39 @@ class Graph:
 			Annotated data object to hold TSS expression values and metadata
 		tes_adata (anndata AnnData):
 			Annotated data object to hold TES expression values and metadata
+		G (GenomeGraph):
+			Graph of the locations (vertices) and edges in the transcript
+			paths, created by create_graph_from_dfs
+		loc_index (tuple):
+			loc_df that the location index was built for, its state (see
+			get_df_state), and the location index itself (see get_loc_index)
+		edge_index (tuple):
+			edge_df that the edge index was built for, its state, and
+			the edge index itself (see get_edge_index)
+		gene_index (tuple):
+			t_df that the gene index was built for, its state, and the
+			gene index itself (see get_gene_index)
+		interval_index (tuple):
+			t_df that the interval indexes were built for, its state, and
+			a dict of the edge, transcript, and gene interval indexes
+			themselves (see get_interval_index)
+		path_index (tuple):
+			t_df that the path indexes were built for, its state, and a
+			dict of the edge and location path indexes themselves (see
+			get_path_index)
+		loc_path_index (tuple):
+			t_df that the location paths were derived for, its state, and
+			the edge_df they were derived from along w/ the location
+			paths themselves (see get_paths)
+		dataset_index (tuple):
+			datasets list that the dataset index was built for, its length,
+			and the dataset index itself (see get_dataset_index)
+		gene_dataset_index (tuple):
+			gene_datasets list that the gene dataset index was built for,
+			its length, and the gene dataset index itself
+		index_codes (dict):
+			Integer codes of the chromosomes, strands, and edge types used
+			in the location and edge indexes
 		"""
 
 		self.datasets = []
@@ -61,6 +100,7 @@ class Graph:
 											 'edge_type', 'edge_id'])
 		self.t_df = pd.DataFrame(columns=['tname',
 			'gid', 'gname', 'path', 'tid'])
+		self.t_df['path'] = PathArray.from_lists([])
 
 		# adata objects for transcripts, edges, locations, tss, and tes
 		self.adata = anndata.AnnData()
@@ -70,6 +110,82 @@ class Graph:
 		self.tss_adata = anndata.AnnData()
 		self.tes_adata = anndata.AnnData()
 
+		# persistent lookups of the locations and edges in the graph
+		self.loc_index = None
+		self.edge_index = None
+		self.gene_index = None
+		self.interval_index = None
+		self.path_index = None
+		self.loc_path_index = None
+		self.dataset_index = None
+		self.gene_dataset_index = None
+		self.index_codes = {'chrom': {}, 'strand': {}, 'edge_type': {}}
+
+	def __getstate__(self):
+		"""
+		Get the state of the Graph to pickle. Paths in list columns of t_df,
+		ie from a t_df that was assigned directly, are stored as PathArrays.
+
+		Returns:
+			state (dict): Attributes of the Graph
+		"""
+		state = self.__dict__.copy()
+
+		# the indexes are cheap to rebuild, and they and the feature AnnData
+		# marker (see SwanGraph.feat_index) hold the column values of the
+		# DataFrames they were built for
+		for kind in ['loc', 'edge', 'gene', 'interval', 'path', 'loc_path',
+			'feat']:
+			if kind+'_index' in state:
+				state[kind+'_index'] = None
+
+		t_df = state.get('t_df')
+		if isinstance(t_df, pd.DataFrame):
+			state['t_df'] = get_path_arrays(t_df)
+		return state
+
+	def __setstate__(self, state):
+		"""
+		Restore the state of a pickled Graph. Graphs pickled w/ paths in
+		list columns of t_df, or as PathStores, get a PathArray of edge
+		paths, and their location paths are dropped if they can be derived
+		from the edge paths.
+
+		Parameters:
+			state (dict): Attributes of the Graph
+		"""
+		paths = state.pop('t_df_paths', None)
+		self.__dict__.update(state)
+
+		# graphs pickled before GenomeGraph were networkx DiGraphs
+		G = getattr(self, 'G', None)
+		if isinstance(G, nx.DiGraph):
+			v1s = [e[0] for e in G.edges]
+			v2s = [e[1] for e in G.edges]
+			self.G = GenomeGraph.from_edges(list(G.nodes), v1s, v2s)
+
+		t_df = getattr(self, 't_df', None)
+		if not isinstance(t_df, pd.DataFrame):
+			return
+
+		# graphs pickled w/ paths as PathStores
+		if paths is not None:
+			t_df['path'] = paths['path'].to_array()
+			if paths['loc_path'] is not None:
+				t_df['loc_path'] = paths['loc_path'].to_array()
+			t_df = t_df[[c for c in paths['cols'] if c in t_df.columns]]
+
+		t_df = get_path_arrays(t_df)
+		if 'path' in t_df.columns and 'loc_path' in t_df.columns:
+			try:
+				edge_paths = PathStore.from_series(t_df.path)
+				loc_paths = PathStore.from_series(t_df.loc_path)
+				if loc_paths == edge_paths.get_loc_paths(self.edge_df):
+					t_df = t_df.drop('loc_path', axis=1)
+			except (TypeError, ValueError, KeyError, AttributeError):
+				pass
+		self.t_df = t_df
+
 	##########################################################################
 	################# Related to checking contents of Graph ##################
 	##########################################################################
@@ -106,11 +222,48 @@ class Graph:
 		if type(datasets) != list:
 			datasets = [datasets]
 
-		g_datasets = self.datasets
-		for d in datasets:
-			if d not in g_datasets:
-				raise Exception('Dataset {} not present in graph. '
-								'Datasets in graph are {}'.format(d, g_datasets))
+		# hash lookup instead of scanning the list for each dataset
+		missing = ~pd.Index(datasets).isin(self.get_dataset_index())
+		if missing.any():
+			d = datasets[missing.argmax()]
+			raise Exception('Dataset {} not present in graph. '
+							'Datasets in graph are {}'.format(d, self.datasets))
+
+	def get_dataset_index(self, how='iso'):
+		"""
+		Get a hashed index of the datasets in the Graph, rebuilding it if
+		the dataset list has been replaced or extended since it was last
+		stored.
+
+		Parameters:
+			how (str): {'iso', 'gene'}
+				Default: 'iso'
+
+		Returns:
+			dataset_index (pandas Index): Names of datasets in the Graph
+		"""
+		prefix = 'gene_' if how == 'gene' else ''
+		datasets = getattr(self, prefix+'datasets')
+		index = getattr(self, prefix+'dataset_index', None)
+		if index is not None and index[0] is datasets and index[1] == len(datasets):
+			return index[2]
+		dataset_index = pd.Index(datasets)
+		self.store_dataset_index(dataset_index, how=how)
+		return dataset_index
+
+	def store_dataset_index(self, dataset_index, how='iso'):
+		"""
+		Store the hashed index of the datasets in the Graph.
+
+		Parameters:
+			dataset_index (pandas Index): Names of datasets in the Graph
+			how (str): {'iso', 'gene'}
+				Default: 'iso'
+		"""
+		prefix = 'gene_' if how == 'gene' else ''
+		datasets = getattr(self, prefix+'datasets')
+		setattr(self, prefix+'dataset_index',
+			(datasets, len(datasets), dataset_index))
 
 	# # check that input datasets have abundance data in the Graph:
 	# def check_abundances(self, datasets):
@@ -150,9 +303,21 @@ class Graph:
 		Parameters:
 			gid (str): Gene ID to check for
 		"""
-		if gid not in self.t_df.gid.tolist():
+		if not self.has_gene(gid):
 			raise Exception('Gene {} not found in Graph.'.format(gid))
 
+	def has_gene(self, gid):
+		"""
+		Check if gene is in Graph.
+
+		Parameters:
+			gid (str): Gene ID to check for
+
+		Returns:
+			has_gene (bool): Whether the gene is in the Graph
+		"""
+		return gid in self.get_gene_index()
+
 	def check_transcript(self, tid):
 		"""
 		Check if transcript is in Graph. Raise exception if not.
@@ -172,7 +337,7 @@ class Graph:
 	def update_ids(self, id_map=None, verbose=False):
 		"""
 		Reindex SwanGraph using sorted genomic coordinates (chromosome, coord).
-		Modifies vertex_ids and replaces them in edge_df and t_df.loc_path.
+		Modifies vertex_ids and replaces them in edge_df.
 
 		Parameters:
 			id_map (dict): Dictionary mapping {old_vertex_id: new_vertex_id}
@@ -185,19 +350,50 @@ class Graph:
 		if not id_map:
 			id_map = self.get_ordered_id_map()
 
-		# convert dfs into dicts for the next steps
-		self.dfs_to_dicts()
+		# keep the location, edge, and path indexes if they're up to date
+		loc_index = self.get_current_index('loc')
+		edge_index = self.get_current_index('edge')
+		path_index = self.get_current_index('path')
 
-		# update the ids according to id_map
-		self.update_loc_df_ids(id_map, verbose)
-		self.update_edge_df_ids(id_map, verbose)
+		if verbose:
+			print('Reindexing vertices and edges')
+
+		old_ids = np.fromiter(id_map.keys(), dtype=np.int64, count=len(id_map))
+		new_ids = np.fromiter(id_map.values(), dtype=np.int64, count=len(id_map))
+
+		# locations, in the order of id_map
+		loc_df = self.loc_df.loc[old_ids].copy(deep=True)
+		loc_df['vertex_id'] = new_ids
+		loc_df.index = pd.Index(new_ids, name='vertex_id')
+
+		# vertices of each edge
+		edge_df = self.edge_df.copy(deep=True)
+		edge_df['v1'] = map_ids(edge_df.v1.to_numpy(), old_ids, new_ids)
+		edge_df['v2'] = map_ids(edge_df.v2.to_numpy(), old_ids, new_ids)
+		edge_df['edge_id'] = edge_df.index.to_numpy()
+		edge_df.index.names = ['edge_id']
+
+		t_df = self.t_df.copy(deep=False)
+		t_df.index.names = ['tid']
 
-		# convert back to dfs
-		self.dicts_to_dfs()
+		# infer column types the same way as building the dfs from dicts
+		self.loc_df = loc_df.infer_objects()
+		self.edge_df = edge_df.infer_objects()
+		self.t_df = t_df.infer_objects()
+
+		# and update the vertex ids in the indexes
+		self.update_index_ids(loc_index, edge_index, id_map)
 
 		# and add new location paths from the updated vertex ids
 		self.get_loc_path()
 
+		# edge paths don't change, and location paths just use the new ids
+		if path_index is not None:
+			path_index = path_index.copy()
+			if 'loc' in path_index:
+				path_index['loc'] = path_index['loc'].map_ids(old_ids, new_ids)
+			self.store_index('path', self.t_df, path_index)
+
 	# get a dictionary mapping vertex id to ordered new vertex id
 	def get_ordered_id_map(self, rev_strand=False):
 		"""
@@ -212,6 +408,10 @@ class Graph:
 			id_map (dict): Dictionary of {old_vertex_id: new_vertex_id}
 		"""
 
+		# the location index maps locations to IDs, so sorting doesn't
+		# change it
+		loc_index = self.get_current_index('loc')
+
 		# sort each of the dfs by chrom, coord either ascending
 		# or descending based on strand
 		if rev_strand:
@@ -222,147 +422,540 @@ class Graph:
 			self.loc_df.sort_values(['chrom', 'coord'],
 									 ascending=[True, True],
 									 inplace=True)
+		if loc_index is not None:
+			self.store_index('loc', self.loc_df, loc_index)
 
 		# dictionary mapping vertex_id to new_id
-		self.loc_df['new_id'] = [i for i in range(len(self.loc_df.index))]
-		id_map = self.loc_df['new_id'].to_dict()
-		self.loc_df.drop('new_id', axis=1, inplace=True)
+		id_map = dict(zip(self.loc_df.index.tolist(),
+						  range(len(self.loc_df.index))))
 
 		return id_map
 
-	def update_loc_df_ids(self, id_map, verbose):
+	def get_loc_path(self):
 		"""
-		Update the vertex IDs in self.loc_df dictionary according to id_map.
+		Determine the location path of each transcript in the SwanGraph using
+		the edge path, ie after the vertex IDs or edges have changed.
+		Location paths aren't stored in t_df; they're derived from the edge
+		paths the next time they're needed (see get_paths).
+		"""
+		path_index = self.get_current_index('path')
+		if 'loc_path' in self.t_df.columns:
+			self.t_df.drop('loc_path', axis=1, inplace=True)
+
+		# spans and vertex ranges of genes depend on the location paths
+		self.reset_t_df_indexes()
+		if path_index is not None:
+			path_index = {kind: index for kind, index in path_index.items()
+				if kind != 'loc'}
+			self.store_index('path', self.t_df, path_index)
+
+	def get_paths(self, kind='edge'):
+		"""
+		Get the edge or location path of each transcript in t_df. Edge paths
+		share the arrays of t_df.path. Location paths are derived from the
+		edge paths and edge_df, and kept until t_df or edge_df is replaced
+		or get_loc_path is called, unless t_df has a loc_path column.
 
 		Parameters:
-			id_map (dict): Map of {old_vertex_id: new_vertex_id}
-			verbose (bool): Display progress
+			kind (str): {'edge', 'loc'}
+				Default: 'edge'
+
+		Returns:
+			paths (PathStore): Path of each transcript, in t_df order
 		"""
+		if kind == 'edge':
+			return PathStore.from_series(self.t_df['path'])
+		elif kind != 'loc':
+			raise ValueError('Path kind {} not recognized. '
+				'Choose from edge or loc.'.format(kind))
+
+		if 'loc_path' in self.t_df.columns:
+			return PathStore.from_series(self.t_df['loc_path'])
+		entry = self.get_current_index('loc_path')
+		if entry is not None and entry[0] is self.edge_df:
+			return entry[1]
+		loc_paths = self.get_paths('edge').get_loc_paths(self.edge_df)
+		self.store_index('loc_path', self.t_df, (self.edge_df, loc_paths))
+		return loc_paths
 
-		loc_df = {}
+	def create_graph_from_dfs(self):
+		"""
+		Create the graph object from the location paths of the transcripts
+		in t_df.
+		"""
+		if 'path' not in self.t_df.columns and \
+		   'loc_path' not in self.t_df.columns:
+			self.G = GenomeGraph.from_edges([], [], [])
+			return
 
-		if verbose:
-			pbar = tqdm(total=len(id_map.items()))
-			counter = 0
+		self.G = GenomeGraph.from_paths(self.get_paths('loc'))
 
-		for old_id, new_id in id_map.items():
-			if verbose:
-				counter+=1
-				if counter % 1000 == 0:
-					pbar.update(1000)
-					pbar.set_description('Reindexing vertices')
+	def order_edge_df(self):
+		"""
+		Order Graph's edge_df based on the v1 vertex ID, followed by
+		v2 vertex ID. Ties are ordered by edge ID so that the order doesn't
+		depend on the order edges were added in.
+		"""
+		# the edge index maps edges to IDs, so sorting doesn't change it
+		edge_index = self.get_current_index('edge')
+		self.edge_df.sort_index(inplace=True)
+		self.edge_df.sort_values(by=['v1', 'v2'], kind='stable', inplace=True)
+		if edge_index is not None:
+			self.store_index('edge', self.edge_df, edge_index)
 
-			loc_df[new_id] = self.loc_df[old_id]
-			loc_df[new_id]['vertex_id'] = new_id
+	##########################################################################
+	############### Related to indexing locations and edges ##################
+	##########################################################################
 
-		if verbose:
-			pbar.close()
+	def get_codes(self, kind, vals):
+		"""
+		Get integer codes for chromosomes, strands, or edge types, adding
+		codes for values that haven't been seen before.
 
-		self.loc_df = loc_df
+		Parameters:
+			kind (str): {'chrom', 'strand', 'edge_type'}
+			vals (numpy array of str): Values to get codes for
 
-	def update_edge_df_ids(self, id_map, verbose):
+		Returns:
+			codes (numpy array of int): Code of each value
+		"""
+		if getattr(self, 'index_codes', None) is None:
+			self.index_codes = {'chrom': {}, 'strand': {}, 'edge_type': {}}
+		kind_codes = self.index_codes[kind]
+
+		inds, uniques = pd.factorize(vals)
+		for u in uniques:
+			if u not in kind_codes:
+				kind_codes[u] = len(kind_codes)
+		codes = np.array([kind_codes[u] for u in uniques], dtype=np.int64)
+		return codes[inds]
+
+	def get_loc_keys(self, chroms, coords):
 		"""
-		Update the vertex IDs in self.edge_df (v1 and v2) dictionary according
-		to id_map.
+		Get integer keys for locations.
 
 		Parameters:
-			id_map (dict): Map of {old_vertex_id: new_vertex_id}
-			verbose (bool): Display progress
+			chroms (numpy array of str): Chromosome of each location
+			coords (numpy array of int): Coordinate of each location
+
+		Returns:
+			keys (numpy array of int): Key of each location
 		"""
+		return (self.get_codes('chrom', chroms) << 32) | coords
 
-		edge_df = {}
+	def get_edge_keys(self, v1, v2, strands, edge_types):
+		"""
+		Get integer keys for edges. Locations are already unique by
+		(chrom, coord), so edges are keyed by their vertex IDs.
 
-		if verbose:
-			pbar = tqdm(total=len(id_map.items()))
-			counter = 0
+		Parameters:
+			v1 (numpy array of int): Vertex ID of the start of each edge
+			v2 (numpy array of int): Vertex ID of the end of each edge
+			strands (numpy array of str): Strand of each edge
+			edge_types (numpy array of str): Type of each edge
 
-		for edge_id, item in self.edge_df.items():
+		Returns:
+			keys (numpy array of int): Key of each edge
+		"""
+		strands = self.get_codes('strand', strands)
+		edge_types = self.get_codes('edge_type', edge_types)
+		if strands.max(initial=0) > 3 or edge_types.max(initial=0) > 3:
+			raise Exception('Cannot index more than 4 strands or edge types.')
+		if v1.max(initial=0) >= 1<<29 or v2.max(initial=0) >= 1<<29:
+			raise Exception('Cannot index more than {} locations.'.format(1<<29))
+		return (v1 << 34) | (v2 << 4) | (strands << 2) | edge_types
+
+	def get_current_index(self, kind):
+		"""
+		Get the location, edge, gene, or interval index if it is up to date,
+		ie loc_df, edge_df, or t_df hasn't been replaced, sorted, filtered,
+		or had columns assigned since the index was stored. Values edited in
+		place aren't detected; call reset_t_df_indexes after editing t_df
+		that way.
 
-			if verbose:
-				counter+=1
-				if counter % 1000 == 0:
-					pbar.update(1000)
-					pbar.set_description('Reindexing edges')
+		Parameters:
+			kind (str): {'loc', 'edge', 'gene', 'interval', 'path',
+				'loc_path', 'feat'}
 
-			edge_df[edge_id] = item
-			edge_df[edge_id]['v1'] = id_map[item['v1']]
-			edge_df[edge_id]['v2'] = id_map[item['v2']]
+		Returns:
+			index (pandas Series, GeneIndex, dict, tuple, or bool): Index
+				from get_loc_index, get_edge_index, or get_gene_index, the
+				indexes from get_interval_index or get_path_index, the
+				location paths from get_paths, or True for 'feat' (see
+				SwanGraph.feat_index), or None if it is out of date
+		"""
+		index = getattr(self, kind+'_index', None)
+		if kind in ['gene', 'interval', 'path', 'loc_path', 'feat']:
+			df = self.t_df
+		else:
+			df = getattr(self, kind+'_df')
+		if index is None or index[0] is not df:
+			return None
+		state = self.get_df_state(kind, df)
+		if not self.same_df_state(index[1], state):
+			return None
+
+		# keep the new state so the next check is fast again
+		setattr(self, kind+'_index', (df, state, index[2]))
+		return index[2]
+
+	def get_df_state(self, kind, df):
+		"""
+		Get the row index and the values of the columns of loc_df, edge_df,
+		or t_df that an index is built from. In-place sorts and filters
+		replace the row index and column assignments replace the column
+		values, so comparing them by identity tells if the DataFrame changed
+		w/o scanning it. Other columns can be added or changed freely.
 
-			# edge id stays the same, just change the vertices associated
-			# with it
-			edge_df[edge_id]['edge_id'] = edge_id
+		Parameters:
+			kind (str): {'loc', 'edge', 'gene', 'interval', 'path',
+				'loc_path', 'feat'}
+			df (pandas DataFrame): loc_df, edge_df, or t_df
 
-		if verbose:
-			pbar.close()
+		Returns:
+			state (list): Row index, followed by the name and values of each
+				column the index is built from
+		"""
+		if kind == 'loc':
+			cols = ['chrom', 'coord', 'vertex_id']
+		elif kind == 'edge':
+			cols = ['v1', 'v2', 'strand', 'edge_type', 'edge_id']
+		else:
+			cols = ['gid', 'gname', 'novelty', 'path', 'loc_path']
+		state = [df.index]
+		for col in cols:
+			if col in df.columns:
+				state.append((col, df[col].values))
+		return state
+
+	def same_df_state(self, state, other):
+		"""
+		Check if two states from get_df_state are for the same, unchanged
+		DataFrame. The row index is compared by identity, and numpy column
+		values by the memory they view, which can't be reused while `state`
+		holds on to them. pandas can copy columns w/o changing them, eg
+		when other columns are added, so values that aren't the same
+		object are compared element-wise.
 
-		self.edge_df = edge_df
+		Parameters:
+			state (list): Stored state from get_df_state
+			other (list): Current state from get_df_state
 
-	def get_loc_path(self):
+		Returns:
+			same (bool): Whether the states match
 		"""
-		Determine the location path of each transcript in the SwanGraph using
-		the edge path and add it to the SwanGraph.
+		if len(state) != len(other) or state[0] is not other[0]:
+			return False
+		for (col, vals), (other_col, other_vals) in zip(state[1:], other[1:]):
+			if col != other_col:
+				return False
+			if vals is other_vals:
+				continue
+			if isinstance(vals, np.ndarray) and isinstance(other_vals, np.ndarray) \
+			   and vals.__array_interface__ == other_vals.__array_interface__:
+				continue
+			if not pd.Series(vals, copy=False).equals(
+			   pd.Series(other_vals, copy=False)):
+				return False
+		return True
+
+	def store_index(self, kind, df, index):
 		"""
+		Store the location, edge, gene, or interval index built for loc_df,
+		edge_df, or t_df.
 
-		def get_transcript_loc_path(path, edge_df):
-			start_v1 = [edge_df.loc[path[0], 'v1']]
-			v2s = edge_df.loc[path, 'v2'].tolist()
-			loc_path = start_v1+v2s
-			return loc_path
+		Parameters:
+			kind (str): {'loc', 'edge', 'gene', 'interval', 'path',
+				'loc_path', 'feat'}
+			df (pandas DataFrame): loc_df, edge_df, or t_df that the index
+				is for
+			index (pandas Series, GeneIndex, dict, tuple, or bool): Vertex
+				or edge IDs indexed by key, the gene index, the interval or
+				path indexes, edge_df and the location paths derived from
+				it, or True for 'feat'
+		"""
+		setattr(self, kind+'_index', (df, self.get_df_state(kind, df), index))
 
-		self.t_df['loc_path'] = self.t_df.apply(lambda x: \
-			get_transcript_loc_path(x.path, self.edge_df), axis=1)
+	def reset_t_df_indexes(self):
+		"""
+		Drop the gene, interval, and path indexes and the location paths,
+		ie after the rows of t_df are reordered in place or its paths
+		change.
+		"""
+		self.gene_index = None
+		self.interval_index = None
+		self.path_index = None
+		self.loc_path_index = None
 
-	def create_graph_from_dfs(self):
+	def get_loc_index(self):
 		"""
-		Create the networkx graph object from t_df.
+		Get the index of the locations in loc_df, rebuilding it if loc_df has
+		been replaced since it was last stored.
+
+		Returns:
+			loc_index (pandas Series): Vertex IDs indexed by location key
+				(from get_loc_keys)
+		"""
+		loc_index = self.get_current_index('loc')
+		if loc_index is None:
+			keys = self.get_loc_keys(self.loc_df.chrom.to_numpy(dtype=object),
+				self.loc_df.coord.to_numpy(dtype=np.int64))
+			loc_index = pd.Series(self.loc_df.vertex_id.to_numpy(dtype=np.int64),
+				index=keys)
+			loc_index = loc_index.loc[~loc_index.index.duplicated(keep='last')]
+			self.store_index('loc', self.loc_df, loc_index)
+		return loc_index
+
+	def get_edge_index(self):
 		"""
+		Get the index of the edges in edge_df, rebuilding it if edge_df has
+		been replaced since it was last stored.
 
-		G = nx.DiGraph()
+		Returns:
+			edge_index (pandas Series): Edge IDs indexed by edge key
+				(from get_edge_keys)
+		"""
+		edge_index = self.get_current_index('edge')
+		if edge_index is None:
+			keys = self.get_edge_keys(self.edge_df.v1.to_numpy(dtype=np.int64),
+				self.edge_df.v2.to_numpy(dtype=np.int64),
+				self.edge_df.strand.to_numpy(dtype=object),
+				self.edge_df.edge_type.to_numpy(dtype=object))
+			edge_index = pd.Series(self.edge_df.edge_id.to_numpy(dtype=np.int64),
+				index=keys)
+			edge_index = edge_index.loc[~edge_index.index.duplicated(keep='last')]
+			self.store_index('edge', self.edge_df, edge_index)
+		return edge_index
+
+	def get_gene_index(self):
+		"""
+		Get the index of the genes in t_df, rebuilding it if t_df has been
+		replaced or its location paths have changed since it was last stored.
 
-		# add nodes to graph from transcript paths
-		paths = self.t_df.loc_path.tolist()
-		for path in paths:
-			nx.add_path(G, path)
+		Returns:
+			gene_index (GeneIndex): Transcripts, strand, chromosome, span,
+				and vertex range of each gene
+		"""
+		gene_index = self.get_current_index('gene')
+		if gene_index is None:
+			loc_paths = None
+			if 'path' in self.t_df.columns:
+				loc_paths = self.get_paths('loc')
+			gene_index = GeneIndex.from_dfs(self.t_df, self.loc_df,
+				self.edge_df, loc_paths)
+			self.store_index('gene', self.t_df, gene_index)
+		return gene_index
+
+	def get_path_index(self, kind):
+		"""
+		Get the inverted index from the edges or locations in the transcript
+		paths to the transcripts that use them, rebuilding it if t_df has
+		been replaced since it was last stored.
 
-		self.G = G
+		Parameters:
+			kind (str): {'edge', 'loc'}
 
-	def order_edge_df(self):
+		Returns:
+			path_index (PathIndex): Sparse transcript x edge or transcript x
+				location incidence matrix, w/ rows in t_df order
 		"""
-		Order Graph's edge_df based on the v1 vertex ID, followed by
-		v2 vertex ID.
+		if kind not in ['edge', 'loc']:
+			raise ValueError('Path index kind {} not recognized. '
+				'Choose from edge or loc.'.format(kind))
+
+		indexes = self.get_current_index('path')
+		if indexes is None:
+			indexes = {}
+			self.store_index('path', self.t_df, indexes)
+		if kind not in indexes:
+			indexes[kind] = PathIndex.from_paths(self.get_paths(kind))
+		return indexes[kind]
+
+	def subset_path_index(self, indexes):
 		"""
-		self.edge_df.sort_values(by=['v1', 'v2'], inplace=True)
+		Store the path indexes for t_df from path indexes that were built
+		for a t_df w/ all of its transcripts, ie before some transcripts
+		were removed or the transcripts were reordered.
 
-	##########################################################################
-	####### Functions to switch back and forth between dfs and dicts #########
-	##########################################################################
+		Parameters:
+			indexes (dict): Path indexes from get_current_index('path'),
+				or None
+		"""
+		if indexes is None:
+			return
+		self.store_index('path', self.t_df, {kind: index.subset(self.t_df.index)
+			for kind, index in indexes.items()})
 
-	def dfs_to_dicts(self):
+	def get_interval_index(self, kind):
 		"""
-		Convert Graph's, loc_df, edge_df, and t_df to dictionaries.
+		Get the index of the genomic intervals spanned by the edges,
+		transcripts, or genes in the Graph, rebuilding it if t_df has been
+		replaced or its location paths have changed since it was last
+		stored.
+
+		Parameters:
+			kind (str): {'edge', 'transcript', 'gene'}
+
+		Returns:
+			interval_index (IntervalIndex): Index of the intervals, w/ edge
+				IDs, transcript IDs, or gene IDs as the IDs
+		"""
+		if kind not in ['edge', 'transcript', 'gene']:
+			raise ValueError('Interval index kind {} not recognized. '
+				'Choose from edge, transcript, or gene.'.format(kind))
+
+		indexes = self.get_current_index('interval')
+		if indexes is None:
+			indexes = {}
+			self.store_index('interval', self.t_df, indexes)
+		if kind in indexes:
+			return indexes[kind]
+
+		if kind == 'edge':
+			v1s = self.edge_df.v1.to_numpy()
+			index = IntervalIndex.from_arrays(self.edge_df.index.to_numpy(),
+				get_values(self.loc_df, 'chrom', v1s),
+				self.edge_df.strand.to_numpy(),
+				get_values(self.loc_df, 'coord', v1s),
+				get_values(self.loc_df, 'coord', self.edge_df.v2.to_numpy()))
+
+		elif kind == 'transcript':
+			loc_paths = self.get_paths('loc')
+			starts = loc_paths.get_ends('tss')
+			stops = loc_paths.get_ends('tes')
+			index = IntervalIndex.from_arrays(self.t_df.index.to_numpy(),
+				get_values(self.loc_df, 'chrom', starts),
+				get_values(self.edge_df, 'strand',
+					self.get_paths('edge').get_ends('tss')),
+				get_values(self.loc_df, 'coord', starts),
+				get_values(self.loc_df, 'coord', stops))
+
+		elif kind == 'gene':
+			gene_df = self.get_gene_index().df
+			if len(gene_df.index) == 0:
+				gene_df = pd.DataFrame(columns=['chrom', 'strand',
+					'min_coord', 'max_coord'])
+			index = IntervalIndex.from_arrays(gene_df.index.to_numpy(),
+				gene_df.chrom.to_numpy(), gene_df.strand.to_numpy(),
+				gene_df.min_coord.to_numpy(), gene_df.max_coord.to_numpy())
+
+		indexes[kind] = index
+		return index
+
+	def query_regions(self, regions, kind='transcript', strand=None,
+					  by_region=False):
+		"""
+		Get the edges, transcripts, or genes that overlap any of a list of
+		genomic regions.
+
+		Parameters:
+			regions (str or list of str or list of tuple): Regions
+				formatted as 'chrom' or 'chrom:start-stop' (1-based,
+				inclusive), or (chrom, start, stop) tuples, ie from
+				read_bed_regions
+			kind (str): {'edge', 'transcript', 'gene'}
+				Default: 'transcript'
+			strand (str): {'+', '-'} Only get entries on this strand
+				Default: None, get entries on both strands
+			by_region (bool): Return each overlapping region, entry pair
+				instead of the entries that overlap any region
+				Default: False
+
+		Returns:
+			ids (list): Edge IDs, transcript IDs, or gene IDs that overlap
+				the regions, in the order of edge_df / t_df
+			overlaps (pandas DataFrame): If by_region, the region (formatted
+				as 'chrom' or 'chrom:start-stop') and edge ID (edge_id),
+				transcript ID (tid), or gene ID (gid) of each overlap
 		"""
+		index = self.get_interval_index(kind)
+		if not by_region:
+			return index.query(regions, strand=strand).tolist()
+
+		regions = parse_regions(regions)
+		region_inds, ids = index.query_regions(regions, strand=strand)
+		names = np.array([format_region(*region) for region in regions],
+						 dtype=object)
+		col = {'edge': 'edge_id', 'transcript': 'tid', 'gene': 'gid'}[kind]
+		return pd.DataFrame({'region': names[region_inds], col: ids})
+
+	def get_region_edges(self, regions, strand=None):
+		"""
+		Get the edges that overlap any of a list of genomic regions.
+
+		Parameters:
+			regions (str or list of str or list of tuple): Regions
+				formatted as 'chrom' or 'chrom:start-stop' (1-based,
+				inclusive), or (chrom, start, stop) tuples
+			strand (str): Only get edges on this strand
+				Default: None, get edges on both strands
 
-		self.loc_df = self.loc_df.to_dict('index')
-		self.edge_df = self.edge_df.to_dict('index')
-		self.t_df = self.t_df.to_dict('index')
+		Returns:
+			edges (list of int): Edge IDs, in edge_df order
+		"""
+		return self.query_regions(regions, kind='edge', strand=strand)
+
+	def get_region_tids(self, regions, strand=None):
+		"""
+		Get the transcripts whose span overlaps any of a list of genomic
+		regions.
+
+		Parameters:
+			regions (str or list of str or list of tuple): Regions
+				formatted as 'chrom' or 'chrom:start-stop' (1-based,
+				inclusive), or (chrom, start, stop) tuples
+			strand (str): Only get transcripts on this strand
+				Default: None, get transcripts on both strands
 
-	def dicts_to_dfs(self):
+		Returns:
+			tids (list of str): Transcript IDs, in t_df order
 		"""
-		Convert Graph's loc_df, edge_df, and t_df dictionaries back into
-		pandas DataFrames
+		return self.query_regions(regions, kind='transcript', strand=strand)
+
+	def get_region_gids(self, regions, strand=None):
 		"""
+		Get the genes whose span overlaps any of a list of genomic regions.
 
-		# loc_df
-		self.loc_df = pd.DataFrame.from_dict(self.loc_df, orient='index')
-		self.loc_df.index.names = ['vertex_id']
+		Parameters:
+			regions (str or list of str or list of tuple): Regions
+				formatted as 'chrom' or 'chrom:start-stop' (1-based,
+				inclusive), or (chrom, start, stop) tuples
+			strand (str): Only get genes on this strand
+				Default: None, get genes on both strands
 
-		# edge_df
-		self.edge_df = pd.DataFrame.from_dict(self.edge_df, orient='index')
-		self.edge_df.index.names = ['edge_id']
+		Returns:
+			gids (list of str): Gene IDs, in the order they appear in t_df
+		"""
+		return self.query_regions(regions, kind='gene', strand=strand)
 
-		# t_df
-		self.t_df = pd.DataFrame.from_dict(self.t_df, orient='index')
-		self.t_df.index.names = ['tid']
+	def update_index_ids(self, loc_index, edge_index, id_map):
+		"""
+		Update the vertex IDs in the location and edge indexes after the
+		vertices have been renumbered, and store them for the new loc_df
+		and edge_df.
+
+		Parameters:
+			loc_index (pandas Series): Location index from before the vertices
+				were renumbered, or None
+			edge_index (pandas Series): Edge index from before the vertices
+				were renumbered, or None
+			id_map (dict): Map of {old_vertex_id: new_vertex_id}
+		"""
+		old_ids = np.fromiter(id_map.keys(), dtype=np.int64, count=len(id_map))
+		new_ids = np.fromiter(id_map.values(), dtype=np.int64, count=len(id_map))
+
+		if loc_index is not None:
+			loc_index = pd.Series(map_ids(loc_index.to_numpy(), old_ids, new_ids),
+				index=loc_index.index)
+			self.store_index('loc', self.loc_df, loc_index)
+
+		if edge_index is not None:
+			keys = edge_index.index.to_numpy()
+			v1 = map_ids(keys >> 34, old_ids, new_ids)
+			v2 = map_ids((keys >> 4) & ((1<<30)-1), old_ids, new_ids)
+			keys = (v1 << 34) | (v2 << 4) | (keys & 15)
+			edge_index = pd.Series(edge_index.to_numpy(), index=keys)
+			self.store_index('edge', self.edge_df, edge_index)
 
 	##########################################################################
 	############################# Other utilities ############################
@@ -455,7 +1048,7 @@ class Graph:
 		Parameters:
 			tid (str): Transcript ID
 		"""
-		return self.edge_df.loc[self.t_df.loc[tid, 'path'][0], 'strand']
+		return self.edge_df.loc[self.get_path_from_tid(tid)[0], 'strand']
 
 	def get_strand_from_gid(self, gid):
 		"""
@@ -465,11 +1058,7 @@ class Graph:
 			gid (str): Gene ID
 		"""
 		# don't use antisense entries
-		if self.has_novelty():
-			vertex = self.t_df.loc[(self.t_df.gid == gid)&(self.t_df.novelty != 'Antisense')].path.tolist()[0][0]
-		else:
-			vertex = self.t_df.loc[(self.t_df.gid == gid)].path.tolist()[0][0]
-		return self.edge_df.loc[vertex, 'strand']
+		return self.get_gene_index().get(gid, 'strand')
 
 	def get_chrom_from_gid(self, gid):
 		"""
@@ -478,9 +1067,7 @@ class Graph:
 		Parameters:
 			gid (str): Gene ID
 		"""
-		chrom = self.loc_df.loc[self.t_df.loc[self.t_df.gid==gid,
-					'loc_path'].tolist()[0][0], 'chrom']
-		return chrom
+		return self.get_gene_index().get(gid, 'chrom')
 
 	def get_path_from_tid(self, tid):
 		"""
@@ -489,7 +1076,7 @@ class Graph:
 		Parameters:
 			tid (str): Transcript ID
 		"""
-		return self.t_df.loc[tid].path
+		return self.get_paths('edge').get_path(tid)
 
 	def get_loc_path_from_tid(self, tid):
 		"""
@@ -498,7 +1085,7 @@ class Graph:
 		Parameters:
 			tid (str): Transcript ID
 		"""
-		return self.t_df.loc[tid].loc_path
+		return self.get_paths('loc').get_path(tid)
 
 	# get the gene id from the gene name
 	def get_gid_from_gname(self, gname):
@@ -509,9 +1096,8 @@ class Graph:
 		Parameters:
 			gname (str): Gene name
 		"""
-		try:
-			gid = self.t_df.loc[self.t_df.gname == gname, 'gid'].tolist()[0]
-		except:
+		gid = self.get_gene_index().get_gid(gname)
+		if gid is None:
 			gid = gname
 		return gid
 
@@ -525,6 +1111,16 @@ class Graph:
 		"""
 		return self.t_df.loc[tid, 'gid']
 
+	def get_tids_from_gid(self, gid):
+		"""
+		Return the transcript IDs of the input gene ID, in t_df order.
+
+		Parameters:
+			gid (str): Gene ID
+		"""
+		rows = self.get_gene_index().get_rows(gid)
+		return self.t_df.index[rows].tolist()
+
 	def get_gene_min_max(self, gid):
 		"""
 		Get the minimum and maximum genomic coordinates of an input gene.
@@ -533,13 +1129,10 @@ class Graph:
 			gid (str): Gene ID to obtain min/max coords for
 		"""
 
-		# get all starts and stops from gene and their coordinates
-		paths = self.t_df.loc[self.t_df.gid == gid].loc_path.tolist()
-		starts = np.unique([path[0] for path in paths]).tolist()
-		stops = np.unique([path[-1] for path in paths]).tolist()
-		coords = self.loc_df.loc[starts+stops, 'coord']
-
-		return int(min(coords)), int(max(coords))
+		# min and max coordinates of the starts and stops of the gene
+		gene_index = self.get_gene_index()
+		return int(gene_index.get(gid, 'min_coord')), \
+			   int(gene_index.get(gid, 'max_coord'))
 
 	# returns the min and max coordinates of an input transcript
 	def get_transcript_min_max(self, tid):
@@ -550,7 +1143,7 @@ class Graph:
 			tid (str): Transcript ID to obtain min/max coords for
 		"""
 
-		path = self.t_df.loc[tid, 'loc_path']
+		path = self.get_loc_path_from_tid(tid)
 		ends = [path[0], path[-1]]
 		end_coords = self.loc_df.loc[ends, 'coord']
 
@@ -571,11 +1164,15 @@ class Graph:
 		self.loc_df['TSS'] = False
 		self.loc_df['TES'] = False
 
-		# get lists of locations that are used as TSS, TES
-		paths = self.t_df.loc_path.tolist()
-		internal = list(set([n for path in paths for n in path[1:-1]]))
-		tss = [path[0] for path in paths]
-		tes = [path[-1] for path in paths]
+		# get the locations that are used as TSS, TES
+		paths = self.get_paths('loc')
+		tss = paths.get_ends('tss')
+		tes = paths.get_ends('tes')
+		lens = paths.lens()
+		inner = np.ones(len(paths.ids), dtype=bool)
+		inner[paths.offsets[:-1][lens > 0]] = False
+		inner[paths.offsets[1:][lens > 0]-1] = False
+		internal = np.unique(paths.ids[inner])
 
 		# set node types in t_df
 		self.loc_df.loc[internal, 'internal'] = True
@@ -601,12 +1198,8 @@ class Graph:
 		strand = self.get_strand_from_gid(gid)
 
 		# subset t_df first, it's the easiest
-		tids = self.t_df.loc[self.t_df.gid == gid].index.tolist()
+		tids = self.get_tids_from_gid(gid)
 		t_df = self.t_df.loc[tids].copy(deep=True)
-		t_df['path'] = self.t_df.loc[tids].apply(
-				lambda x: copy.deepcopy(x.path), axis=1)
-		t_df['loc_path'] = self.t_df.loc[tids].apply(
-				lambda x: copy.deepcopy(x.loc_path), axis=1)
 
 		# # also subset anndata
 		# if obs_col and obs_cats:
@@ -622,16 +1215,12 @@ class Graph:
 
 		# subset loc_df based on all the locs that are in the paths from
 		# the already-subset t_df
-		paths = t_df['loc_path'].tolist()
-		locs = [node for path in paths for node in path]
-		locs = np.unique(locs)
+		locs = np.unique(self.get_paths('loc').subset(tids).ids)
 		loc_df = self.loc_df.loc[locs].copy(deep=True)
 
 		# subset edge_df based on all the edges that are in the paths from
 		# the alread-subset t_df
-		paths = t_df['path'].tolist()
-		edges = [node for path in paths for node in path]
-		edges = np.unique(edges)
+		edges = np.unique(PathStore.from_series(t_df['path']).ids)
 		edge_df = self.edge_df.loc[edges].copy(deep=True)
 
 		# create a new graph that's been subset
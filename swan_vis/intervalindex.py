@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+from swan_vis.tabix_utils import parse_regions
+
+class IntervalIndex:
+	def __init__(self, ids, groups):
+		"""
+		Index of genomic intervals, ie edges, transcripts, or genes, for
+		finding the intervals that overlap a region. Intervals are grouped
+		by chromosome and strand, and sorted by start within each group.
+		Along w/ the largest stop of all intervals up to each position,
+		this bounds the intervals that can overlap a region w/ two binary
+		searches.
+
+		Attributes
+		----------
+		ids (numpy array):
+			ID of each interval
+		groups (dict):
+			Chromosome mapped to a dict of strand mapped to the (starts,
+			stops, max_stops, inds) arrays of the intervals on that
+			chromosome and strand, sorted by start. inds are the positions
+			of the intervals in ids.
+
+		Parameters:
+			ids (numpy array): ID of each interval
+			groups (dict): Intervals of each chromosome and strand
+		"""
+		self.ids = ids
+		self.groups = groups
+
+	@classmethod
+	def from_arrays(cls, ids, chroms, strands, starts, stops):
+		"""
+		Create an IntervalIndex from the coordinates of each interval.
+		Coordinates are inclusive, and each interval's start and stop can be
+		in either order.
+
+		Parameters:
+			ids (list-like): ID of each interval
+			chroms (list-like of str): Chromosome of each interval
+			strands (list-like of str): Strand of each interval
+			starts (list-like of int): Start of each interval
+			stops (list-like of int): Stop of each interval
+
+		Returns:
+			index (IntervalIndex): Index of the intervals
+		"""
+		ids = np.asarray(ids)
+		starts = np.asarray(starts, dtype=np.int64)
+		stops = np.asarray(stops, dtype=np.int64)
+		starts, stops = np.minimum(starts, stops), np.maximum(starts, stops)
+
+		chrom_codes, chrom_names = pd.factorize(np.asarray(chroms))
+		strand_codes, strand_names = pd.factorize(np.asarray(strands))
+
+		# sort by chromosome, then strand, then start
+		order = np.lexsort((starts, strand_codes, chrom_codes))
+		group_codes = chrom_codes[order]*(len(strand_names)+1)+strand_codes[order]
+		bounds = np.flatnonzero(np.diff(group_codes))+1
+		bounds = np.concatenate([[0], bounds, [len(order)]]).astype(np.int64)
+
+		groups = {}
+		for i, j in zip(bounds[:-1], bounds[1:]):
+			if i == j:
+				continue
+			inds = order[i:j]
+			chrom = chrom_names[chrom_codes[inds[0]]]
+			strand = strand_names[strand_codes[inds[0]]]
+			g_stops = stops[inds]
+			groups.setdefault(chrom, {})[strand] = (starts[inds], g_stops,
+				np.maximum.accumulate(g_stops), inds)
+
+		return cls(ids, groups)
+
+	def __len__(self):
+		return len(self.ids)
+
+	def query_inds(self, chrom, start=None, stop=None, strand=None):
+		"""
+		Get the positions in ids of the intervals that overlap a region.
+
+		Parameters:
+			chrom (str): Chromosome of region
+			start (int): Start of region, or None for a whole chromosome
+			stop (int): Stop of region, or None for a whole chromosome
+			strand (str): Only get intervals on this strand
+				Default: None, get intervals on both strands
+
+		Returns:
+			inds (numpy array of int): Positions of the intervals in ids
+		"""
+		strand_groups = self.groups.get(chrom, {})
+		if strand is not None:
+			strand_groups = {strand: strand_groups[strand]} \
+				if strand in strand_groups else {}
+
+		inds = []
+		for starts, stops, max_stops, g_inds in strand_groups.values():
+			if start is None:
+				inds.append(g_inds)
+				continue
+
+			# intervals that start before the region ends, and can't have
+			# all stopped before the region starts
+			lo = np.searchsorted(max_stops, start, side='left')
+			hi = np.searchsorted(starts, stop, side='right')
+			if lo >= hi:
+				continue
+			keep = stops[lo:hi] >= start
+			inds.append(g_inds[lo:hi][keep])
+
+		if not inds:
+			return np.empty(0, dtype=np.int64)
+		return np.concatenate(inds)
+
+	def query_regions(self, regions, strand=None):
+		"""
+		Get the intervals that overlap each of a list of regions.
+
+		Parameters:
+			regions (str or list of str or list of tuple): Regions
+				formatted as 'chrom' or 'chrom:start-stop' (1-based,
+				inclusive), or (chrom, start, stop) tuples
+			strand (str): Only get intervals on this strand
+				Default: None, get intervals on both strands
+
+		Returns:
+			region_inds (numpy array of int): Position of the region in
+				regions for each overlap
+			ids (numpy array): ID of the interval for each overlap
+		"""
+		region_inds = []
+		inds = []
+		for i, (chrom, start, stop) in enumerate(parse_regions(regions)):
+			temp = self.query_inds(chrom, start, stop, strand)
+			region_inds.append(np.full(len(temp), i, dtype=np.int64))
+			inds.append(temp)
+
+		if not inds:
+			return np.empty(0, dtype=np.int64), self.ids[:0]
+		return np.concatenate(region_inds), self.ids[np.concatenate(inds)]
+
+	def query(self, regions, strand=None):
+		"""
+		Get the IDs of the intervals that overlap any of a list of regions.
+
+		Parameters:
+			regions (str or list of str or list of tuple): Regions
+				formatted as 'chrom' or 'chrom:start-stop' (1-based,
+				inclusive), or (chrom, start, stop) tuples
+			strand (str): Only get intervals on this strand
+				Default: None, get intervals on both strands
+
+		Returns:
+			ids (numpy array): IDs of the intervals, in the order they were
+				added to the index
+		"""
+		inds = [self.query_inds(*region, strand=strand)
+				for region in parse_regions(regions)]
+		if not inds:
+			return self.ids[:0]
+		return self.ids[np.unique(np.concatenate(inds))]
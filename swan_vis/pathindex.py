@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+class PathIndex:
+	def __init__(self, tids, ids, matrix):
+		"""
+		Inverted index of the edges or vertices in transcript paths, as a
+		sparse transcript x edge (or vertex) incidence matrix. Entry (i, j)
+		is True if transcript tids[i] uses ids[j].
+
+		Attributes
+		----------
+		tids (pandas Index):
+			Transcript IDs, one per row
+		ids (pandas Index):
+			Sorted edge or vertex IDs, one per column. Only IDs that are
+			in at least one path are included.
+		matrix (scipy sparse csr_matrix of bool):
+			Incidence matrix
+		csc (scipy sparse csc_matrix of bool):
+			Incidence matrix in column-major order, for looking up the
+			transcripts that use each ID. Created the first time it's
+			needed.
+
+		Parameters:
+			tids (list-like of str): Transcript IDs
+			ids (list-like of int): Sorted edge or vertex IDs
+			matrix (scipy sparse matrix of bool): Incidence matrix
+		"""
+		self.tids = pd.Index(tids)
+		self.ids = pd.Index(ids)
+		self.matrix = sparse.csr_matrix(matrix, dtype=bool)
+		self.csc = None
+
+	@classmethod
+	def from_paths(cls, paths):
+		"""
+		Create a PathIndex from transcript paths.
+
+		Parameters:
+			paths (PathStore): Edge or location path of each transcript
+
+		Returns:
+			index (PathIndex): Inverted index of the paths
+		"""
+		rows = np.repeat(np.arange(len(paths), dtype=np.int64), paths.lens())
+		ids, cols = np.unique(paths.ids.astype(np.int64), return_inverse=True)
+		matrix = sparse.csr_matrix((np.ones(len(rows), dtype=bool),
+			(rows, cols.reshape(-1))), shape=(len(paths), len(ids)))
+		matrix.sum_duplicates()
+		return cls(paths.tids, ids, matrix)
+
+	def __len__(self):
+		return len(self.tids)
+
+	def nbytes(self):
+		"""
+		Get the memory used by the incidence matrix.
+
+		Returns:
+			nbytes (int): Number of bytes
+		"""
+		m = self.matrix
+		return m.data.nbytes+m.indices.nbytes+m.indptr.nbytes
+
+	def get_csc(self):
+		"""
+		Get the incidence matrix in column-major order.
+
+		Returns:
+			csc (scipy sparse csc_matrix of bool): Incidence matrix
+		"""
+		if self.csc is None:
+			self.csc = self.matrix.tocsc()
+		return self.csc
+
+	def get_rows(self, tids):
+		"""
+		Get the row numbers of transcripts.
+
+		Parameters:
+			tids (list-like of str): Transcript IDs
+
+		Returns:
+			rows (numpy array of int): Row number of each transcript
+		"""
+		rows = self.tids.get_indexer(tids)
+		if (rows == -1).any():
+			raise KeyError(np.asarray(tids)[np.flatnonzero(rows == -1)[0]])
+		return rows
+
+	def get_cols(self, ids):
+		"""
+		Get the column numbers of edge or vertex IDs.
+
+		Parameters:
+			ids (list-like of int): Edge or vertex IDs
+
+		Returns:
+			cols (numpy array of int): Column number of each ID, or -1 if
+				it's not in any path
+		"""
+		return self.ids.get_indexer(ids)
+
+	def has(self, tid, ids):
+		"""
+		Check which edges or vertices a transcript uses.
+
+		Parameters:
+			tid (str): Transcript ID
+			ids (list-like of int): Edge or vertex IDs
+
+		Returns:
+			has (numpy array of bool): Whether the transcript uses each ID
+		"""
+		row = self.get_rows([tid])[0]
+		used = self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row+1]]
+		cols = self.get_cols(ids)
+		return np.isin(cols, used)&(cols != -1)
+
+	def get_ids(self, tid):
+		"""
+		Get the edges or vertices that a transcript uses.
+
+		Parameters:
+			tid (str): Transcript ID
+
+		Returns:
+			ids (numpy array of int): Sorted edge or vertex IDs
+		"""
+		row = self.get_rows([tid])[0]
+		cols = self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row+1]]
+		return self.ids.to_numpy()[np.sort(cols)]
+
+	def get_tid_rows(self, ids):
+		"""
+		Get the row numbers of the transcripts that use any of some edges
+		or vertices.
+
+		Parameters:
+			ids (list-like of int): Edge or vertex IDs
+
+		Returns:
+			rows (numpy array of int): Sorted row numbers
+		"""
+		cols = self.get_cols(ids)
+		cols = cols[cols != -1]
+		return np.unique(self.get_csc()[:, cols].indices)
+
+	def get_tids(self, ids):
+		"""
+		Get the transcripts that use any of some edges or vertices.
+
+		Parameters:
+			ids (int or list-like of int): Edge or vertex ID(s)
+
+		Returns:
+			tids (list of str): Transcript IDs, in row order
+		"""
+		ids = np.atleast_1d(ids)
+		return self.tids[self.get_tid_rows(ids)].tolist()
+
+	def get_used_ids(self, tids):
+		"""
+		Get the edges or vertices used by any of some transcripts.
+
+		Parameters:
+			tids (list-like of str): Transcript IDs
+
+		Returns:
+			ids (numpy array of int): Sorted edge or vertex IDs
+		"""
+		rows = self.get_rows(tids)
+		return self.ids.to_numpy()[np.unique(self.matrix[rows].indices)]
+
+	def counts(self):
+		"""
+		Get the number of transcripts that use each edge or vertex.
+
+		Returns:
+			counts (numpy array of int): Number of transcripts, in the
+				order of ids
+		"""
+		return np.bincount(self.matrix.indices, minlength=len(self.ids))
+
+	def pairs(self):
+		"""
+		Get each transcript, edge or vertex pair in the index.
+
+		Returns:
+			rows (numpy array of int): Row number of the transcript of
+				each pair, in order
+			ids (numpy array of int): Edge or vertex ID of each pair
+		"""
+		rows = np.repeat(np.arange(len(self.tids), dtype=np.int64),
+			np.diff(self.matrix.indptr))
+		return rows, self.ids.to_numpy()[self.matrix.indices]
+
+	def append(self, other):
+		"""
+		Get the index w/ the transcripts of another index added after
+		these ones, ie after adding transcripts.
+
+		Parameters:
+			other (PathIndex): Index of the new transcripts
+
+		Returns:
+			index (PathIndex): Index of both sets of transcripts
+		"""
+		ids = np.union1d(self.ids.to_numpy(), other.ids.to_numpy())
+		matrices = []
+		for index in [self, other]:
+			cols = np.searchsorted(ids, index.ids.to_numpy())
+			m = index.matrix.tocoo()
+			matrices.append(sparse.csr_matrix((m.data, (m.row, cols[m.col])),
+				shape=(len(index.tids), len(ids))))
+		matrix = sparse.vstack(matrices, format='csr')
+		return PathIndex(self.tids.append(other.tids), ids, matrix)
+
+	def subset(self, tids):
+		"""
+		Get the index of a subset of transcripts, ie after removing some.
+		Edges or vertices that are no longer used are removed.
+
+		Parameters:
+			tids (list-like of str): Transcript IDs to keep, in order
+
+		Returns:
+			index (PathIndex): Index of the input transcripts
+		"""
+		matrix = self.matrix[self.get_rows(tids)]
+		used = np.flatnonzero(np.bincount(matrix.indices,
+			minlength=len(self.ids)))
+		return PathIndex(tids, self.ids[used], matrix[:, used])
+
+	def map_ids(self, old_ids, new_ids):
+		"""
+		Get the index w/ new edge or vertex IDs, ie after update_ids.
+
+		Parameters:
+			old_ids (numpy array of int): Old IDs
+			new_ids (numpy array of int): New ID of each old ID
+
+		Returns:
+			index (PathIndex): Index w/ the new IDs
+		"""
+		inds = pd.Index(old_ids).get_indexer(self.ids)
+		if (inds == -1).any():
+			raise KeyError(self.ids[np.flatnonzero(inds == -1)[0]])
+		ids = np.asarray(new_ids)[inds]
+		order = np.argsort(ids, kind='stable')
+		return PathIndex(self.tids, ids[order], self.matrix[:, order])
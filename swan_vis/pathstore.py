@@ -0,0 +1,500 @@
+import itertools
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import ExtensionArray, ExtensionDtype, \
+	register_extension_dtype
+from pandas.api.types import is_integer, is_list_like
+
+def get_min_int_array(vals):
+	"""
+	Get integer values as an int32 array if they fit, otherwise int64.
+	int32 arrays are returned w/o copying them.
+
+	Parameters:
+		vals (list-like of int): Values
+
+	Returns:
+		vals (numpy array of int): Values as int32 or int64
+	"""
+	if isinstance(vals, np.ndarray) and vals.dtype == np.int32:
+		return vals
+	vals = np.asarray(vals, dtype=np.int64)
+	info = np.iinfo(np.int32)
+	if len(vals) == 0 or (vals.min() >= info.min and vals.max() <= info.max):
+		vals = vals.astype(np.int32)
+	return vals
+
+def flatten_paths(paths):
+	"""
+	Concatenate paths into one flat array of IDs.
+
+	Parameters:
+		paths (list of list of int): Paths
+
+	Returns:
+		ids (numpy array of int): IDs of every path, concatenated
+		offsets (numpy array of int): Start of each path in ids, followed
+			by the total number of IDs
+	"""
+	lens = np.fromiter((len(path) for path in paths), dtype=np.int64,
+					   count=len(paths))
+	offsets = np.concatenate([[0], np.cumsum(lens)]).astype(np.int64)
+	ids = np.fromiter(itertools.chain.from_iterable(paths),
+					  dtype=np.int64, count=offsets[-1])
+	return ids, offsets
+
+def take_paths(ids, offsets, inds):
+	"""
+	Get the paths at some positions from flat ID and offset arrays.
+
+	Parameters:
+		ids (numpy array of int): IDs of every path, concatenated
+		offsets (numpy array of int): Start of each path in ids, followed
+			by the total number of IDs
+		inds (numpy array of int): Positions of the paths to get, or -1
+			for an empty path
+
+	Returns:
+		ids (numpy array of int): IDs of the paths, concatenated
+		offsets (numpy array of int): Start of each path in ids, followed
+			by the total number of IDs
+	"""
+	inds = np.asarray(inds, dtype=np.int64)
+	found = inds != -1
+	starts = np.zeros(len(inds), dtype=np.int64)
+	lens = np.zeros(len(inds), dtype=np.int64)
+	starts[found] = offsets[inds[found]]
+	lens[found] = offsets[inds[found]+1]-starts[found]
+	new_offsets = np.concatenate([[0], np.cumsum(lens)]).astype(np.int64)
+	pos = np.arange(new_offsets[-1])-np.repeat(new_offsets[:-1]-starts, lens)
+	return ids[pos], new_offsets
+
+def get_path_arrays(df, cols=['path', 'loc_path']):
+	"""
+	Get a DataFrame w/ its columns of paths stored as PathArrays instead
+	of lists. Columns that don't hold a list of IDs in every row are left
+	as they are.
+
+	Parameters:
+		df (pandas DataFrame): Table w/ paths, ie t_df
+		cols (list of str): Columns of paths
+			Default: ['path', 'loc_path']
+
+	Returns:
+		df (pandas DataFrame): Table w/ paths as PathArrays. Same object
+			as the input if no columns were converted.
+	"""
+	for col in cols:
+		if col not in df.columns or isinstance(df[col].array, PathArray):
+			continue
+		paths = df[col].tolist()
+		if not all(is_list_like(path) for path in paths):
+			continue
+		try:
+			array = PathArray.from_lists(paths)
+		except (TypeError, ValueError):
+			continue
+		df = df.copy(deep=False)
+		df[col] = array
+	return df
+
+class PathStore:
+	def __init__(self, tids, ids, offsets):
+		"""
+		Compact store of transcript paths (edge or location paths). All paths
+		are concatenated into one flat array of IDs, and the path of
+		transcript i is ids[offsets[i]:offsets[i+1]].
+
+		Attributes
+		----------
+		tids (pandas Index):
+			Transcript IDs
+		ids (numpy array of int):
+			Edge or vertex IDs of every path, concatenated
+		offsets (numpy array of int):
+			Start of each transcript's path in ids, followed by the total
+			number of IDs
+
+		Parameters:
+			tids (list-like of str): Transcript IDs
+			ids (numpy array of int): Edge or vertex IDs of every path,
+				concatenated
+			offsets (numpy array of int): Start of each transcript's path in
+				ids, followed by the total number of IDs
+		"""
+		self.tids = pd.Index(tids)
+		self.ids = get_min_int_array(ids)
+		self.offsets = get_min_int_array(offsets)
+
+	@classmethod
+	def from_lists(cls, tids, paths):
+		"""
+		Create a PathStore from a list of paths, ie t_df.path or
+		t_df.loc_path.
+
+		Parameters:
+			tids (list-like of str): Transcript IDs
+			paths (list-like of list of int): Path of each transcript
+
+		Returns:
+			store (PathStore): Paths in compact form
+		"""
+		ids, offsets = flatten_paths(list(paths))
+		return cls(tids, ids, offsets)
+
+	@classmethod
+	def from_series(cls, paths):
+		"""
+		Create a PathStore from a column of paths, ie t_df.path. Columns
+		stored as a PathArray share its arrays.
+
+		Parameters:
+			paths (pandas Series): Path of each transcript, indexed by
+				transcript ID
+
+		Returns:
+			store (PathStore): Paths in compact form
+		"""
+		array = paths.array
+		if isinstance(array, PathArray) and not array.na.any():
+			return cls(paths.index, array.ids, array.offsets)
+		return cls.from_lists(paths.index, paths.tolist())
+
+	def __len__(self):
+		return len(self.tids)
+
+	def __eq__(self, other):
+		if not isinstance(other, PathStore):
+			return NotImplemented
+		return self.tids.equals(other.tids) and \
+			   np.array_equal(self.ids, other.ids) and \
+			   np.array_equal(self.offsets, other.offsets)
+
+	def lens(self):
+		"""
+		Get the length of each path.
+
+		Returns:
+			lens (numpy array of int): Number of IDs in each path
+		"""
+		return np.diff(self.offsets)
+
+	def nbytes(self):
+		"""
+		Get the memory used by the ID and offset arrays.
+
+		Returns:
+			nbytes (int): Number of bytes
+		"""
+		return self.ids.nbytes+self.offsets.nbytes
+
+	def get_path(self, tid):
+		"""
+		Get the path of a transcript.
+
+		Parameters:
+			tid (str): Transcript ID
+
+		Returns:
+			path (list of int): Path of the transcript
+		"""
+		i = self.tids.get_loc(tid)
+		return self.ids[self.offsets[i]:self.offsets[i+1]].tolist()
+
+	def get_ends(self, kind):
+		"""
+		Get the first or last ID in each path, ie the TSS or TES of each
+		location path.
+
+		Parameters:
+			kind (str): {'tss', 'tes'}
+
+		Returns:
+			ids (numpy array of int): First (tss) or last (tes) ID in each
+				path
+		"""
+		if kind == 'tss':
+			inds = self.offsets[:-1]
+		elif kind == 'tes':
+			inds = self.offsets[1:]-1
+		else:
+			raise ValueError('End kind {} not recognized. '
+				'Choose from tss or tes.'.format(kind))
+		return self.ids[inds]
+
+	def to_lists(self):
+		"""
+		Get the paths as lists, ie to use as t_df.path or t_df.loc_path.
+
+		Returns:
+			paths (list of list of int): Path of each transcript
+		"""
+		ids = self.ids.tolist()
+		offsets = self.offsets.tolist()
+		return [ids[offsets[i]:offsets[i+1]] for i in range(len(self.tids))]
+
+	def to_array(self):
+		"""
+		Get the paths as a PathArray, ie to use as t_df.path. The arrays
+		are shared.
+
+		Returns:
+			array (PathArray): Path of each transcript
+		"""
+		return PathArray(self.ids, self.offsets)
+
+	def explode(self):
+		"""
+		Get each ID in each path along with the transcript it's from.
+
+		Returns:
+			tids (numpy array of str): Transcript ID of each entry
+			ids (numpy array of int): Edge or vertex ID of each entry
+		"""
+		tids = np.repeat(self.tids.to_numpy(), self.lens())
+		return tids, self.ids
+
+	def subset(self, tids):
+		"""
+		Get the paths of a subset of transcripts.
+
+		Parameters:
+			tids (list of str): Transcript IDs to keep, in order
+
+		Returns:
+			store (PathStore): Paths of the input transcripts
+		"""
+		inds = self.tids.get_indexer(tids)
+		if (inds == -1).any():
+			raise KeyError(tids[np.flatnonzero(inds == -1)[0]])
+		ids, offsets = take_paths(self.ids, self.offsets, inds)
+		return PathStore(self.tids[inds], ids, offsets)
+
+	def get_loc_paths(self, edge_df):
+		"""
+		Get location paths from edge paths. The location path of a transcript
+		is the start (v1) of its first edge followed by the end (v2) of each
+		edge.
+
+		Parameters:
+			edge_df (pandas DataFrame): SwanGraph edge_df, indexed by edge ID
+
+		Returns:
+			store (PathStore): Location path of each transcript
+		"""
+		if (self.lens() == 0).any():
+			raise ValueError('Cannot get location paths of empty edge paths.')
+		inds = edge_df.index.get_indexer(self.ids)
+		if (inds == -1).any():
+			raise KeyError(self.ids[np.flatnonzero(inds == -1)[0]])
+		v1s = edge_df.v1.to_numpy(dtype=np.int64)[inds]
+		v2s = edge_df.v2.to_numpy(dtype=np.int64)[inds]
+
+		starts = self.offsets[:-1]
+		ids = np.insert(v2s, starts, v1s[starts])
+		offsets = self.offsets+np.arange(len(self.offsets))
+		return PathStore(self.tids, ids, offsets)
+
+@register_extension_dtype
+class PathDtype(ExtensionDtype):
+	"""
+	pandas dtype of a column of paths stored as a PathArray.
+	"""
+	name = 'path'
+	type = list
+	kind = 'O'
+	na_value = None
+
+	@classmethod
+	def construct_array_type(cls):
+		return PathArray
+
+class PathArray(ExtensionArray):
+	def __init__(self, ids, offsets, na=None):
+		"""
+		pandas extension array of transcript paths, stored like a PathStore
+		as one flat array of IDs and an offsets array instead of one list
+		per transcript. Used as t_df.path, so that the column takes as
+		little memory as a PathStore and can be sorted, subset, and
+		copied w/o copying lists. Each entry is returned as a list.
+
+		Attributes
+		----------
+		ids (numpy array of int):
+			Edge or vertex IDs of every path, concatenated
+		offsets (numpy array of int):
+			Start of each path in ids, followed by the total number of IDs
+		na (numpy array of bool):
+			Whether each path is missing. Missing paths are empty.
+
+		Parameters:
+			ids (numpy array of int): Edge or vertex IDs of every path,
+				concatenated
+			offsets (numpy array of int): Start of each path in ids,
+				followed by the total number of IDs
+			na (numpy array of bool): Whether each path is missing.
+				Default: None, no missing paths
+		"""
+		self.ids = get_min_int_array(ids)
+		self.offsets = get_min_int_array(offsets)
+		if na is None:
+			na = np.zeros(len(self.offsets)-1, dtype=bool)
+		self.na = np.asarray(na, dtype=bool)
+
+	@classmethod
+	def from_lists(cls, paths):
+		"""
+		Create a PathArray from a list of paths.
+
+		Parameters:
+			paths (list-like of list of int): Path of each transcript, or
+				None if it's missing
+
+		Returns:
+			array (PathArray): Paths in compact form
+		"""
+		paths = list(paths)
+		na = np.array([not is_list_like(path) for path in paths], dtype=bool)
+		ids, offsets = flatten_paths([[] if missing else path
+			for path, missing in zip(paths, na)])
+		return cls(ids, offsets, na)
+
+	@classmethod
+	def _from_sequence(cls, scalars, dtype=None, copy=False):
+		if isinstance(scalars, PathArray):
+			return scalars.copy() if copy else scalars
+		return cls.from_lists(scalars)
+
+	@classmethod
+	def _from_factorized(cls, values, original):
+		return cls.from_lists([None if v is None else list(v) for v in values])
+
+	@classmethod
+	def _concat_same_type(cls, to_concat):
+		to_concat = list(to_concat)
+		if not to_concat:
+			return cls(np.zeros(0), np.zeros(1))
+		n = np.cumsum([0]+[len(a.ids) for a in to_concat[:-1]])
+		offsets = [np.zeros(1, dtype=np.int64)]+[a.offsets[1:].astype(np.int64)+i
+			for a, i in zip(to_concat, n)]
+		return cls(np.concatenate([a.ids.astype(np.int64) for a in to_concat]),
+			np.concatenate(offsets),
+			np.concatenate([a.na for a in to_concat]))
+
+	@property
+	def dtype(self):
+		return PathDtype()
+
+	@property
+	def nbytes(self):
+		return self.ids.nbytes+self.offsets.nbytes+self.na.nbytes
+
+	def __len__(self):
+		return len(self.na)
+
+	def __getitem__(self, item):
+		if is_integer(item):
+			if item < 0:
+				item += len(self)
+			if self.na[item]:
+				return None
+			return self.ids[self.offsets[item]:self.offsets[item+1]].tolist()
+		item = pd.api.indexers.check_array_indexer(self, item)
+		return self.take(np.arange(len(self))[item])
+
+	def __setitem__(self, key, value):
+		inds = np.arange(len(self))[key]
+		if np.ndim(inds) == 0:
+			inds = [inds]
+			value = [value]
+		elif not isinstance(value, PathArray) and (len(value) == 0 or
+			not all(is_list_like(v) or v is None for v in value)):
+			value = [value]*len(inds)
+		paths = self.to_lists()
+		for i, path in zip(inds, value):
+			paths[i] = None if path is None else list(path)
+		new = PathArray.from_lists(paths)
+		self.ids, self.offsets, self.na = new.ids, new.offsets, new.na
+
+	def __iter__(self):
+		return iter(self.to_lists())
+
+	def __array__(self, dtype=None, copy=None):
+		paths = np.empty(len(self), dtype=object)
+		for i, path in enumerate(self.to_lists()):
+			paths[i] = path
+		return paths
+
+	def __eq__(self, other):
+		if not isinstance(other, PathArray):
+			if not is_list_like(other) or len(other) != len(self):
+				return NotImplemented
+			other = PathArray.from_lists(other)
+		if len(other) != len(self):
+			raise ValueError('Lengths must match to compare')
+		if np.array_equal(self.offsets, other.offsets) and \
+		   np.array_equal(self.ids, other.ids):
+			return ~(self.na | other.na)
+		return np.array([a is not None and a == b for a, b in
+			zip(self.to_lists(), other.to_lists())], dtype=bool)
+
+	def isna(self):
+		return self.na.copy()
+
+	def take(self, indices, allow_fill=False, fill_value=None):
+		indices = np.asarray(indices, dtype=np.int64)
+		n = len(self)
+		if allow_fill:
+			if fill_value is not None and not pd.isna(fill_value):
+				raise ValueError('Paths can only be filled w/ None')
+			if (indices < -1).any():
+				raise ValueError('Invalid value in indices')
+			missing = indices == -1
+		else:
+			indices = np.where(indices < 0, indices+n, indices)
+			missing = np.zeros(len(indices), dtype=bool)
+		if ((indices >= n) | (indices < -1)).any() or \
+		   (not allow_fill and (indices < 0).any()):
+			raise IndexError('Index out of bounds for PathArray of '
+				'length {}'.format(n))
+		ids, offsets = take_paths(self.ids, self.offsets,
+			np.where(missing, -1, indices))
+		na = missing.copy()
+		na[~missing] = self.na[indices[~missing]]
+		return PathArray(ids, offsets, na)
+
+	def copy(self):
+		return PathArray(self.ids.copy(), self.offsets.copy(), self.na.copy())
+
+	def astype(self, dtype, copy=True):
+		dtype = pd.api.types.pandas_dtype(dtype)
+		if isinstance(dtype, PathDtype):
+			return self.copy() if copy else self
+		if dtype == np.dtype(object):
+			return self.__array__()
+		return super().astype(dtype, copy=copy)
+
+	def _values_for_factorize(self):
+		values = np.empty(len(self), dtype=object)
+		for i, path in enumerate(self.to_lists()):
+			values[i] = None if path is None else tuple(path)
+		return values, None
+
+	def _values_for_argsort(self):
+		return self._values_for_factorize()[0]
+
+	def to_lists(self):
+		"""
+		Get the paths as lists.
+
+		Returns:
+			paths (list of list of int): Path of each transcript, or None
+				if it's missing
+		"""
+		ids = self.ids.tolist()
+		offsets = self.offsets.tolist()
+		return [None if missing else ids[offsets[i]:offsets[i+1]]
+			for i, missing in enumerate(self.na.tolist())]
+
+	def tolist(self):
+		return self.to_lists()
@@ -158,7 +158,7 @@ class PlottedGraph(Graph):
 		self.loc_df = sg.loc_df
 		self.edge_df = sg.edge_df
 		self.t_df = sg.t_df
-		self.G = sg.G
+		self.G = sg.G.to_networkx()
 
 		self.g_min, self.g_max = self.get_gene_min_max(gid)
 		self.strand = self.get_strand_from_gid(gid)
@@ -329,26 +329,14 @@ class PlottedGraph(Graph):
 			return edge_dict['neg']+str(rad)
 
 	# get the colors of all the edges
+	# if we're given a path, only color the edges that are in the path
 	def calc_edge_colors(self):
-		self.edge_df['color'] = self.edge_df.apply(
-			lambda x: self.get_edge_color(x), axis=1)
-
-	# get the color of the edge
-	def get_edge_color(self, x):
-		# firstly, if we're given a path,
-		# only color the edges that are in the path
-		# color_dict = self.color_dict
+		colors = self.edge_df.edge_type.to_numpy().astype(str)
 		if self.tid:
-			# path_edges = [(self.path[i],self.path[i+1])
-			#				for i in range(len(self.path)-1)]
-			if x.edge_id in self.edge_path:
-				color = x.edge_type
-			else:
-				color = x.edge_type+'_gray'
-		# otherwise just color them all
-		else:
-			color = x.edge_type
-		return color
+			in_path = self.get_path_index('edge').has(self.tid,
+				self.edge_df.edge_id.to_numpy())
+			colors = np.where(in_path, colors, np.char.add(colors, '_gray'))
+		self.edge_df['color'] = colors
 
 	# get the styles of the edges (dashed or not)
 	def calc_edge_linestyles(self):
@@ -859,8 +847,8 @@ class PlottedGraph(Graph):
 
 	# orders edges by those present in the transcript and those not present in the transcript
 	def get_ordered_edges(self):
-		self.edge_df['in_transcript'] = self.edge_df.apply(lambda x:
-			1 if x.edge_id in self.edge_path else 0, axis=1)
+		self.edge_df['in_transcript'] = self.get_path_index('edge').has(
+			self.tid, self.edge_df.edge_id.to_numpy()).astype(int)
 		self.edge_df.sort_values(by='in_transcript', inplace=True)
 		self.edge_df.drop('in_transcript', axis=1, inplace=True)
 
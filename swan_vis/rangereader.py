@@ -0,0 +1,52 @@
+import io
+
+class RangeReader(io.RawIOBase):
+	def __init__(self, f, start, stop):
+		"""
+		Read-only view of a byte range of an open binary file, so that the
+		range can be read in pieces like a file of its own w/o reading all
+		of it into memory at once.
+
+		Attributes
+		----------
+		f (file-like):
+			Binary file handle, positioned in the range
+		start (int):
+			Byte offset of the start of the range
+		stop (int):
+			Byte offset of the end of the range
+
+		Parameters:
+			f (file-like): Seekable binary file handle. Closing the
+				RangeReader doesn't close it.
+			start (int): Byte offset of the start of the range
+			stop (int): Byte offset of the end of the range
+		"""
+		self.f = f
+		self.start = start
+		self.stop = stop
+		self.f.seek(start)
+
+	def readable(self):
+		return True
+
+	def readinto(self, b):
+		"""
+		Read bytes up to the end of the range into a buffer.
+
+		Parameters:
+			b (writable buffer): Buffer to read into
+
+		Returns:
+			n (int): Number of bytes read, 0 at the end of the range
+		"""
+		n = min(len(b), self.stop-self.f.tell())
+		if n <= 0:
+			return 0
+		return self.f.readinto(memoryview(b)[:n])
+
+	def tell(self):
+		"""
+		Get the number of bytes read from the range.
+		"""
+		return self.f.tell()-self.start
@@ -6,12 +6,13 @@ import matplotlib as mpl
 import os
 import math
 import copy
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import sqlite3
 import pickle
 import anndata
 from statsmodels.stats.multitest import multipletests
 import multiprocessing
+import itertools
 from itertools import repeat
 from tqdm import tqdm
 import matplotlib.colors as mc
@@ -22,6 +23,7 @@ import pdb
 
 from swan_vis.utils import *
 from swan_vis.talon_utils import *
+from swan_vis.cache_utils import *
 from swan_vis.graph import *
 from swan_vis.plottedgraph import PlottedGraph
 from swan_vis.report import Report
@@ -65,19 +67,70 @@ class SwanGraph(Graph):
 		Annotated data object to hold TSS expression values and metadata
 	tes_adata (anndata AnnData):
 		Annotated data object to hold TES expression values and metadata
+	feat_index (tuple):
+		t_df that edge_adata, tss_adata, tes_adata, and ic_adata were built
+		for, its state (see get_df_state), and True. New datasets are only
+		added to them w/o rebuilding them if t_df hasn't changed since.
+	cache_dir (str):
+		Directory to cache parsed GTFs / TALON DBs in, or None
+	cache_size (float):
+		Maximum size of the cache in GB
+	lazy_db (dict):
+		TALON DB that transcripts are loaded from on demand, and the
+		options it was added with, or None
+	lazy_cache (collections OrderedDict):
+		SwanGraphs of the regions loaded from lazy_db, from least to most
+		recently used
+	lazy_cache_size (int):
+		Maximum number of regions to keep in lazy_cache
+	backed (str):
+		Directory w/ the h5ad files that hold the counts of the AnnData
+		objects in backed mode, or None if they're held in memory
+	layer_cache (collections OrderedDict):
+		tpm and pi layers computed on demand, from least to most recently
+		used, w/ the AnnData each was computed from
+	layer_cache_size (float):
+		Maximum size of layer_cache in GB, or None if tpm and pi are
+		stored in the AnnData objects
 	"""
 
 	def __init__(self,
 				 sc=False,
 				 edge_adata=True,
 				 end_adata=True,
-				 ic_adata=True):
+				 ic_adata=True,
+				 cache_dir=None,
+				 cache_size=10,
+				 lazy_cache_size=20,
+				 backed=None,
+				 layer_cache_size=None):
 		"""
 		Parameters:
 			sc (bool): Whether this is coming from single cell data
 			edge_adata (bool): Whether to create the edge_adata table
 			end_adata (bool): Whether to create the tss/tes_adata tables
 			ic_adata (bool): Whether to create the ic_adata table
+			cache_dir (str): Directory to cache parsed GTFs / TALON DBs in.
+				Inputs are cached by their contents and the options they were
+				added with, so changed files are parsed again.
+				Default: None, no caching
+			cache_size (float): Maximum size of the cache in GB. The least
+				recently used entries are removed to stay under it.
+				Default: 10
+			lazy_cache_size (int): Maximum number of genes / regions from a
+				lazily-added TALON DB to keep in memory. The least recently
+				used ones are removed to stay under it.
+				Default: 20
+			backed (str): Directory to keep the counts of the AnnData
+				objects in, as h5ad files that are read in blocks of rows
+				instead of being held in memory. TPM and pi are computed
+				from the counts when they're needed instead of being stored.
+				Default: None, hold AnnData objects in memory
+			layer_cache_size (float): Compute tpm and pi from the counts
+				when they're needed instead of storing them as layers, and
+				keep up to this many GB of them in memory. The least
+				recently used ones are removed to stay under it.
+				Default: None, store tpm and pi as layers
 		"""
 
 		super().__init__()
@@ -105,20 +158,94 @@ class SwanGraph(Graph):
 		else:
 			self.make_ic_adata = False
 
+		self.cache_dir = cache_dir
+		self.cache_size = cache_size
+		if cache_dir:
+			os.makedirs(cache_dir, exist_ok=True)
+
+		self.lazy_db = None
+		self.feat_index = None
+		self.lazy_cache = OrderedDict()
+		self.lazy_cache_size = lazy_cache_size
+
+		self.backed = backed
+		if backed:
+			os.makedirs(backed, exist_ok=True)
+
+		self.layer_cache = OrderedDict()
+		self.layer_cache_size = layer_cache_size
+
+	def __getstate__(self):
+		"""
+		Get the state of the SwanGraph to pickle. Backed AnnData objects
+		hold an open file, so only their obs, var, and uns are pickled,
+		along w/ the path to their file.
+
+		Returns:
+			state (dict): Attributes of the SwanGraph
+		"""
+		state = super().__getstate__()
+
+		# cached layers are recomputed when they're needed again
+		if 'layer_cache' in state:
+			state['layer_cache'] = OrderedDict()
+
+		backed_files = {}
+		for name in ['adata', 'gene_adata', 'edge_adata', 'tss_adata',
+					 'tes_adata', 'ic_adata']:
+			adata = state.get(name)
+			if adata is not None and adata.isbacked:
+				backed_files[name] = str(adata.filename)
+				state[name] = anndata.AnnData(obs=adata.obs, var=adata.var,
+					uns=adata.uns)
+		if backed_files:
+			state['backed_files'] = backed_files
+		return state
+
+	def __setstate__(self, state):
+		"""
+		Restore the state of a pickled SwanGraph, opening the files of
+		backed AnnData objects again.
+
+		Parameters:
+			state (dict): Attributes of the SwanGraph
+		"""
+		backed_files = state.pop('backed_files', {})
+		super().__setstate__(state)
+		for name, fname in backed_files.items():
+			shell = getattr(self, name)
+			adata = anndata.read_h5ad(fname, backed='r')
+			adata.obs = shell.obs
+			adata.var = shell.var
+			adata.uns = shell.uns
+			setattr(self, name, adata)
+
 	###########################################################################
 	############## Related to adding datasets and merging #####################
 	###########################################################################
 
 	def add_annotation(self,
 					   fname,
-					   verbose=False):
+					   verbose=False,
+					   engine='vectorized',
+					   n_jobs=1,
+					   regions=None):
 		"""
 		Adds an annotation from input fname to the SwanGraph.
 
 		Parameters:
-			fname (str): Path to annotation GTF
+			fname (str): Path to annotation GTF. Can be gzipped.
 			verbose (bool): Display progress
 				Default: False
+			engine (str): {'vectorized', 'python'} Which GTF parser to use.
+				Default: 'vectorized'
+			n_jobs (int): Number of processes to parse the GTF with.
+				Only used with the 'vectorized' engine.
+				Default: 1
+			regions (str or list of str): Only add transcripts that overlap
+				these regions, formatted as 'chrom' or 'chrom:start-stop'.
+				Only used with the 'vectorized' engine.
+				Default: None, add all transcripts
 		"""
 
 		# is there already an annotation?
@@ -127,7 +254,8 @@ class SwanGraph(Graph):
 
 		# use the add_dataset function to add stuff to graph
 		self.add_dataset(fname, include_isms=True, \
-			annotation=True, verbose=verbose)
+			annotation=True, verbose=verbose, engine=engine, n_jobs=n_jobs,
+			regions=regions)
 
 		# call all transcripts from the annotation "Known"
 		self.t_df.loc[self.t_df.annotation == True, 'novelty'] = 'Known'
@@ -140,24 +268,113 @@ class SwanGraph(Graph):
 						  fname,
 						  pass_list=None,
 						  include_isms=False,
-						  verbose=False):
+						  verbose=False,
+						  engine='vectorized',
+						  n_jobs=1,
+						  regions=None,
+						  lazy=False):
 
 		"""
 		Adds a whole transcriptome from a set of samples.
 
 		Parameters:
-			fname (str): Path to GTF or TALON db
+			fname (str): Path to GTF (can be gzipped) or TALON db
 			pass_list (str): Path to pass list file (if passing a TALON DB)
 			include_isms (bool): Include ISMs from input dataset
 				Default: False
 			verbose (bool): Display progress
 				Default: False
+			engine (str): {'vectorized', 'python'} Which GTF / TALON DB
+				parser to use.
+				Default: 'vectorized'
+			n_jobs (int): Number of processes to parse the GTF with.
+				Only used with the 'vectorized' engine.
+				Default: 1
+			regions (str or list of str): Only add transcripts that overlap
+				these regions, formatted as 'chrom' or 'chrom:start-stop'.
+				Only used with the 'vectorized' engine.
+				Default: None, add all transcripts
+			lazy (bool): Don't read the TALON DB now. Instead, transcripts
+				are read from it one gene or region at a time when they
+				are plotted or requested with load_gene / load_region.
+				TALON DB only.
+				Default: False
 		"""
 
+		if lazy:
+			self.add_lazy_db(fname, pass_list=pass_list,
+				include_isms=include_isms,
+				engine=engine)
+			return
+
 		# use the add_dataset function to add transcripts to graph
 		tids = self.add_dataset(fname, pass_list=pass_list,
 			include_isms=include_isms,
-			verbose=verbose)
+			verbose=verbose,
+			engine=engine,
+			n_jobs=n_jobs,
+			regions=regions)
+
+		# fill NaN annotation transcripts with false
+		if 'annotation' in self.t_df.columns:
+			self.t_df.annotation.fillna(False, inplace=True)
+
+	def add_transcriptomes(self,
+						   fnames,
+						   pass_lists=None,
+						   include_isms=False,
+						   verbose=False,
+						   engine='vectorized',
+						   n_jobs=1,
+						   regions=None):
+		"""
+		Adds several transcriptomes to the SwanGraph. Gives the same result
+		as calling add_transcriptome on each one in order, but reindexing,
+		sorting, and building the graph are only done once after all of
+		the transcriptomes have been added.
+
+		Parameters:
+			fnames (list of str): Paths to GTFs (can be gzipped) or TALON dbs
+			pass_lists (list of str): Path to pass list file for each input
+				(if passing TALON DBs), or None for inputs without one
+				Default: None
+			include_isms (bool): Include ISMs from input datasets
+				Default: False
+			verbose (bool): Display progress
+				Default: False
+			engine (str): {'vectorized', 'python'} Which GTF / TALON DB
+				parser to use.
+				Default: 'vectorized'
+			n_jobs (int): Number of processes to parse each GTF with.
+				Only used with the 'vectorized' engine.
+				Default: 1
+			regions (str or list of str): Only add transcripts that overlap
+				these regions, formatted as 'chrom' or 'chrom:start-stop'.
+				Only used with the 'vectorized' engine.
+				Default: None, add all transcripts
+		"""
+		if isinstance(fnames, str):
+			fnames = [fnames]
+		if pass_lists is None:
+			pass_lists = [None for fname in fnames]
+		if len(pass_lists) != len(fnames):
+			raise ValueError('Number of pass lists ({}) does not match number '
+				'of transcriptomes ({})'.format(len(pass_lists), len(fnames)))
+
+		# add each transcriptome, and reindex / build the graph at the end
+		# even if one of them fails so the SwanGraph stays usable
+		try:
+			for fname, pass_list in zip(fnames, pass_lists):
+				self.add_dataset(fname, pass_list=pass_list,
+					include_isms=include_isms,
+					verbose=verbose,
+					engine=engine,
+					n_jobs=n_jobs,
+					regions=regions,
+					finalize=False)
+		finally:
+			if not self.is_empty():
+				self.finalize_graph(verbose=verbose)
 
 		# fill NaN annotation transcripts with false
 		if 'annotation' in self.t_df.columns:
@@ -168,12 +385,16 @@ class SwanGraph(Graph):
 					pass_list=None,
 					include_isms=False,
 					annotation=False,
-					verbose=False):
+					verbose=False,
+					engine='vectorized',
+					n_jobs=1,
+					regions=None,
+					finalize=True):
 		"""
 		Add transcripts from a dataset from either a GTF or a TALON database.
 
 		Parameters:
-			fname (str): Path to GTF or TALON db
+			fname (str): Path to GTF (can be gzipped) or TALON db
 			pass_list (str): Path to pass list file of transcript IDs to include
 			include_isms (bool): Include ISMs from input dataset
 				Default: False
@@ -182,11 +403,42 @@ class SwanGraph(Graph):
 				Default: False
 			verbose (bool): Display progress
 				Default: False
+			engine (str): {'vectorized', 'python'} Which GTF / TALON DB
+				parser to use. 'vectorized' reads the GTF in chunks using
+				vectorized string operations, or the TALON DB in batches of
+				rows that are processed column-wise. 'python' parses the GTF
+				line-by-line or the TALON DB transcript-by-transcript.
+				Default: 'vectorized'
+			n_jobs (int): Number of processes to parse the GTF with. The GTF
+				is split into byte ranges that are parsed in parallel and
+				then merged in file order, so the result does not depend
+				on n_jobs. Only used with the 'vectorized' engine. Scripts
+				that use n_jobs > 1 must run from an
+				`if __name__ == '__main__':` block.
+				Default: 1
+			regions (str or list of str): Only add transcripts that overlap
+				these regions, formatted as 'chrom' or 'chrom:start-stop'
+				(1-based, inclusive). If the GTF is bgzipped and has a tabix
+				index (<fname>.tbi), or the input is a TALON DB, only the
+				needed parts of it are read. Only used with the 'vectorized'
+				engine.
+				Default: None, add all transcripts
+			finalize (bool): Whether to reindex and sort the entries and
+				build the graph after adding the dataset. If False,
+				finalize_graph must be called before using the SwanGraph.
+				Default: True
 		"""
 
 		# are we dealing with a gtf or a db?
 		ftype = gtf_or_db(fname)
 
+		if engine not in ['vectorized', 'python']:
+			raise ValueError('Parser engine {} not recognized. '
+				'Choose from "vectorized" or "python".'.format(engine))
+		if regions is not None and engine != 'vectorized':
+			raise ValueError('Regions can only be used with the "vectorized" '
+				'engine.')
+
 		if annotation:
 			data = 'annotation'
 		else:
@@ -194,17 +446,28 @@ class SwanGraph(Graph):
 		print()
 		print('Adding {} to the SwanGraph'.format(data))
 
-		# get loc_df, edge_df, t_df
 		if ftype == 'gtf':
 			check_file_loc(fname, 'GTF')
-			t_df, exon_df, from_talon, from_cerberus = parse_gtf(fname, include_isms, verbose)
 		elif ftype == 'db':
 			check_file_loc(fname, 'TALON DB')
-			observed = True
-			t_df, exon_df = parse_db(fname, pass_list, observed,
-									 include_isms, verbose)
-			from_talon = True
-			from_cerberus = False
+
+		# get transcripts and exons, from the cache if we can
+		t_df = None
+		cache_dir = getattr(self, 'cache_dir', None)
+		if cache_dir:
+			key = get_cache_key([fname, pass_list], cache_dir,
+				ftype=ftype, include_isms=include_isms,
+				annotation=annotation, regions=regions)
+			t_df, exon_df, from_talon, from_cerberus = load_parsed(cache_dir, key)
+			if verbose and t_df is not None:
+				print('Loaded {} from cache {}'.format(data, cache_dir))
+
+		if t_df is None:
+			t_df, exon_df, from_talon, from_cerberus = self.parse_dataset(fname,
+				ftype, pass_list, include_isms, verbose, engine, n_jobs, regions)
+			if cache_dir:
+				save_parsed(cache_dir, key, t_df, exon_df, from_talon,
+					from_cerberus, getattr(self, 'cache_size', None))
 
 		# keep track of transcripts from GTF if we're adding annotation
 		if annotation:
@@ -243,6 +506,27 @@ class SwanGraph(Graph):
 
 		# order node ids by genomic position, add node types, add loc_path,
 		# and create graph
+		if finalize:
+			self.finalize_graph(verbose=verbose)
+
+		if verbose:
+			if annotation:
+				data = 'annotation'
+			else:
+				data = 'transcriptome'
+			print()
+			print('{} added to the SwanGraph'.format(data.capitalize()))
+
+	def finalize_graph(self, verbose=False):
+		"""
+		Order node IDs by genomic position, sort the edges and transcripts,
+		add node types, and create the graph from the dfs. Run after
+		adding datasets with add_dataset(..., finalize=False).
+
+		Parameters:
+			verbose (bool): Display progress
+				Default: False
+		"""
 		if verbose:
 			print('Reindexing and sorting entries on genomic location...')
 
@@ -251,14 +535,54 @@ class SwanGraph(Graph):
 		self.order_transcripts()
 		self.get_loc_types()
 		self.create_graph_from_dfs()
+		self.get_gene_index()
 
-		if verbose:
-			if annotation:
-				data = 'annotation'
+		# regions loaded from a lazy TALON DB are missing the new transcripts
+		if getattr(self, 'lazy_cache', None):
+			self.lazy_cache.clear()
+
+	def parse_dataset(self, fname, ftype, pass_list, include_isms, verbose,
+					  engine, n_jobs, regions):
+		"""
+		Get the transcripts and exons from a GTF or TALON database.
+
+		Parameters:
+			fname (str): Path to GTF or TALON db
+			ftype (str): {'gtf', 'db'}
+			pass_list (str): Path to pass list file of transcript IDs to include
+			include_isms (bool): Include ISMs from input dataset
+			verbose (bool): Display progress
+			engine (str): {'vectorized', 'python'} Which GTF / TALON DB
+				parser to use.
+			n_jobs (int): Number of processes to parse the GTF with
+			regions (str or list of str): Only get transcripts that overlap
+				these regions
+
+		Returns:
+			t_df (pandas DataFrame): Transcripts
+			exon_df (pandas DataFrame): Exons
+			from_talon (bool): Whether the input is from TALON
+			from_cerberus (bool): Whether the input is from cerberus
+		"""
+		if ftype == 'gtf':
+			if engine == 'vectorized':
+				t_df, exon_df, from_talon, from_cerberus = parse_gtf_vectorized(fname,
+					include_isms, verbose, n_jobs=n_jobs, regions=regions)
 			else:
-				data = 'transcriptome'
-			print()
-			print('{} added to the SwanGraph'.format(data.capitalize()))
+				t_df, exon_df, from_talon, from_cerberus = parse_gtf(fname,
+					include_isms, verbose)
+		elif ftype == 'db':
+			observed = True
+			if engine == 'vectorized':
+				t_df, exon_df = parse_db_vectorized(fname, pass_list, observed,
+					include_isms, verbose, regions=regions)
+			else:
+				t_df, exon_df = parse_db(fname, pass_list, observed,
+										 include_isms, verbose)
+			from_talon = True
+			from_cerberus = False
+
+		return t_df, exon_df, from_talon, from_cerberus
 
 	def remove_isms(self):
 		"""
@@ -268,27 +592,215 @@ class SwanGraph(Graph):
 		if 'novelty' in self.t_df.columns:
 
 			# transcripts
+			self.get_path_index('edge')
+			self.get_path_index('loc')
+			path_index = self.get_current_index('path')
 			self.t_df = self.t_df.loc[self.t_df.novelty != 'ISM']
+			self.subset_path_index(path_index)
 
 			# edges
-			edge_df = pivot_path_list(self.t_df, 'path')
-			eids = edge_df.edge_id.unique().tolist()
-			self.edge_df = self.edge_df.loc[eids]
+			eids = self.get_path_index('edge').ids
+			edge_index = self.get_current_index('edge')
+			self.edge_df = self.edge_df.loc[self.edge_df.index.isin(eids)]
 
 			# locs
-			loc_df = pivot_path_list(self.t_df, 'loc_path')
-			lids = loc_df.vertex_id.unique().tolist()
-			self.loc_df = self.loc_df.loc[lids]
+			lids = self.get_path_index('loc').ids
+			loc_index = self.get_current_index('loc')
+			self.loc_df = self.loc_df.loc[self.loc_df.index.isin(lids)]
+
+			# remove them from the indexes too
+			if edge_index is not None:
+				self.store_index('edge', self.edge_df,
+					edge_index.loc[edge_index.isin(eids)])
+			if loc_index is not None:
+				self.store_index('loc', self.loc_df,
+					loc_index.loc[loc_index.isin(lids)])
+
+	##########################################################################
+	################## Related to lazy loading from TALON DBs ################
+	##########################################################################
+	def add_lazy_db(self,
+					fname,
+					pass_list=None,
+					include_isms=False,
+					engine='vectorized'):
+		"""
+		Adds a TALON DB to read transcripts from on demand, one gene or
+		region at a time, instead of reading the whole DB now. Genes or
+		regions that are plotted, or requested with load_gene /
+		load_region, are read along with the transcripts already in the
+		SwanGraph and kept in lazy_cache.
+
+		Parameters:
+			fname (str): Path to TALON db
+			pass_list (str): Path to pass list file
+				Default: None
+			include_isms (bool): Include ISMs from input dataset
+				Default: False
+			engine (str): {'vectorized'} Which TALON DB parser to use.
+				Default: 'vectorized'
+		"""
+
+		if gtf_or_db(fname) != 'db':
+			raise ValueError('Only TALON DBs can be added lazily.')
+		if engine != 'vectorized':
+			raise ValueError('TALON DBs can only be added lazily with the '
+				'"vectorized" engine.')
+		if self.is_lazy():
+			raise ValueError('TALON DB {} already added lazily to the '
+				'SwanGraph'.format(self.lazy_db['fname']))
+
+		check_file_loc(fname, 'TALON DB')
+		if pass_list:
+			check_file_loc(pass_list, 'pass list')
+
+		self.lazy_db = {'fname': fname,
+						'pass_list': pass_list,
+						'include_isms': include_isms,
+						'regions': {}}
+		self.lazy_cache = OrderedDict()
+		if not hasattr(self, 'lazy_cache_size'):
+			self.lazy_cache_size = 20
+
+		print()
+		print('Added TALON DB {} to the SwanGraph. Transcripts will be read '
+			  'from it as they are needed.'.format(fname))
+
+	def is_lazy(self):
+		"""
+		Checks if transcripts are read from a TALON DB on demand.
+		"""
+		return getattr(self, 'lazy_db', None) is not None
+
+	def check_lazy(self):
+		"""
+		Check if a TALON DB has been added lazily. Raise exception if not.
+		"""
+		if not self.is_lazy():
+			raise Exception('No TALON DB added lazily to the SwanGraph.')
+
+	def get_lazy_regions(self, name, kind='gene'):
+		"""
+		Get the regions that a gene, or the gene of a transcript, spans in
+		the lazily-added TALON DB. Lookups are remembered.
+
+		Parameters:
+			name (str): Gene ID / name or transcript ID / name
+			kind (str): {'gene', 'transcript'}
+				Default: 'gene'
+
+		Returns:
+			regions (list of str): Regions formatted as 'chrom:start-stop'.
+				Empty if the gene or transcript is not in the TALON DB.
+		"""
+		lookups = self.lazy_db['regions']
+		if (kind, name) not in lookups:
+			conn = connect_db(self.lazy_db['fname'])
+			regions = fetch_gene_regions(conn.cursor(), name, kind=kind)
+			conn.close()
+			lookups[(kind, name)] = [format_region(*r) for r in regions]
+		return lookups[(kind, name)]
+
+	def load_region(self, regions):
+		"""
+		Get a SwanGraph with the transcripts that overlap some genomic
+		regions, from both the lazily-added TALON DB and the rest of the
+		SwanGraph. The least recently used regions are removed from
+		lazy_cache once there are more than lazy_cache_size of them.
+
+		Parameters:
+			regions (str or list of str): Regions to load, formatted as
+				'chrom' or 'chrom:start-stop' (1-based, inclusive)
+
+		Returns:
+			sg (swan SwanGraph): SwanGraph of the regions
+		"""
+		self.check_lazy()
+
+		# same regions in any order or overlap are the same cache entry
+		merged = merge_regions(parse_regions(regions))
+		key = tuple(sorted([format_region(chrom, start, stop)
+			for chrom, intervals in merged.items()
+			for start, stop in intervals]))
+		if key in self.lazy_cache:
+			self.lazy_cache.move_to_end(key)
+			return self.lazy_cache[key]
+
+		sg = self.subset_on_region_sg(list(key))
+		sg.add_dataset(self.lazy_db['fname'],
+			pass_list=self.lazy_db['pass_list'],
+			include_isms=self.lazy_db['include_isms'],
+			regions=list(key))
+		if 'annotation' in sg.t_df.columns:
+			sg.t_df.annotation.fillna(False, inplace=True)
+
+		self.lazy_cache[key] = sg
+		while len(self.lazy_cache) > self.lazy_cache_size:
+			self.lazy_cache.popitem(last=False)
+		return sg
+
+	def load_gene(self, gid):
+		"""
+		Get a SwanGraph with the transcripts of a gene, along with any other
+		transcripts that overlap it, from both the lazily-added TALON DB
+		and the rest of the SwanGraph.
+
+		Parameters:
+			gid (str): Gene ID or name
+
+		Returns:
+			sg (swan SwanGraph): SwanGraph of the gene's region
+		"""
+		self.check_lazy()
+		regions = self.get_lazy_regions(gid, kind='gene')
+
+		# gene could be only in the rest of the SwanGraph
+		if not regions:
+			if not self.has_gene(gid):
+				gid = self.get_gid_from_gname(gid)
+			self.check_gene(gid)
+			return self.subset_on_gene_sg(gid)
+
+		return self.load_region(regions)
+
+	def load_transcript(self, tid):
+		"""
+		Get a SwanGraph with the transcripts of the gene that a transcript
+		belongs to, along with any other transcripts that overlap it, from
+		both the lazily-added TALON DB and the rest of the SwanGraph.
+
+		Parameters:
+			tid (str): Transcript ID
+
+		Returns:
+			sg (swan SwanGraph): SwanGraph of the gene's region
+		"""
+		self.check_lazy()
+		regions = self.get_lazy_regions(tid, kind='transcript')
+
+		# transcript could be only in the rest of the SwanGraph
+		if not regions:
+			self.check_transcript(tid)
+			return self.subset_on_gene_sg(self.get_gid_from_tid(tid))
+
+		return self.load_region(regions)
 
 	def abundance_to_adata(self,
 						   counts_file,
-						   how='iso'):
+						   how='iso',
+						   chunksize=100000):
 		"""
-		Convert expression matrix to adata
+		Convert expression matrix to adata. The matrix is read in chunks of
+		rows straight into a sparse matrix, dropping transcripts that
+		aren't in the SwanGraph as it goes.
 
 		Parameters:
-			counts_file (str): Path to TALON or Swan-formatted counts matrix
+			counts_file (str): Path to TALON or Swan-formatted counts matrix.
+				Can be gzipped.
 			how (str): {'iso', 'gene'}
+			chunksize (int): Number of rows of the counts matrix to read at
+				a time.
+				Default: 100000
 
 		Returns:
 			adata (anndata AnnData): AnnData representation of gene or
@@ -296,58 +808,28 @@ class SwanGraph(Graph):
 		"""
 
 		# read in abundance file
+		# limit to just the transcripts already in the graph
 		check_file_loc(counts_file, 'abundance matrix')
+		ids = self.t_df.tid if how == 'iso' else None
 		try:
-			df = pd.read_csv(counts_file, sep='\t')
+			X, ids, datasets = read_abundance(counts_file, how=how, ids=ids,
+				chunksize=chunksize)
 		except:
 			raise ValueError('Problem reading expression matrix {}'.format(counts_file))
 
-		# check if abundance matrix is a talon transcript or gene abundance matrix
-		t_cols = ['gene_ID', 'transcript_ID', 'annot_gene_id', 'annot_transcript_id',
-			'annot_gene_name', 'annot_transcript_name', 'n_exons', 'length',
-			'gene_novelty', 'transcript_novelty', 'ISM_subtype']
-		g_cols = ['gene_ID', 'annot_gene_id', 'annot_gene_name', 'gene_novelty']
-		if df.columns.tolist()[:11] == t_cols or df.columns.tolist()[:4] == g_cols:
-			df = reformat_talon_abundance(df, how=how)
-
-		# rename id ID column
-		col = df.columns[0]
 		if how == 'gene':
 			id_col = 'gid'
 		elif how == 'iso':
 			id_col = 'tid'
 
-		df.rename({col: id_col}, axis=1, inplace=True)
-
-		# sum for gene level
-		if how == 'gene':
-			df = df.groupby(id_col).sum().reset_index()
-
-		# limit to just the transcripts already in the graph
-		if how == 'iso':
-			sg_tids = self.t_df.tid.tolist()
-			ab_tids = df.tid.tolist()
-			tids = list(set(sg_tids)&set(ab_tids))
-			df = df.loc[df.tid.isin(tids)]
-
-		# transpose to get adata format
-		df.set_index(id_col, inplace=True)
-		df = df.T
-
 		# get adata components - obs, var, and X
 
 		# var
-		var = df.columns.to_frame()
-		var.columns = [id_col]
-		# if how == 'gene':
-		# 	var_ind = 'gid'
-		# elif how == 'iso':
-		# 	var_ind = 'tid'
-		var.index.name = id_col
+		var = pd.DataFrame(index=pd.Index(ids, name=id_col),
+			data={id_col: ids})
 
 		# obs
-		obs = df.index.to_frame()
-		obs.columns = ['dataset']
+		obs = pd.DataFrame(index=datasets, data={'dataset': datasets})
 
 		# if we already have transcript abundance and we're adding genes,
 		# copy the obs information there
@@ -360,13 +842,9 @@ class SwanGraph(Graph):
 
 		obs.index.name = 'dataset'
 
-		# X
-		X = sparse.csr_matrix(df.to_numpy())
-
-		# create transcript-level adata object and filter out unexpressed transcripts
+		# create transcript-level adata object; unexpressed transcripts
+		# were already filtered out
 		adata = anndata.AnnData(var=var, obs=obs, X=X)
-		genes, _  = sc.pp.filter_genes(adata, min_counts=1, inplace=False)
-		adata = adata[:, genes]
 		adata.layers['counts'] = adata.X
 
 		return adata
@@ -394,10 +872,14 @@ class SwanGraph(Graph):
 
 		# add each dataset to list of "datasets", check if any are already there!
 		datasets = adata.obs.dataset.tolist()
-		for d in datasets:
-			if d in dataset_list:
-				raise ValueError('Dataset {} already present in the SwanGraph.'.format(d))
+		dataset_index = self.get_dataset_index(how=how)
+		new_index = pd.Index(datasets)
+		dupes = new_index.isin(dataset_index)
+		if dupes.any():
+			d = datasets[dupes.argmax()]
+			raise ValueError('Dataset {} already present in the SwanGraph.'.format(d))
 		dataset_list.extend(datasets)
+		self.store_dataset_index(dataset_index.append(new_index), how=how)
 
 		print()
 		if len(datasets) <= 5:
@@ -407,6 +889,11 @@ class SwanGraph(Graph):
 			n = len(datasets) - len(mini_datasets)
 			print('Adding abundance for datasets {}... (and {} more) to SwanGraph'.format(', '.join(mini_datasets), n))
 
+		# edge, tss, tes, and ic adatas can be added to if the transcripts
+		# haven't changed since they were made
+		append = ab_bool and how == 'iso' and \
+			self.get_current_index('feat') is not None
+
 		# if there is preexisting abundance data in the SwanGraph, concatenate
 		# otherwise, adata is the new transcript level adata
 		if not ab_bool:
@@ -414,33 +901,46 @@ class SwanGraph(Graph):
 			# create transcript-level adata object
 			sg_adata = adata
 
-			# add counts as layers
-			sg_adata.layers['counts'] = sg_adata.X
-			print('Calculating TPM...')
-			sg_adata.layers['tpm'] = sparse.csr_matrix(calc_tpm(sg_adata, recalc=True).to_numpy())
+			# backed counts are written to the SwanGraph's own file, and
+			# tpm and pi are computed from them when needed
+			if self.is_backed():
+				name = 'adata' if how == 'iso' else 'gene_adata'
+				sg_adata = self.write_backed(name, adata.obs, adata.var,
+					(X for _, X in iter_layer_chunks(adata)))
 
-			if not self.sc and how == 'iso':
-				print('Calculating PI...')
-				sg_adata.layers['pi'] = sparse.csr_matrix(calc_pi(sg_adata, self.t_df)[0].to_numpy())
+			else:
+				# add counts as layers
+				sg_adata.layers['counts'] = sg_adata.X
+
+			if not self.has_lazy_layers():
+				print('Calculating TPM...')
+				if not self.sc and how == 'iso':
+					print('Calculating PI...')
+					calc_layers(sg_adata, self.t_df)
+				else:
+					calc_layers(sg_adata)
 		else:
 
-			# first set current layer to be counts
-			sg_adata.X = sg_adata.layers['counts']
+			# tpm and pi are per dataset, so only calculate them for the
+			# new datasets
+			if not self.is_backed():
+				adata.layers['counts'] = adata.X
+
+			if not self.has_lazy_layers():
+				print('Calculating TPM...')
+				if not self.sc and how == 'iso':
+					print('Calculating PI...')
+					calc_layers(adata, self.t_df)
+				else:
+					calc_layers(adata)
 
 			# concatenate existing adata with new one
 			# outer join to add all new transcripts (that are from added
 			# annotation or transcriptome) to the abundance
-			uns = sg_adata.uns
-			sg_adata = sg_adata.concatenate(adata, join='outer', index_unique=None)
-			sg_adata.uns = uns
-
-			# recalculate pi and tpm
-			print('Calculating TPM...')
-			sg_adata.layers['tpm'] = sparse.csr_matrix(calc_tpm(sg_adata, recalc=True).to_numpy())
-
-			if not self.sc and how == 'iso':
-				print('Calculating PI...')
-				sg_adata.layers['pi'] = sparse.csr_matrix(calc_pi(sg_adata, self.t_df)[0].to_numpy())
+			var = pd.concat([sg_adata.var, adata.var])
+			var = var.loc[~var.index.duplicated()]
+			var = var.reindex(sg_adata.var.index.union(adata.var.index))
+			sg_adata = self.concat_adata(sg_adata, adata, var)
 
 		if how == 'iso':
 			self.adata = sg_adata
@@ -449,19 +949,21 @@ class SwanGraph(Graph):
 
 		# add abundance for edges, TSS per gene, and TES per gene
 		if how == 'iso':
+			new_adata = adata if append else None
 			if self.make_edge_adata:
 				print('Calculating edge usage...')
-				self.create_edge_adata()
+				self.create_edge_adata(new_adata)
 			if self.make_end_adata:
 				print('Calculating TSS usage...')
-				self.create_feat_adata(kind='tss')
+				self.create_feat_adata(kind='tss', adata=new_adata)
 				print('Calculating TES usage...')
-				self.create_feat_adata(kind='tes')
+				self.create_feat_adata(kind='tes', adata=new_adata)
 
 			if 'ic_id' in self.t_df.columns:
 				if self.make_ic_adata:
 					print('Calculating IC usage...')
-					self.create_feat_adata(kind='ic')
+					self.create_feat_adata(kind='ic', adata=new_adata)
+			self.store_index('feat', self.t_df, True)
 
 		# set abundance flag to true
 		if how == 'iso':
@@ -471,12 +973,229 @@ class SwanGraph(Graph):
 			self.gene_abundance = True
 			self.gene_adata = sg_adata
 
+		# new backed datasets have been copied to the SwanGraph's files
+		if adata.isbacked:
+			self.remove_backed(adata)
+		self.clean_layer_cache()
+
+	def concat_adata(self, adata, new_adata, var, keys=None):
+		"""
+		Add the datasets of one AnnData after the datasets of another. The
+		layers of both are widened to the columns in `var` and stacked, so
+		per-dataset values like tpm and pi aren't recalculated. In memory,
+		stacking copies the existing layers into new arrays, so adding
+		datasets costs time proportional to all of the data, not just the
+		new data.
+
+		If `adata` is backed, the counts of `new_adata` are appended to its
+		file in place, as long as the existing columns keep their order in
+		`var` (ie new IDs are only inserted between them). Otherwise, the
+		counts of both are written to a new file in blocks of rows.
+
+		Parameters:
+			adata (anndata AnnData): AnnData w/ the existing datasets
+			new_adata (anndata AnnData): AnnData w/ the new datasets
+			var (pandas DataFrame): var table of the combined AnnData. Must
+				include every column of both AnnDatas.
+			keys (list of str): Columns of the var tables to match columns
+				on. Default: None, match on the var index
+
+		Returns:
+			adata (anndata AnnData): AnnData w/ the datasets of both, and
+				the unstructured data of `adata`
+		"""
+		def get_cols(df):
+			if keys:
+				return pd.MultiIndex.from_frame(var[keys]).get_indexer(
+					pd.MultiIndex.from_frame(df[keys]))
+			return var.index.get_indexer(df.index)
+
+		cols = get_cols(adata.var)
+		new_cols = get_cols(new_adata.var)
+		if (cols == -1).any() or (new_cols == -1).any():
+			raise ValueError('Cannot concatenate AnnData objects w/ columns '
+				'missing from the combined var table.')
+
+		obs = pd.concat([adata.obs, new_adata.obs])
+		n = len(var.index)
+
+		# backed AnnDatas are stored as <name>.h5ad
+		if adata.isbacked:
+			fname = str(adata.filename)
+			if can_append_backed(fname, cols):
+				blocks = (widen_matrix(X, new_cols, n)
+					for _, X in iter_layer_chunks(new_adata))
+				adata.file.close()
+				try:
+					totals = append_backed_adata(fname, obs, var, cols, blocks)
+				except ValueError:
+					adata.file.open()
+					raise
+				totals = np.concatenate([adata.obs['total_counts'].to_numpy(),
+					totals])
+				return self.open_backed(fname, obs, var, totals, uns=adata.uns)
+
+			name = os.path.splitext(os.path.basename(fname))[0]
+			blocks = itertools.chain(
+				(widen_matrix(X, cols, n) for _, X in iter_layer_chunks(adata)),
+				(widen_matrix(X, new_cols, n) for _, X in iter_layer_chunks(new_adata)))
+			return self.write_backed(name, obs, var, blocks, uns=adata.uns)
+
+		# stack each layer that both have
+		layers = {}
+		for layer in adata.layers.keys():
+			if layer in new_adata.layers.keys():
+				layers[layer] = sparse.vstack([
+					widen_matrix(adata.layers[layer], cols, n),
+					widen_matrix(new_adata.layers[layer], new_cols, n)],
+					format='csr')
+
+		merged = anndata.AnnData(obs=obs, var=var, X=layers['counts'])
+		for layer, X in layers.items():
+			merged.layers[layer] = X
+		merged.layers['counts'] = merged.X
+		merged.uns = adata.uns
+
+		return merged
+
+	def is_backed(self):
+		"""
+		Checks if the counts of the AnnData objects are kept on disk.
+		"""
+		return getattr(self, 'backed', None) is not None
+
+	def write_backed(self, name, obs, var, blocks, uns=None):
+		"""
+		Write counts to an h5ad file in the backed directory one block of
+		rows at a time, replacing the file of the AnnData w/ the same name,
+		and open it in backed mode.
+
+		Parameters:
+			name (str): Name of the AnnData, ie 'adata' or 'edge_adata'
+			obs (pandas DataFrame): obs table
+			var (pandas DataFrame): var table
+			blocks (iterable of scipy sparse matrix): Counts of consecutive
+				blocks of rows, w/ one column per row of `var`
+			uns (dict): Unstructured data of the AnnData.
+				Default: None, no unstructured data
+
+		Returns:
+			adata (anndata AnnData): Backed AnnData w/ counts as X
+		"""
+		fname = os.path.join(self.backed, '{}.h5ad'.format(name))
+		totals = write_backed_adata(fname+'.tmp', obs, var, blocks)
+
+		# blocks can be read from the file that's being replaced
+		old_adata = getattr(self, name, None)
+		if old_adata is not None and old_adata.isbacked:
+			old_adata.file.close()
+		os.replace(fname+'.tmp', fname)
+
+		return self.open_backed(fname, obs, var, totals, uns=uns)
+
+	def open_backed(self, fname, obs, var, totals, uns=None):
+		"""
+		Open an h5ad file from write_backed in backed mode.
+
+		Parameters:
+			fname (str): Path to h5ad file
+			obs (pandas DataFrame): obs table
+			var (pandas DataFrame): var table
+			totals (numpy array of float): Total counts of each row
+			uns (dict): Unstructured data of the AnnData.
+				Default: None, no unstructured data
+
+		Returns:
+			adata (anndata AnnData): Backed AnnData w/ counts as X
+		"""
+		adata = anndata.read_h5ad(fname, backed='r')
+		adata.obs = obs.copy()
+		adata.var.index.name = var.index.name
+		adata.obs['total_counts'] = totals
+		if uns is not None:
+			adata.uns = uns
+		return adata
+
+	def has_lazy_layers(self):
+		"""
+		Checks if tpm and pi are computed from the counts when they're
+		needed instead of being stored as layers.
+		"""
+		return self.is_backed() or \
+			getattr(self, 'layer_cache_size', None) is not None
+
+	def get_adata_layer(self, adata, layer, t_df=None):
+		"""
+		Get a layer of one of the SwanGraph's AnnData objects. tpm and pi
+		that aren't stored are computed from the counts and kept in
+		layer_cache until they're the least recently used ones over
+		layer_cache_size, or the AnnData is replaced, ie when datasets are
+		added.
+
+		Parameters:
+			adata (anndata AnnData): AnnData from the SwanGraph
+			layer (str): {'counts', 'tpm', 'pi'}
+			t_df (pandas DataFrame): Table w/ the gene ID of each column, to
+				compute pi. Default: None, use adata.var
+
+		Returns:
+			X (scipy sparse csr_matrix): Datasets x IDs matrix
+		"""
+		if layer not in ['tpm', 'pi'] or layer in adata.layers.keys():
+			return get_layer(adata, layer, t_df=t_df)
+
+		if getattr(self, 'layer_cache', None) is None:
+			self.layer_cache = OrderedDict()
+
+		# cached layers are only valid for the AnnData they came from
+		key = (id(adata), layer)
+		entry = self.layer_cache.get(key)
+		if entry is not None and entry[0] is adata:
+			self.layer_cache.move_to_end(key)
+			return entry[1]
+
+		X = get_layer(adata, layer, t_df=t_df)
+		nbytes = X.data.nbytes+X.indices.nbytes+X.indptr.nbytes
+		max_bytes = self.layer_cache_size*1e9 if self.layer_cache_size \
+			is not None else 0
+		if nbytes <= max_bytes:
+			self.layer_cache[key] = (adata, X, nbytes)
+			while sum(e[2] for e in self.layer_cache.values()) > max_bytes:
+				self.layer_cache.popitem(last=False)
+		return X
+
+	def clean_layer_cache(self):
+		"""
+		Remove cached layers of AnnData objects that have been replaced.
+		"""
+		cache = getattr(self, 'layer_cache', None)
+		if not cache:
+			return
+		adatas = [self.adata, self.gene_adata, self.edge_adata,
+				  self.tss_adata, self.tes_adata, self.ic_adata]
+		for key, entry in list(cache.items()):
+			if not any(entry[0] is adata for adata in adatas):
+				del cache[key]
+
+	def remove_backed(self, adata):
+		"""
+		Close and remove the file of a backed AnnData.
+
+		Parameters:
+			adata (anndata AnnData): Backed AnnData
+		"""
+		fname = str(adata.filename)
+		adata.file.close()
+		os.remove(fname)
+
 
 	def format_adata(self,
 	                 adata_file,
 					 how='iso'):
 		"""
-		Format AnnData file for use with Swan
+		Format AnnData file for use with Swan. If the SwanGraph is backed,
+		the AnnData file is read in blocks of rows and the counts of the
+		expressed transcripts are copied to the backed directory.
 
 		Parameters:
 			adata_file (str): Path to AnnData file where var index is the
@@ -489,12 +1208,16 @@ class SwanGraph(Graph):
 		"""
 
 		# read in abundance file
+		# backed AnnData files are read in blocks of rows
 		check_file_loc(adata_file, 'AnnData')
 		try:
-			adata = sc.read(adata_file)
+			if self.is_backed():
+				adata = anndata.read_h5ad(adata_file, backed='r')
+			else:
+				adata = sc.read(adata_file)
 
 		except:
-			raise ValueError('Problem reading AnnData {}'.format(counts_file))
+			raise ValueError('Problem reading AnnData {}'.format(adata_file))
 
 
 		# format tid for var table
@@ -514,6 +1237,16 @@ class SwanGraph(Graph):
 			# will have to think about summing across genes
 			# probably use tid<->gid conversions from t_df
 
+		# limit to expressed transcripts already in the graph, and copy
+		# their counts to a new file in the backed directory
+		if self.is_backed():
+			totals = calc_layer_totals(adata)
+			cols = np.flatnonzero((totals >= 1)&\
+				adata.var.index.isin(self.t_df.tid))
+			return self.write_backed('new_adata', adata.obs,
+				adata.var.iloc[cols], (X for _, X in iter_layer_chunks(adata,
+				cols=cols)))
+
 		# create transcript-level adata object and filter out unexpressed transcripts
 		genes, _  = sc.pp.filter_genes(adata, min_counts=1, inplace=False)
 		adata = adata[:, genes].copy()
@@ -541,7 +1274,8 @@ class SwanGraph(Graph):
 		Adds abundance / metadata information from an AnnData object into the
 		SwanGraph. Transcripts in the SwanGraph but not in the AnnData will be
 		assigned 0 counts. Transcripts in the abundance matrix but not in the
-		SwanGraph will not have expression added.
+		SwanGraph will not have expression added. If the SwanGraph is
+		backed, the AnnData file is never fully read into memory.
 
 		Parameters:
 			adata_file (str): Path to AnnData file where var index is the
@@ -565,6 +1299,7 @@ class SwanGraph(Graph):
 			counts_file (str): Path to TSV expression file where first column is
 				the transcript ID and following columns name the added datasets and
 				their counts in each dataset, OR to a TALON abundance matrix.
+				Can be gzipped.
 			how (str): {'iso', 'gene'}
 		"""
 		adata = self.abundance_to_adata(counts_file, how=how)
@@ -636,116 +1371,161 @@ class SwanGraph(Graph):
 	##########################################################################
 	############# Obtaining abundance of edges, locs, and ends ###############
 	##########################################################################
-	def create_cerberus_adata(self, mode):
+	def iter_feat_counts(self, m, adata=None):
+		"""
+		Add up the transcript counts of each feature, ie each edge, TSS,
+		TES, or intron chain, w/ a sparse matrix product, one block of
+		datasets at a time.
+
+		Parameters:
+			m (scipy sparse matrix): Transcripts x features matrix where
+				entry (i, j) is nonzero if transcript i, in the order of
+				self.adata.var, has feature j
+			adata (anndata AnnData): Transcript-level AnnData w/ the
+				datasets to add up counts for, and a subset of the
+				transcripts in self.adata.
+				Default: None, use self.adata
+
+		Yields:
+			X (scipy sparse csr_matrix): Datasets x features counts matrix
+				of each block of datasets
+		"""
+		cols = None
+		if adata is None:
+			adata = self.adata
+		else:
+			cols = self.adata.var.index.get_indexer(adata.var.index)
+		m = sparse.csr_matrix(m)
+		for _, counts in iter_layer_chunks(adata):
+			if cols is not None:
+				counts = widen_matrix(counts, cols, len(self.adata.var.index))
+			yield sparse.csr_matrix(counts @ sparse.csr_matrix(m, dtype=counts.dtype))
+
+	def get_feat_counts(self, m, adata=None):
+		"""
+		Add up the transcript counts of each feature, ie each edge, TSS,
+		TES, or intron chain, w/ a sparse matrix product.
+
+		Parameters:
+			m (scipy sparse matrix): Transcripts x features matrix where
+				entry (i, j) is nonzero if transcript i, in the order of
+				self.adata.var, has feature j
+			adata (anndata AnnData): Transcript-level AnnData w/ the
+				datasets to add up counts for, and a subset of the
+				transcripts in self.adata.
+				Default: None, use self.adata
+
+		Returns:
+			X (scipy sparse csr_matrix): Datasets x features counts matrix
+		"""
+		return stack_blocks(self.iter_feat_counts(m, adata), m.shape[1])
+
+	def make_feat_adata(self, name, obs, var, m, adata=None):
+		"""
+		Create the AnnData of the counts of some features, ie edges, TSSs,
+		TESs, or intron chains, w/ the counts as a layer. If the SwanGraph
+		is backed, the counts are written to a file one block of datasets
+		at a time instead.
+
+		Parameters:
+			name (str): Name of the AnnData, ie 'edge_adata'
+			obs (pandas DataFrame): obs table
+			var (pandas DataFrame): var table
+			m (scipy sparse matrix): Transcripts x features matrix, see
+				get_feat_counts
+			adata (anndata AnnData): Transcript-level AnnData w/ the
+				datasets to add up counts for.
+				Default: None, use self.adata
+
+		Returns:
+			feat_adata (anndata AnnData): Feature-level AnnData
+		"""
+		if self.is_backed():
+			if adata is not None:
+				name = 'new_'+name
+			return self.write_backed(name, obs, var,
+				self.iter_feat_counts(m, adata))
+
+		feat_adata = anndata.AnnData(var=var, obs=obs,
+			X=self.get_feat_counts(m, adata))
+		feat_adata.layers['counts'] = feat_adata.X
+		return feat_adata
+
+	def create_cerberus_adata(self, mode, adata=None):
 		"""
 		Use the ends and intron chains called by Cerberus to compute
 		expression values for TSSs, TESs, or intron chains.
 
 		Parameters:
 			mode (str): {'ic', 'tss', 'tes'}
+			adata (anndata AnnData): Transcript-level AnnData w/ the
+				datasets to compute expression for.
+				Default: None, use self.adata
 		"""
 		id_col = '{}_id'.format(mode)
 		name_col = '{}_name'.format(mode)
 
-		# merge ic, tss, tes info with transcript counts
+		# ic, tss, tes info of each transcript
 		gb_cols = ['gid', 'gname', id_col]
-		subset_cols = copy.deepcopy(gb_cols)
-		if mode in ['tss', 'tes']:
-			end = True
-			vert_col = '{}_vertex'.format(mode)
-			subset_cols.append('loc_path')
-			if mode == 'tss':
-				ind = 0
-			elif mode == 'tes':
-				ind = -1
-		else:
-			end = False
-
-		df = self.t_df[subset_cols].reset_index()
+		end = mode in ['tss', 'tes']
+		tids = self.adata.var.index
+		df = self.t_df[gb_cols].reindex(tids)
 
-		# merge with vertex id
+		# add vertex id
 		if end:
-			df[vert_col] = [path[ind] for path in df.loc_path.values.tolist()]
-			df.drop('loc_path', axis=1, inplace=True)
+			vert_col = '{}_vertex'.format(mode)
+			paths = self.get_paths('loc').subset(tids)
+			df[vert_col] = paths.get_ends(mode)
 			gb_cols.append(vert_col)
 
-		t_counts = self.get_transcript_abundance(kind='counts')
-		t_counts = t_counts.merge(df, how='left', on='tid')
-
-		# gb and sum counts over the different features
-		t_counts.drop('tid', axis=1, inplace=True)
-		t_counts = t_counts.groupby(gb_cols).sum()
-
-		# get separate components of the table
-		X = sparse.csr_matrix(t_counts.transpose().values)
-		obs = self.adata.obs
+		# sum counts over the different features
+		m, var = get_group_indicator_matrix(df, gb_cols)
+		obs = self.adata.obs if adata is None else adata.obs
 
 		# add name of thing
-		t_counts.reset_index(inplace=True)
-		t_counts[name_col] = t_counts.gname+'_'+t_counts[id_col].str.split('_', expand=True)[1]
-		gb_cols.append(name_col)
-		var = t_counts[gb_cols]
+		var[name_col] = var.gname+'_'+var[id_col].str.split('_', expand=True)[1]
 		var.set_index(id_col, inplace=True)
 
 		if end:
 			var.rename({vert_col: 'vertex_id'}, axis=1, inplace=True)
 
-		return obs, var, X
+		return obs, var, m
 
-	def create_feat_adata(self, kind):
+	def create_feat_adata(self, kind, adata=None):
 		"""
 		Create a tss / tes / ic-level adata object. Enables calculating tss / tes
 		usage across samples.
 
 		Parameters:
 			kind (str): {'tss', 'ic', 'tes'}
+			adata (anndata AnnData): New datasets, already added to
+				self.adata, to add to the existing tss / tes / ic adata
+				instead of rebuilding it.
+				Default: None, build it from all datasets
 		"""
 
 		# check to see if end information is already present in swangraph
 		id_col = '{}_id'.format(kind)
 		if id_col in self.t_df.columns:
 			print('Using Cerberus IDs to calculate')
-			obs, var, X = self.create_cerberus_adata(kind)
+			obs, var, m = self.create_cerberus_adata(kind, adata)
+			keys = None
 
 		else:
 			# limit to only expresed transcripts
-			t_df = self.t_df.copy(deep=True)
-			t_df = t_df.loc[self.adata.var.index.tolist()]
-			df = get_ends(t_df, kind)
-
-			# get a mergeable transcript expression df
-			tid = self.adata.var.index.tolist()
-			obs = self.adata.obs.index.tolist()
-			data = self.adata.layers['counts'].transpose()
-			t_exp_df = pd.DataFrame.sparse.from_spmatrix(columns=obs, data=data, index=tid)
-			t_exp_df = t_exp_df.merge(t_df, how='left',
-				left_index=True, right_index=True)
-
-			# merge counts per transcript with end expression
-			df = df.merge(t_exp_df, how='left',
-				left_index=True, right_index=True)
-
-			# sort based on vertex id
-			df.sort_index(inplace=True, ascending=True)
-
-			# set index to gene ID, gene name, and vertex id
-			df.reset_index(drop=True, inplace=True)
-			df.set_index(['gid', 'gname', 'vertex_id'], inplace=True)
-			df = df[self.datasets]
-
-			# groupby on gene and assign each unique TSS / gene combo an ID
-			# use dense representation b/c I've already removed 0 counts and sparse
-			# gb operations are known to be slow in pandas
-			# https://github.com/pandas-dev/pandas/issues/36123
-			# maybe try this? :
-			# https://cmdlinetips.com/2019/03/how-to-write-pandas-groupby-function-using-sparse-matrix/
+			t_df = self.t_df.loc[self.adata.var.index]
+			df = get_ends(t_df, kind,
+				loc_paths=self.get_paths('loc').subset(t_df.index))
+			df['gid'] = t_df.gid.to_numpy()
+			df['gname'] = t_df.gname.to_numpy()
+
+			# sum counts over each unique TSS / gene combo
+			gb_cols = ['gid', 'gname', 'vertex_id']
+			m, df = get_group_indicator_matrix(df, gb_cols)
+
+			# assign each unique TSS / gene combo an ID
 			id_col = '{}_id'.format(kind)
 			name_col = '{}_name'.format(kind)
-			df = df.copy()
-			df.reset_index(inplace=True)
-			df[self.datasets] = df[self.datasets].sparse.to_dense()
-			df = df.groupby(['gid', 'gname', 'vertex_id']).sum().reset_index()
-
 			df['end_gene_num'] = df.sort_values(['gid', 'vertex_id'],
 							ascending=[True, True])\
 							.groupby(['gid']) \
@@ -754,173 +1534,113 @@ class SwanGraph(Graph):
 			df[name_col] = df['gname']+'_'+df['end_gene_num'].astype(str)
 			df.drop('end_gene_num', axis=1, inplace=True)
 
-			# obs, var, and X tables for new data
-			var_cols = ['gid', 'gname', 'vertex_id', id_col, name_col]
-			var = df[var_cols]
-			var.set_index('{}_id'.format(kind), inplace=True)
-			df.drop(var_cols, axis=1, inplace=True)
-			df = df[self.adata.obs.index.tolist()]
-			X = sparse.csr_matrix(df.transpose().values)
-			obs = self.adata.obs
+			# obs and var tables for new data
+			var = df[gb_cols+[id_col, name_col]]
+			var.set_index(id_col, inplace=True)
+			obs = self.adata.obs if adata is None else adata.obs
+
+			# ids are renumbered when a gene has new ends, so match the
+			# existing ends on gene and vertex
+			keys = ['gid', 'vertex_id']
 
 		# create anndata
-		adata = anndata.AnnData(var=var, obs=obs, X=X)
+		feat_adata = self.make_feat_adata(kind+'_adata', obs, var, m, adata)
 
-		# add counts and tpm as layers
-		adata.layers['counts'] = adata.X
-		adata.layers['tpm'] = sparse.csr_matrix(calc_tpm(adata, recalc=True).to_numpy())
-		if not self.sc:
-			adata.layers['pi'] = sparse.csr_matrix(calc_pi(adata,
-					adata.var)[0].to_numpy())
+		# add tpm and pi as layers
+		if not self.has_lazy_layers():
+			calc_layers(feat_adata, None if self.sc else feat_adata.var)
+
+		# add the new datasets to the existing adata
+		if adata is not None:
+			new_adata = feat_adata
+			old_adata = getattr(self, kind+'_adata')
+			feat_adata = self.concat_adata(old_adata, new_adata,
+				new_adata.var, keys=keys)
+			if new_adata.isbacked:
+				self.remove_backed(new_adata)
 
 		# assign adata and clean up unstructured data if needed
-		if kind == 'tss':
+		elif kind == 'tss':
 			if self.has_abundance():
-				adata.uns = self.tss_adata.uns
-			self.tss_adata = adata
-
+				feat_adata.uns = self.tss_adata.uns
 		elif kind == 'tes':
 			if self.has_abundance():
-				adata.uns = self.tss_adata.uns
-			self.tes_adata = adata
-
+				feat_adata.uns = self.tss_adata.uns
 		elif kind == 'ic':
 			if self.has_abundance():
-				adata.uns = self.ic_adata.uns
-			self.ic_adata = adata
+				feat_adata.uns = self.ic_adata.uns
+		setattr(self, kind+'_adata', feat_adata)
 
-	def create_edge_adata(self):
+	def create_edge_adata(self, adata=None):
 		"""
 		Create an edge-level adata object. Enables calculating edge usage across
 		samples.
-		"""
-
-		# get table what edges are in each transcript
-		t_df = self.t_df.copy(deep=True)
-		t_df = t_df.loc[self.adata.var.index.tolist()]
-		edge_exp_df = pivot_path_list(t_df, 'path')
-
-		# get a mergeable transcript expression df
-		tid = self.adata.var.index.tolist()
-		obs = self.adata.obs.index.tolist()
-		data = self.adata.layers['counts'].transpose()
-		t_exp_df = pd.DataFrame.sparse.from_spmatrix(columns=obs,
-													 data=data,
-													 index=tid)
 
-		# merge counts per transcript with edges
-		edge_exp_df = edge_exp_df.merge(t_exp_df, how='left',
-			left_index=True, right_index=True)
+		Parameters:
+			adata (anndata AnnData): New datasets, already added to
+				self.adata, to add to the existing edge adata instead of
+				rebuilding it.
+				Default: None, build it from all datasets
+		"""
 
-		# sum the counts per transcript / edge / dataset
-		edge_exp_df.reset_index(inplace=True, drop=True)
-		edge_exp_df.set_index('edge_id', inplace=True)
-		edge_exp_df[self.datasets] = edge_exp_df[self.datasets].sparse.to_dense()
-		edge_exp_df = edge_exp_df.groupby(by='edge_id', as_index=True).sum()
+		# sum the counts of the transcripts that use each edge
+		index = self.get_path_index('edge')
+		m = index.matrix[index.get_rows(self.adata.var.index)]
 
 		# order based on order of edges in self.edge_df
-		edge_exp_df = edge_exp_df.merge(self.edge_df[['v1', 'v2']],
-			how='left', left_index=True, right_index=True)
-		edge_exp_df.sort_values(by=['v1', 'v2'], inplace=True)
-		edge_exp_df.drop(['v1', 'v2'], axis=1, inplace=True)
-
-		# drop edges that are unexpressed
-		edge_exp_df = edge_exp_df.loc[edge_exp_df.sum(1) > 0]
+		eids = index.ids.to_numpy()
+		edge_df = self.edge_df.loc[eids]
+		order = np.lexsort((edge_df.v2.to_numpy(), edge_df.v1.to_numpy()))
+
+		# drop edges that are unexpressed in every dataset. edge counts
+		# are sums of transcript counts, so total the transcripts first
+		if adata is None:
+			t_totals = calc_layer_totals(self.adata)
+		else:
+			t_totals = np.zeros(len(self.adata.var.index))
+			t_totals[self.adata.var.index.get_indexer(adata.var.index)] = \
+				calc_layer_totals(adata)
+		totals = sparse.csr_matrix(m, dtype=np.float64).T @ t_totals
+		if adata is not None:
+			old_cols = index.get_cols(self.edge_adata.var.index.astype(int))
+			old_totals = calc_layer_totals(self.edge_adata)
+			totals[old_cols[old_cols != -1]] += old_totals[old_cols != -1]
+		order = order[totals[order] > 0]
 
 		# obs, var, and X tables for new data
-		var = edge_exp_df.index.to_frame()
-		X = sparse.csr_matrix(edge_exp_df.transpose().values)
-		obs = self.adata.obs
+		var = pd.Index(eids[order], name='edge_id').to_frame()
+		obs = self.adata.obs if adata is None else adata.obs
 
 		# create edge-level adata object
-		adata = anndata.AnnData(var=var, obs=obs, X=X)
+		edge_adata = self.make_feat_adata('edge_adata', obs, var,
+			m[:, order], adata)
 
-		# add counts and tpm as layers
-		adata.layers['counts'] = adata.X
-		adata.layers['tpm'] = sparse.csr_matrix(calc_tpm(adata, recalc=True).to_numpy())
+		# add tpm as a layer
+		if not self.has_lazy_layers():
+			calc_layers(edge_adata)
 
 		# can't make pi for edges unless I make a new edge for
 		# each gene that the edge is in
 		# could just have self.edge_adata var separate from self.edge_df for now tho
 	#	 self.edge_adata.layers['pi'] = sparse.csr_matrix(calc_pi(self.adata, self.edge_df)[0].to_numpy())
 
+		# add the new datasets to the existing adata
+		if adata is not None:
+			new_adata = edge_adata
+			edge_adata = self.concat_adata(self.edge_adata, new_adata,
+				new_adata.var)
+			if new_adata.isbacked:
+				self.remove_backed(new_adata)
+
 		# assign adata and clean up unstructured data if needed
-		if self.has_abundance():
-			adata.uns = self.edge_adata.uns
-		self.edge_adata = adata
+		elif self.has_abundance():
+			edge_adata.uns = self.edge_adata.uns
+		self.edge_adata = edge_adata
 
 	##########################################################################
 	############# Related to creating dfs from GTF or TALON DB ###############
 	##########################################################################
 
-	def get_current_locs(self):
-		"""
-		Get a dictionary of unique locations already in the SwanGraph, along
-		with the number of unique locations. Used to create the dataframes
-		in create_dfs.
-
-		Returns:
-			locs (dict): Dictionary of unique genomic locations. Keys are
-				(chromosome, coordinate). Items are the vertex IDs from the
-				SwanGraph.
-			n (int): Number of unique genomic locations. -1 if SwanGraph
-				is empty.
-		"""
-		if not self.is_empty():
-			n = self.loc_df.vertex_id.max()
-
-			ids = self.loc_df.vertex_id.tolist()
-			chroms = self.loc_df.chrom.tolist()
-			coords = self.loc_df.coord.tolist()
-			locs = dict([((ch, co), vid) for ch, co, vid in zip(chroms, coords, ids)])
-		else:
-			locs = {}
-			n = -1
-
-		return locs, n
-
-	def get_current_edges(self):
-		"""
-		Get a dictionary of unique edges already in the SwanGraph, along with
-		the number of unique edges. Used to create the dataframes in
-		create_dfs_gtf and create_dfs_db.
-
-		Returns:
-			edges (dict): Dictionary of unique edges. Keys are (chromosome,
-				start (v1) coord, end (v2) coord, strand, edge_type). Items are
-				the edge IDs, v1, v2, and edge_type from the SwanGraph.
-			n (int): Number of unique edges. -1 if SwanGraph is emtpy.
-		"""
-
-		if not self.is_empty():
-
-			# number of edges currently
-			n = self.edge_df.edge_id.max()
-
-			# get a version of edge_df with the coordinates
-			edge_df = self.add_edge_coords()
-
-			edges = {}
-			for ind, entry in edge_df.iterrows():
-				ch = entry.chrom
-				v1_coord = entry.v1_coord
-				v2_coord = entry.v2_coord
-				strand = entry.strand
-				edge_type = entry.edge_type
-				v1 = entry.v1
-				v2 = entry.v2
-				key = (ch,v1_coord,v2_coord,strand,edge_type)
-				item = {'edge_id': entry['edge_id'],
-						'edge_type': edge_type,
-						'v1': v1,
-						'v2': v2}
-				edges[key] = item
-		else:
-			edges = {}
-			n = -1
-
-		return edges, n
-
 	def add_edge_coords(self):
 		"""
 		Add coordinates and chromosome to edge_df from loc_df.
@@ -958,13 +1678,13 @@ class SwanGraph(Graph):
 		from preexisting transcripts in the SwanGraph.
 
 		Parameters:
-			transcripts (dict of dict): Dictionary of transcripts from file.
-				Keys (str): transcript id
-				Items (dict): gene id, gene name, transcript id (same as key),
+			transcripts (pandas DataFrame or dict of dict): Transcripts from file.
+				Keys / index (str): transcript id
+				Items / columns: gene id, gene name, transcript id (same as key),
 				transcript name, strand, and exons belonging to the transcript.
-			exons (dict of dict): Dictionary of exons in GTF.
-				Keys (str): exon ids (chromosome_v1_v2_strand_exon)
-				Items (dict): edge id (same as key), chromosome, v1, v2, strand,
+			exons (pandas DataFrame or dict of dict): Exons in GTF.
+				Keys / index (str): exon ids (chromosome_v1_v2_strand_exon)
+				Items / columns: edge id (same as key), chromosome, v1, v2, strand,
 				and edge type (all exon in this case)
 			from_talon (bool): Whether or not the GTF was determined to be
 				from TALON.
@@ -982,46 +1702,33 @@ class SwanGraph(Graph):
 				TALON DB or GTF as well as those already in the SwanGraph.
 		"""
 
-		# turn each dataframe back into a dict
-		if type(transcripts) != dict:
-			transcripts = transcripts.to_dict(orient='index')
-		if type(exons) != dict:
-			exons = exons.to_dict(orient='index')
+		# work with dataframes
+		if type(transcripts) == dict:
+			transcripts = pd.DataFrame.from_dict(transcripts, orient='index')
+		if type(exons) == dict:
+			exons = pd.DataFrame.from_dict(exons, orient='index')
 
-		locs = self.create_loc_dict(exons)
-		transcripts, edges = self.create_transcript_edge_dicts(transcripts, exons, locs)
+		# existing transcripts keep their edge paths
+		path_index = self.get_current_index('path')
 
-		# turn transcripts, edges, and locs into dataframes
-		locs = [{'chrom': key[0],
-				 'coord': key[1],
-				 'vertex_id': vertex_id} for key, vertex_id in locs.items()]
-		loc_df = pd.DataFrame(locs)
-
-		edges = [{'v1': item['v1'],
-				  'v2': item['v2'],
-				  'strand': key[3],
-				  'edge_id': item['edge_id'],
-				  'edge_type': item['edge_type']} for key, item in edges.items()]
-		edge_df = pd.DataFrame(edges)
+		loc_df, loc_index, v1_ids, v2_ids = self.create_loc_df(exons)
+		edge_df, edge_index, paths = self.create_edge_df(transcripts, exons,
+			v1_ids, v2_ids)
 
 		cols = ['tid', 'tname', 'gid', 'gname', 'path']
 		if from_talon:
 			cols.append('novelty')
 		if from_cerberus:
 			cols += ['tss_id', 'ic_id', 'tes_id']
-		t_df = pd.DataFrame(transcripts)
-		t_df = t_df.transpose()
+		t_df = transcripts.astype(object)
+		t_df['path'] = paths
 		t_df = t_df.reset_index(drop=True)
 		t_df = t_df[cols]
 
-		# remove entries that are already in the SwanGraph so we just get
+		# remove transcripts that are already in the SwanGraph so we just get
 		# dfs of new entries
 		tids = self.t_df.tid.tolist()
-		eids = self.edge_df.edge_id.tolist()
-		vids = self.loc_df.vertex_id.tolist()
 		t_df = t_df.loc[~t_df.tid.isin(tids)]
-		edge_df = edge_df.loc[~edge_df.edge_id.isin(eids)]
-		loc_df = loc_df.loc[~loc_df.vertex_id.isin(vids)]
 
 		# format indices of dfs
 		loc_df = create_dupe_index(loc_df, 'vertex_id')
@@ -1032,6 +1739,7 @@ class SwanGraph(Graph):
 		t_df = set_dupe_index(t_df, 'tid')
 
 		# and concatenate with those that exist
+		new_t_df = t_df
 		loc_df = pd.concat([self.loc_df, loc_df])
 		edge_df = pd.concat([self.edge_df, edge_df])
 		t_df = pd.concat([self.t_df, t_df])
@@ -1040,121 +1748,158 @@ class SwanGraph(Graph):
 		if 'novelty' in t_df.columns:
 			t_df['novelty'] = t_df['novelty'].fillna('Undefined')
 
+		# keep the indexes for the new dfs so we don't have to rebuild them
+		# the next time we add data
+		if len(loc_index.index) == len(loc_df.index):
+			self.store_index('loc', loc_df, loc_index)
+		if len(edge_index.index) == len(edge_df.index):
+			self.store_index('edge', edge_df, edge_index)
+
+		# and add the new transcripts to the edge path index
+		if path_index is not None and 'edge' in path_index:
+			new_index = PathIndex.from_paths(
+				PathStore.from_series(new_t_df['path']))
+			self.store_index('path', t_df,
+				{'edge': path_index['edge'].append(new_index)})
+
 		return loc_df, edge_df, t_df
 
-	def create_loc_dict(self, exons):
+	def create_loc_df(self, exons):
 		"""
-		Create location dictionary using the exons found from a GTF or TALON
-		DB.
+		Create a DataFrame of the locations from the exons found in a GTF or
+		TALON DB that aren't already in the SwanGraph. New locations are
+		numbered in the order that they first appear in the exons.
 
 		Parameters:
-			exons (dict): Dictionary of exons found in the GTF or TALON DB.
-				Keys (str): chr_v1_c2_strand_exon.
-				Items (dict): eid, chrom, v1, v2, strand, edge_type
+			exons (pandas DataFrame): Exons found in the GTF or TALON DB.
+				Index (str): chr_v1_v2_strand_exon.
+				Columns: eid, chrom, v1, v2, strand
 
 		Returns:
-			locs (dict): Dictionary of locations and their vertex IDs
-				in the SwanGraph, including existing and novel locations.
-				Keys: (chrom, coord). Items: vertex_id.
+			loc_df (pandas DataFrame): DataFrame of new locations with
+				chrom, coord, and vertex_id
+			loc_index (pandas Series): Location index (see get_loc_index)
+				with the new locations added
+			v1_ids (numpy array of int): Vertex ID of the start of each exon
+			v2_ids (numpy array of int): Vertex ID of the end of each exon
 		"""
+		if not self.is_empty():
+			n = self.loc_df.vertex_id.max()
+			loc_index = self.get_loc_index()
+		else:
+			n = -1
+			loc_index = pd.Series([], dtype=np.int64)
 
-		locs, vertex_id = self.get_current_locs()
-		vertex_id += 1
-		for eid, edge in exons.items():
-			chrom = edge['chrom']
-			v1 = edge['v1']
-			v2 = edge['v2']
-
-			# exon start
-			key = (chrom, v1)
-			if key not in locs:
-				locs[key] = vertex_id
-				vertex_id += 1
+		# each exon's start then end
+		chroms = np.repeat(exons.chrom.to_numpy(dtype=object), 2)
+		coords = np.column_stack([exons.v1.to_numpy(dtype=np.int64),
+								  exons.v2.to_numpy(dtype=np.int64)]).ravel()
+		keys = self.get_loc_keys(chroms, coords)
 
-			# exon end
-			key = (chrom, v2)
-			if key not in locs:
-				locs[key] = vertex_id
-				vertex_id += 1
+		ids, new_inds, new_ids = get_key_ids(keys, loc_index, n)
+		loc_df = pd.DataFrame({'chrom': chroms[new_inds],
+							   'coord': coords[new_inds],
+							   'vertex_id': new_ids})
+		loc_index = pd.concat([loc_index,
+			pd.Series(new_ids, index=keys[new_inds])])
 
-		return locs
+		return loc_df, loc_index, ids[0::2], ids[1::2]
 
-	def create_transcript_edge_dicts(self, transcripts, exons, locs):
+	def create_edge_df(self, transcripts, exons, v1_ids, v2_ids):
 		"""
-		Create edge dictionary using the exons found from a GTF or TALON DB, and
-		add the edge path to the transcript dictionary (only dictionary
-		attribute added by this function).
+		Create a DataFrame of the exons and introns from the transcripts
+		found in a GTF or TALON DB that aren't already in the SwanGraph, and
+		get the edge path of each transcript. New edges are numbered in the
+		order that they first appear in the transcripts' paths.
 
 		Parameters:
-			transcripts (dict): Dictionary of transcripts found in the GTF or
-				TALON DB.
-				Keys (str): transcript ID
-				Items (dict): gid, gname, tid, tname, strand, novelty (if talon),
-					exons (list of 'chr_coord1_coord2_strand_exon').
-			exons (dict): Dictionary of exons found in the GTF or TALON DB.
-				Keys (str): chr_v1_c2_strand_exon.
-				Items (dict): eid, chrom, v1, v2, strand, edge_type
-			loc (dict): TODO
+			transcripts (pandas DataFrame): Transcripts found in the GTF or
+				TALON DB. Must have an exons column (list of
+				'chr_coord1_coord2_strand_exon').
+			exons (pandas DataFrame): Exons found in the GTF or TALON DB.
+				Index (str): chr_v1_v2_strand_exon.
+				Columns: eid, chrom, v1, v2, strand
+			v1_ids (numpy array of int): Vertex ID of the start of each exon,
+				from create_loc_df
+			v2_ids (numpy array of int): Vertex ID of the end of each exon,
+				from create_loc_df
 
 		Returns:
-			transcripts (dict): Dictionary of only NEW transcripts.
-				Keys (str): transcript ID
-				Items (str): TODO
-			edges (dict): Dictionary of edges and their edge IDs
-				in the SwanGraph, including existing and novel edges.
-				Keys: TODO
-				Items: TODO
-		"""
-
-		edges, edge_id = self.get_current_edges()
-		edge_id += 1
-		for key, t in transcripts.items():
-			t['path'] = []
-			strand = t['strand']
-			t_exons = t['exons']
-
-			# reorder exons that are in weird orders from the GTF
-			t_exons = reorder_exons(t_exons)
-
-			for i, exon_id in enumerate(t_exons):
-
-				# pull some information from exon dict
-				exon = exons[exon_id]
-				chrom = exon['chrom']
-				v1 = exon['v1']
-				v2 = exon['v2']
-				strand = exon['strand']
-
-				# add current exon and subsequent intron
-				# (if not the last exon) for each exon to edge
-				# also add this exon to the current transcript's path
-				key = (chrom, v1, v2, strand, 'exon')
-				v1_key = (chrom, v1)
-				v2_key = (chrom, v2)
-				if key not in edges:
-					edges[key] = {'edge_id': edge_id, 'edge_type': 'exon',
-								  'v1': locs[v1_key], 'v2': locs[v2_key]}
-					t['path'] += [edge_id]
-					edge_id += 1
-				else:
-					t['path'] += [edges[key]['edge_id']]
-
-				# if this isn't the last exon, we also need to add an intron
-				# this consists of v2 of the prev exon and v1 of the next exon
-				# also add this intron to the current transcript's path
-				if i < len(t_exons)-1:
-					next_exon = exons[t_exons[i+1]]
-					v1 = next_exon['v1']
-					key = (chrom, v2, v1, strand, 'intron')
-					v1_key = (chrom, v1)
-					if key not in edges:
-						edges[key] = {'edge_id': edge_id, 'edge_type': 'intron',
-									  'v1': locs[v2_key], 'v2': locs[v1_key]}
-						t['path'] += [edge_id]
-						edge_id += 1
-					else:
-						t['path'] += [edges[key]['edge_id']]
-		return transcripts, edges
+			edge_df (pandas DataFrame): DataFrame of new edges with v1, v2,
+				strand, edge_id, and edge_type
+			edge_index (pandas Series): Edge index (see get_edge_index)
+				with the new edges added
+			paths (PathArray): Edge path of each transcript
+		"""
+		if not self.is_empty():
+			n = self.edge_df.edge_id.max()
+			edge_index = self.get_edge_index()
+		else:
+			n = -1
+			edge_index = pd.Series([], dtype=np.int64)
+
+		# row in exons of each transcript's exons
+		t_exons = transcripts.exons.tolist()
+		lens = np.array([len(e) for e in t_exons], dtype=np.int64)
+		inds = exons.index.get_indexer([e for t in t_exons for e in t])
+		if (inds == -1).any():
+			eid = [e for t in t_exons for e in t][np.flatnonzero(inds == -1)[0]]
+			raise KeyError(eid)
+		t_inds = np.repeat(np.arange(len(lens)), lens)
+		starts = np.concatenate([[0], np.cumsum(lens)[:-1]]).astype(np.int64)
+
+		# order each transcript's exons by start coordinate, reversed for
+		# transcripts on the - strand (same as reorder_exons)
+		strands = exons.strand.to_numpy(dtype=object)
+		v1_coords = exons.v1.to_numpy(dtype=np.int64)
+		order = np.lexsort((v1_coords[inds], t_inds))
+		rank = np.arange(len(inds))-starts[t_inds]
+		first = inds[starts[lens > 0]]
+		minus = np.zeros(len(lens), dtype=bool)
+		minus[lens > 0] = strands[first] == '-'
+		rank[minus[t_inds]] = (lens[t_inds]-1-rank)[minus[t_inds]]
+		sorted_inds = np.empty_like(inds)
+		sorted_inds[starts[t_inds]+rank] = inds[order]
+		inds = sorted_inds
+
+		# each exon is followed by an intron to the next exon
+		# in the transcript, if there is one
+		has_intron = np.zeros(len(inds), dtype=bool)
+		has_intron[:-1] = t_inds[:-1] == t_inds[1:]
+		n_before = np.concatenate([[0], np.cumsum(has_intron)[:-1]]).astype(np.int64)
+		exon_pos = np.arange(len(inds))+n_before
+		intron_pos = exon_pos[has_intron]+1
+		n_edges = len(inds)+len(intron_pos)
+
+		e_v1 = np.empty(n_edges, dtype=np.int64)
+		e_v2 = np.empty(n_edges, dtype=np.int64)
+		e_strand = np.empty(n_edges, dtype=object)
+		e_type = np.empty(n_edges, dtype=object)
+		e_v1[exon_pos] = v1_ids[inds]
+		e_v2[exon_pos] = v2_ids[inds]
+		e_strand[exon_pos] = strands[inds]
+		e_type[exon_pos] = 'exon'
+		e_v1[intron_pos] = v2_ids[inds[:-1][has_intron[:-1]]]
+		e_v2[intron_pos] = v1_ids[inds[1:][has_intron[:-1]]]
+		e_strand[intron_pos] = strands[inds[:-1][has_intron[:-1]]]
+		e_type[intron_pos] = 'intron'
+
+		keys = self.get_edge_keys(e_v1, e_v2, e_strand, e_type)
+		ids, new_inds, new_ids = get_key_ids(keys, edge_index, n)
+		edge_df = pd.DataFrame({'v1': e_v1[new_inds],
+								'v2': e_v2[new_inds],
+								'strand': e_strand[new_inds],
+								'edge_id': new_ids,
+								'edge_type': e_type[new_inds]})
+		edge_index = pd.concat([edge_index,
+			pd.Series(new_ids, index=keys[new_inds])])
+
+		# split edge IDs back up by transcript
+		path_lens = np.maximum(2*lens-1, 0)
+		bounds = np.concatenate([[0], np.cumsum(path_lens)])
+		paths = PathArray(ids, bounds)
+
+		return edge_df, edge_index, paths
 
 	def label_annotated(self, tids):
 		"""
@@ -1168,8 +1913,7 @@ class SwanGraph(Graph):
 		"""
 
 		# obtain all unique annotated edges
-		edges = self.t_df.loc[tids, 'path'].tolist()
-		edges = list(set([e for path in edges for e in path]))
+		edges = self.get_path_index('edge').get_used_ids(tids).tolist()
 
 		# obtain all unique annotated locations
 		v1_locs = self.edge_df.loc[edges, 'v1'].tolist()
@@ -1187,6 +1931,78 @@ class SwanGraph(Graph):
 	##########################################################################
 	######################## Other SwanGraph utilities #####################
 	##########################################################################
+	def subset_dfs_on_tids(self, tids):
+		"""
+		Get copies of t_df, loc_df, and edge_df with only the given
+		transcripts and the locations and edges in their paths.
+
+		Parameters:
+			tids (list of str): Transcript IDs to keep
+
+		Returns:
+			t_df (pandas DataFrame): Subset t_df
+			loc_df (pandas DataFrame): Subset loc_df
+			edge_df (pandas DataFrame): Subset edge_df
+		"""
+		# subset t_df first, it's the easiest. paths are stored in flat
+		# arrays, so copying them doesn't copy a list per transcript
+		t_df = self.t_df.loc[tids].copy(deep=True)
+
+		# subset loc_df based on all the locs that are in the paths from
+		# the already-subset t_df
+		locs = np.unique(self.get_paths('loc').subset(tids).ids)
+		loc_df = self.loc_df.loc[locs].copy(deep=True)
+
+		# subset edge_df based on all the edges that are in the paths from
+		# the alread-subset t_df
+		edges = np.unique(PathStore.from_series(t_df['path']).ids)
+		edge_df = self.edge_df.loc[edges].copy(deep=True)
+
+		return t_df, loc_df, edge_df
+
+	def subset_on_region_sg(self, regions):
+		"""
+		Subset the SwanGraph on the transcripts that overlap some genomic
+		regions and return the subset graph. Unlike subset_on_gene_sg,
+		the graph is not built, so more transcripts can be added to it
+		with add_dataset.
+
+		Parameters:
+			regions (str or list of str): Regions to subset on, formatted as
+				'chrom' or 'chrom:start-stop' (1-based, inclusive)
+
+		Returns:
+			subset_sg (swan SwanGraph): Swan Graph subset on the regions
+		"""
+		subset_sg = SwanGraph(sc=self.sc,
+			edge_adata=self.make_edge_adata,
+			end_adata=self.make_end_adata,
+			ic_adata=self.make_ic_adata,
+			cache_dir=getattr(self, 'cache_dir', None),
+			cache_size=getattr(self, 'cache_size', 10))
+		subset_sg.pg = self.pg
+		subset_sg.annotation = self.annotation
+		if self.is_empty():
+			return subset_sg
+
+		tids = self.get_region_tids(regions)
+		if not tids:
+			return subset_sg
+
+		t_df, loc_df, edge_df = self.subset_dfs_on_tids(tids)
+		subset_sg.loc_df = loc_df
+		subset_sg.edge_df = edge_df
+		subset_sg.t_df = t_df
+
+		# also subset anndata
+		if self.abundance:
+			tids = list(set(tids)&set(self.adata.var.index.tolist()))
+			subset_sg.adata = self.adata[:, tids]
+			subset_sg.datasets = subset_sg.adata.obs.index.tolist()
+			subset_sg.abundance = self.abundance
+
+		return subset_sg
+
 	def subset_on_gene_sg(self, gid=None, datasets=None):
 		"""
 		Subset the swan Graph on a given gene and return the subset graph.
@@ -1210,31 +2026,12 @@ class SwanGraph(Graph):
 			# get the strand
 			strand = self.get_strand_from_gid(gid)
 
-			# subset t_df first, it's the easiest
-			tids = self.t_df.loc[self.t_df.gid == gid].index.tolist()
-			t_df = self.t_df.loc[tids].copy(deep=True)
-			t_df['path'] = self.t_df.loc[tids].apply(
-					lambda x: copy.deepcopy(x.path), axis=1)
-			t_df['loc_path'] = self.t_df.loc[tids].apply(
-					lambda x: copy.deepcopy(x.loc_path), axis=1)
+			tids = self.get_tids_from_gid(gid)
+			t_df, loc_df, edge_df = self.subset_dfs_on_tids(tids)
 
 			# since we don't keep all transcripts in adata, make
 			# sure to pare that down
 			tids = list(set(tids)&set(self.adata.var.index.tolist()))
-
-			# subset loc_df based on all the locs that are in the paths from
-			# the already-subset t_df
-			paths = t_df['loc_path'].tolist()
-			locs = [node for path in paths for node in path]
-			locs = np.unique(locs)
-			loc_df = self.loc_df.loc[locs].copy(deep=True)
-
-			# subset edge_df based on all the edges that are in the paths from
-			# the alread-subset t_df
-			paths = t_df['path'].tolist()
-			edges = [node for path in paths for node in path]
-			edges = np.unique(edges)
-			edge_df = self.edge_df.loc[edges].copy(deep=True)
 		if not gid:
 			t_df = self.t_df.copy(deep=True)
 			edge_df = self.edge_df.copy(deep=True)
@@ -1257,7 +2054,12 @@ class SwanGraph(Graph):
 		# 		  'tss': self.tss_adata, 'tes': self.tes_adata}
 		adatas = {'iso': self.adata}
 		for key, adata in adatas.items():
-			if datasets and gid:
+			# only read in this gene's data from backed adata, and compute
+			# tpm from all transcripts if it isn't stored
+			if gid and self.abundance and self.has_lazy_layers():
+				new_adatas[key] = read_adata_subset(adata, datasets, tids,
+					t_df=None if self.sc else self.t_df)
+			elif datasets and gid:
 				new_adatas[key] = adata[datasets, tids]
 			elif gid:
 				new_adatas[key] = adata[:, tids]
@@ -1349,12 +2151,11 @@ class SwanGraph(Graph):
 
 		# order by tss location
 		elif order == 'tss':
-			t_df = t_df.merge(self.t_df[['path', 'loc_path']],
-				how='left', left_index=True, right_index=True)
-			t_df['start_coord'] = t_df.apply(lambda x:
-				self.loc_df.loc[x.loc_path[0], 'coord'], axis=1)
-			t_df['strand'] = t_df.apply(lambda x:
-				self.edge_df.loc[x.path[0], 'strand'], axis=1)
+			tids = t_df.index
+			t_df['start_coord'] = get_values(self.loc_df, 'coord',
+				self.get_paths('loc').subset(tids).get_ends('tss'))
+			t_df['strand'] = get_values(self.edge_df, 'strand',
+				self.get_paths('edge').subset(tids).get_ends('tss'))
 			fwd = t_df.loc[t_df.strand == '+']
 			rev = t_df.loc[t_df.strand == '-']
 			fwd.sort_values(by='start_coord', ascending=True, inplace=True)
@@ -1363,22 +2164,21 @@ class SwanGraph(Graph):
 			# print(rev[['strand', 'start_coord']])
 			t_df = pd.concat([fwd, rev])
 			# print(t_df[['strand', 'start_coord']])
-			t_df.drop(['start_coord', 'strand', 'path', 'loc_path'], axis=1, inplace=True)
+			t_df.drop(['start_coord', 'strand'], axis=1, inplace=True)
 
 		# order by tes location
 		elif order == 'tes':
-			t_df = t_df.merge(self.t_df[['path', 'loc_path']],
-				how='left', left_index=True, right_index=True)
-			t_df['end_coord'] = t_df.apply(lambda x:
-				self.loc_df.loc[x.loc_path[-1], 'coord'], axis=1)
-			t_df['strand'] = t_df.apply(lambda x:
-				self.edge_df.loc[x.path[-1], 'strand'], axis=1)
+			tids = t_df.index
+			t_df['end_coord'] = get_values(self.loc_df, 'coord',
+				self.get_paths('loc').subset(tids).get_ends('tes'))
+			t_df['strand'] = get_values(self.edge_df, 'strand',
+				self.get_paths('edge').subset(tids).get_ends('tes'))
 			fwd = t_df.loc[t_df.strand == '+']
 			rev = t_df.loc[t_df.strand == '-']
 			fwd.sort_values(by='end_coord', ascending=True, inplace=True)
 			rev.sort_values(by='end_coord', ascending=False, inplace=True)
 			t_df = pd.concat([fwd, rev])
-			t_df.drop(['end_coord', 'strand', 'path', 'loc_path'], axis=1, inplace=True)
+			t_df.drop(['end_coord', 'strand'], axis=1, inplace=True)
 
 		tids = t_df.index.tolist()
 		return t_df, tids
@@ -1396,9 +2196,11 @@ class SwanGraph(Graph):
 		"""
 
 		# order by transcript id
+		path_index = self.get_current_index('path')
 		if order == 'tid':
 			ordered_tids = sorted(self.t_df.tid.tolist())
 			self.t_df = self.t_df.loc[ordered_tids]
+			self.subset_path_index(path_index)
 
 		# order by expression
 		elif order == 'expression':
@@ -1410,17 +2212,19 @@ class SwanGraph(Graph):
 			else:
 
 				# find max expressed transcripts
-				data = self.adata.layers['tpm'].sum(axis=0)
+				data = calc_layer_totals(self.adata, 'tpm')
 				cols = self.adata.var.index.tolist()
 				temp = pd.DataFrame(index=['tpm'], data=[data], columns=cols).transpose()
 				temp.sort_values(by='tpm', ascending=False, inplace=True)
 				ordered_tids = temp.index.tolist()
 				# print(temp)
 
-				# order t_df and adata
+				# order t_df and adata. backed adata is left in file order
 				self.t_df = self.t_df.loc[ordered_tids]
 				# print(self.t_df)
-				self.adata = self.adata[:, ordered_tids]
+				if not self.adata.isbacked:
+					self.adata = self.adata[:, ordered_tids]
+				self.subset_path_index(path_index)
 
 		# order by coordinate of tss
 		elif order == 'tss':
@@ -1436,6 +2240,7 @@ class SwanGraph(Graph):
 								  ascending=ascending,
 								  inplace=True)
 			self.t_df.drop('start_coord', axis=1, inplace=True)
+			self.reset_t_df_indexes()
 
 		# order by coordinate of tes
 		elif order == 'tes':
@@ -1451,11 +2256,138 @@ class SwanGraph(Graph):
 								  ascending=ascending,
 								  inplace=True)
 			self.t_df.drop('end_coord', axis=1, inplace=True)
+			self.reset_t_df_indexes()
 
 	##########################################################################
 	######################## Analysis tools  #################################
 	##########################################################################
 
+	def get_graph_edge_keys(self):
+		"""
+		Get a key for each edge in edge_df from its v1 and v2 vertices, to
+		match edges from the graph to edge_df.
+
+		Returns:
+			n_locs (int): Multiplier for v1 in the keys
+			edge_keys (numpy array of int): v1*n_locs+v2 of each edge
+		"""
+		v1s = self.edge_df.v1.to_numpy(dtype=np.int64)
+		v2s = self.edge_df.v2.to_numpy(dtype=np.int64)
+		n_locs = int(max(v1s.max(initial=0), v2s.max(initial=0)))+1
+		return n_locs, v1s*n_locs+v2s
+
+	def find_novel_events(self, event, verbose=False):
+		"""
+		Find novel exons that span annotated introns (intron retention), or
+		novel introns that span annotated exons (exon skipping). An edge
+		spans another if both of the other edge's vertices are between
+		its vertices. Spanned edges are found w/ binary searches over the
+		edges sorted by vertex ID, and the transcripts that use each edge
+		from the edge path index, so every novel edge is tested at once.
+
+		Parameters:
+			event (str): {'ir', 'es'}
+			verbose (bool): Display output
+				Default: False
+
+		Returns:
+			event_df (pandas DataFrame): Gene ID (gid), transcript ID (tid),
+				and novel edge ID (edge_id) of each event. Each gene is
+				reported w/ the first novel edge that it has an event
+				for, once for each spanned edge and novel transcript w/
+				the novel edge.
+		"""
+		if event == 'ir':
+			cand_type, span_type = 'exon', 'intron'
+		else:
+			cand_type, span_type = 'intron', 'exon'
+
+		edge_df = self.edge_df
+		cand_inds = np.flatnonzero(((edge_df.annotation == False)&\
+			(edge_df.edge_type == cand_type)).to_numpy())
+		if event == 'ir':
+			print('Analyzing {} exonic edges for IR'.format(len(cand_inds)))
+		else:
+			print('Analyzing {} intronic edges for ES'.format(len(cand_inds)))
+		if verbose:
+			print('Testing each novel edge for {}'.format(
+				'intron retention' if event == 'ir' else 'exon skipping'))
+
+		eids = edge_df.edge_id.to_numpy()
+		v1s = edge_df.v1.to_numpy(dtype=np.int64)
+		v2s = edge_df.v2.to_numpy(dtype=np.int64)
+		c_v1s = v1s[cand_inds]
+		c_v2s = v2s[cand_inds]
+
+		# edges of the right type in the graph, sorted by their lower vertex
+		n_locs, edge_keys = self.get_graph_edge_keys()
+		g_v1s, g_v2s = self.G.edge_arrays()
+		in_graph = np.isin(edge_keys, g_v1s.astype(np.int64)*n_locs+g_v2s)
+		span_inds = np.flatnonzero(in_graph&\
+			(edge_df.edge_type == span_type).to_numpy())
+		s_lo = np.minimum(v1s[span_inds], v2s[span_inds])
+		s_hi = np.maximum(v1s[span_inds], v2s[span_inds])
+		order = np.argsort(s_lo, kind='stable')
+
+		# spanned edges w/ a lower vertex after v1 and upper vertex before v2
+		first = np.searchsorted(s_lo[order], c_v1s, side='right')
+		last = np.maximum(np.searchsorted(s_lo[order], c_v2s, side='left'),
+						  first)
+		counts = last-first
+		pair_c = np.repeat(np.arange(len(cand_inds)), counts)
+		offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+		pair_s = order[first[pair_c]+np.arange(len(pair_c))-offsets[pair_c]]
+		keep = s_hi[pair_s] < c_v2s[pair_c]
+		pairs = pd.DataFrame({'c': pair_c[keep],
+							  'e': span_inds[pair_s[keep]]})
+		pairs.sort_values(['c', 'e'], inplace=True)
+
+		# transcript, edge pairs from the edge path index
+		t_df = self.t_df
+		g_codes, gids = pd.factorize(t_df.gid.to_numpy())
+		t_rows, t_eids = self.get_path_index('edge').pairs()
+		t_pairs = pd.DataFrame({'t': t_rows, 'eid': t_eids.astype(np.int64)})
+
+		# novel transcripts that have each novel edge, in t_df order
+		novel = (t_df.annotation == False).to_numpy()
+		c = pd.Index(eids[cand_inds]).get_indexer(t_pairs.eid.to_numpy())
+		tids = pd.DataFrame({'c': c, 't': t_pairs.t.to_numpy()})
+		tids = tids.loc[(c != -1)&novel[tids.t.to_numpy()]]
+		tids = tids.sort_values(['c', 't'])
+
+		# genes of the novel transcripts w/ each novel edge
+		cand_genes = pd.DataFrame({'c': tids.c.to_numpy(),
+			'g': g_codes[tids.t.to_numpy()]}).drop_duplicates()
+
+		# for exon skipping, only keep exons that are used by one of the
+		# genes of the novel intron
+		if event == 'es':
+			gene_edges = pd.DataFrame({'g': g_codes[t_pairs.t.to_numpy()],
+				'eid': t_pairs.eid.to_numpy()}).drop_duplicates()
+			temp = pairs.merge(cand_genes, on='c')
+			temp['eid'] = eids[temp.e.to_numpy()]
+			temp = temp.merge(gene_edges, on=['g', 'eid'])
+			pairs = pairs.loc[pairs.set_index(['c', 'e']).index.isin(
+				temp.set_index(['c', 'e']).index)]
+
+		# each gene is only reported for the first novel edge w/ an event
+		valid = np.intersect1d(pairs.c.unique(), tids.c.unique())
+		cand_genes = cand_genes.loc[cand_genes.c.isin(valid)]
+		cand_genes = cand_genes.drop_duplicates(subset='g', keep='first')
+
+		# one entry for each spanned edge and novel transcript
+		cand_genes['g_order'] = np.arange(len(cand_genes.index))
+		pairs['e_order'] = np.arange(len(pairs.index))
+		tids['t_order'] = np.arange(len(tids.index))
+		event_df = cand_genes.merge(pairs, on='c').merge(tids, on='c')
+		event_df.sort_values(['g_order', 'e_order', 't_order'], inplace=True)
+
+		event_df = pd.DataFrame({
+			'gid': gids[event_df.g.to_numpy(dtype=np.int64)],
+			'tid': t_df.tid.to_numpy()[event_df.t.to_numpy(dtype=np.int64)],
+			'edge_id': eids[cand_inds][event_df.c.to_numpy(dtype=np.int64)]})
+		return event_df
+
 	def find_ir_genes(self, verbose=False):
 		"""
 		Finds all unique genes containing novel intron retention events.
@@ -1475,80 +2407,7 @@ class SwanGraph(Graph):
 			raise Exception('Cannot find novel IR events without '
 				'annotation in SwanGraph.')
 
-		edge_ids = self.edge_df.loc[ \
-			(self.edge_df.annotation == False)& \
-			(self.edge_df.edge_type == 'exon'), 'edge_id']
-		print('Analyzing {} exonic edges for IR'.format(len(edge_ids)))
-
-		# get subset of transcripts that are novel to look for ir edges in
-		nt_df = self.t_df.loc[self.t_df.annotation == False]
-
-		# verbose output
-		if verbose:
-			n_progress = len(edge_ids)
-			pbar = tqdm(total=n_progress)
-			pbar.set_description('Testing each novel edge for intron retention')
-
-		# for each edge, see if the subgraph between the edge vertices
-		# contains an exonic edge
-		ir_edges = []
-		ir_genes = []
-		ir_transcripts = []
-		# df for gene+transcript+edge combos
-		ir_df = pd.DataFrame()
-		for i, eid in enumerate(edge_ids):
-			# subgraph consisting of all nodes between the candidate
-			# intron-retaining edge coords in order and its edges
-			entry = self.edge_df.loc[eid]
-			v1 = entry.v1
-			v2 = entry.v2
-			sub_nodes = [i for i in range(v1+1,v2)]
-			sub_G = self.G.subgraph(sub_nodes)
-			sub_edges = list(sub_G.edges())
-			self.edge_df['tuple_edge_id'] = self.edge_df[['v1', 'v2']].apply(tuple, axis=1)
-			sub_edges = self.edge_df.loc[self.edge_df.tuple_edge_id.isin(sub_edges)]
-			self.edge_df.drop('tuple_edge_id', axis=1, inplace=True)
-
-			# find edges that are intronic; if there are none, this is not
-			# an intron-retaining edge
-			sub_edges = sub_edges.loc[sub_edges.edge_type == 'intron']
-
-			if len(sub_edges.index) > 0:
-
-				# transcripts that contain the exon-skipping edge
-				cand_t_df = nt_df[[eid in path for path in nt_df.path.values.tolist()]]
-
-				# circumvent the ISM bug
-				if len(cand_t_df) == 0:
-					continue
-
-				# does at least one of the retained introns belong
-				# to the same gene as the retaining edge?
-				else:
-					# genes that contain the intron-retaining edge edge
-					cand_genes = cand_t_df.gid.values.tolist()
-					cand_g_df = self.t_df.loc[self.t_df.gid.isin(cand_genes)]
-
-					# check if the retained edges are in one of the
-					# intron-retaining genes (wow this is confusing)
-					for gid in cand_genes:
-						if gid in ir_genes: continue
-						for cand_eid in sub_edges.index:
-							temp_df = cand_g_df[[cand_eid in path for path in cand_g_df.path.values.tolist()]]
-							tids = cand_t_df.tid.tolist()
-							for tid in tids:
-								temp = pd.DataFrame(data=[[gid, tid, eid]],
-									columns=['gid', 'tid', 'edge_id'])
-								ir_df = pd.concat([ir_df, temp])
-								ir_edges.append(eid)
-								ir_genes.append(gid)
-								ir_transcripts.append(tid)
-			if verbose:
-				pbar.update(1)
-
-		# ir_genes = list(set(ir_genes))
-		# ir_transcripts = list(set(ir_transcripts))
-		# ir_edges = list(set(ir_edges))
+		ir_df = self.find_novel_events('ir', verbose=verbose)
 		ir_transcripts = ir_df.tid.unique().tolist()
 		print('Found {} novel ir events in {} transcripts.'.format(len(ir_df.index),
 			len(ir_transcripts)))
@@ -1577,82 +2436,7 @@ class SwanGraph(Graph):
 			raise Exception('Cannot find novel IR events without '
 				'annotation in SwanGraph.')
 
-		edge_ids = self.edge_df.loc[ \
-			(self.edge_df.annotation == False)& \
-			(self.edge_df.edge_type == 'intron'), 'edge_id']
-		print('Analyzing {} intronic edges for ES'.format(len(edge_ids)))
-
-		# get subset of transcripts that are novel to look for ir edges in
-		nt_df = self.t_df.loc[self.t_df.annotation == False]
-
-		# verbose output
-		if verbose:
-			n_progress = len(edge_ids)
-			pbar = tqdm(total=n_progress)
-			pbar.set_description('Testing each novel edge for exon skipping')
-
-		# for each edge, see if the subgraph between the edge vertices
-		# contains an exonic edge
-		es_edges = []
-		es_genes = []
-		es_transcripts = []
-		# df for gene+transcript+edge combos
-		es_df = pd.DataFrame()
-		for eid in edge_ids:
-			# subgraph consisting of all nodes between the candidate
-			# exon-skipping edge coords in order and its edges
-			entry = self.edge_df.loc[eid]
-			v1 = entry.v1
-			v2 = entry.v2
-			sub_nodes = [i for i in range(v1+1,v2)]
-			sub_G = self.G.subgraph(sub_nodes)
-			sub_edges = list(sub_G.edges())
-			self.edge_df['tuple_edge_id'] = self.edge_df[['v1', 'v2']].apply(tuple, axis=1)
-			sub_edges = self.edge_df.loc[self.edge_df.tuple_edge_id.isin(sub_edges)]
-			self.edge_df.drop('tuple_edge_id', axis=1, inplace=True)
-
-			# find edges that are exonic; if there are none, this is not
-			# an exon-skipping edge
-			sub_edges = sub_edges.loc[sub_edges.edge_type == 'exon']
-
-			if len(sub_edges.index) > 0:
-
-				# transcripts that contain the candidate exon-skipping edge
-				skip_t_df = nt_df[[eid in path for path in nt_df.path.values.tolist()]]
-
-				# circumvent the ISM bug
-				if len(skip_t_df) == 0:
-					continue
-
-				# does at least one of the skipped exons belong
-				# to the same gene as the skipping edge?
-				else:
-					# genes that contain the candidate exon-skipping edge
-					skip_genes = skip_t_df.gid.values.tolist()
-					skip_g_df = self.t_df.loc[self.t_df.gid.isin(skip_genes)]
-
-					# check if the skipped edges are in one of the
-					# exon-skipping genes (wow this is confusing)
-					for gid in skip_genes:
-						if gid in es_genes: continue
-						for skip_eid in sub_edges.index:
-							# transcripts with the exons that are skipped
-							temp_df = skip_g_df[[skip_eid in path for path in skip_g_df.path.values.tolist()]]
-							tids = skip_t_df.tid.tolist()
-							if len(temp_df.index) > 0:
-								for tid in tids:
-									temp = pd.DataFrame(data=[[gid, tid, eid]],
-										columns=['gid', 'tid', 'edge_id'])
-									es_df = pd.concat([es_df, temp])
-									es_edges.append(eid)
-									es_genes.append(gid)
-									es_transcripts.append(tid)
-			if verbose:
-				pbar.update(1)
-
-		# es_genes = list(set(es_genes))
-		# es_transcripts = list(set(es_transcripts))
-		# es_edges = list(set(es_edges))
+		es_df = self.find_novel_events('es', verbose=verbose)
 		es_transcripts = es_df.tid.unique().tolist()
 		print('Found {} novel es events in {} transcripts.'.format(len(es_df.index),
 			len(es_transcripts)))
@@ -1974,7 +2758,7 @@ class SwanGraph(Graph):
 
 		# use calculated values already in the SwanGraph
 		if obs_col == 'dataset' and not self.sc:
-			df = pd.DataFrame(data=adata.layers['pi'].todense(),
+			df = pd.DataFrame(data=self.get_adata_layer(adata, 'pi', t_df=ref_df).toarray(),
 								 index=adata.obs.index,
 								 columns=adata.var.index)
 			sums = calc_total_counts(adata, obs_col)
@@ -2206,12 +2990,8 @@ class SwanGraph(Graph):
 		# get collapsed abundance table from edge_adata
 		columns = self.adata.var.index.tolist()
 		rows = self.adata.obs.index.tolist()
-		if kind == 'counts':
-			data = self.adata.layers['counts'].toarray()
-		elif kind == 'tpm':
-			data = self.adata.layers['tpm'].toarray()
-		elif kind == 'pi':
-			data = self.adata.layers['pi'].toarray()
+		if kind in ['counts', 'tpm', 'pi']:
+			data = self.get_adata_layer(self.adata, kind, t_df=self.t_df).toarray()
 
 		df = pd.DataFrame(index=rows, columns=columns, data=data)
 		df = df.transpose()
@@ -2253,10 +3033,8 @@ class SwanGraph(Graph):
 		# get collapsed abundance table from edge_adata
 		columns = self.edge_adata.var.index.tolist()
 		rows = self.edge_adata.obs.index.tolist()
-		if kind == 'counts':
-			data = self.edge_adata.layers['counts'].toarray()
-		elif kind == 'tpm':
-			data = self.edge_adata.layers['tpm'].toarray()
+		if kind in ['counts', 'tpm']:
+			data = self.get_adata_layer(self.edge_adata, kind).toarray()
 
 		df = pd.DataFrame(index=rows, columns=columns, data=data)
 		df = df.transpose()
@@ -2343,12 +3121,8 @@ class SwanGraph(Graph):
 		# get abundance table from end_adata
 		columns = adata.var.index.tolist()
 		rows = adata.obs.index.tolist()
-		if kind == 'counts':
-			data = adata.layers['counts'].toarray()
-		elif kind == 'tpm':
-			data = adata.layers['tpm'].toarray()
-		elif kind == 'pi':
-			data = adata.layers['pi'].toarray()
+		if kind in ['counts', 'tpm', 'pi']:
+			data = self.get_adata_layer(adata, kind).toarray()
 
 		df = pd.DataFrame(index=rows, columns=columns, data=data)
 		df = df.transpose()
@@ -2488,7 +3262,15 @@ class SwanGraph(Graph):
 				Default: True
 		"""
 
-		if gid not in self.t_df.gid.tolist():
+		# read the gene from the TALON DB if we need to
+		if self.is_lazy():
+			self.load_gene(gid).plot_graph(gid,
+				indicate_dataset=indicate_dataset,
+				indicate_novel=indicate_novel,
+				prefix=prefix)
+			return
+
+		if not self.has_gene(gid):
 			gid = self.get_gid_from_gname(gid)
 
 		self.check_plotting_args(indicate_dataset, indicate_novel)
@@ -2528,6 +3310,10 @@ class SwanGraph(Graph):
 			ax (matplotlib axes): Axes with transcript plotted
 		"""
 
+		# read the transcript from the TALON DB if we need to
+		if self.is_lazy():
+			return self.load_transcript(tid).plot_browser(tid, **kwargs)
+
 		# init plot settings
 		self.check_transcript(tid)
 		self.pg.init_plot_settings(self, tid=tid,
@@ -2570,6 +3356,15 @@ class SwanGraph(Graph):
 				Default: True
 		"""
 
+		# read the transcript from the TALON DB if we need to
+		if self.is_lazy():
+			self.load_transcript(tid).plot_transcript_path(tid,
+				indicate_dataset=indicate_dataset,
+				indicate_novel=indicate_novel,
+				browser=browser,
+				prefix=prefix)
+			return
+
 		self.check_plotting_args(indicate_dataset, indicate_novel, browser)
 		self.check_transcript(tid)
 
@@ -2620,6 +3415,15 @@ class SwanGraph(Graph):
 				indicate_novel
 		"""
 
+		# read the transcripts from the TALON DB if we need to
+		if self.is_lazy():
+			for tid in tids:
+				self.load_transcript(tid).plot_each_transcript([tid], prefix,
+					indicate_dataset=indicate_dataset,
+					indicate_novel=indicate_novel,
+					browser=browser)
+			return
+
 		self.check_plotting_args(indicate_dataset, indicate_novel, browser)
 
 		# loop through each transcript in the SwanGraph object
@@ -2665,14 +3469,22 @@ class SwanGraph(Graph):
 				indicate_novel
 		"""
 
-		if gid not in self.t_df.gid.tolist():
+		# read the gene from the TALON DB if we need to
+		if self.is_lazy():
+			self.load_gene(gid).plot_each_transcript_in_gene(gid, prefix,
+				indicate_dataset=indicate_dataset,
+				indicate_novel=indicate_novel,
+				browser=browser)
+			return
+
+		if not self.has_gene(gid):
 			gid = self.get_gid_from_gname(gid)
 		self.check_gene(gid)
 
 		self.check_plotting_args(indicate_dataset, indicate_novel, browser)
 
 		# loop through each transcript in the SwanGraph object
-		tids = self.t_df.loc[self.t_df.gid == gid, 'tid'].tolist()
+		tids = self.get_tids_from_gid(gid)
 		print()
 		print('Plotting {} transcripts for {}'.format(len(tids), gid))
 		for tid in tids:
@@ -2778,6 +3590,28 @@ class SwanGraph(Graph):
 				Default: 'expression' if abundance information is present,
 						 'tid' if not
 		"""
+		# read the gene from the TALON DB if we need to
+		if self.is_lazy():
+			self.load_gene(gid).gen_report(gid, prefix,
+				datasets=datasets,
+				groupby=groupby,
+				metadata_cols=metadata_cols,
+				novelty=novelty,
+				layer=layer,
+				cmap=cmap,
+				include_qvals=include_qvals,
+				q=q,
+				log2fc=log2fc,
+				qval_obs_col=qval_obs_col,
+				qval_obs_conditions=qval_obs_conditions,
+				include_unexpressed=include_unexpressed,
+				indicate_novel=indicate_novel,
+				display_numbers=display_numbers,
+				transcript_col=transcript_col,
+				browser=browser,
+				order=order)
+			return
+
 		# check if groupby column is present
 		multi_groupby = False
 		indicate_dataset = False
@@ -2820,7 +3654,7 @@ class SwanGraph(Graph):
 								'value from metadata column.')
 
 		# check to see if input gene is in the graph
-		if gid not in self.t_df.gid.tolist():
+		if not self.has_gene(gid):
 			gid = self.get_gid_from_gname(gid)
 		self.check_gene(gid)
 
@@ -2884,6 +3718,11 @@ class SwanGraph(Graph):
 		# small SwanGraph with only this gene's data
 		sg = self.subset_on_gene_sg(gid=gid, datasets=columns)
 
+		# backed abundance is only read in for this gene's transcripts,
+		# w/ tpm computed from all transcripts
+		if self.adata.isbacked:
+			subset_adata = sg.adata
+
 		# if we're grouping data, calculate those new numbers
 		# additionally order transcripts
 		if groupby:
@@ -2899,12 +3738,10 @@ class SwanGraph(Graph):
 		else:
 			if layer == 'tpm':
 				# use whole adata to calc tpm
-				t_df = tpm_df = self.get_tpm().transpose()
-				t_df = t_df[subset_adata.obs.dataset.tolist()]
+				t_df = tpm_df = calc_tpm(subset_adata).transpose()
 			elif layer == 'pi':
 				# calc tpm just so we can order based on exp
-				t_df = tpm_df = self.get_tpm().transpose()
-				t_df = t_df[subset_adata.obs.dataset.tolist()]
+				t_df = tpm_df = calc_tpm(subset_adata).transpose()
 				t_df, _ = calc_pi(sg.adata, sg.t_df)
 				t_df = t_df.transpose()
 
@@ -2916,7 +3753,7 @@ class SwanGraph(Graph):
 			order = 'tid'
 		elif order == 'expression':
 			order = 'log2tpm'
-		tids = self.t_df.loc[self.t_df.gid == gid].index.tolist()
+		tids = self.get_tids_from_gid(gid)
 		tids = list(set(tids)&set(tpm_df.index.tolist()))
 		tpm_df = tpm_df.loc[tids]
 		t_df = t_df.loc[tids]
@@ -3132,8 +3969,10 @@ class SwanGraph(Graph):
 		elif kind == 'ic':
 			adata = self.ic_adata
 
-		adata.X = adata.layers['tpm']
-		df = pd.DataFrame.sparse.from_spmatrix(data=adata.X,
+		data = self.get_adata_layer(adata, 'tpm')
+		if not self.has_lazy_layers():
+			adata.X = data
+		df = pd.DataFrame.sparse.from_spmatrix(data=data,
 			index=adata.obs['dataset'].tolist(),
 			columns=adata.var.index.tolist())
 		return df
@@ -3159,7 +3998,7 @@ class SwanGraph(Graph):
 		if indicate_novel and not self.annotation:
 			raise Exception('Annotation data not present in graph. Use '
 							'add_annotation before using indicate_novel')
-		if indicate_dataset and indicate_dataset not in self.datasets:
+		if indicate_dataset and indicate_dataset not in self.get_dataset_index():
 			raise Exception('Dataset {} not present in the graph. '
 							''.format(indicate_dataset))
 
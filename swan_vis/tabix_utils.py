@@ -0,0 +1,307 @@
+import gzip
+import io
+import os
+import re
+import struct
+
+# Minimal reader for bgzip-compressed, tabix-indexed (.tbi) GTFs so that
+# regions of a GTF can be loaded without an htslib dependency. Only the
+# linear index of the .tbi is used; records are scanned forward from the
+# smallest virtual offset that can overlap the query.
+
+def is_gzipped(fname):
+	"""
+	Determine whether a file is gzip (or bgzip) compressed from its magic
+	number.
+
+	Parameters:
+		fname (str): Path to file
+
+	Returns:
+		gzipped (bool): Whether the file is gzipped
+	"""
+	with open(fname, 'rb') as infile:
+		gzipped = infile.read(2) == b'\x1f\x8b'
+	return gzipped
+
+def is_bgzipped(fname):
+	"""
+	Determine whether a file is bgzip compressed, ie each gzip block has
+	the BGZF 'BC' extra subfield.
+
+	Parameters:
+		fname (str): Path to file
+
+	Returns:
+		bgzipped (bool): Whether the file is bgzipped
+	"""
+	with open(fname, 'rb') as infile:
+		header = infile.read(18)
+	if len(header) < 18:
+		return False
+	if header[:4] != b'\x1f\x8b\x08\x04':
+		return False
+	return header[12:14] == b'BC'
+
+def get_tabix_fname(fname):
+	"""
+	Get the name of the tabix index of a bgzipped file, if there is one.
+
+	Parameters:
+		fname (str): Path to bgzipped file
+
+	Returns:
+		tbi (str): Path to index, or None if the index does not exist
+	"""
+	tbi = fname+'.tbi'
+	if os.path.exists(tbi):
+		return tbi
+	return None
+
+def read_tabix_index(tbi):
+	"""
+	Read the reference names and linear index from a tabix index.
+
+	Parameters:
+		tbi (str): Path to .tbi index
+
+	Returns:
+		index (dict): Reference names in the order that they appear in the
+			file, mapped to the linear index (list of virtual offsets of
+			the first record overlapping each 16kb window) for that reference
+	"""
+	with gzip.open(tbi, 'rb') as infile:
+		data = infile.read()
+
+	if data[:4] != b'TBI\x01':
+		raise ValueError('{} is not a tabix index'.format(tbi))
+
+	n_ref, fmt, col_seq, col_beg, col_end, meta, skip, l_nm = \
+		struct.unpack_from('<8i', data, 4)
+	offset = 36
+	names = data[offset:offset+l_nm].split(b'\x00')[:n_ref]
+	names = [n.decode() for n in names]
+	offset += l_nm
+
+	index = {}
+	for name in names:
+
+		# skip the binning index
+		n_bin = struct.unpack_from('<i', data, offset)[0]
+		offset += 4
+		for i in range(n_bin):
+			b, n_chunk = struct.unpack_from('<Ii', data, offset)
+			offset += 8+16*n_chunk
+
+		# linear index
+		n_intv = struct.unpack_from('<i', data, offset)[0]
+		offset += 4
+		ioff = list(struct.unpack_from('<{}Q'.format(n_intv), data, offset))
+		offset += 8*n_intv
+		index[name] = ioff
+
+	return index
+
+def parse_regions(regions):
+	"""
+	Parse genomic regions formatted as 'chrom' or 'chrom:start-stop'.
+	Coordinates are 1-based and inclusive. Regions that are already
+	(chrom, start, stop) tuples, ie from read_bed_regions, are kept as-is.
+
+	Parameters:
+		regions (str or list of str or list of tuple): Region(s) to parse
+
+	Returns:
+		regions (list of tuple): Chromosome, start, and stop of each region.
+			Start and stop are None for whole chromosomes.
+	"""
+	if type(regions) == str:
+		regions = [regions]
+
+	parsed = []
+	for region in regions:
+		if type(region) == tuple:
+			parsed.append(region)
+			continue
+		m = re.match(r'^([^:\s]+)(?::([0-9,]+)-([0-9,]+))?$', region.strip())
+		if not m:
+			raise ValueError('Region {} not formatted as chrom or '
+				'chrom:start-stop'.format(region))
+		chrom = m.group(1)
+		start = m.group(2)
+		stop = m.group(3)
+		if start is not None:
+			start = int(start.replace(',', ''))
+			stop = int(stop.replace(',', ''))
+			if start > stop:
+				raise ValueError('Region {} start is after its stop'.format(region))
+		parsed.append((chrom, start, stop))
+	return parsed
+
+def read_bed_regions(fname):
+	"""
+	Read the regions in a BED file. Coordinates are converted from 0-based,
+	half-open to 1-based, inclusive.
+
+	Parameters:
+		fname (str): Path to BED file, optionally gzipped
+
+	Returns:
+		regions (list of tuple): Chromosome, start, and stop of each region
+	"""
+	opener = gzip.open if is_gzipped(fname) else open
+	regions = []
+	with opener(fname, 'rt') as infile:
+		for line in infile:
+			if not line.strip() or line.startswith(('#', 'track', 'browser')):
+				continue
+			fields = line.split('\t')
+			regions.append((fields[0], int(fields[1])+1, int(fields[2])))
+	return regions
+
+def format_region(chrom, start, stop):
+	"""
+	Format a region as 'chrom' or 'chrom:start-stop'.
+
+	Parameters:
+		chrom (str): Chromosome of region
+		start (int): Start of region, or None for a whole chromosome
+		stop (int): End of region, or None for a whole chromosome
+
+	Returns:
+		region (str): Formatted region
+	"""
+	if start is None:
+		return chrom
+	return '{}:{}-{}'.format(chrom, start, stop)
+
+def merge_regions(regions):
+	"""
+	Merge overlapping regions on the same chromosome.
+
+	Parameters:
+		regions (list of tuple): Chromosome, start, and stop of each region.
+			Start and stop are None for whole chromosomes.
+
+	Returns:
+		merged (dict): Chromosome mapped to a sorted list of non-overlapping
+			(start, stop) intervals. Whole chromosomes are (None, None).
+	"""
+	merged = {}
+	for chrom, start, stop in regions:
+		merged.setdefault(chrom, []).append((start, stop))
+
+	for chrom, intervals in merged.items():
+		if (None, None) in intervals:
+			merged[chrom] = [(None, None)]
+			continue
+		intervals = sorted(intervals)
+		temp = [intervals[0]]
+		for start, stop in intervals[1:]:
+			if start <= temp[-1][1]+1:
+				temp[-1] = (temp[-1][0], max(temp[-1][1], stop))
+			else:
+				temp.append((start, stop))
+		merged[chrom] = temp
+	return merged
+
+def fetch_tabix(fname, index, chrom, start=None, stop=None):
+	"""
+	Get the lines of a bgzipped, tabix-indexed GTF that overlap a region.
+
+	Parameters:
+		fname (str): Path to bgzipped GTF
+		index (dict): Output of read_tabix_index
+		chrom (str): Chromosome of region
+		start (int): 1-based start of region. None for the whole chromosome
+			Default: None
+		stop (int): 1-based end of region (inclusive). None for the whole
+			chromosome
+			Default: None
+
+	Returns:
+		lines (list of bytes): GTF lines that overlap the region
+	"""
+	if chrom not in index or not index[chrom]:
+		return []
+
+	# smallest virtual offset that can hold a record overlapping the region
+	ioff = index[chrom]
+	if start is None:
+		voff = ioff[0]
+	else:
+		voff = ioff[min((start-1)>>14, len(ioff)-1)]
+	coffset = voff >> 16
+	uoffset = voff & 0xffff
+
+	lines = []
+	with open(fname, 'rb') as raw:
+		raw.seek(coffset)
+		with gzip.GzipFile(fileobj=raw, mode='rb') as infile:
+			infile.read(uoffset)
+			seen = False
+			for line in infile:
+				if line.startswith(b'#'):
+					continue
+				fields = line.split(b'\t', 5)
+				if len(fields) < 5:
+					continue
+				if fields[0].decode() != chrom:
+					if seen:
+						break
+					continue
+				seen = True
+				l_start = int(fields[3])
+				l_stop = int(fields[4])
+
+				# records are sorted by start
+				if stop is not None and l_start > stop:
+					break
+				if start is not None and l_stop < start:
+					continue
+				lines.append(line)
+	return lines
+
+def fetch_tabix_transcripts(fname, regions):
+	"""
+	Get the lines of a bgzipped, tabix-indexed GTF that could belong to
+	transcripts overlapping the input regions. Regions are expanded to the
+	full span of the transcripts that overlap them so that each transcript's
+	exons are included, even if they don't overlap the region themselves.
+
+	Parameters:
+		fname (str): Path to bgzipped GTF
+		regions (list of tuple): Chromosome, start, and stop of each region,
+			output from parse_regions
+
+	Returns:
+		gtf (io.BytesIO): GTF lines, in file order
+	"""
+	index = read_tabix_index(get_tabix_fname(fname))
+	regions = merge_regions(regions)
+
+	# expand each region to the span of transcripts that overlap it
+	expanded = []
+	for chrom, intervals in regions.items():
+		for start, stop in intervals:
+			if start is None:
+				expanded.append((chrom, None, None))
+				continue
+			for line in fetch_tabix(fname, index, chrom, start, stop):
+				fields = line.split(b'\t', 5)
+				if fields[2] == b'transcript':
+					start = min(start, int(fields[3]))
+					stop = max(stop, int(fields[4]))
+			expanded.append((chrom, start, stop))
+	expanded = merge_regions(expanded)
+
+	# fetch in the order that chromosomes appear in the file
+	lines = []
+	for chrom in index.keys():
+		if chrom not in expanded:
+			continue
+		for start, stop in expanded[chrom]:
+			lines += fetch_tabix(fname, index, chrom, start, stop)
+
+	gtf = io.BytesIO(b''.join(lines))
+	return gtf
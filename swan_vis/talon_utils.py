@@ -1,7 +1,9 @@
 import copy
 import itertools
 import operator
+import os
 import sqlite3
+import urllib.request
 
 # All functions in this file written by Dana Wyman for TALON, and
 # adapted to interface with TALON dbs
@@ -14,6 +16,102 @@ def format_for_in(l):
 		l = [l]
 	return "(" + ','.join(['"' + str(x) + '"' for x in l]) + ")"
 
+def connect_db(database):
+	""" Opens a read-only connection to the database that all of the queries
+		for one TALON DB can share. Memory-maps the database and uses a large
+		page cache since we read most of it. Temporary tables (ie the
+		pass_list table) are kept in memory. """
+	path = urllib.request.pathname2url(os.path.abspath(database))
+	conn = sqlite3.connect('file:{}?mode=ro'.format(path), uri=True)
+	cursor = conn.cursor()
+	cursor.execute("PRAGMA mmap_size = 1073741824")
+	cursor.execute("PRAGMA cache_size = -262144")
+	cursor.execute("PRAGMA temp_store = MEMORY")
+	return conn
+
+def load_pass_list(cursor, pass_list):
+	""" Loads gene_ID - transcript_ID tuples into the temporary pass_list
+		table so that other queries can join against it. If pass_list is
+		None, loads all of the transcripts in the database. """
+	cursor.execute("DROP TABLE IF EXISTS temp.pass_list")
+	cursor.execute(""" CREATE TEMP TABLE pass_list (gene_ID INTEGER,
+					   transcript_ID INTEGER PRIMARY KEY) """)
+	if pass_list is None:
+		cursor.execute(""" INSERT INTO temp.pass_list
+						   SELECT gene_ID, transcript_ID FROM transcripts """)
+	else:
+		cursor.executemany("INSERT OR IGNORE INTO temp.pass_list VALUES (?,?)",
+						   pass_list)
+
+def load_ids(cursor, ids):
+	""" Loads a list of IDs into the temporary ids table so that other
+		queries can join against it """
+	cursor.execute("DROP TABLE IF EXISTS temp.ids")
+	cursor.execute("CREATE TEMP TABLE ids (ID INTEGER PRIMARY KEY)")
+	cursor.executemany("INSERT OR IGNORE INTO temp.ids VALUES (?)",
+					   [(x,) for x in ids])
+
+def filter_pass_list_regions(cursor, regions):
+	""" Limits the temporary pass_list table to transcripts that overlap
+		any of the regions, given as (chrom, start, stop) tuples with 1-based,
+		inclusive coordinates. Start and stop are None for whole
+		chromosomes. """
+	cursor.execute("DROP TABLE IF EXISTS temp.regions")
+	cursor.execute(""" CREATE TEMP TABLE regions (chrom TEXT, start INTEGER,
+					   stop INTEGER) """)
+	cursor.executemany("INSERT INTO temp.regions VALUES (?,?,?)", regions)
+	query = """ DELETE FROM temp.pass_list
+				WHERE transcript_ID NOT IN
+					(SELECT t.transcript_ID FROM transcripts t
+					 JOIN location loc1 ON t.start_vertex = loc1.location_ID
+					 JOIN location loc2 ON t.end_vertex = loc2.location_ID
+					 JOIN temp.regions r ON loc1.chromosome = r.chrom
+					 WHERE t.transcript_ID IN
+					 	(SELECT transcript_ID FROM temp.pass_list)
+					 AND (r.start IS NULL
+					 	  OR (MIN(loc1.position,loc2.position) <= r.stop
+					 	  AND MAX(loc1.position,loc2.position) >= r.start))) """
+	cursor.execute(query)
+
+def fetch_gene_regions(cursor, name, kind='gene'):
+	""" Returns the chromosome, start, and end of the gene with the given gene
+		ID or name (kind='gene'), or of the gene of the transcript with the
+		given transcript ID or name (kind='transcript'), as (chrom, start,
+		stop) tuples. IDs also match without their version numbers. Returns
+		an empty list if there is no such gene or transcript. """
+	if kind == 'gene':
+		query = """ SELECT a.attribute, a.ID FROM gene_annotations a
+					WHERE a.attribute IN ('gene_id', 'gene_name')
+					AND (a.value = ? OR a.value GLOB ?) """
+		attrs = ['gene_id', 'gene_name']
+	else:
+		query = """ SELECT a.attribute, t.gene_ID FROM transcript_annotations a
+					JOIN transcripts t ON a.ID = t.transcript_ID
+					WHERE a.attribute IN ('transcript_id', 'transcript_name')
+					AND (a.value = ? OR a.value GLOB ?) """
+		attrs = ['transcript_id', 'transcript_name']
+	cursor.execute(query, (name, name+'.*'))
+	hits = cursor.fetchall()
+
+	# prefer IDs over names
+	gene_IDs = sorted(set([h[1] for h in hits if h[0] == attrs[0]]))
+	if not gene_IDs:
+		gene_IDs = sorted(set([h[1] for h in hits if h[0] == attrs[1]]))
+	if not gene_IDs:
+		return []
+
+	query = """ SELECT loc1.chromosome,
+				MIN(MIN(loc1.position,loc2.position)),
+				MAX(MAX(loc1.position,loc2.position))
+				FROM transcripts t
+				JOIN location loc1 ON t.start_vertex = loc1.location_ID
+				JOIN location loc2 ON t.end_vertex = loc2.location_ID
+				WHERE t.gene_ID IN ({})
+				GROUP BY loc1.chromosome
+				ORDER BY loc1.chromosome """.format(','.join(['?' for g in gene_IDs]))
+	cursor.execute(query, gene_IDs)
+	return cursor.fetchall()
+
 def fetch_all_transcript_gene_pairs(cursor):
 	""" Return gene_ID - transcript_ID tuples from database """
 
@@ -52,102 +150,61 @@ def parse_datasets(dataset, cursor):
 		raise ValueError("Dataset name '%s' not found in database" % dataset)
 	return dataset
 
-def handle_filtering(database, observed, pass_list_file):
+def handle_filtering(database, observed, pass_list_file, conn=None,
+					 regions=None):
 	""" Determines which transcripts to allow in the analysis. This can be done
 		in two different ways. If no pass_list is included, then all of the
 		transcripts in the database are included (modified by 'observed'
 		option). If a pass_list is provided, then transcripts on that list
 		will be included (modified by 'observed' option). This can be
-		tuned further by providing a dataset file, but this is optional. """
+		tuned further by providing a dataset file, but this is optional.
+		If regions are given as (chrom, start, stop) tuples, only
+		transcripts that overlap them are allowed.
 
-	conn = sqlite3.connect(database)
-	conn.row_factory = sqlite3.Row
-	cursor = conn.cursor()
+		The allowed transcripts are left in the temporary pass_list table
+		on conn, if given, for other queries to join against. """
 
-	# Get list of datasets to use in run
-	# if dataset != None:
-	# 	datasets = parse_datasets(dataset, cursor)
-	# elif observed == True:
-	if observed: 
-		datasets = fetch_all_datasets(cursor)
-	else:
-		datasets = None
-	# datasets = fetch_all_datasets(cursor)
+	close = conn is None
+	if close:
+		conn = connect_db(database)
+	cursor = conn.cursor()
 
 	# Get initial transcript pass_list
 	if pass_list_file != None:
-		pass_list = parse_pass_list(pass_list_file)
+		load_pass_list(cursor, parse_pass_list(pass_list_file))
 	else:
-		pass_list = fetch_all_transcript_gene_pairs(cursor)
+		load_pass_list(cursor, None)
+
+	if regions is not None:
+		filter_pass_list_regions(cursor, regions)
 
-	if datasets != None:
+	if observed:
 		# Limit the pass_list to transcripts detected in the datasets
-		transcripts = [ x[1] for x in pass_list ]
-		transcript_str = format_for_in(transcripts)
-		dataset_str = format_for_in(datasets)
-
-		query = """ SELECT DISTINCT gene_ID, transcript_ID
-					FROM observed
-					WHERE transcript_ID IN %s
-					AND dataset in %s """
-		cursor.execute(query % (transcript_str, dataset_str))
-		pass_list = cursor.fetchall()
-
-	conn.close()
+		query = """ DELETE FROM temp.pass_list
+					WHERE transcript_ID NOT IN
+						(SELECT transcript_ID FROM observed
+						 WHERE dataset IN (SELECT dataset_name FROM dataset)) """
+		cursor.execute(query)
+
+	cursor.execute("SELECT gene_ID, transcript_ID FROM temp.pass_list")
+	pass_list = cursor.fetchall()
+
+	if close:
+		conn.close()
 	return pass_list
 
 def get_gene_transcript_map(db, pass_list):
 	""" Creates a dictionary mapping gene IDs to the transcripts that belong to
-		them. The columns in each tuple are:
-			0: gene ID
-			1: transcript ID
-			2: chromosome
-			3: start position (min of 5' and 3')
-			4: end position (max of 5' and 3')
-			5: strand
-			6: edge path
-			7. n_exons
-	"""
+		them. Same as get_gene_2_transcripts. """
+	return get_gene_2_transcripts(db, pass_list)
 
-	conn = sqlite3.connect(db)
-	conn.row_factory = sqlite3.Row
-	cursor = conn.cursor()
-	pass_list_string = "(" + ','.join([str(x) for x in pass_list]) + ")"
-	query = """
-			SELECT
-				t.gene_ID,
-				t.transcript_ID,
-				loc1.chromosome,
-				MIN(loc1.position,loc2.position) AS min_pos,
-				MAX(loc1.position,loc2.position) AS max_pos,
-				genes.strand,
-				t.jn_path,
-				t.start_exon,
-				t.end_exon,
-				t.n_exons
-			FROM transcripts t
-			LEFT JOIN location loc1 ON t.start_vertex = loc1.location_ID
-			LEFT JOIN location loc2 ON t.end_vertex = loc2.location_ID
-			LEFT JOIN genes ON t.gene_ID = genes.gene_ID
-			WHERE t.transcript_ID IN """ + pass_list_string
-	cursor.execute(query)
-	transcript_tuples = cursor.fetchall()
-
-	# Sort based on gene ID
-	sorted_transcript_tuples = sorted(transcript_tuples, key=lambda x: x["gene_ID"])
-
-	gene_groups = {}
-	for key,group in itertools.groupby(sorted_transcript_tuples,operator.itemgetter(0)):
-		# sort by transcript start position
-		gene_groups[key] = sorted(list(group), key=lambda x: x["min_pos"])
-	conn.close()
-
-	return gene_groups
-
-def get_annotations(database, feat_type, pass_list=None):
+def get_annotations(database, feat_type, pass_list=None, conn=None,
+					filtered=False):
 	"""
 		Extracts annotations from the gene/transcript/exon annotation table of
-		the database (depending on choice of feat_type).
+		the database (depending on choice of feat_type). If filtered, only
+		gets annotations of the genes/transcripts in the temporary pass_list
+		table on conn (see handle_filtering).
 
 		Returns:
 			annotation_dict: dictionary data structure in which the keys are
@@ -156,16 +213,25 @@ def get_annotations(database, feat_type, pass_list=None):
 							 annotation tuples.
 	"""
 	# fetch the annotations
-	conn = sqlite3.connect(database)
+	close = conn is None
+	if close:
+		conn = connect_db(database)
 	cursor = conn.cursor()
 
 	table_name = feat_type + "_annotations"
 
-	if pass_list == None:
+	if filtered:
+		id_col = "gene_ID" if feat_type == "gene" else "transcript_ID"
+		query = "SELECT * FROM " + table_name + \
+				" WHERE ID IN (SELECT " + id_col + " FROM temp.pass_list)" + \
+				" ORDER BY ID, source, attribute"
+	elif pass_list == None:
 		query = "SELECT * FROM " + table_name
 	else:
-		pass_list_string = "(" + ','.join([str(x) for x in pass_list]) + ")"
-		query = "SELECT * FROM " + table_name + " WHERE ID IN " + pass_list_string
+		load_ids(cursor, pass_list)
+		query = "SELECT * FROM " + table_name + \
+				" WHERE ID IN (SELECT ID FROM temp.ids)" + \
+				" ORDER BY ID, source, attribute"
 
 	cursor.execute(query)
 	annotation_tuples = cursor.fetchall()
@@ -178,11 +244,15 @@ def get_annotations(database, feat_type, pass_list=None):
 	for key,group in itertools.groupby(sorted_annotations,operator.itemgetter(0)):
 		ID_groups[key] = list(group)
 
+	if close:
+		conn.close()
 	return ID_groups
 
-def get_gene_2_transcripts(database, pass_list):
+def get_gene_2_transcripts(database, pass_list, conn=None, filtered=False):
 	""" Creates a dictionary mapping gene IDs to the transcripts that belong to
-		them. The columns in each tuple are:
+		them. If filtered, gets the transcripts in the temporary pass_list
+		table on conn (see handle_filtering) instead of pass_list. The
+		columns in each tuple are:
 			0: gene ID
 			1: transcript ID
 			2: chromosome
@@ -193,10 +263,16 @@ def get_gene_2_transcripts(database, pass_list):
 			7. n_exons
 	"""
 
-	conn = sqlite3.connect(database)
-	conn.row_factory = sqlite3.Row
+	close = conn is None
+	if close:
+		conn = connect_db(database)
 	cursor = conn.cursor()
-	pass_list_string = "(" + ','.join([str(x) for x in pass_list]) + ")"
+	cursor.row_factory = sqlite3.Row
+	if filtered:
+		id_query = "SELECT transcript_ID FROM temp.pass_list"
+	else:
+		load_ids(cursor, pass_list)
+		id_query = "SELECT ID FROM temp.ids"
 	query = """
 			SELECT
 				t.gene_ID,
@@ -213,7 +289,8 @@ def get_gene_2_transcripts(database, pass_list):
 			LEFT JOIN location loc1 ON t.start_vertex = loc1.location_ID
 			LEFT JOIN location loc2 ON t.end_vertex = loc2.location_ID
 			LEFT JOIN genes ON t.gene_ID = genes.gene_ID
-			WHERE t.transcript_ID IN """ + pass_list_string
+			WHERE t.transcript_ID IN (""" + id_query + """)
+			ORDER BY t.transcript_ID"""
 	cursor.execute(query)
 	transcript_tuples = cursor.fetchall()
 
@@ -224,15 +301,18 @@ def get_gene_2_transcripts(database, pass_list):
 	for key,group in itertools.groupby(sorted_transcript_tuples,operator.itemgetter(0)):
 		# Sort by transcript start position
 		gene_groups[key] = sorted(list(group), key=lambda x: x["min_pos"])
-	conn.close()
 
+	if close:
+		conn.close()
 	return gene_groups
 
-def fetch_exon_locations(database):
+def fetch_exon_locations(database, conn=None):
 	""" Queries the database to create a dictionary mapping exon IDs to
 		the chromosome, start, end, and strand of the exon """
 
-	conn = sqlite3.connect(database)
+	close = conn is None
+	if close:
+		conn = connect_db(database)
 	cursor = conn.cursor()
 
 	query = """
@@ -256,7 +336,8 @@ def fetch_exon_locations(database):
 		exon_ID = loc_tuple[0]
 		exon_locations[exon_ID] = loc_tuple[1:]
 
-	conn.close()
+	if close:
+		conn.close()
 	return exon_locations
 
 # def check_annot_validity(annot, database):
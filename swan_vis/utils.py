@@ -3,6 +3,11 @@ import networkx as nx
 import numpy as np
 import pandas as pd
 import pickle
+import csv
+import re
+import io
+import gzip
+import multiprocessing
 from statsmodels.stats.multitest import multipletests
 import scipy.stats as st
 import matplotlib.pyplot as plt
@@ -11,9 +16,18 @@ import copy
 from collections import defaultdict
 from tqdm import tqdm
 import scanpy as sc
+import anndata
+import h5py
 from scipy import sparse
+try:
+	from anndata.io import write_elem
+except ImportError:
+	from anndata.experimental import write_elem
 
 from swan_vis.talon_utils import *
+from swan_vis.tabix_utils import *
+from swan_vis.pathstore import PathStore
+from swan_vis.rangereader import RangeReader
 
 pd.options.mode.chained_assignment = None
 
@@ -181,12 +195,31 @@ def gtf_or_db(fname):
 		ftype (str): 'gtf' or 'db' depending on results
 	"""
 	ext = fname.split('.')[-1]
+	if ext in ['gz', 'bgz']:
+		ext = '.'.join(fname.split('.')[-2:])
 	if ext == 'gtf': return 'gtf'
+	elif ext in ['gtf.gz', 'gtf.bgz']: return 'gtf'
 	elif ext == 'db': return 'db'
 	else:
-		raise Exception('File type must be gtf or db. '
+		raise Exception('File type must be gtf, gtf.gz, or db. '
 			'Type received is {}'.format(ext))
 
+def open_gtf(fname):
+	"""
+	Open a plain-text or gzipped GTF for reading as text.
+
+	Parameters:
+		fname (str): Path to GTF
+
+	Returns:
+		gtf (file object): Text-mode file handle
+	"""
+	if is_gzipped(fname):
+		gtf = gzip.open(fname, 'rt')
+	else:
+		gtf = open(fname)
+	return gtf
+
 # validate that a gtf has the correct fields and info in it
 def validate_gtf(fname):
 	"""
@@ -201,32 +234,44 @@ def validate_gtf(fname):
 		raise Exception("GTF can't load correctly. Could be a header problem.")
 
 	# first make sure that there are transcript and exon entries
-	missing_entry_type = False
-	missing_entry_types = []
-	entry_types = df.entry_type.unique().tolist()
-	if 'transcript' not in entry_types:
-		missing_entry_type = True
-		missing_entry_types.append('transcript')
-	if 'exon' not in entry_types:
-		missing_entry_type = True
-		missing_entry_types.append('exon')
-	if missing_entry_type:
-		raise Exception('GTF is missing entry types {}'.format(missing_entry_types))
+	check_gtf_entry_types(df.entry_type.unique().tolist())
 
 	# next check if gene_id, transcript_id, and gene_name fields exist
 	# in each line of the thing
 	df = df.loc[df.entry_type == 'transcript']
-	df['tid'] = df.fields.str.extract(r'transcript_id "([A-z]+[0-9.]+)"',
+	df['transcript_id'] = df.fields.str.extract(r'transcript_id "([A-z]+[0-9.]+)"',
 		expand=False)
-	df['gid'] = df.fields.str.extract(r'gene_id "([A-z]+[0-9.]+)"',
+	df['gene_id'] = df.fields.str.extract(r'gene_id "([A-z]+[0-9.]+)"',
 		expand=False)
 	df.drop('fields', axis=1, inplace=True)
 
-	missing_fields = []
-	if df.tid.isnull().any():
-		missing_fields.append('transcript_id')
-	if df.gid.isnull().any():
-		missing_fields.append('gene_id')
+	check_gtf_fields(df, ['transcript_id', 'gene_id'])
+
+def check_gtf_entry_types(entry_types):
+	"""
+	Make sure that the entry types needed by Swan are present in a GTF.
+
+	Parameters:
+		entry_types (list of str): Unique entry types (3rd column) in the GTF
+	"""
+	missing_entry_types = []
+	for entry_type in ['transcript', 'exon']:
+		if entry_type not in entry_types:
+			missing_entry_types.append(entry_type)
+	if missing_entry_types:
+		raise Exception('GTF is missing entry types {}'.format(missing_entry_types))
+
+def check_gtf_fields(df, fields):
+	"""
+	Make sure that the attributes needed by Swan are present in each
+	GTF entry.
+
+	Parameters:
+		df (pandas DataFrame): Attribute values from the GTF, with one column
+			per attribute. Missing attributes are NaN.
+		fields (list of str): Attributes that each entry must have
+	"""
+	missing_fields = [f for f in fields if df[f].isnull().any()]
 	if missing_fields:
 		raise Exception('Last column of GTF is missing entry types {}'.format(missing_fields))
 
@@ -273,24 +318,72 @@ def reorder_exons(exon_ids):
 		exons.reverse()
 	return exons
 
-def get_ends(t_df, kind):
+def get_key_ids(keys, index, n):
+	"""
+	Get IDs for integer keys. Keys that already have an ID keep it, and new
+	keys are numbered from n+1 in the order that they first appear.
+
+	Parameters:
+		keys (numpy array of int): Keys to get IDs for
+		index (pandas Series): IDs of the keys that already have them,
+			indexed by (unique) key
+		n (int): Largest ID already in use. -1 if there are none.
+
+	Returns:
+		ids (numpy array of int): ID of each key
+		new_inds (numpy array of int): Index in keys of the first appearance
+			of each new key, in order of their IDs
+		new_ids (numpy array of int): IDs of the new keys
+	"""
+	pos = index.index.get_indexer(keys)
+	found = pos >= 0
+	ids = np.full(len(keys), -1, dtype=np.int64)
+	ids[found] = index.to_numpy()[pos[found]]
+
+	# number the keys that aren't there yet by their first appearance
+	cands = np.flatnonzero(~found)
+	_, first, inv = np.unique(keys[cands], return_index=True,
+							  return_inverse=True)
+	order = np.argsort(first)
+	rank = np.empty_like(order)
+	rank[order] = np.arange(len(order))
+	new_ids = np.arange(n+1, n+1+len(order), dtype=np.int64)
+	ids[cands] = new_ids[rank[inv]]
+	new_inds = cands[first[order]]
+
+	return ids, new_inds, new_ids
+
+def map_ids(ids, old_ids, new_ids):
+	"""
+	Map IDs from old to new IDs.
+
+	Parameters:
+		ids (numpy array of int): IDs to map
+		old_ids (numpy array of int): Old IDs
+		new_ids (numpy array of int): New ID of each old ID
+
+	Returns:
+		ids (numpy array of int): Mapped IDs
+	"""
+	inds = pd.Index(old_ids).get_indexer(ids)
+	if (inds == -1).any():
+		raise KeyError(ids[np.flatnonzero(inds == -1)[0]])
+	return new_ids[inds]
+
+def get_ends(t_df, kind, loc_paths=None):
 	"""
 	From the transcript dataframe, return one with transcript id and tss / tes.
 
 	Parameters:
 		kind (str): Choose 'tss' or 'tes'
+		loc_paths (PathStore): Location path of each transcript in t_df.
+			Default: None, use the loc_path column of t_df
 	"""
-	# might be able to use this in the future:
-	# https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.explode.html
-	if kind == 'tss':
-		ind = 0
-	elif kind == 'tes':
-		ind = -1
-
-	df = pd.DataFrame([[tid, path[ind]] for tid, path in \
-		zip(t_df.index, t_df.loc_path)])
-	df.columns = ['tid', 'vertex_id']
-	df.set_index('tid', inplace=True)
+	paths = loc_paths
+	if paths is None:
+		paths = PathStore.from_series(t_df.loc_path)
+	df = pd.DataFrame({'vertex_id': paths.get_ends(kind)},
+		index=pd.Index(t_df.index, name='tid'))
 	return df
 
 def pivot_path_list(t_df, path_col):
@@ -302,20 +395,561 @@ def pivot_path_list(t_df, path_col):
 		t_df (pandas DataFrame): Transcript datafram from SwanGraph
 		path_col (str): Which path to pull from. Choose from 'path' or 'loc_path'
 	"""
-	df = t_df.explode(path_col, ignore_index=False)
 	if path_col == 'path':
 		c = 'edge_id'
-		c_map = {path_col: c}
 	elif path_col == 'loc_path':
 		c = 'vertex_id'
-		c_map = {path_col: c}
-	df.rename(c_map, axis=1, inplace=True)
-	df = df[[c]]
+	paths = PathStore.from_series(t_df[path_col])
+	tids, ids = paths.explode()
+	df = pd.DataFrame({c: ids.astype(object)},
+		index=pd.Index(tids, name=t_df.index.name, dtype=t_df.index.dtype))
 	return df
 
 ##########################################################################
 ############### Related to calculating abundance values ##################
 ##########################################################################
+def get_indicator_matrix(labels, groups=None):
+	"""
+	Get a sparse indicator matrix that maps each item to its group, so that
+	values can be added up per group w/ a matrix product.
+
+	Parameters:
+		labels (list-like or pandas MultiIndex): Group of each item. Items
+			w/ missing (NaN) labels or labels not in `groups` aren't in any
+			group.
+		groups (list-like or pandas MultiIndex): Group of each column.
+			Default: unique labels, in order of first appearance
+
+	Returns:
+		m (scipy sparse csr_matrix of float): Items x groups matrix where
+			entry (i, j) is 1 if item i is in group j
+		groups (pandas Index): Group of each column
+	"""
+	if not isinstance(labels, pd.Index):
+		labels = np.asarray(labels)
+	codes = None
+	if groups is None:
+		codes, groups = pd.factorize(labels)
+
+	# wrapping a MultiIndex in pd.Index would flatten it into tuples
+	if not isinstance(groups, pd.Index):
+		groups = pd.Index(groups)
+	if codes is None:
+		codes = groups.get_indexer(labels)
+
+	rows = np.flatnonzero(codes != -1)
+	m = sparse.csr_matrix((np.ones(len(rows)), (rows, codes[rows])),
+		shape=(len(labels), len(groups)))
+	return m, groups
+
+def get_group_indicator_matrix(df, cols):
+	"""
+	Get a sparse indicator matrix that maps each row of a DataFrame to its
+	unique combination of values in some columns, ie to add up values
+	like `df.groupby(cols).sum()` w/ a matrix product.
+
+	Parameters:
+		df (pandas DataFrame): Table w/ one row per item
+		cols (list of str): Columns to group on
+
+	Returns:
+		m (scipy sparse csr_matrix of float): Rows x groups matrix where
+			entry (i, j) is 1 if row i is in group j. Rows w/ missing
+			values in `cols` aren't in any group.
+		groups (pandas DataFrame): Values of `cols` for each group, sorted
+			on `cols`
+	"""
+	labels = pd.MultiIndex.from_frame(df[cols])
+	groups = pd.MultiIndex.from_frame(df[cols].dropna())
+	groups = groups.unique().sort_values()
+	m, groups = get_indicator_matrix(labels, groups)
+	return m, groups.to_frame(index=False)
+
+def widen_matrix(X, cols, n_cols):
+	"""
+	Move the columns of a sparse matrix to new positions in a wider matrix,
+	ie to add columns of 0s for new transcripts. The data array is shared
+	w/ the input matrix, unless the columns are reordered.
+
+	Parameters:
+		X (scipy sparse matrix): Matrix to widen
+		cols (numpy array of int): New position of each column
+		n_cols (int): Number of columns in the wider matrix
+
+	Returns:
+		X (scipy sparse csr_matrix): Wider matrix
+	"""
+	X = sparse.csr_matrix(X)
+	cols = np.asarray(cols, dtype=np.int64)
+	if n_cols == X.shape[1] and (cols == np.arange(n_cols)).all():
+		return X
+	X = sparse.csr_matrix((X.data, cols[X.indices], X.indptr),
+		shape=(X.shape[0], n_cols))
+	if (np.diff(cols) < 0).any():
+		X = X.sorted_indices()
+	return X
+
+def scale_rows(X, factors):
+	"""
+	Multiply each row of a sparse matrix by a factor.
+
+	Parameters:
+		X (scipy sparse matrix): Matrix to scale
+		factors (numpy array of float): Factor for each row
+
+	Returns:
+		X (scipy sparse csr_matrix): Scaled matrix
+	"""
+	return sparse.csr_matrix(sparse.diags(factors) @ X)
+
+def calc_tpm_matrix(counts):
+	"""
+	Calculate the TPM of each row of a sparse counts matrix.
+
+	Parameters:
+		counts (scipy sparse matrix): Datasets x IDs counts matrix
+
+	Returns:
+		tpm (scipy sparse csr_matrix): Datasets x IDs TPM matrix
+	"""
+	counts = sparse.csr_matrix(counts)
+	totals = np.asarray(counts.sum(axis=1), dtype=np.float64).reshape(-1)
+	factors = np.divide(1e6, totals, out=np.zeros(len(totals)),
+		where=totals != 0)
+	return scale_rows(counts, factors)
+
+def calc_pi_matrix(sums, gids):
+	"""
+	Calculate the percent isoform per gene of each row of a sparse counts
+	matrix. Pi is only stored for IDs w/ counts.
+
+	Parameters:
+		sums (scipy sparse matrix): Conditions x IDs counts matrix
+		gids (numpy array of str): Gene ID of each column, or NaN for
+			columns w/o a gene, which get a pi of 0
+
+	Returns:
+		pi (scipy sparse csr_matrix): Conditions x IDs pi matrix
+	"""
+	sums = sparse.csr_matrix(sums, copy=True)
+	sums.eliminate_zeros()
+	sums.sort_indices()
+
+	# calculate total number of reads per gene per condition
+	g_codes, genes = pd.factorize(gids)
+	g, _ = get_indicator_matrix(gids, genes)
+	totals = sparse.csr_matrix(sums @ g)
+	totals.eliminate_zeros()
+	totals.sort_indices()
+
+	# look up the gene total of each nonzero count
+	n_genes = len(genes)
+	rows = np.repeat(np.arange(sums.shape[0], dtype=np.int64),
+		np.diff(sums.indptr))
+	codes = g_codes[sums.indices]
+	has_gene = codes != -1
+	keys = rows*n_genes+codes
+	t_keys = np.repeat(np.arange(totals.shape[0], dtype=np.int64),
+		np.diff(totals.indptr))*n_genes+totals.indices
+	gene_counts = np.ones(len(keys))
+	gene_counts[has_gene] = totals.data[np.searchsorted(t_keys, keys[has_gene])]
+
+	data = np.where(has_gene, (sums.data/gene_counts)*100, 0)
+	pi = sparse.csr_matrix((data, sums.indices, sums.indptr), shape=sums.shape)
+	pi.eliminate_zeros()
+	return pi
+
+def get_var_gids(adata, t_df):
+	"""
+	Get the gene ID of each column of an AnnData.
+
+	Parameters:
+		adata (anndata AnnData): Annotated data object from the SwanGraph
+		t_df (pandas DataFrame): Pandas Dataframe that has index to
+			gene id mapping
+
+	Returns:
+		ids (pandas Index): ID of each column. Edge and vertex IDs are ints.
+		gids (numpy array): Gene ID of each column, or NaN if it's not
+			in `t_df`
+	"""
+	# we use ints to index edges and locs
+	id_col = adata.var.index.name
+	ids = adata.var.index
+	if id_col == 'vertex_id' or id_col == 'edge_id':
+		ids = ids.astype('int')
+	return ids, t_df['gid'].reindex(ids).to_numpy()
+
+def iter_layer_chunks(adata, layer='counts', t_df=None, cols=None,
+	chunksize=10000):
+	"""
+	Iterate over the rows of a layer of an AnnData in blocks. Stored
+	layers are returned as one block. tpm and pi that aren't stored, ie in
+	backed AnnDatas or ones w/ lazily computed layers, are computed from
+	each block of counts. Backed AnnDatas only store counts, as X, so
+	they're read `chunksize` rows at a time.
+
+	Parameters:
+		adata (anndata AnnData): Annotated data object from the SwanGraph
+		layer (str): {'counts', 'tpm', 'pi'}. Default: 'counts'
+		t_df (pandas DataFrame): Table w/ the gene ID of each column, to
+			compute pi. Default: None, use adata.var
+		cols (numpy array of int): Columns to keep. Default: None, keep all
+		chunksize (int): Number of rows to read at a time from backed
+			AnnDatas. Default: 10000
+
+	Yields:
+		start (int): Number of the first row in the block
+		X (scipy sparse csr_matrix): Values of the rows in the block
+	"""
+	if layer in adata.layers.keys():
+		X = sparse.csr_matrix(adata.layers[layer])
+		if cols is not None:
+			X = X[:, cols]
+		yield 0, X
+		return
+
+	if layer == 'pi':
+		if t_df is None:
+			t_df = adata.var
+		_, gids = get_var_gids(adata, t_df)
+	elif layer not in ['counts', 'tpm']:
+		raise ValueError('Layer {} not found in AnnData'.format(layer))
+
+	if adata.isbacked:
+		counts = adata.X
+	else:
+		counts = sparse.csr_matrix(adata.layers['counts'])
+		chunksize = max(adata.n_obs, 1)
+	n = adata.n_obs
+	for start in range(0, n, chunksize):
+		X = sparse.csr_matrix(counts[start:min(start+chunksize, n)])
+		if layer == 'tpm':
+			X = calc_tpm_matrix(X)
+		elif layer == 'pi':
+			X = calc_pi_matrix(X, gids)
+		if cols is not None:
+			X = X[:, cols]
+		yield start, X
+
+def stack_blocks(blocks, n_cols):
+	"""
+	Stack blocks of rows into one sparse matrix.
+
+	Parameters:
+		blocks (iterable of scipy sparse matrix): Consecutive blocks of rows
+		n_cols (int): Number of columns
+
+	Returns:
+		X (scipy sparse csr_matrix): Stacked matrix
+	"""
+	blocks = list(blocks)
+	if not blocks:
+		return sparse.csr_matrix((0, n_cols))
+	elif len(blocks) == 1:
+		return sparse.csr_matrix(blocks[0])
+	return sparse.vstack(blocks, format='csr')
+
+def get_layer(adata, layer='counts', t_df=None, cols=None):
+	"""
+	Get a layer of an AnnData as a sparse matrix, reading it in blocks of
+	rows if the AnnData is backed.
+
+	Parameters:
+		adata (anndata AnnData): Annotated data object from the SwanGraph
+		layer (str): {'counts', 'tpm', 'pi'}. Default: 'counts'
+		t_df (pandas DataFrame): Table w/ the gene ID of each column, to
+			compute pi of backed AnnDatas. Default: None, use adata.var
+		cols (numpy array of int): Columns to keep. Default: None, keep all
+
+	Returns:
+		X (scipy sparse csr_matrix): Datasets x IDs matrix
+	"""
+	n_cols = adata.n_vars if cols is None else len(cols)
+	return stack_blocks((X for _, X in iter_layer_chunks(adata, layer,
+		t_df=t_df, cols=cols)), n_cols)
+
+def sum_row_groups(blocks, m, n_cols):
+	"""
+	Add up rows per group w/ a sparse indicator matrix, one block of rows
+	at a time.
+
+	Parameters:
+		blocks (iterable of (int, scipy sparse matrix)): First row number
+			and values of each block of rows, ie from iter_layer_chunks
+		m (scipy sparse matrix): Rows x groups indicator matrix
+		n_cols (int): Number of columns
+
+	Returns:
+		data (scipy sparse csr_matrix): Groups x columns sums
+	"""
+	m = sparse.csr_matrix(m)
+	data = sparse.csr_matrix((m.shape[1], n_cols))
+	for start, X in blocks:
+		data = data + m[start:start+X.shape[0]].T @ X
+	return sparse.csr_matrix(data)
+
+def calc_layer_totals(adata, layer='counts'):
+	"""
+	Add up a layer of an AnnData over all datasets, one block of rows at
+	a time.
+
+	Parameters:
+		adata (anndata AnnData): Annotated data object from the SwanGraph
+		layer (str): {'counts', 'tpm'}. Default: 'counts'
+
+	Returns:
+		totals (numpy array of float): Total of each column
+	"""
+	totals = np.zeros(adata.n_vars)
+	for _, X in iter_layer_chunks(adata, layer):
+		totals += np.asarray(X.sum(axis=0)).reshape(-1)
+	return totals
+
+def get_backed_frames(obs, var):
+	"""
+	Get an AnnData w/o data w/ the obs and var tables to write to an h5ad
+	file.
+
+	Parameters:
+		obs (pandas DataFrame): obs table
+		var (pandas DataFrame): var table
+
+	Returns:
+		adata (anndata AnnData): AnnData w/ copies of obs and var
+	"""
+	# anndata stores the index as str, so an index named after a column of
+	# int IDs, ie edge_id, no longer matches it and can't be written
+	adata = anndata.AnnData(obs=obs.copy(), var=var.copy())
+	for df in [adata.obs, adata.var]:
+		if df.index.name in df.columns and \
+			not (df.index == df[df.index.name]).all():
+			df.index.name = None
+	return adata
+
+def write_backed_adata(fname, obs, var, blocks):
+	"""
+	Write an AnnData w/ counts as X to an h5ad file that can be read in
+	backed mode. Counts are written one block of rows at a time, so they're
+	never all held in memory. Raises a ValueError and removes the file if
+	a block doesn't have one column per row of `var`, or the blocks don't
+	have one row per row of `obs`.
+
+	Parameters:
+		fname (str): Path to h5ad file
+		obs (pandas DataFrame): obs table
+		var (pandas DataFrame): var table
+		blocks (iterable of scipy sparse matrix): Counts of consecutive
+			blocks of rows, w/ one column per row of `var`
+
+	Returns:
+		totals (numpy array of float): Total counts of each row
+	"""
+	get_backed_frames(obs, var).write_h5ad(fname)
+
+	try:
+		totals = write_backed_counts(fname, blocks,
+			(len(obs.index), len(var.index)))
+	except ValueError:
+		os.remove(fname)
+		raise
+	return totals
+
+def write_backed_counts(fname, blocks, shape):
+	"""
+	Write counts as X to an h5ad file one block of rows at a time. See
+	write_backed_adata.
+
+	Parameters:
+		fname (str): Path to h5ad file w/ obs and var already written
+		blocks (iterable of scipy sparse matrix): Counts of consecutive
+			blocks of rows
+		shape (tuple of int): Number of rows in obs and var
+
+	Returns:
+		totals (numpy array of float): Total counts of each row
+	"""
+	totals = [np.zeros(0)]
+	with h5py.File(fname, 'a') as f:
+		if 'X' in f:
+			del f['X']
+		group = f.create_group('X')
+		indptr = [np.zeros(1, dtype=np.int64)]
+		n = 0
+		n_rows = 0
+		for X in blocks:
+			X = sparse.csr_matrix(X)
+			if X.shape[1] != shape[1]:
+				raise ValueError('Block of counts has {} columns but there are '
+					'{} var rows.'.format(X.shape[1], shape[1]))
+			n_rows += X.shape[0]
+			if 'data' not in group:
+				group.create_dataset('data', shape=(0,), maxshape=(None,),
+					dtype=X.dtype, chunks=True)
+				group.create_dataset('indices', shape=(0,), maxshape=(None,),
+					dtype=np.int64, chunks=True)
+			if X.nnz:
+				for key, values in [('data', X.data), ('indices', X.indices)]:
+					group[key].resize((n+X.nnz,))
+					group[key][n:] = values
+			indptr.append(X.indptr[1:].astype(np.int64)+n)
+			n += X.nnz
+			totals.append(np.asarray(X.sum(axis=1), dtype=np.float64).reshape(-1))
+
+		if n_rows != shape[0]:
+			raise ValueError('Blocks of counts have {} rows in total but there '
+				'are {} obs rows.'.format(n_rows, shape[0]))
+
+		# keep every array resizable so rows can be appended later
+		if 'data' not in group:
+			group.create_dataset('data', shape=(0,), maxshape=(None,),
+				dtype=np.float64, chunks=True)
+			group.create_dataset('indices', shape=(0,), maxshape=(None,),
+				dtype=np.int64, chunks=True)
+		group.create_dataset('indptr', data=np.concatenate(indptr),
+			maxshape=(None,), chunks=True)
+		group.attrs['encoding-type'] = 'csr_matrix'
+		group.attrs['encoding-version'] = '0.1.0'
+		group.attrs['shape'] = shape
+
+	return np.concatenate(totals)
+
+def can_append_backed(fname, cols):
+	"""
+	Check if rows can be appended to the counts of an h5ad file written by
+	write_backed_adata w/o rewriting it, ie its arrays are resizable and
+	its columns keep their order in the combined columns.
+
+	Parameters:
+		fname (str): Path to h5ad file
+		cols (numpy array of int): New position of each column
+
+	Returns:
+		can_append (bool): Whether rows can be appended
+	"""
+	if (np.diff(cols) <= 0).any():
+		return False
+	with h5py.File(fname, 'r') as f:
+		group = f.get('X')
+		if not isinstance(group, h5py.Group):
+			return False
+		return all(key in group and group[key].maxshape == (None,)
+			for key in ['data', 'indices', 'indptr'])
+
+def append_backed_adata(fname, obs, var, cols, blocks):
+	"""
+	Append rows of counts to an h5ad file written by write_backed_adata,
+	in place. Only the new blocks are written; the existing counts are
+	kept, and their column indices are moved to `cols` if columns were
+	added. Check can_append_backed first. Raises a ValueError and leaves
+	the counts as they were if a block doesn't have one column per row of
+	`var`, or the file and the blocks don't have one row per row of `obs`.
+
+	Parameters:
+		fname (str): Path to h5ad file
+		obs (pandas DataFrame): obs table of the existing and new rows
+		var (pandas DataFrame): var table of the combined columns
+		cols (numpy array of int): New position of each existing column,
+			in increasing order
+		blocks (iterable of scipy sparse matrix): Counts of consecutive
+			blocks of new rows, w/ one column per row of `var`
+
+	Returns:
+		totals (numpy array of float): Total counts of each new row
+	"""
+	shape = (len(obs.index), len(var.index))
+	cols = np.asarray(cols, dtype=np.int64)
+	totals = [np.zeros(0)]
+	with h5py.File(fname, 'a') as f:
+		group = f['X']
+		n_old_rows = len(group['indptr'])-1
+		n_old = group['indptr'][-1]
+		n = n_old
+		n_rows = n_old_rows
+		try:
+			for X in blocks:
+				X = sparse.csr_matrix(X)
+				if X.shape[1] != shape[1]:
+					raise ValueError('Block of counts has {} columns but there '
+						'are {} var rows.'.format(X.shape[1], shape[1]))
+				if X.nnz:
+					for key, values in [('data', X.data), ('indices', X.indices)]:
+						group[key].resize((n+X.nnz,))
+						group[key][n:] = values
+				indptr = group['indptr']
+				indptr.resize((n_rows+X.shape[0]+1,))
+				indptr[n_rows+1:] = X.indptr[1:].astype(np.int64)+n
+				n += X.nnz
+				n_rows += X.shape[0]
+				totals.append(np.asarray(X.sum(axis=1),
+					dtype=np.float64).reshape(-1))
+
+			if n_rows != shape[0]:
+				raise ValueError('Blocks of counts have {} rows in total but '
+					'there are {} obs rows.'.format(n_rows, shape[0]))
+		except ValueError:
+			for key in ['data', 'indices']:
+				group[key].resize((n_old,))
+			group['indptr'].resize((n_old_rows+1,))
+			raise
+
+		# move the existing counts to their new columns
+		if len(cols) != shape[1] or (cols != np.arange(len(cols))).any():
+			indices = group['indices']
+			chunksize = 1000000
+			for start in range(0, n_old, chunksize):
+				stop = min(start+chunksize, n_old)
+				indices[start:stop] = cols[indices[start:stop]]
+		group.attrs['shape'] = shape
+
+		# obs and var are small, so rewrite them
+		adata = get_backed_frames(obs, var)
+		for key, df in [('obs', adata.obs), ('var', adata.var)]:
+			del f[key]
+			write_elem(f, key, df)
+
+	return np.concatenate(totals)
+
+def read_adata_subset(adata, obs_names=None, var_names=None, t_df=None):
+	"""
+	Read the data of some datasets and IDs from an AnnData into memory.
+	The tpm and pi of the subset are computed from the full rows of
+	counts if they aren't stored, so they match those of the whole AnnData.
+
+	Parameters:
+		adata (anndata AnnData): Backed AnnData w/ counts as X, or
+			in-memory AnnData w/ a counts layer
+		obs_names (list of str): Datasets to keep. Default: None, keep all
+		var_names (list of str): IDs to keep. Default: None, keep all
+		t_df (pandas DataFrame): Table w/ the gene ID of each ID, to
+			compute pi. Default: None, don't compute pi
+
+	Returns:
+		subset (anndata AnnData): In-memory AnnData w/ counts, tpm, and
+			pi (if `t_df` is given) layers
+	"""
+	rows = np.arange(adata.n_obs)
+	if obs_names is not None:
+		rows = adata.obs.index.get_indexer(obs_names)
+	cols = np.arange(adata.n_vars)
+	if var_names is not None:
+		cols = adata.var.index.get_indexer(var_names)
+	if (rows == -1).any() or (cols == -1).any():
+		raise KeyError('Datasets or IDs not found in AnnData')
+
+	layers = ['counts', 'tpm']
+	if t_df is not None:
+		layers.append('pi')
+	data = {}
+	for layer in layers:
+		data[layer] = get_layer(adata, layer, t_df=t_df, cols=cols)[rows]
+
+	subset = anndata.AnnData(obs=adata.obs.iloc[rows].copy(),
+		var=adata.var.iloc[cols].copy(), X=data['counts'])
+	for layer, X in data.items():
+		subset.layers[layer] = X
+	return subset
+
 def calc_total_counts(adata, obs_col='dataset', layer='counts'):
 	"""
 	Calculate cumulative expression per adata entry based on condition given
@@ -335,20 +969,15 @@ def calc_total_counts(adata, obs_col='dataset', layer='counts'):
 
 	"""
 
-	# turn into a sparse dataframe
-	cols = adata.var.index.tolist()
-	inds = adata.obs[obs_col].tolist()
-	data = adata.layers[layer].toarray()
-	df = pd.DataFrame(data=data, index=inds, columns=cols)
-	df.index.name = obs_col
-
-	# add up values on condition (row)
-	df = df.groupby(level=0).sum()
+	# add up values on condition (row), in sorted order
+	labels = adata.obs[obs_col].to_numpy()
+	conditions = pd.Index(pd.unique(labels)).dropna().sort_values()
+	m, conditions = get_indicator_matrix(labels, conditions)
+	data = sum_row_groups(iter_layer_chunks(adata, layer), m, adata.n_vars)
 
-	# convert to sparse
-	df = pd.DataFrame.sparse.from_spmatrix(data=sparse.csr_matrix(df.values),
-										   index=df.index.tolist(),
-										   columns=df.columns)
+	df = pd.DataFrame.sparse.from_spmatrix(data=data,
+										   index=conditions.tolist(),
+										   columns=adata.var.index)
 
 	return df
 
@@ -357,6 +986,11 @@ def calc_pi(adata, t_df, obs_col='dataset'):
 	Calculate the percent isoform per gene per condition given by `obs_col`.
 	Default column to use is `adata.obs` index column, `dataset`.
 
+	Counts are added up per condition and per gene w/ sparse indicator
+	matrices, so no dense condition x transcript matrix is ever created.
+	Backed AnnDatas are read in blocks of rows. Pi is only stored for
+	transcripts w/ counts in a condition.
+
 	Parameters:
 		adata (anndata AnnData): Annotated data object from the SwanGraph
 		t_df (pandas DataFrame): Pandas Dataframe that has index to
@@ -375,81 +1009,59 @@ def calc_pi(adata, t_df, obs_col='dataset'):
 			per condition.
 	"""
 
-	# calculate cumulative counts across obs_col
-	id_col = adata.var.index.name
-	conditions = adata.obs[obs_col].unique().tolist()
-	df = calc_total_counts(adata, obs_col=obs_col)
-	df = df.transpose()
+	ids, gids = get_var_gids(adata, t_df)
 
-	# we use ints to index edges and locs
-	if id_col == 'vertex_id' or id_col == 'edge_id':
-		df.index = df.index.astype('int')
-
-	sums = df.copy(deep=True)
-	sums = sums[conditions]
-	sums = sums.transpose()
-
-	# add gid
-	df = df.merge(t_df['gid'], how='left', left_index=True, right_index=True)
-	t_counts = df.melt(id_vars=['gid'],
-					   value_vars=conditions,
-					   var_name=obs_col,
-					   value_name='t_counts',
-					   ignore_index=False)
-	t_counts.index.name = id_col
-	t_counts.reset_index(inplace=True)
-
-	# calculate total number of reads per gene per condition
-	temp = df.copy(deep=True)
-	temp.reset_index(drop=True, inplace=True)
-	temp[conditions] = temp[conditions].sparse.to_dense()
-	totals = temp.groupby('gid').sum().reset_index()
+	# calculate cumulative counts across obs_col, in order of appearance
+	m, conditions = get_indicator_matrix(adata.obs[obs_col].to_numpy())
+	sums = sum_row_groups(iter_layer_chunks(adata, 'counts'), m, len(ids))
+	sums.eliminate_zeros()
+	sums.sort_indices()
 
-	# merge back in
-	df = df.copy(deep=True)
-	df.reset_index(inplace=True)
-	df.rename({'index':id_col}, axis=1, inplace=True)
-	df = df.merge(totals, on='gid', suffixes=('_t_counts', None))
-	del totals
-
-	df = df.melt(id_vars=['gid'],
-				 value_vars=conditions,
-				 var_name=obs_col,
-				 value_name='gene_counts')
-	df = df.drop_duplicates()
-	df = t_counts.merge(df, how='left', on=['gid', obs_col])
-
-	# before anything, remove stuff w/ 0 gene counts
-	df = df.loc[df.gene_counts > 0]
-
-	df['pi'] = (df.t_counts/df.gene_counts)*100
-	# try:
-	df = df.pivot(columns=obs_col, index=id_col, values='pi')
-	# except:
-	# 	import pdb; pdb.set_trace()
-
-	# order based on order in adata
-	ids = adata.var.index.tolist()
-	df = df.loc[ids]
-	cols = adata.obs[obs_col].unique().tolist()
-	cols = list(set(cols)&set(df.columns.tolist()))
-	df = df[cols]
+	# calculate pi from the total number of reads per gene per condition
+	pi = calc_pi_matrix(sums, gids)
 
 	# convert to sparse
-	df = df.transpose()
-	df = pd.DataFrame.sparse.from_spmatrix(data=sparse.csr_matrix(df.values),
-										   index=df.index.tolist(),
-										   columns=df.columns)
+	df = pd.DataFrame.sparse.from_spmatrix(data=pi,
+										   index=conditions.tolist(),
+										   columns=ids)
+	sums = pd.DataFrame.sparse.from_spmatrix(data=sums,
+											 index=conditions.tolist(),
+											 columns=ids)
 	return df, sums
 
+def calc_layers(adata, t_df=None):
+	"""
+	Calculate the tpm of each row of an AnnData from its counts, and pi if
+	`t_df` is given, and store them as sparse layers. The matrices are
+	stored as they're computed, w/o going through a sparse DataFrame like
+	calc_tpm and calc_pi. Also stores the total counts of each row in
+	adata.obs.
+
+	Parameters:
+		adata (anndata AnnData): Annotated data object w/ a counts layer
+		t_df (pandas DataFrame): Table w/ the gene ID of each column, to
+			compute pi. Default: None, don't compute pi
+	"""
+	counts = sparse.csr_matrix(adata.layers['counts'])
+	adata.obs['total_counts'] = np.asarray(counts.sum(axis=1),
+		dtype=np.float64).reshape(-1)
+	adata.layers['tpm'] = calc_tpm_matrix(counts)
+	if t_df is not None:
+		_, gids = get_var_gids(adata, t_df)
+		adata.layers['pi'] = calc_pi_matrix(counts, gids)
+
 def calc_tpm(adata, obs_col='dataset', how='mean', recalc=False):
 	"""
 	Calculate the TPM per condition given by `obs_col`.
 	Default column to use is `adata.obs` index column, `dataset`.
 
+	TPM is computed by scaling each row of the sparse counts matrix, and
+	grouped by averaging w/ a sparse indicator matrix, so no dense matrix
+	is ever created. Backed AnnDatas are read in blocks of rows.
+
 	Parameters:
 		adata (anndata AnnData): Annotated data object from the SwanGraph
-		obs_col (str or list of str): Column name from adata.obs table to group on.
+		obs_col (str): Column name from adata.obs table to group on.
 			Default: 'dataset'
 		how (str): How to compute tpm across multiple datasets {'mean', 'max'}
 		recalc (bool): Whether tpm data should be recalculated or tpm
@@ -465,49 +1077,46 @@ def calc_tpm(adata, obs_col='dataset', how='mean', recalc=False):
 
 	# only need to calculate tpm once when adding abundance
 	if recalc:
-
-		# calculate tpm using scanpy
-		d = sc.pp.normalize_total(adata,
-								  layer='counts',
-								  target_sum=1e6,
-								  key_added='total_counts',
-								  inplace=False)
-		adata.obs['total_counts'] = d['norm_factor']
-		data = d['X'].toarray()
-
-	# otherwise just grab the tpm from the adata
+		counts = sparse.csr_matrix(adata.layers['counts'])
+		adata.obs['total_counts'] = np.asarray(counts.sum(axis=1),
+			dtype=np.float64).reshape(-1)
+		data = calc_tpm_matrix(counts)
+		blocks = [(0, data)]
+
+	# otherwise just grab the tpm from the adata, in blocks of rows
+	# if it's backed
 	else:
-		data = adata.layers['tpm'].toarray()
+		blocks = iter_layer_chunks(adata, 'tpm')
 
-	# turn into a dataframe
-	cols = adata.var.index.tolist()
 	inds = adata.obs[obs_col].tolist()
-	df = pd.DataFrame(data=data, columns=cols, index=inds)
-	df.index.name = obs_col
 
-	# average across tpm
-	if obs_col != 'dataset':
+	if obs_col == 'dataset':
+		if not recalc:
+			data = stack_blocks((X for _, X in blocks), adata.n_vars)
 
-		# keep track of original row order to sort by
-		row_order = df.index.unique().tolist()
-		row_map = {}
-		for i, row in enumerate(row_order):
-			row_map[row] = i
-
-		df['row_order'] = df.index.map(row_map)
-		df.reset_index(inplace=True)
+	# average across tpm, keeping the original row order
+	else:
+		m, groups = get_indicator_matrix(adata.obs[obs_col].to_numpy())
 		if how == 'mean':
-			df = df.groupby(obs_col).mean()
+			n = np.asarray(m.sum(axis=0)).reshape(-1)
+			data = scale_rows(sum_row_groups(blocks, m, adata.n_vars), 1/n)
 		elif how == 'max':
-			df = df.groupby(obs_col).max()
-		df = df.sort_values(by='row_order', ascending=True)
-		df.drop('row_order', inplace=True, axis=1)
+			data = sparse.csr_matrix((len(groups), adata.n_vars))
+			for start, X in blocks:
+				block_m = m[start:start+X.shape[0]].tocsc()
+				maxes = []
+				for i in range(len(groups)):
+					rows = block_m.indices[block_m.indptr[i]:block_m.indptr[i+1]]
+					if len(rows) == 0:
+						maxes.append(sparse.csr_matrix((1, adata.n_vars)))
+					else:
+						maxes.append(sparse.csr_matrix(X[rows].max(axis=0)))
+				data = data.maximum(sparse.vstack(maxes, format='csr'))
+		inds = groups.tolist()
 
 	# make sparse
-	data = sparse.csr_matrix(df.values)
-	inds = df.index.tolist()
-	cols = df.columns.tolist()
-	df = pd.DataFrame.sparse.from_spmatrix(data, index=inds, columns=cols)
+	df = pd.DataFrame.sparse.from_spmatrix(data, index=inds,
+										   columns=adata.var.index)
 
 	return df
 
@@ -568,35 +1177,31 @@ def parse_db(database, pass_list, observed, include_isms, verbose):
 
 	# annot = check_annot_validity(annot, database)
 
-	pass_list = handle_filtering(database, observed, pass_list)
-
-	# create separate gene and transcript pass_lists
-	gene_pass_list = []
-	transcript_pass_list = []
-	for key,group in itertools.groupby(pass_list,operator.itemgetter(0)):
-		gene_pass_list.append(key)
-		for id_tuple in list(group):
-			transcript_pass_list.append(id_tuple[1])
+	# share one connection to the database and keep the transcripts to use
+	# in a temporary table to join against
+	conn = connect_db(database)
+	pass_list = handle_filtering(database, observed, pass_list, conn=conn)
 
 	# get gene, transcript, and exon annotations
-	gene_annotations = get_annotations(database, "gene",
-									   pass_list = gene_pass_list)
+	gene_annotations = get_annotations(database, "gene", conn=conn,
+									   filtered=True)
 	transcript_annotations = get_annotations(database, "transcript",
-											 pass_list = transcript_pass_list)
-	exon_annotations = get_annotations(database, "exon")
+											 conn=conn, filtered=True)
+	exon_annotations = get_annotations(database, "exon", conn=conn)
 
 	# get transcript data from the database
-	gene_2_transcripts = get_gene_2_transcripts(database,
-						 transcript_pass_list)
+	gene_2_transcripts = get_gene_2_transcripts(database, None, conn=conn,
+						 filtered=True)
 
 	# get exon location info from database
-	exon_ID_2_location = fetch_exon_locations(database)
+	exon_ID_2_location = fetch_exon_locations(database, conn=conn)
+	conn.close()
 
 	transcripts = {}
 	exons = {}
 
 	if verbose:
-		n_transcripts = len(transcript_pass_list)
+		n_transcripts = len(pass_list)
 		pbar = tqdm(total=n_transcripts)
 		pbar.set_description('Processing transcripts')
 
@@ -700,6 +1305,297 @@ def parse_db(database, pass_list, observed, include_isms, verbose):
 
 	return t_df, exon_df
 
+def get_db_attributes(cursor, feat_type, attributes, batch_size=100000):
+	"""
+	Get the values of some annotation attributes of the genes or transcripts
+	in the temporary pass_list table (see handle_filtering). Reads the
+	annotations in batches and pivots each batch so that only one row per
+	gene / transcript is kept in memory. If an attribute is annotated more
+	than once, the value from the last source (alphabetically) is used,
+	same as parse_db.
+
+	Parameters:
+		cursor (sqlite3 Cursor): Cursor of connection w/ pass_list table
+		feat_type (str): {'gene', 'transcript'}
+		attributes (list of str): Attributes to get
+		batch_size (int): Number of annotations to read at once
+			Default: 100000
+
+	Returns:
+		df (pandas DataFrame): Value of each attribute (columns) for each
+			gene / transcript TALON ID (index). NaN if not annotated.
+	"""
+	id_col = 'gene_ID' if feat_type == 'gene' else 'transcript_ID'
+	query = """ SELECT ID, attribute, value FROM {}_annotations
+				WHERE ID IN (SELECT {} FROM temp.pass_list)
+				AND attribute IN ({})
+				ORDER BY ID, source, attribute """.format(feat_type, id_col,
+					','.join(['?' for a in attributes]))
+	cursor.execute(query, attributes)
+
+	dfs = []
+	while True:
+		rows = cursor.fetchmany(batch_size)
+		if not rows:
+			break
+		df = pd.DataFrame.from_records(rows, columns=['ID', 'attribute', 'value'])
+		df = df.drop_duplicates(subset=['ID', 'attribute'], keep='last')
+		dfs.append(df.pivot(index='ID', columns='attribute', values='value'))
+
+	if dfs:
+		df = pd.concat(dfs)
+
+		# an ID can be split across batches
+		if df.index.duplicated().any():
+			df = df.groupby(level=0, sort=False).last()
+	else:
+		df = pd.DataFrame(index=pd.Index([], dtype=np.int64))
+	return df.reindex(columns=attributes)
+
+def get_db_transcripts(cursor, batch_size=100000):
+	"""
+	Get the transcripts in the temporary pass_list table (see
+	handle_filtering) along with the exons in each of their paths. Reads
+	the transcripts in batches and splits the paths of each batch.
+
+	Parameters:
+		cursor (sqlite3 Cursor): Cursor of connection w/ pass_list table
+		batch_size (int): Number of transcripts to read at once
+			Default: 100000
+
+	Returns:
+		t_df (pandas DataFrame): transcript_ID, gene_ID, min_pos (start
+			of the transcript), and strand of each transcript
+		t_exons (pandas DataFrame): transcript_ID and exon_ID of each exon
+			in each transcript, in path order
+	"""
+	query = """ SELECT t.transcript_ID, t.gene_ID,
+				MIN(loc1.position,loc2.position) AS min_pos,
+				genes.strand, t.start_exon, t.jn_path, t.end_exon, t.n_exons
+				FROM transcripts t
+				LEFT JOIN location loc1 ON t.start_vertex = loc1.location_ID
+				LEFT JOIN location loc2 ON t.end_vertex = loc2.location_ID
+				LEFT JOIN genes ON t.gene_ID = genes.gene_ID
+				WHERE t.transcript_ID IN (SELECT transcript_ID FROM temp.pass_list)
+				ORDER BY t.transcript_ID """
+	cursor.execute(query)
+
+	cols = ['transcript_ID', 'gene_ID', 'min_pos', 'strand', 'start_exon',
+			'jn_path', 'end_exon', 'n_exons']
+	t_dfs = []
+	exon_dfs = []
+	while True:
+		rows = cursor.fetchmany(batch_size)
+		if not rows:
+			break
+		df = pd.DataFrame.from_records(rows, columns=cols)
+
+		# every other edge in the path is an exon
+		mono = (df.n_exons == 1).to_numpy()
+		path = df.start_exon.astype(str)+','+df.jn_path.astype(str)+','+\
+			   df.end_exon.astype(str)
+		path.loc[mono] = df.loc[mono, 'start_exon'].astype(str)
+		exons = path.str.split(',').str[::2].explode()
+		exon_dfs.append(pd.DataFrame({'transcript_ID': df.transcript_ID.to_numpy()[exons.index],
+			'exon_ID': exons.to_numpy().astype(np.int64)}))
+		t_dfs.append(df[['transcript_ID', 'gene_ID', 'min_pos', 'strand']])
+
+	if not t_dfs:
+		return pd.DataFrame(columns=cols[:4]), \
+			   pd.DataFrame(columns=['transcript_ID', 'exon_ID'])
+	t_df = pd.concat(t_dfs, ignore_index=True)
+	t_exons = pd.concat(exon_dfs, ignore_index=True)
+	return t_df, t_exons
+
+def get_db_exons(cursor, exon_ids, batch_size=100000):
+	"""
+	Get the location of each of a set of exons from a TALON DB.
+
+	Parameters:
+		cursor (sqlite3 Cursor): Cursor of connection to TALON DB
+		exon_ids (numpy array of int): TALON edge IDs of exons
+		batch_size (int): Number of exons to read at once
+			Default: 100000
+
+	Returns:
+		exon_df (pandas DataFrame): chrom, v1, v2, and strand of each exon,
+			indexed by exon ID. v1 / v2 are the start / stop of the exon in
+			the direction of its strand.
+	"""
+	load_ids(cursor, exon_ids.tolist())
+	query = """ SELECT e.edge_ID, loc1.chromosome,
+				MIN(loc1.position,loc2.position),
+				MAX(loc1.position,loc2.position),
+				e.strand
+				FROM edge e
+				LEFT JOIN location loc1 ON e.v1 = loc1.location_ID
+				LEFT JOIN location loc2 ON e.v2 = loc2.location_ID
+				WHERE e.edge_type = 'exon'
+				AND e.edge_ID IN (SELECT ID FROM temp.ids) """
+	cursor.execute(query)
+
+	cols = ['exon_ID', 'chrom', 'start', 'stop', 'strand']
+	dfs = []
+	while True:
+		rows = cursor.fetchmany(batch_size)
+		if not rows:
+			break
+		dfs.append(pd.DataFrame.from_records(rows, columns=cols))
+	if dfs:
+		df = pd.concat(dfs, ignore_index=True)
+	else:
+		df = pd.DataFrame(columns=cols)
+	df = df.drop_duplicates(subset='exon_ID', keep='last')
+
+	# same as find_edge_start_stop
+	minus = (df.strand == '-').to_numpy()
+	df['v1'] = np.where(minus, df.stop, df.start)
+	df['v2'] = np.where(minus, df.start, df.stop)
+	df.index = df.exon_ID.to_numpy()
+	return df[['chrom', 'v1', 'v2', 'strand']]
+
+def parse_db_vectorized(database, pass_list, observed, include_isms, verbose,
+						batch_size=100000, regions=None):
+	"""
+	Get the unique transcripts and exons that are present in a TALON DB
+	transcriptome. Only reads the tables and columns that are needed, in
+	batches, and builds the transcript and exon tables column-wise rather
+	than transcript-by-transcript. Output is the same as parse_db.
+
+	Parameters:
+		database (str): Path to database file
+		pass_list (str): Path to TALON pass list files
+		observed (bool): Whether or not to only use observed transcripts
+		include_isms (bool): Whether to include ISMs or not
+		verbose (bool): Display progress
+		batch_size (int): Number of rows to read from the database at once
+			Default: 100000
+		regions (str or list of str): Only report transcripts that overlap
+			these regions, formatted as 'chrom' or 'chrom:start-stop'
+			(1-based, inclusive). Only the needed parts of the DB are read.
+			Default: None, report all transcripts
+
+	Returns:
+		t_df (pandas DataFrame): DataFrame of transcripts in TALON db. Index
+			is transcript ids. Columns are gene id, gene name,
+			transcript id (same as key), transcript name, strand, and exons
+			belonging to the transcript.
+		exon_df (pandas DataFrame): DataFrame of exons in TALON db. Index is exon ids
+			which consist of chromosome_v1_v2_strand_exon. Columns are edge id
+			(same as key), chromosome, v1, v2, strand, and edge type
+			(all exon in this case) of each exon.
+	"""
+
+	# make sure files exist
+	if pass_list:
+		check_file_loc(pass_list, 'pass list')
+	if regions is not None:
+		regions = parse_regions(regions)
+
+	conn = connect_db(database)
+	cursor = conn.cursor()
+	handle_filtering(database, observed, pass_list, conn=conn,
+		regions=regions)
+
+	if verbose:
+		pbar = tqdm(total=4)
+		pbar.set_description('Processing transcripts')
+
+	# gene and transcript names / ids / novelty
+	genes = get_db_attributes(cursor, 'gene', ['gene_id', 'gene_name'],
+		batch_size)
+	nov_keys = ['ISM_transcript', 'NIC_transcript', 'NNC_transcript',
+				'antisense_transcript', 'intergenic_transcript',
+				'genomic_transcript']
+	t_attrs = get_db_attributes(cursor, 'transcript',
+		['transcript_id', 'transcript_name', 'transcript_status']+nov_keys,
+		batch_size)
+	if verbose:
+		pbar.update(2)
+
+	# transcripts and their exons
+	t_df, t_exons = get_db_transcripts(cursor, batch_size)
+	if verbose:
+		pbar.update(1)
+
+	if t_df.empty:
+		conn.close()
+		if verbose:
+			pbar.update(1)
+			pbar.close()
+		if regions is not None:
+			raise Exception('No transcripts found in regions {}'.format(
+				[format_region(*r) for r in regions]))
+		return pd.DataFrame({}).transpose(), pd.DataFrame({}).transpose()
+
+	exons = get_db_exons(cursor, t_exons.exon_ID.unique(), batch_size)
+	conn.close()
+	if verbose:
+		pbar.update(1)
+		pbar.close()
+
+	# order transcripts by gene, then start
+	order = np.lexsort((t_df.transcript_ID.to_numpy(),
+						t_df.min_pos.to_numpy(),
+						t_df.gene_ID.to_numpy()))
+	t_df = t_df.iloc[order].reset_index(drop=True)
+
+	# names and ids
+	gene_ids = genes.gene_id.reindex(t_df.gene_ID)
+	gene_names = genes.gene_name.reindex(t_df.gene_ID)
+	t_df['gid'] = gene_ids.to_numpy()
+	t_df['gname'] = gene_names.fillna(gene_ids).to_numpy()
+	attrs = t_attrs.reindex(t_df.transcript_ID)
+	t_df['tid'] = attrs.transcript_id.to_numpy()
+	t_df['tname'] = attrs.transcript_name.fillna(attrs.transcript_id).to_numpy()
+
+	# same as get_transcript_novelties
+	conds = [(attrs.transcript_status == 'KNOWN').to_numpy()]
+	conds += [attrs[key].notnull().to_numpy() for key in nov_keys]
+	choices = ['Known', 'ISM', 'NIC', 'NNC', 'Antisense', 'Intergenic', 'Genomic']
+	t_df['novelty'] = np.select(conds, choices, default='Undefined').astype(object)
+
+	# exons of each transcript in path order, and unique exons in the order
+	# that they first appear
+	inds = exons.index.get_indexer(t_exons.exon_ID)
+	if (inds == -1).any():
+		raise KeyError(t_exons.exon_ID.to_numpy()[np.flatnonzero(inds == -1)[0]])
+	exons = exons.iloc[inds].reset_index(drop=True)
+	exons['eid'] = exons.chrom.astype(str)+'_'+exons.v1.astype(str)+'_'+\
+				   exons.v2.astype(str)+'_'+exons.strand.astype(str)+'_exon'
+	t_inds = pd.Index(t_df.transcript_ID).get_indexer(t_exons.transcript_ID)
+	exon_order = np.argsort(t_inds, kind='stable')
+	exons = exons.iloc[exon_order]
+	t_inds = t_inds[exon_order]
+	counts = np.bincount(t_inds, minlength=len(t_df.index))
+	eids = np.split(exons.eid.to_numpy(), np.cumsum(counts)[:-1])
+	t_df['exons'] = [list(i) for i in eids]
+
+	# later transcripts w/ the same transcript id take precedence, but
+	# transcripts stay in the order they were first seen in
+	dupe_tids = t_df.tid.duplicated(keep='last')
+	if dupe_tids.any():
+		first_tids = t_df.loc[~t_df.tid.duplicated(keep='first'), 'tid']
+		t_df = t_df.loc[~dupe_tids]
+		t_df = t_df.set_index('tid', drop=False).loc[first_tids]
+
+	t_df = t_df[['gid', 'gname', 'tid', 'tname', 'strand', 'novelty', 'exons']]
+	t_df.index = t_df.tid.tolist()
+	t_df = t_df.astype(object)
+
+	exon_df = exons.drop_duplicates(subset='eid', keep='first')
+	exon_df = exon_df[['eid', 'chrom', 'v1', 'v2', 'strand']]
+	exon_df.index = exon_df.eid.tolist()
+	exon_df = exon_df.astype(object)
+
+	# use stable gid if we can
+	try:
+		t_df['gid'] = get_stable_gid(t_df, 'gid')
+	except:
+		pass
+
+	return t_df, exon_df
+
 def parse_gtf(gtf_file, include_isms, verbose):
 	"""
 	Get the unique transcripts and exons that are present in a GTF
@@ -724,18 +1620,6 @@ def parse_gtf(gtf_file, include_isms, verbose):
 		from_cerberus (bool): Whether or not the GTF is from cerberus
 	"""
 
-	# counts the number of transcripts in a given GTF
-	# so that we can track progress
-	def count_transcripts(gtf_file):
-		df = pd.read_csv(gtf_file, sep='\t', usecols=[2],
-			names=['entry_type'], comment='#')
-		df = df.loc[df.entry_type == 'transcript']
-		n = len(df.index)
-		return n
-
-	# get the number of transcripts in the file
-	n_transcripts = count_transcripts(gtf_file)
-
 	# dictionaries to hold unique edges and transcripts
 	transcripts = {}
 	exons = {}
@@ -743,14 +1627,26 @@ def parse_gtf(gtf_file, include_isms, verbose):
 	from_cerberus = False
 	ism_tids = []
 
-	# display progess
+	# display progess in terms of bytes read. we don't know
+	# the total for gzipped files
 	if verbose:
-		pbar = tqdm(total=n_transcripts)
-		counter = 0
+		total = None
+		if not is_gzipped(gtf_file):
+			total = os.path.getsize(gtf_file)
+		pbar = tqdm(total=total, unit='B', unit_scale=True)
+		pbar.set_description('Processing transcripts')
+		n_bytes = 0
 
-	with open(gtf_file) as gtf:
+	with open_gtf(gtf_file) as gtf:
 		for line in gtf:
 
+			# update progress bar
+			if verbose:
+				n_bytes += len(line)
+				if n_bytes >= 1000000:
+					pbar.update(n_bytes)
+					n_bytes = 0
+
 			# ignore header lines
 			if line.startswith('#'):
 				continue
@@ -769,13 +1665,6 @@ def parse_gtf(gtf_file, include_isms, verbose):
 			# transcript entry
 			if entry_type == "transcript":
 
-				# update progress bar
-				if verbose:
-					counter+=1
-					if counter % 100 == 0:
-						pbar.update(100)
-						pbar.set_description('Processing transcripts')
-
 				attributes = get_fields(fields)
 
 				# check if this gtf has transcript novelty vals
@@ -855,6 +1744,10 @@ def parse_gtf(gtf_file, include_isms, verbose):
 				if tid in transcripts:
 					transcripts[tid]['exons'].append(eid)
 
+	if verbose:
+		pbar.update(n_bytes)
+		pbar.close()
+
 	t_df = pd.DataFrame(transcripts).transpose()
 	exon_df = pd.DataFrame(exons).transpose()
 
@@ -870,6 +1763,480 @@ def parse_gtf(gtf_file, include_isms, verbose):
 
 	return t_df, exon_df, from_talon, from_cerberus
 
+def get_gtf_attribute(fields, key):
+	"""
+	From a Series of GTF attribute columns, extract the value of one attribute.
+
+	Parameters:
+		fields (pandas Series): Last column of each GTF entry
+		key (str): Name of attribute to extract
+
+	Returns:
+		vals (pandas Series): Value of the attribute for each entry. NaN
+			where the attribute is absent.
+	"""
+	# start the pattern with the key itself so that the regex engine can
+	# skip ahead to it, then make sure it isn't the end of a longer key
+	key = re.escape(key)
+	pattern = key+r'(?<![^;\s]'+key+r')\s+"?([^";\s]*)'
+	return fields.str.extract(pattern, expand=False)
+
+def has_gtf_attribute(fields, key):
+	"""
+	From a Series of GTF attribute columns, determine which entries contain
+	a given attribute.
+
+	Parameters:
+		fields (pandas Series): Last column of each GTF entry
+		key (str): Name of attribute to look for
+
+	Returns:
+		has_key (numpy array of bool): Whether each entry has the attribute
+	"""
+	key = re.escape(key)
+	pattern = key+r'(?<![^;\s]'+key+r')(?![^;\s])'
+	return fields.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+
+def get_transcript_novelties_vectorized(fields):
+	"""
+	Vectorized version of get_transcript_novelties. Get the novelty type
+	associated with each transcript from its GTF attribute column.
+
+	Parameters:
+		fields (pandas Series): Last column of each GTF transcript entry
+
+	Returns:
+		novelty (numpy array of str): Novelty type of each transcript
+	"""
+	known = (get_gtf_attribute(fields, 'transcript_status') == 'KNOWN').to_numpy()
+	conds = [known]
+	choices = ['Known']
+	for key, nov in [('ISM_transcript', 'ISM'),
+					 ('NIC_transcript', 'NIC'),
+					 ('NNC_transcript', 'NNC'),
+					 ('antisense_transcript', 'Antisense'),
+					 ('intergenic_transcript', 'Intergenic'),
+					 ('genomic_transcript', 'Genomic')]:
+		conds.append(has_gtf_attribute(fields, key))
+		choices.append(nov)
+	novelty = np.select(conds, choices, default='Undefined').astype(object)
+	return novelty
+
+def get_gtf_source(gtf_file):
+	"""
+	Determine whether a GTF comes from TALON and / or cerberus from the
+	attributes of its first transcript entry.
+
+	Parameters:
+		gtf_file (str): File path of GTF
+
+	Returns:
+		from_talon (bool): Whether or not the GTF was determined to be
+			from TALON
+		from_cerberus (bool): Whether or not the GTF is from cerberus
+	"""
+	from_talon = False
+	from_cerberus = False
+	with open_gtf(gtf_file) as gtf:
+		for line in gtf:
+			if line.startswith('#'):
+				continue
+			line = line.strip().split('\t')
+			if len(line) > 2 and line[2] == 'transcript':
+				attributes = get_fields(line[-1])
+				if 'talon_transcript' in attributes or 'talon_gene' in attributes:
+					from_talon = True
+				if 'ic_id' in attributes:
+					from_cerberus = True
+				break
+	return from_talon, from_cerberus
+
+def split_gtf(gtf_file, n):
+	"""
+	Split a GTF into roughly equal byte ranges that start and end
+	on line boundaries.
+
+	Parameters:
+		gtf_file (str): File path of GTF
+		n (int): Number of ranges to split the GTF into
+
+	Returns:
+		ranges (list of tuple): Start and stop byte offset of each range
+	"""
+	size = os.path.getsize(gtf_file)
+	bounds = [0]
+	with open(gtf_file, 'rb') as gtf:
+		for i in range(1, n):
+			gtf.seek(max(int(size*i/n)-1, bounds[-1]))
+			gtf.readline()
+			pos = gtf.tell()
+			if pos >= size:
+				break
+			if pos > bounds[-1]:
+				bounds.append(pos)
+	bounds.append(size)
+	ranges = [(bounds[i], bounds[i+1]) for i in range(len(bounds)-1)]
+	return ranges
+
+def parse_gtf_range(gtf_file, start, stop, from_talon, from_cerberus,
+					chunksize=500000, pbar=None):
+	"""
+	Get the transcript and exon entries from a byte range of a GTF.
+	Gzipped GTFs can only be read as a whole, from start=0.
+
+	Parameters:
+		gtf_file (str): File path of GTF
+		start (int): Byte offset of the first line to read
+		stop (int): Byte offset to stop reading at. Must be a line boundary.
+		from_talon (bool): Whether the GTF is from TALON
+		from_cerberus (bool): Whether the GTF is from cerberus
+		chunksize (int): Number of GTF lines to process at once
+			Default: 500000
+		pbar (tqdm): Progress bar to update with the number of bytes read
+			Default: None
+
+	Returns:
+		t_df (pandas DataFrame): Transcript entries, w/ the line
+			number of each entry in the range
+		exon_df (pandas DataFrame): Exon entries, w/ the line number of
+			each entry in the range
+		entry_types (set of str): Entry types seen in the range
+		n_lines (int): Number of lines in the range
+	"""
+	# the range is read in pieces as it's parsed, so only `chunksize`
+	# lines are held in memory at once
+	with open(gtf_file, 'rb') as raw:
+		if is_gzipped(gtf_file):
+			with gzip.GzipFile(fileobj=raw, mode='rb') as gtf:
+				return parse_gtf_buffer(gtf, from_talon, from_cerberus,
+										chunksize, pbar, raw)
+		with io.BufferedReader(RangeReader(raw, start, stop)) as gtf:
+			return parse_gtf_buffer(gtf, from_talon, from_cerberus,
+									chunksize, pbar)
+
+def parse_gtf_buffer(gtf, from_talon, from_cerberus, chunksize=500000,
+					 pbar=None, raw=None):
+	"""
+	Get the transcript and exon entries from an open GTF.
+
+	Parameters:
+		gtf (file-like): Binary GTF file handle, positioned at the
+			start of a line
+		from_talon (bool): Whether the GTF is from TALON
+		from_cerberus (bool): Whether the GTF is from cerberus
+		chunksize (int): Number of GTF lines to process at once
+			Default: 500000
+		pbar (tqdm): Progress bar to update with the number of bytes read
+			Default: None
+		raw (file-like): Handle whose position tracks the bytes read for
+			the progress bar, ie the underlying compressed file.
+			Default: None, use gtf
+
+	Returns:
+		t_df (pandas DataFrame): Transcript entries, w/ the line
+			number of each entry
+		exon_df (pandas DataFrame): Exon entries, w/ the line number of
+			each entry
+		entry_types (set of str): Entry types seen
+		n_lines (int): Number of lines read
+	"""
+	gtf_cols = ['chrom', 'source', 'entry_type', 'start', 'stop',
+				'score', 'strand', 'frame', 'fields']
+	use_cols = ['chrom', 'entry_type', 'start', 'stop', 'strand', 'fields']
+
+	t_chunks = []
+	exon_chunks = []
+	entry_types = set()
+	n_lines = 0
+
+	if raw is None:
+		raw = gtf
+	n_bytes = raw.tell()
+
+	try:
+		reader = pd.read_csv(gtf, sep='\t', header=None, names=gtf_cols,
+			usecols=use_cols, dtype=str, quoting=csv.QUOTE_NONE,
+			chunksize=chunksize)
+	except pd.errors.EmptyDataError:
+		reader = []
+
+	for df in reader:
+
+		if pbar is not None:
+			pbar.update(raw.tell()-n_bytes)
+			n_bytes = raw.tell()
+		n_lines += len(df.index)
+
+		# ignore header lines and entries other than transcripts and exons
+		df = df.loc[~df.chrom.str.startswith('#')]
+		entry_types.update(df.entry_type.unique().tolist())
+		df = df.loc[df.entry_type.isin(['transcript', 'exon'])]
+		if df.empty:
+			continue
+
+		# transcript entries
+		t = df.loc[df.entry_type == 'transcript']
+		if not t.empty:
+			entry = pd.DataFrame()
+			entry['gid'] = get_gtf_attribute(t.fields, 'gene_id').fillna('NULL')
+			entry['gname'] = get_gtf_attribute(t.fields, 'gene_name')
+			entry['tid'] = get_gtf_attribute(t.fields, 'transcript_id')
+			entry['tname'] = get_gtf_attribute(t.fields, 'transcript_name')
+			entry['strand'] = t.strand
+			entry['chrom'] = t.chrom
+			entry['t_start'] = t.start.astype(np.int64)
+			entry['t_stop'] = t.stop.astype(np.int64)
+			entry['line'] = t.index
+			check_gtf_fields(entry.rename({'tid': 'transcript_id'}, axis=1),
+				['transcript_id'])
+
+			# add a gene/transcript name field if there isn't one
+			entry['gname'] = entry.gname.fillna(entry.gid)
+			entry['tname'] = entry.tname.fillna(entry.tid)
+
+			# if we're using a talon gtf, add a novelty field
+			if from_talon:
+				entry['novelty'] = get_transcript_novelties_vectorized(t.fields)
+			if from_cerberus:
+				for c in ['tss_id', 'tes_id', 'ic_id']:
+					entry[c] = get_gtf_attribute(t.fields, c)
+			t_chunks.append(entry)
+
+		# exon entries
+		e = df.loc[df.entry_type == 'exon']
+		if not e.empty:
+			coords = e[['start', 'stop']].astype(np.int64).to_numpy()
+			fwd = (e.strand != '-').to_numpy()
+			v1 = np.where(fwd, coords.min(axis=1), coords.max(axis=1))
+			v2 = np.where(fwd, coords.max(axis=1), coords.min(axis=1))
+
+			entry = pd.DataFrame()
+			entry['tid'] = get_gtf_attribute(e.fields, 'transcript_id')
+			entry['chrom'] = e.chrom
+			entry['v1'] = v1
+			entry['v2'] = v2
+			entry['strand'] = e.strand
+			entry['eid'] = entry.chrom+'_'+entry.v1.astype(str)+'_'+\
+						   entry.v2.astype(str)+'_'+entry.strand+'_exon'
+			entry['line'] = e.index
+			check_gtf_fields(entry.rename({'tid': 'transcript_id'}, axis=1),
+				['transcript_id'])
+			exon_chunks.append(entry)
+
+	t_df = pd.concat(t_chunks, ignore_index=True) if t_chunks else None
+	exon_df = pd.concat(exon_chunks, ignore_index=True) if exon_chunks else None
+	return t_df, exon_df, entry_types, n_lines
+
+def get_mp_context():
+	"""
+	Get a multiprocessing context that starts worker processes from a clean
+	state. Forking a process that has already started threads (ie from
+	numba or OpenMP) can deadlock the workers. Modules aren't preloaded in
+	the forkserver, since that would change it for every other user of
+	forkserver in the process; workers import swan_vis themselves.
+
+	Returns:
+		ctx (multiprocessing context): Forkserver context if available,
+			otherwise spawn
+	"""
+	if 'forkserver' in multiprocessing.get_all_start_methods():
+		return multiprocessing.get_context('forkserver')
+	return multiprocessing.get_context('spawn')
+
+def parse_gtf_range_star(args):
+	"""
+	Call parse_gtf_range on a tuple of arguments. Used to parse
+	GTF ranges in a multiprocessing Pool.
+
+	Parameters:
+		args (tuple): Arguments to parse_gtf_range
+
+	Returns:
+		Output of parse_gtf_range
+	"""
+	return parse_gtf_range(*args)
+
+def parse_gtf_vectorized(gtf_file, include_isms, verbose, chunksize=500000,
+						 n_jobs=1, regions=None):
+	"""
+	Get the unique transcripts and exons that are present in a GTF
+	transcriptome. Reads the GTF in chunks of columnar arrays and extracts
+	the needed attributes with vectorized string operations rather than
+	processing the file line-by-line. Output is the same as parse_gtf.
+
+	Parameters:
+		gtf_file (str): File path of GTF
+		include_isms (bool): Whether to include ISMs or not
+		verbose (bool): Display progress
+		chunksize (int): Number of GTF lines to process at once
+			Default: 500000
+		n_jobs (int): Number of processes to use. If > 1, the GTF is split
+			into byte ranges that are parsed in parallel. Each process
+			imports swan_vis when it starts, so this only helps w/ large
+			GTFs and at least `n_jobs` CPUs. Gzipped GTFs and GTFs read
+			by region are always parsed in one process.
+			Default: 1
+		regions (str or list of str): Only report transcripts that overlap
+			these regions, formatted as 'chrom' or 'chrom:start-stop'
+			(1-based, inclusive). For bgzipped GTFs with a tabix index
+			(<gtf_file>.tbi), only the parts of the GTF needed are read.
+			Default: None, report all transcripts
+
+	Returns:
+		t_df (pandas DataFrame): DataFrame of transcripts in GTF. Index
+			is transcript ids. Columns are gene id, gene name,
+			transcript id (same as key), transcript name, strand, and exons
+			belonging to the transcript.
+		exon_df (pandas DataFrame): DataFrame of exons in GTF. Index is exon ids
+			which consist of chromosome_v1_v2_strand_exon. Columns are edge id
+			(same as key), chromosome, v1, v2, strand, and edge type
+			(all exon in this case) of each exon.
+		from_talon (bool): Whether or not the GTF was determined to be
+			from TALON
+		from_cerberus (bool): Whether or not the GTF is from cerberus
+	"""
+
+	# check if this gtf has transcript novelty vals
+	# from the first transcript entry
+	from_talon, from_cerberus = get_gtf_source(gtf_file)
+
+	gzipped = is_gzipped(gtf_file)
+	if regions is not None:
+		regions = parse_regions(regions)
+
+	# display progress in terms of bytes read so that we
+	# don't have to read the file ahead of time
+	pbar = None
+	if verbose:
+		pbar = tqdm(total=os.path.getsize(gtf_file), unit='B',
+			unit_scale=True)
+		pbar.set_description('Processing transcripts')
+
+	# parse only what we need from indexed gtfs, otherwise parse each range
+	# of the gtf, either here or in a pool of processes
+	if regions is not None and is_bgzipped(gtf_file) and get_tabix_fname(gtf_file):
+		gtf = fetch_tabix_transcripts(gtf_file, regions)
+		results = [parse_gtf_buffer(gtf, from_talon, from_cerberus, chunksize)]
+		if verbose:
+			pbar.update(pbar.total)
+	elif n_jobs > 1 and not gzipped and regions is None:
+		ranges = split_gtf(gtf_file, n_jobs)
+		args = [(gtf_file, start, stop, from_talon, from_cerberus, chunksize)
+				for start, stop in ranges]
+		results = []
+		with get_mp_context().Pool(n_jobs) as pool:
+			for (start, stop), res in zip(ranges, pool.imap(parse_gtf_range_star, args)):
+				results.append(res)
+				if verbose:
+					pbar.update(stop-start)
+	else:
+		size = os.path.getsize(gtf_file)
+		results = [parse_gtf_range(gtf_file, 0, size, from_talon,
+					from_cerberus, chunksize, pbar)]
+
+	if verbose:
+		pbar.close()
+
+	# combine ranges, numbering lines across the whole file
+	t_chunks = []
+	exon_chunks = []
+	entry_types = set()
+	n_lines = 0
+	for t, e, types, n in results:
+		for df, chunks in zip([t, e], [t_chunks, exon_chunks]):
+			if df is not None:
+				df['line'] += n_lines
+				chunks.append(df)
+		entry_types.update(types)
+		n_lines += n
+	del results
+
+	# no transcripts in the requested regions
+	if regions is not None and not t_chunks:
+		raise Exception('No transcripts found in regions {}'.format(
+			[format_region(*r) for r in regions]))
+
+	# make sure that there are transcript and exon entries
+	if not entry_types:
+		raise Exception("GTF can't load correctly. Could be a header problem.")
+	check_gtf_entry_types(entry_types)
+
+	t_df = pd.concat(t_chunks, ignore_index=True)
+	exons = pd.concat(exon_chunks, ignore_index=True)
+	del t_chunks, exon_chunks
+
+	# later entries for the same transcript id take precedence, but
+	# transcripts stay in the order they were first seen in
+	dupe_tids = t_df.tid.duplicated(keep='last')
+	if dupe_tids.any():
+		first_tids = t_df.loc[~t_df.tid.duplicated(keep='first'), 'tid']
+		t_df = t_df.loc[~dupe_tids]
+		t_df = t_df.set_index('tid', drop=False).loc[first_tids]
+	t_df.reset_index(drop=True, inplace=True)
+
+	# only keep transcripts that overlap the requested regions
+	if regions is not None:
+		keep = np.zeros(len(t_df.index), dtype=bool)
+		for chrom, start, stop in regions:
+			inds = (t_df.chrom == chrom).to_numpy()
+			if start is not None:
+				inds &= (t_df.t_start <= stop).to_numpy()
+				inds &= (t_df.t_stop >= start).to_numpy()
+			keep |= inds
+		t_df = t_df.loc[keep].reset_index(drop=True)
+		if t_df.empty:
+			raise Exception('No transcripts found in regions {}'.format(
+				[format_region(*r) for r in regions]))
+	t_df.drop(['chrom', 't_start', 't_stop'], axis=1, inplace=True)
+
+	# add exons to each transcript's list of exons in file order. only
+	# exons that follow the transcript's entry are added
+	t_inds = pd.Index(t_df.tid).get_indexer(exons.tid)
+	exons['t_ind'] = t_inds
+	t_lines = t_df.line.to_numpy()
+	t_exons = exons.loc[exons.t_ind >= 0]
+	t_exons = t_exons.loc[t_exons.line.to_numpy() > t_lines[t_exons.t_ind.to_numpy()]]
+	order = np.argsort(t_exons.t_ind.to_numpy(), kind='stable')
+	eids = t_exons.eid.to_numpy()[order]
+	counts = np.bincount(t_exons.t_ind.to_numpy(), minlength=len(t_df.index))
+	eids = np.split(eids, np.cumsum(counts)[:-1])
+	t_df.drop('line', axis=1, inplace=True)
+	exon_col = t_df.columns.get_loc('strand')+1
+	t_df.insert(exon_col, 'exons', [list(i) for i in eids])
+
+	# don't include exons that come from ISM transcripts
+	if not include_isms and from_talon:
+		novelty = t_df.novelty.to_numpy()
+		keep = (exons.t_ind >= 0).to_numpy()
+		keep[keep] = novelty[exons.t_ind.to_numpy()[keep]] != 'ISM'
+		exons = exons.loc[keep]
+
+	# don't include exons from transcripts outside of the regions
+	if regions is not None:
+		exons = exons.loc[exons.t_ind >= 0]
+
+	exon_df = exons.drop_duplicates(subset='eid', keep='first')
+	exon_df = exon_df[['eid', 'chrom', 'v1', 'v2', 'strand']]
+	exon_df['edge_type'] = 'exon'
+	exon_df.index = exon_df.eid.tolist()
+	t_df.index = t_df.tid.tolist()
+
+	# match the column types that parse_gtf produces
+	exon_df = exon_df.astype(object)
+	t_df = t_df.astype(object)
+
+	# remove ISMs
+	if not include_isms and from_talon:
+		t_df = t_df.loc[t_df.novelty != 'ISM']
+
+	# use stable gid if we can
+	try:
+		t_df['gid'] = get_stable_gid(t_df, 'gid')
+	except:
+		pass
+
+	return t_df, exon_df, from_talon, from_cerberus
+
 ##########################################################################
 ######################## Related to DIE testing ##########################
 ##########################################################################
@@ -1075,6 +2442,84 @@ def reformat_talon_abundance(df, how='iso', ofile=None):
 	# otherwise dump to output file
 	df.to_csv(ofile, sep='\t', index=False)
 
+def read_abundance(fname, how='iso', ids=None, chunksize=100000):
+	"""
+	Read a TALON or Swan-formatted abundance matrix into a sparse matrix in
+	chunks of rows, so the dense matrix is never held in memory. Rows w/
+	IDs not in `ids` are dropped as they're read, and only the nonzero
+	counts of the rest are kept.
+
+	Parameters:
+		fname (str): Path to plain-text or gzipped abundance matrix
+		how (str): {'iso', 'gene'}. For 'gene', counts are added up per
+			gene ID.
+		ids (list-like of str): IDs to keep.
+			Default: None, keep all IDs
+		chunksize (int): Number of rows to read at a time.
+			Default: 100000
+
+	Returns:
+		X (scipy sparse csr_matrix): Datasets x IDs counts matrix. IDs w/
+			< 1 count in total are removed.
+		ids (pandas Index): ID of each column, in file order for 'iso' or
+			sorted for 'gene'
+		datasets (list of str): Dataset of each row
+	"""
+	compression = 'gzip' if is_gzipped(fname) else None
+
+	# check if abundance matrix is a talon transcript or gene abundance matrix
+	header = pd.read_csv(fname, sep='\t', nrows=0, compression=compression)
+	t_cols = ['gene_ID', 'transcript_ID', 'annot_gene_id', 'annot_transcript_id',
+		'annot_gene_name', 'annot_transcript_name', 'n_exons', 'length',
+		'gene_novelty', 'transcript_novelty', 'ISM_subtype']
+	g_cols = ['gene_ID', 'annot_gene_id', 'annot_gene_name', 'gene_novelty']
+	columns = header.columns.tolist()
+	if columns[:11] == t_cols or columns[:4] == g_cols:
+		columns = reformat_talon_abundance(header, how=how).columns.tolist()
+	id_col = columns[0]
+	datasets = columns[1:]
+
+	# nonzero counts of each chunk of rows w/ ids to keep
+	if ids is not None:
+		ids = pd.Index(ids)
+	row_ids = [np.array([], dtype=object)]
+	rows = [np.array([], dtype=np.int64)]
+	cols = [np.array([], dtype=np.int64)]
+	data = [np.array([], dtype=np.int64)]
+	n = 0
+	chunks = pd.read_csv(fname, sep='\t', usecols=[id_col]+datasets,
+		dtype={id_col: str}, compression=compression, chunksize=chunksize)
+	for chunk in chunks:
+		if ids is not None:
+			chunk = chunk.loc[chunk[id_col].isin(ids)]
+		values = chunk[datasets].to_numpy()
+		r, c = np.nonzero(values)
+		row_ids.append(chunk[id_col].to_numpy())
+		rows.append(r+n)
+		cols.append(c)
+		data.append(values[r, c])
+		n += len(chunk.index)
+
+	row_ids = np.concatenate(row_ids)
+	X = sparse.csr_matrix((np.concatenate(data),
+		(np.concatenate(cols), np.concatenate(rows))),
+		shape=(len(datasets), n))
+
+	# sum for gene level
+	if how == 'gene':
+		genes = pd.Index(pd.unique(row_ids)).sort_values()
+		m, row_ids = get_indicator_matrix(row_ids, genes)
+		X = sparse.csr_matrix(X @ sparse.csr_matrix(m, dtype=X.dtype))
+	row_ids = pd.Index(row_ids)
+
+	# filter out unexpressed ids
+	totals = np.asarray(X.sum(axis=0)).reshape(-1)
+	keep = np.flatnonzero(totals >= 1)
+	X = X[:, keep]
+	row_ids = row_ids[keep]
+
+	return X, row_ids, datasets
+
 def read(file):
 	"""
 	Read a SwanGraph from a saved pickle file.
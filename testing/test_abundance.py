@@ -274,6 +274,115 @@ class TestAbundance(object):
         assert np.array_equal(ctrl_pi, test_pi)
 
 
+    # add abundance - adding datasets one at a time gives the same edge,
+    # tss, and tes adatas as adding them together
+    def test_add_abundance_4(self):
+        sg = swan.SwanGraph()
+        sg.add_annotation('files/test_full_annotation.gtf')
+        sg.add_transcriptome('files/test_full.gtf')
+        sg.add_abundance('files/test_ab_dataset1.tsv')
+        assert sg.get_current_index('feat') is not None
+        sg.add_abundance('files/test_ab_dataset2.tsv')
+
+        ctrl = swan.SwanGraph()
+        ctrl.add_annotation('files/test_full_annotation.gtf')
+        ctrl.add_transcriptome('files/test_full.gtf')
+        ctrl.add_abundance('files/test_ab_1.tsv')
+
+        for kind in ['', 'edge_', 'tss_', 'tes_']:
+            test_adata = getattr(sg, kind+'adata')
+            ctrl_adata = getattr(ctrl, kind+'adata')
+            assert test_adata.obs.index.tolist() == ctrl_adata.obs.index.tolist()
+            assert np.allclose(test_adata.obs.total_counts.to_numpy(),
+                ctrl_adata.obs.total_counts.to_numpy())
+            assert test_adata.var.index.tolist() == ctrl_adata.var.index.tolist()
+            assert set(test_adata.layers.keys()) == set(ctrl_adata.layers.keys())
+            for layer in ctrl_adata.layers.keys():
+                test = test_adata.layers[layer].toarray()
+                ctrl_X = ctrl_adata.layers[layer].toarray()
+                print(kind, layer)
+                print(test)
+                print(ctrl_X)
+                assert np.allclose(test, ctrl_X)
+
+    # add abundance - backed SwanGraph gives the same counts, tpm, and pi
+    # as an in-memory one
+    def test_add_abundance_5(self, tmp_path):
+        sg = swan.SwanGraph(backed=str(tmp_path))
+        sg.add_annotation('files/test_full_annotation.gtf')
+        sg.add_transcriptome('files/test_full.gtf')
+        sg.add_abundance('files/test_ab_dataset1.tsv')
+        sg.add_abundance('files/test_ab_dataset2.tsv')
+        assert sg.adata.isbacked
+
+        # backed AnnDatas are opened again when the SwanGraph is read
+        sg.save_graph(str(tmp_path / 'swan'))
+        sg = swan.read(str(tmp_path / 'swan.p'))
+        assert sg.adata.isbacked
+
+        ctrl = swan.SwanGraph()
+        ctrl.add_annotation('files/test_full_annotation.gtf')
+        ctrl.add_transcriptome('files/test_full.gtf')
+        ctrl.add_abundance('files/test_ab_1.tsv')
+
+        for kind in ['', 'edge_', 'tss_', 'tes_']:
+            test_adata = getattr(sg, kind+'adata')
+            ctrl_adata = getattr(ctrl, kind+'adata')
+            assert test_adata.isbacked
+            pd.testing.assert_frame_equal(test_adata.var, ctrl_adata.var,
+                check_dtype=False, check_categorical=False)
+            t_df = sg.t_df if kind == '' else None
+            for layer in ctrl_adata.layers.keys():
+                test = swan.get_layer(test_adata, layer, t_df=t_df).toarray()
+                ctrl_X = ctrl_adata.layers[layer].toarray()
+                print(kind, layer)
+                print(test)
+                print(ctrl_X)
+                assert np.allclose(test, ctrl_X)
+
+        test, _ = swan.calc_pi(sg.adata, sg.t_df)
+        ctrl_df, _ = swan.calc_pi(ctrl.adata, ctrl.t_df)
+        assert np.allclose(test.sparse.to_dense().to_numpy(),
+            ctrl_df.sparse.to_dense().to_numpy())
+
+    # add abundance - tpm and pi computed on demand match the stored ones,
+    # and are cached until they're evicted or the datasets change
+    def test_add_abundance_6(self):
+        sg = swan.SwanGraph(layer_cache_size=1)
+        sg.add_annotation('files/test_full_annotation.gtf')
+        sg.add_transcriptome('files/test_full.gtf')
+        sg.add_abundance('files/test_ab_dataset1.tsv')
+        assert list(sg.adata.layers.keys()) == ['counts']
+
+        ctrl = swan.SwanGraph()
+        ctrl.add_annotation('files/test_full_annotation.gtf')
+        ctrl.add_transcriptome('files/test_full.gtf')
+        ctrl.add_abundance('files/test_ab_1.tsv')
+
+        # cached until the datasets change
+        tpm = sg.get_adata_layer(sg.adata, 'tpm')
+        assert sg.get_adata_layer(sg.adata, 'tpm') is tpm
+        sg.add_abundance('files/test_ab_dataset2.tsv')
+        assert len(sg.layer_cache) == 0
+
+        for kind in ['', 'tss_', 'tes_']:
+            test_adata = getattr(sg, kind+'adata')
+            ctrl_adata = getattr(ctrl, kind+'adata')
+            t_df = sg.t_df if kind == '' else None
+            for layer in ['tpm', 'pi']:
+                test = sg.get_adata_layer(test_adata, layer, t_df=t_df).toarray()
+                ctrl_X = ctrl_adata.layers[layer].toarray()
+                assert np.allclose(test, ctrl_X)
+        assert len(sg.layer_cache) == 6
+
+        # least recently used layers are evicted to stay under the size
+        nbytes = sg.layer_cache[(id(sg.adata), 'tpm')][2]
+        sg.layer_cache.clear()
+        sg.layer_cache_size = (nbytes+1)/1e9
+        sg.get_adata_layer(sg.adata, 'tpm')
+        sg.get_adata_layer(sg.adata, 'pi', t_df=sg.t_df)
+        assert list(sg.layer_cache.keys()) == [(id(sg.adata), 'pi')]
+
     # add abundance - vanilla
     def test_add_abundance_1(self):
         sg = swan.SwanGraph()
@@ -392,6 +501,30 @@ class TestLowLevel(object):
         # don't test test_sums cause that's the direct output from
         # calc_total_counts
 
+    # test calc_layers - same as calc_tpm and calc_pi per dataset
+    def test_calc_layers(self):
+        sg = swan.SwanGraph()
+        sg.add_transcriptome('files/test_full.gtf')
+        sg.add_abundance('files/test_ab_1.tsv')
+        adata = sg.adata.copy()
+        del adata.layers['tpm']
+        del adata.layers['pi']
+        del adata.obs['total_counts']
+        swan.calc_layers(adata, sg.t_df)
+
+        tpm = swan.calc_tpm(adata, obs_col='dataset').sparse.to_dense()
+        pi, _ = swan.calc_pi(adata, sg.t_df, obs_col='dataset')
+        assert np.allclose(adata.layers['tpm'].toarray(), tpm.to_numpy())
+        assert np.allclose(adata.layers['pi'].toarray(),
+            pi.sparse.to_dense().to_numpy())
+        assert adata.obs.total_counts.tolist() == \
+            sg.adata.obs.total_counts.tolist()
+
+        # no pi w/o a t_df
+        del adata.layers['pi']
+        swan.calc_layers(adata)
+        assert 'pi' not in adata.layers
+
     # test calc_tpm - use different obs_col
     def test_calc_tpm_2(self):
         sg = swan.SwanGraph()
@@ -451,6 +584,26 @@ class TestLowLevel(object):
         print(test_df == df)
         assert (test_df == df).all(axis=0).all()
 
+    # test calc_tpm, calc_pi - group rows in order of appearance, take max
+    def test_calc_tpm_3(self):
+        sg = swan.SwanGraph()
+        sg.add_transcriptome('files/test_full.gtf')
+        sg.add_abundance('files/test_ab_1.tsv')
+        sg.adata.obs['cluster'] = ['c2', 'c1']
+
+        test_df, test_sums = swan.calc_pi(sg.adata, sg.t_df, obs_col='cluster')
+        assert test_df.index.tolist() == ['c2', 'c1']
+        assert test_sums.index.tolist() == ['c2', 'c1']
+        ctrl = np.around(sg.adata.layers['pi'].toarray())
+        assert np.array_equal(np.around(test_df.sparse.to_dense().to_numpy()), ctrl)
+
+        sg.adata.obs['cluster'] = ['c1', 'c1']
+        test_df = swan.calc_tpm(sg.adata, obs_col='cluster', how='max')
+        test_df = np.around(test_df.sparse.to_dense().to_numpy())
+        ctrl = np.around([[166666.6667, 333333.3333, 333333.3333,
+                           333333.3333, 166666.6667]])
+        assert np.array_equal(test_df, ctrl)
+
     # test calc_total_counts - use additional metadata col
     def test_calc_total_counts_2(self):
         sg = swan.SwanGraph()
@@ -5,6 +5,10 @@ import swan_vis as swan
 import networkx as nx
 import math
 import pandas as pd
+import os
+import copy
+import shutil
+import sqlite3
 
 ###########################################################################
 ##################### Related to adding metadata ##########################
@@ -317,6 +321,28 @@ class TestDataset(object):
         assert "ISM" not in sg.t_df.novelty.unique()
         # assert 1 == 0
 
+    # tests add_transcriptomes - same as adding each one at a time
+    def test_add_transcriptomes(self):
+        gtfs = ['files/test_novel.gtf', 'files/test_novel_talon.gtf',
+                'files/test_cerberus.gtf']
+        sg = swan.SwanGraph()
+        sg.add_annotation('files/test_known.gtf')
+        for gtf in gtfs:
+            sg.add_transcriptome(gtf)
+
+        sg2 = swan.SwanGraph()
+        sg2.add_annotation('files/test_known.gtf')
+        sg2.add_transcriptomes(gtfs)
+        pd.testing.assert_frame_equal(sg.t_df, sg2.t_df)
+        pd.testing.assert_frame_equal(sg.edge_df, sg2.edge_df)
+        pd.testing.assert_frame_equal(sg.loc_df, sg2.loc_df)
+        assert list(sg.G.edges) == list(sg2.G.edges)
+
+        # one pass list per input
+        with pytest.raises(ValueError) as e:
+            sg2.add_transcriptomes(gtfs, pass_lists=[None])
+        assert 'Number of pass lists' in str(e.value)
+
     # tests if correct error is thrown when adding annotation to
     # sg that already has one
     def test_add_annotation_already(self):
@@ -484,6 +510,275 @@ class TestFiles(object):
         print(t_df == ctrl_t_df)
         assert (t_df == ctrl_t_df).all(axis=0).all()
 
+    # tests vectorized GTF parsing
+    def test_parse_gtf_vectorized(self):
+        gtf_file = 'files/Canx.gtf'
+        t_df, exon_df, from_talon, from_cerberus = swan.parse_gtf_vectorized(gtf_file, True, False)
+
+        t_df.index.name = 'tid_index'
+        t_df = t_df.sort_values(by='tid_index')
+
+        ctrl_t_df = pd.read_csv('files/Canx_transcript.tsv',sep='\t')
+        ctrl_t_df.set_index('tid_index', inplace=True)
+        ctrl_t_df = ctrl_t_df.sort_values(by='tid_index')
+
+        ctrl_exons = ctrl_t_df.exons.tolist()
+        ctrl_exons = [exons.split(',') for exons in ctrl_exons]
+        ctrl_t_df['exons'] = ctrl_exons
+
+        # gene ids are reported w/o version number
+        ctrl_t_df['gid'] = swan.get_stable_gid(ctrl_t_df, 'gid')
+
+        print(t_df == ctrl_t_df)
+        assert (t_df == ctrl_t_df).all(axis=0).all()
+        assert from_talon == False
+        assert from_cerberus == False
+
+    # tests vectorized GTF parsing - same output as line-by-line parser
+    # for talon, cerberus, and duplicate transcript id GTFs in small chunks
+    def test_parse_gtf_vectorized_engines(self):
+        gtf_files = ['files/test_full.gtf',
+                     'files/test_novel_talon.gtf',
+                     'files/test_novel_1.gtf',
+                     'files/test_cerberus.gtf']
+        for gtf_file in gtf_files:
+            for include_isms in [True, False]:
+                ctrl = swan.parse_gtf(gtf_file, include_isms, False)
+                test = swan.parse_gtf_vectorized(gtf_file, include_isms,
+                                                 False, chunksize=4)
+                print(gtf_file, include_isms)
+                pd.testing.assert_frame_equal(test[0], ctrl[0])
+                pd.testing.assert_frame_equal(test[1], ctrl[1])
+                assert test[2] == ctrl[2]
+                assert test[3] == ctrl[3]
+
+    # tests vectorized GTF parsing - talon novelty and ISM removal
+    def test_parse_gtf_vectorized_isms(self):
+        gtf_file = 'files/test_novel_talon.gtf'
+        t_df, exon_df, from_talon, from_cerberus = swan.parse_gtf_vectorized(gtf_file, False, False)
+        assert from_talon == True
+        assert t_df.tid.tolist() == ['test3']
+        assert t_df.novelty.tolist() == ['NIC']
+        assert 'chr2_60_50_-_exon' not in exon_df.index
+
+    # tests vectorized GTF parsing - missing exon entries
+    def test_parse_gtf_vectorized_no_exons(self):
+        gtf_file = 'files/test_no_exons.gtf'
+        with pytest.raises(Exception) as e:
+            swan.parse_gtf_vectorized(gtf_file, True, False)
+        assert 'missing entry types' in str(e.value)
+        assert 'exon' in str(e.value)
+
+    # tests vectorized GTF parsing - missing transcript_id attribute
+    def test_parse_gtf_vectorized_no_tid(self):
+        gtf_file = 'files/test_no_tid.gtf'
+        with pytest.raises(Exception) as e:
+            swan.parse_gtf_vectorized(gtf_file, True, False)
+        assert 'transcript_id' in str(e.value)
+
+    # tests vectorized GTF parsing - progress bar
+    def test_parse_gtf_vectorized_verbose(self):
+        gtf_file = 'files/test_full.gtf'
+        ctrl = swan.parse_gtf_vectorized(gtf_file, True, False)
+        test = swan.parse_gtf_vectorized(gtf_file, True, True, chunksize=3)
+        pd.testing.assert_frame_equal(test[0], ctrl[0])
+        pd.testing.assert_frame_equal(test[1], ctrl[1])
+
+    # tests vectorized GTF parsing - multiple processes
+    def test_parse_gtf_vectorized_n_jobs(self):
+        gtf_files = ['files/Canx.gtf',
+                     'files/test_novel_talon.gtf',
+                     'files/test_novel_1.gtf',
+                     'files/test_cerberus.gtf']
+        for gtf_file in gtf_files:
+            for include_isms in [True, False]:
+                ctrl = swan.parse_gtf_vectorized(gtf_file, include_isms, False)
+                test = swan.parse_gtf_vectorized(gtf_file, include_isms,
+                                                 False, chunksize=2, n_jobs=3)
+                print(gtf_file, include_isms)
+                pd.testing.assert_frame_equal(test[0], ctrl[0])
+                pd.testing.assert_frame_equal(test[1], ctrl[1])
+                assert test[2] == ctrl[2]
+                assert test[3] == ctrl[3]
+
+    # tests splitting GTF into ranges on line boundaries
+    def test_split_gtf(self):
+        gtf_file = 'files/test_full.gtf'
+        ranges = swan.split_gtf(gtf_file, 4)
+        assert len(ranges) == 4
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == os.path.getsize(gtf_file)
+        with open(gtf_file, 'rb') as gtf:
+            for i in range(len(ranges)-1):
+                assert ranges[i][1] == ranges[i+1][0]
+                gtf.seek(ranges[i][1]-1)
+                assert gtf.read(1) == b'\n'
+
+    # tests parsing GTF ranges - each range only reads its own lines
+    def test_parse_gtf_range(self):
+        gtf_file = 'files/test_full.gtf'
+        with open(gtf_file, 'rb') as gtf:
+            n_lines = len(gtf.readlines())
+        ranges = swan.split_gtf(gtf_file, 3)
+        tids = []
+        n = 0
+        for start, stop in ranges:
+            t_df, _, _, range_lines = swan.parse_gtf_range(gtf_file, start,
+                stop, False, False, chunksize=2)
+            tids += t_df.tid.tolist()
+            n += range_lines
+        assert n == n_lines
+        ctrl = swan.parse_gtf_range(gtf_file, 0, os.path.getsize(gtf_file),
+            False, False)
+        assert tids == ctrl[0].tid.tolist()
+
+    # tests vectorized GTF parsing - gzipped and bgzipped GTFs
+    def test_parse_gtf_vectorized_gz(self):
+        ctrl = swan.parse_gtf('files/test_regions.gtf', False, False)
+        for gtf_file in ['files/test_regions.gtf.gz',
+                         'files/test_regions_plain.gtf.gz']:
+            test = swan.parse_gtf_vectorized(gtf_file, False, False)
+            pd.testing.assert_frame_equal(test[0], ctrl[0])
+            pd.testing.assert_frame_equal(test[1], ctrl[1])
+
+            # python engine should be able to read gzipped files as well
+            test = swan.parse_gtf(gtf_file, False, False)
+            pd.testing.assert_frame_equal(test[0], ctrl[0])
+
+    # tests vectorized GTF parsing - regions from indexed, gzipped,
+    # and plain GTFs
+    def test_parse_gtf_vectorized_regions(self):
+        regions = [['chr1'],
+                   'chr1:11000-11100',
+                   ['chr1:12500-110800', 'chr10'],
+                   ['chr2:1-200000', 'chr2:5000-6000'],
+                   'chr1:110800-110800']
+        ctrl_tids = [['ENST00000000000.1', 'ENST00000000001.1',
+                      'ENST00000000045.1', 'ENST00000000044.1'],
+                     ['ENST00000000000.1'],
+                     ['ENST00000000001.1', 'ENST00000000045.1',
+                      'ENST00000000044.1', 'ENST00000000018.1',
+                      'ENST00000000019.1'],
+                     ['ENST00000000002.1', 'ENST00000000003.1',
+                      'ENST00000000046.1', 'ENST00000000047.1'],
+                     ['ENST00000000045.1', 'ENST00000000044.1']]
+        full = swan.parse_gtf_vectorized('files/test_regions.gtf', True, False)
+        for region, tids in zip(regions, ctrl_tids):
+            for include_isms in [True, False]:
+                ctrl = None
+                for gtf_file in ['files/test_regions.gtf',
+                                 'files/test_regions.gtf.gz',
+                                 'files/test_regions_plain.gtf.gz']:
+                    test = swan.parse_gtf_vectorized(gtf_file, include_isms,
+                                                     False, regions=region)
+                    if ctrl is None:
+                        ctrl = test
+                    print(gtf_file, region, include_isms)
+                    pd.testing.assert_frame_equal(test[0], ctrl[0])
+                    pd.testing.assert_frame_equal(test[1], ctrl[1])
+
+                # all of the exons from each transcript are there
+                if include_isms:
+                    assert ctrl[0].tid.tolist() == tids
+                    for tid in tids:
+                        assert ctrl[0].loc[tid, 'exons'] == full[0].loc[tid, 'exons']
+
+    # tests vectorized GTF parsing - regions w/ no transcripts
+    def test_parse_gtf_vectorized_regions_empty(self):
+        for gtf_file in ['files/test_regions.gtf', 'files/test_regions.gtf.gz']:
+            with pytest.raises(Exception) as e:
+                swan.parse_gtf_vectorized(gtf_file, True, False,
+                                          regions='chrZ:1-100')
+            assert 'No transcripts' in str(e.value)
+
+    # tests add_transcriptome w/ regions
+    def test_add_transcriptome_regions(self):
+        sg = swan.SwanGraph()
+        sg.add_transcriptome('files/test_regions.gtf.gz', include_isms=True,
+                             regions='chr1:11000-11100')
+        assert sg.t_df.tid.tolist() == ['ENST00000000000.1']
+        assert sg.loc_df.chrom.unique().tolist() == ['chr1']
+
+        with pytest.raises(ValueError):
+            sg = swan.SwanGraph()
+            sg.add_transcriptome('files/test_regions.gtf.gz',
+                                 regions='chr1', engine='python')
+
+    # tests add_transcriptome w/ either GTF parser engine
+    def test_add_transcriptome_engine(self):
+        sg = swan.SwanGraph()
+        sg.add_transcriptome('files/test_full.gtf', engine='python')
+        sg2 = swan.SwanGraph()
+        sg2.add_transcriptome('files/test_full.gtf', engine='vectorized')
+        pd.testing.assert_frame_equal(sg.t_df, sg2.t_df)
+        pd.testing.assert_frame_equal(sg.edge_df, sg2.edge_df)
+        pd.testing.assert_frame_equal(sg.loc_df, sg2.loc_df)
+
+        with pytest.raises(ValueError):
+            sg = swan.SwanGraph()
+            sg.add_transcriptome('files/test_full.gtf', engine='cython')
+
+    # tests saving / loading parsed inputs to / from the cache
+    def test_cache_round_trip(self, tmp_path):
+        cache_dir = str(tmp_path)
+        inputs = [swan.parse_gtf_vectorized('files/test_full.gtf', True, False),
+                  swan.parse_gtf_vectorized('files/test_cerberus.gtf', True, False),
+                  swan.parse_db('files/test_full.db', None, True, True, False)+(True, False)]
+        for i, ctrl in enumerate(inputs):
+            key = str(i)
+            swan.save_parsed(cache_dir, key, *ctrl)
+            test = swan.load_parsed(cache_dir, key)
+            pd.testing.assert_frame_equal(ctrl[0], test[0])
+            pd.testing.assert_frame_equal(ctrl[1], test[1])
+            assert ctrl[2:] == test[2:]
+
+        # not in the cache
+        assert swan.load_parsed(cache_dir, 'missing') == (None, None, None, None)
+
+    # tests cache keys change w/ file contents and options
+    def test_get_cache_key(self, tmp_path):
+        fname = str(tmp_path / 'test.gtf')
+        with open('files/test_full.gtf') as infile, open(fname, 'w') as ofile:
+            ofile.write(infile.read())
+        cache_dir = str(tmp_path / 'cache')
+        key = swan.get_cache_key([fname, None], cache_dir, include_isms=True)
+        assert key == swan.get_cache_key([fname, None], cache_dir, include_isms=True)
+        assert key != swan.get_cache_key([fname, None], cache_dir, include_isms=False)
+
+        with open(fname, 'a') as ofile:
+            ofile.write('# a change\n')
+        assert key != swan.get_cache_key([fname, None], cache_dir, include_isms=True)
+
+    # tests evicting least recently used entries from the cache
+    def test_evict_cache(self, tmp_path):
+        cache_dir = str(tmp_path)
+        ctrl = swan.parse_gtf_vectorized('files/test_full.gtf', True, False)
+        for i, key in enumerate(['a', 'b', 'c']):
+            swan.save_parsed(cache_dir, key, *ctrl)
+            os.utime(os.path.join(cache_dir, key+'.npz'), (i, i))
+        size = os.path.getsize(os.path.join(cache_dir, 'a.npz'))
+        swan.evict_cache(cache_dir, 2.5*size/1e9)
+        assert sorted(os.listdir(cache_dir)) == ['b.npz', 'c.npz']
+
+    # tests add_transcriptome / add_annotation w/ a cache
+    def test_add_transcriptome_cache(self, tmp_path):
+        cache_dir = str(tmp_path / 'cache')
+        sg = swan.SwanGraph()
+        sg.add_annotation('files/test_full_annotation.gtf')
+        sg.add_transcriptome('files/test_full.gtf')
+
+        for i in range(2):
+            sg2 = swan.SwanGraph(cache_dir=cache_dir)
+            sg2.add_annotation('files/test_full_annotation.gtf')
+            sg2.add_transcriptome('files/test_full.gtf')
+            pd.testing.assert_frame_equal(sg.t_df, sg2.t_df)
+            pd.testing.assert_frame_equal(sg.edge_df, sg2.edge_df)
+            pd.testing.assert_frame_equal(sg.loc_df, sg2.loc_df)
+
+        # annotation and transcriptome are cached separately
+        entries = [f for f in os.listdir(cache_dir) if f.endswith('.npz')]
+        assert len(entries) == 2
+
     # tests TALON DB parsing - no pass_list
     def test_parse_db_1(self):
         db_file = 'files/test_full.db'
@@ -526,6 +821,26 @@ class TestFiles(object):
         assert (t_df == ctrl_t_df).all(axis=0).all()
 
 
+    # tests TALON DB filtering - pass list kept in a temp table on the
+    # shared, read-only connection
+    def test_handle_filtering(self):
+        db_file = 'files/test_full.db'
+        pass_list = 'files/test_full_pass_list.csv'
+        conn = swan.connect_db(db_file)
+        test = swan.handle_filtering(db_file, False, pass_list, conn=conn)
+        assert sorted(tuple(x) for x in test) == [(1,1), (2,2), (2,3), (2,4)]
+
+        annot = swan.get_annotations(db_file, 'transcript', conn=conn,
+                                     filtered=True)
+        assert sorted(annot.keys()) == [1, 2, 3, 4]
+        genes = swan.get_gene_2_transcripts(db_file, None, conn=conn,
+                                            filtered=True)
+        assert sorted(genes.keys()) == [1, 2]
+
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute('DELETE FROM transcripts')
+        conn.close()
+
     # tests TALON DB parsing - yes pass_list
     def test_parse_db_2(self):
         db_file = 'files/test_full.db'
@@ -571,14 +886,87 @@ class TestFiles(object):
         print(t_df == ctrl_t_df)
         assert (t_df == ctrl_t_df).all(axis=0).all()
 
+    # tests vectorized TALON DB parsing - same output as parse_db, even
+    # when reading a few rows at a time
+    def test_parse_db_vectorized(self):
+        db_file = 'files/test_full.db'
+        pass_list = 'files/test_full_pass_list.csv'
+        for p in [None, pass_list]:
+            ctrl = swan.parse_db(db_file, p, False, True, False)
+            test = swan.parse_db_vectorized(db_file, p, False, True, False,
+                                            batch_size=2)
+            pd.testing.assert_frame_equal(ctrl[0], test[0])
+            pd.testing.assert_frame_equal(ctrl[1], test[1])
+
+    # tests vectorized TALON DB parsing - regions
+    def test_parse_db_vectorized_regions(self):
+        db_file = 'files/test_full.db'
+        full = swan.parse_db_vectorized(db_file, None, False, True, False)
+        test = swan.parse_db_vectorized(db_file, None, False, True, False,
+                                        regions='chr1:30-35')
+        pd.testing.assert_frame_equal(full[0].loc[['test1']], test[0])
+        assert test[1].chrom.unique().tolist() == ['chr1']
+
+        with pytest.raises(Exception) as e:
+            swan.parse_db_vectorized(db_file, None, False, True, False,
+                                     regions='chr1:100-200')
+        assert 'No transcripts' in str(e.value)
+
+    # tests getting the span of a gene from a TALON DB
+    def test_fetch_gene_regions(self):
+        conn = swan.connect_db('files/test_full.db')
+        cursor = conn.cursor()
+        assert swan.fetch_gene_regions(cursor, 'test1_gid') == [('chr1', 1, 40)]
+        assert swan.fetch_gene_regions(cursor, 'test2_gname') == [('chr2', 45, 100)]
+        assert swan.fetch_gene_regions(cursor, 'test2',
+                                       kind='transcript') == [('chr2', 45, 100)]
+        assert swan.fetch_gene_regions(cursor, 'test9_gid') == []
+        conn.close()
+
+    # tests lazily adding a TALON DB - genes are read as they're needed and
+    # the least recently used ones are dropped
+    def test_add_transcriptome_lazy(self, tmp_path):
+        db_file = str(tmp_path / 'test_full_observed.db')
+        shutil.copy('files/test_full.db', db_file)
+        conn = sqlite3.connect(db_file)
+        conn.execute("INSERT INTO dataset (dataset_name) VALUES ('test')")
+        conn.executemany(""" INSERT INTO observed (gene_ID, transcript_ID, dataset)
+                             VALUES (?,?,'test') """,
+                         [(1,1), (2,2), (2,3), (2,4), (3,5)])
+        conn.commit()
+        conn.close()
+
+        sg = swan.SwanGraph()
+        sg.add_transcriptome(db_file, include_isms=True)
+
+        lazy_sg = swan.SwanGraph(lazy_cache_size=1)
+        lazy_sg.add_transcriptome(db_file, include_isms=True, lazy=True)
+        assert lazy_sg.is_lazy()
+        assert lazy_sg.is_empty()
+
+        for gid in ['test1_gid', 'test2_gid']:
+            test = lazy_sg.load_gene(gid)
+            ctrl_tids = sg.t_df.loc[sg.t_df.gid == gid, 'tid'].tolist()
+            tids = test.t_df.loc[test.t_df.gid == gid, 'tid'].tolist()
+            assert sorted(tids) == sorted(ctrl_tids)
+            assert len(lazy_sg.lazy_cache) == 1
+
+        # same region, so same SwanGraph
+        assert lazy_sg.load_transcript('test2') is test
+        assert lazy_sg.load_gene('test2_gname') is test
+
+        with pytest.raises(Exception):
+            lazy_sg.load_gene('test9_gid')
+        with pytest.raises(ValueError):
+            lazy_sg.add_transcriptome('files/test_full.gtf', lazy=True)
+
 
 ###########################################################################
 ####################### Related to DF creation ############################
 ###########################################################################
 class TestCreateDFs(object):
 
-    # add_edge_coords, get_current_locs, get_current_edges,
-    # create_loc_dict, create_transcript_edge_dict create_dfs,
+    # add_edge_coords, create_dfs,
 
     # tests add_edge_coords
     def test_add_edge_coords(self):
@@ -610,383 +998,6 @@ class TestCreateDFs(object):
         print(ctrl_edge_df)
         assert (edge_df == ctrl_edge_df).all(axis=0).all()
 
-    # tests get_current_locs with an empty swangraph
-    def test_get_current_locs_empty_sg(self):
-        sg = swan.SwanGraph()
-        locs, n = sg.get_current_locs()
-
-        assert locs == {}
-        assert n == -1
-
-    # tests get_current_locs with a swangraph with data
-    def test_get_current_locs_sg_data(self):
-        sg = swan.SwanGraph()
-        cols = ['vertex_id', 'chrom', 'coord']
-        data = [[0, 1, 2], [1, 1, 3], [2, 3, 50]]
-        sg.loc_df = pd.DataFrame(data=data, columns=cols)
-        cols = ['tid']
-        data = [0]
-        sg.t_df = pd.DataFrame(data=data, columns=cols)
-        locs, n = sg.get_current_locs()
-
-        ctrl_locs = {(1,2):0, (1,3):1, (3,50):2}
-        assert locs == ctrl_locs
-        assert n == 2
-
-    # tests get_current_edges with an empty swangraph
-    def test_get_current_edges_empty_sg(self):
-        sg = swan.SwanGraph()
-        edges, n = sg.get_current_edges()
-
-        assert(edges == {})
-        assert(n == -1)
-
-    # tests get_current_edges in a sg with data
-    def test_get_current_edges_sg_data(self):
-        sg = swan.SwanGraph()
-
-        cols = ['vertex_id', 'chrom', 'coord']
-        data = [[0, 1, 2], [1, 1, 3], [2, 1, 50]]
-        sg.loc_df = pd.DataFrame(data=data, columns=cols)
-
-        cols = ['edge_id', 'v1', 'v2', 'strand', 'edge_type']
-        data = [[0, 0, 1, '+', 'exon'],
-                [1, 1, 2, '+', 'intron']]
-        sg.edge_df = pd.DataFrame(data=data, columns=cols)
-
-        cols = ['tid']
-        data = [0]
-        sg.t_df = pd.DataFrame(data=data, columns=cols)
-
-        edges, n = sg.get_current_edges()
-        ctrl = {(1,2,3,'+','exon'): {'edge_id': 0,
-                                     'edge_type': 'exon',
-                                     'v1': 0 ,
-                                     'v2': 1},
-                (1,3,50,'+','intron'): {'edge_id': 1,
-                                        'edge_type': 'intron',
-                                        'v1': 1,
-                                        'v2': 2}}
-        assert(edges == ctrl)
-        assert(n == 1)
-
-    # test create_loc_dict on an empty sg
-    # also checks to make sure exons that use the same loc
-    # don't result in dupe entries in loc_df
-    def test_create_loc_dict_empty_sg(self):
-        _, exons = get_test_transcript_exon_dicts()
-
-        sg = swan.SwanGraph()
-        locs = sg.create_loc_dict(exons)
-        ctrl_locs = {('chr1',1): 0,
-            ('chr1', 20): 1,
-            ('chr1', 25): 2,
-            ('chr1', 30): 3,
-            ('chr1', 35): 4,
-            ('chr1', 40): 5,
-            ('chr2', 100): 6,
-            ('chr2', 80): 7,
-            ('chr2', 75): 8,
-            ('chr2', 60): 9,
-            ('chr2', 50): 10,
-            ('chr2', 45): 11,
-            ('chr2', 65): 12
-             }
-        assert(ctrl_locs == locs)
-
-    # tests create_loc_dict when locs already exist in sg
-    def test_create_loc_dict_sg_data(self):
-        _, exons = get_test_transcript_exon_dicts()
-
-        # dummy preexisting data
-        sg = swan.SwanGraph()
-        data = [[0, 'chr1', 1], [1, 'chr2', 80]]
-        columns = ['vertex_id', 'chrom', 'coord']
-        sg.loc_df = pd.DataFrame(data=data, columns=columns)
-
-        cols = ['tid']
-        data = [0]
-        sg.t_df = pd.DataFrame(data=data, columns=cols)
-
-        locs = sg.create_loc_dict(exons)
-
-        ctrl_locs = {('chr1', 1):0,
-            ('chr2', 80): 1,
-            ('chr1', 20): 2,
-            ('chr1', 25): 3,
-            ('chr1', 30): 4,
-            ('chr1', 35): 5,
-            ('chr1', 40): 6,
-            ('chr2', 100): 7,
-            ('chr2', 75): 8,
-            ('chr2', 60): 9,
-            ('chr2', 50): 10,
-            ('chr2', 45): 11,
-            ('chr2', 65): 12
-             }
-
-        print('test')
-        print(locs)
-        print('control')
-        print(ctrl_locs)
-        assert(ctrl_locs == locs)
-
-    # tests create_transcript_edge_dict empty swangraph
-    def test_create_transcript_edge_dict_emtpy_sg(self):
-        transcripts, exons = get_test_transcript_exon_dicts()
-
-        sg = swan.SwanGraph()
-        locs = sg.create_loc_dict(exons)
-
-        transcripts, edges = sg.create_transcript_edge_dicts(transcripts, exons, locs)
-
-        # just compare the paths for the transcripts, which is the only
-        # part modified by this function
-        transcripts = dict([(key, item['path']) for key, item in transcripts.items()])
-        ctrl_transcript_paths = {
-            'test1': [0,1,2,3,4],
-            'test2': [5,6,7,8,9],
-            'test3': [5,6,10,11,9],
-            'test4': [12],
-            'test5': [5,13,14]
-        }
-
-        assert(transcripts == ctrl_transcript_paths)
-
-        ctrl_edges = {
-            ('chr1', 1, 20, '+', 'exon'): {
-                'edge_id': 0,
-                'edge_type': 'exon',
-                'v1': 0,
-                'v2': 1
-            },
-            ('chr1', 20, 25, '+', 'intron'): {
-                'edge_id': 1,
-                'edge_type': 'intron',
-                'v1': 1,
-                'v2': 2
-            },
-            ('chr1', 25, 30, '+', 'exon'): {
-                'edge_id': 2,
-                'edge_type': 'exon',
-                'v1': 2,
-                'v2': 3
-            },
-            ('chr1', 30, 35, '+', 'intron'): {
-                'edge_id': 3,
-                'edge_type': 'intron',
-                'v1': 3,
-                'v2': 4
-            },
-            ('chr1', 35, 40, '+', 'exon'): {
-                'edge_id': 4,
-                'edge_type': 'exon',
-                'v1': 4,
-                'v2': 5
-            },
-            ('chr2', 100, 80, '-', 'exon'): {
-                'edge_id': 5,
-                'edge_type': 'exon',
-                'v1': 6,
-                'v2': 7
-            },
-            ('chr2', 80, 75, '-', 'intron'): {
-                'edge_id': 6,
-                'edge_type': 'intron',
-                'v1': 7,
-                'v2': 8
-            },
-            ('chr2', 75, 60, '-', 'exon'): {
-                'edge_id': 7,
-                'edge_type': 'exon' ,
-                'v1': 8,
-                'v2': 9
-            },
-            ('chr2', 60, 50, '-', 'intron'): {
-                'edge_id': 8,
-                'edge_type': 'intron',
-                'v1': 9,
-                'v2': 10
-            },
-            ('chr2', 50, 45, '-', 'exon'): {
-                'edge_id': 9,
-                'edge_type': 'exon',
-                'v1': 10,
-                'v2': 11
-            },
-            ('chr2', 75, 65, '-', 'exon'): {
-                'edge_id': 10,
-                'edge_type': 'exon',
-                'v1': 8,
-                'v2': 12
-            },
-            ('chr2', 65, 50, '-', 'intron'): {
-                'edge_id': 11,
-                'edge_type': 'intron',
-                'v1': 12,
-                'v2': 10
-            },
-            ('chr2', 45, 50, '+', 'exon'): {
-                'edge_id': 12,
-                'edge_type': 'exon',
-                'v1': 11,
-                'v2': 10
-            },
-            ('chr2', 80, 60, '-', 'intron'): {
-                'edge_id': 13,
-                'edge_type': 'intron',
-                'v1': 7,
-                'v2': 9
-            },
-            ('chr2', 60, 50, '-', 'exon'): {
-                'edge_id': 14,
-                'edge_type': 'exon',
-                'v1': 9,
-                'v2': 10
-            }
-        }
-
-        assert(edges == ctrl_edges)
-
-    # tests create_transcript_edge_dict with edges already in swangraph
-    def test_create_transcript_edge_dict_edge_sg(self):
-        transcripts, exons = get_test_transcript_exon_dicts()
-
-        # add some dummy data
-        sg = swan.SwanGraph()
-
-        data = [[0, 'chr1', 1],
-                [1, 'chr2', 20],
-                [2, 'chr2', 100],
-                [3, 'chr2', 80]]
-        columns = ['vertex_id', 'chrom', 'coord']
-        sg.loc_df = pd.DataFrame(data=data, columns=columns)
-        cols = ['tid']
-        data = [0]
-        sg.t_df = pd.DataFrame(data=data, columns=cols)
-        locs = sg.create_loc_dict(exons)
-
-        data = [[0, 0, 1, '+', 'exon'],
-                [1, 2, 3, '-', 'exon']]
-        columns = ['edge_id', 'v1', 'v2', 'strand', 'edge_type']
-        sg.edge_df = pd.DataFrame(data=data, columns=columns)
-
-        transcripts, edges = sg.create_transcript_edge_dicts(transcripts, exons, locs)
-
-        # just compare the paths for the transcripts, which is the only
-        # part modified by this function
-        transcripts = dict([(key, item['path']) for key, item in transcripts.items()])
-        ctrl_transcript_paths = {
-            'test1': [0,2,3,4,5],
-            'test2': [1,6,7,8,9],
-            'test3': [1,6,10,11,9],
-            'test4': [12],
-            'test5': [1,13,14]
-        }
-
-        assert(transcripts == ctrl_transcript_paths)
-
-        ctrl_edges = {
-            ('chr1', 1, 20, '+', 'exon'): {
-                'edge_id': 0,
-                'edge_type': 'exon',
-                'v1': 0,
-                'v2': 1
-            },
-            ('chr1', 20, 25, '+', 'intron'): {
-                'edge_id': 2,
-                'edge_type': 'intron',
-                'v1': 4,
-                'v2': 5
-            },
-            ('chr1', 25, 30, '+', 'exon'): {
-                'edge_id': 3,
-                'edge_type': 'exon',
-                'v1': 5,
-                'v2': 6
-            },
-            ('chr1', 30, 35, '+', 'intron'): {
-                'edge_id': 4,
-                'edge_type': 'intron',
-                'v1': 6,
-                'v2': 7
-            },
-            ('chr1', 35, 40, '+', 'exon'): {
-                'edge_id': 5,
-                'edge_type': 'exon',
-                'v1': 7,
-                'v2': 8
-            },
-            ('chr2', 100, 80, '-', 'exon'): {
-                'edge_id': 1,
-                'edge_type': 'exon',
-                'v1': 2,
-                'v2': 3
-            },
-            ('chr2', 80, 75, '-', 'intron'): {
-                'edge_id': 6,
-                'edge_type': 'intron',
-                'v1': 3,
-                'v2': 9
-            },
-            ('chr2', 75, 60, '-', 'exon'): {
-                'edge_id': 7,
-                'edge_type': 'exon' ,
-                'v1': 9,
-                'v2': 10
-            },
-            ('chr2', 60, 50, '-', 'intron'): {
-                'edge_id': 8,
-                'edge_type': 'intron',
-                'v1': 10,
-                'v2': 11
-            },
-            ('chr2', 50, 45, '-', 'exon'): {
-                'edge_id': 9,
-                'edge_type': 'exon',
-                'v1': 11,
-                'v2': 12
-            },
-            ('chr2', 75, 65, '-', 'exon'): {
-                'edge_id': 10,
-                'edge_type': 'exon',
-                'v1': 9,
-                'v2': 13
-            },
-            ('chr2', 65, 50, '-', 'intron'): {
-                'edge_id': 11,
-                'edge_type': 'intron',
-                'v1': 13,
-                'v2': 11
-            },
-            ('chr2', 45, 50, '+', 'exon'): {
-                'edge_id': 12,
-                'edge_type': 'exon',
-                'v1': 12,
-                'v2': 11
-            },
-            ('chr2', 80, 60, '-', 'intron'): {
-                'edge_id': 13,
-                'edge_type': 'intron',
-                'v1': 3,
-                'v2': 10
-            },
-            ('chr2', 60, 50, '-', 'exon'): {
-                'edge_id': 14,
-                'edge_type': 'exon',
-                'v1': 10,
-                'v2': 11
-            }
-        }
-
-        assert(edges == ctrl_edges)
-
-    # # tests create_transcript_edge_dict where transcripts already
-#     # # exist in the swangraph
-#     # def test_create_transcript_edge_dict_edge_t_sg(self):
-#     #     pass
-#     #     # TODO
-#
     # tests create_dfs with an empty sg
     # also ensures that empty dict -> df -> dict conversion doesn't screw up
     def test_create_dfs_empty_sg(self):
@@ -1016,6 +1027,39 @@ class TestCreateDFs(object):
         check_dfs(loc_df, ctrl_loc_df, edge_df, ctrl_edge_df, t_df, ctrl_t_df)
 
 
+    # tests create_dfs gives the same results from dicts and dataframes
+    def test_create_dfs_df_input(self):
+        transcripts, exons = get_test_transcript_exon_dicts()
+        sg = swan.SwanGraph()
+        ctrl = sg.create_dfs(copy.deepcopy(transcripts), copy.deepcopy(exons), False)
+
+        t_df = pd.DataFrame(transcripts).transpose()
+        exon_df = pd.DataFrame(exons).transpose()
+        test = sg.create_dfs(t_df, exon_df, False)
+        for ctrl_df, test_df in zip(ctrl, test):
+            pd.testing.assert_frame_equal(ctrl_df, test_df)
+
+    # tests that the location and edge indexes are kept up to date
+    # as data is added and match ones built from scratch
+    def test_create_dfs_indexes(self):
+        sg = swan.SwanGraph()
+        sg.add_annotation('files/test_full_annotation.gtf')
+        sg.add_transcriptome('files/test_full.gtf')
+        loc_index = sg.get_current_index('loc')
+        edge_index = sg.get_current_index('edge')
+        assert loc_index is not None
+        assert edge_index is not None
+
+        sg.loc_index = None
+        sg.edge_index = None
+        assert loc_index.sort_index().equals(sg.get_loc_index().sort_index())
+        assert edge_index.sort_index().equals(sg.get_edge_index().sort_index())
+
+        # replacing the dfs invalidates the indexes
+        sg.loc_df = sg.loc_df.copy()
+        assert sg.get_current_index('loc') is None
+        assert sg.get_current_index('edge') is not None
+
     # tests create_dfs when from_talon = True
     def test_create_dfs_empty_sg_from_talon(self):
         transcripts, exons = get_test_transcript_exon_dicts()
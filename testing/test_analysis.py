@@ -354,6 +354,49 @@ class TestSGAnalysis(object):
         print(gids)
         assert set(ctrl_gids) == set(gids)
 
+    # tests find_ir_genes - genes are only reported for their first
+    # novel edge, w/ every novel transcript that has the edge
+    def test_find_ir_genes_multi(self):
+        sg = swan.SwanGraph()
+        sg.annotation = True
+
+        # t_df
+        data = [[[0,1,2,3,4], True, 'g1', 't1'],
+                [[5,3,4], False, 'g1', 't2'],
+                [[0,1,6], False, 'g1', 't3'],
+                [[6], False, 'g2', 't4']]
+        cols = ['path', 'annotation', 'gid', 'tid']
+        sg.t_df = pd.DataFrame(data=data, columns=cols)
+
+        # edge
+        data = [[0, 'exon', True, 0, 1],
+                [1, 'intron', True, 1, 2],
+                [2, 'exon', True, 2, 3],
+                [3, 'intron', True, 3, 4],
+                [4, 'exon', True, 4, 5],
+                [5, 'exon', False, 0, 3],
+                [6, 'exon', False, 2, 5]]
+        cols = ['edge_id', 'edge_type', 'annotation', 'v1', 'v2']
+        sg.edge_df = pd.DataFrame(data=data, columns=cols)
+
+        # loc
+        data = [0,1,2,3,4,5]
+        cols = ['vertex_id']
+        sg.loc_df = pd.DataFrame(data=data, columns=cols)
+
+        sg.get_loc_path()
+        sg.create_graph_from_dfs()
+        ir_df = sg.find_ir_genes()
+        assert ir_df.columns.tolist() == ['gid', 'tid', 'edge_id']
+        assert ir_df.values.tolist() == [['g1', 't2', 5],
+                                         ['g2', 't3', 6],
+                                         ['g2', 't4', 6]]
+
+        # no novel edges
+        sg.edge_df['annotation'] = True
+        assert len(sg.find_ir_genes().index) == 0
+        assert len(sg.find_es_genes().index) == 0
+
 def get_die_test_sg():
     sg = swan.SwanGraph()
     db = 'files/chr11_and_Tcf3_no_gname.db'
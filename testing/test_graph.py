@@ -6,6 +6,7 @@ import networkx as nx
 import math
 import pandas as pd
 import anndata
+import pickle
 
 ###########################################################################
 ###################### Utilities in graph.py ##############################
@@ -13,8 +14,7 @@ import anndata
 class TestGraph(object):
 
     # done
-    # test get_ordered_id_map, dfs_to_dicts, dicts_to_dfs, update_loc_df_ids,
-    # update_edge_df_ids, , create_graph_from_dfs, subset_on_gene, check_datsets,
+    # test get_ordered_id_map, create_graph_from_dfs, subset_on_gene, check_datsets,
     # check_gene, check_transcript, order_edge_df, is_empty, has_novelty,
     # get_path_from_tid, get_loc_path_from_tid
     # has_abundance, get_strand_from_gid, get_strand_from_tid, get_gid_from_gname
@@ -57,6 +57,39 @@ class TestGraph(object):
         assert sg.get_gene_min_max(1) == (0,2)
         assert sg.get_gene_min_max(2) == (2,4)
 
+    # test get_tids_from_gid, and that the gene index is rebuilt when
+    # t_df is replaced
+    def test_get_tids_from_gid(self):
+        sg = make_gene_sg()
+        assert sg.get_tids_from_gid(1) == [0, 1]
+        assert sg.has_gene(2)
+        assert not sg.has_gene(3)
+
+        sg.t_df = sg.t_df.loc[[3, 2, 1]]
+        assert sg.get_tids_from_gid(2) == [3, 2]
+        assert sg.get_gene_min_max(1) == (0, 2)
+        with pytest.raises(Exception) as e:
+            sg.check_gene(3)
+        assert 'not found' in str(e.value)
+
+    # test get_tids_from_gid after t_df has been changed in place
+    def test_get_tids_from_gid_inplace(self):
+        sg = swan.SwanGraph()
+        sg.add_transcriptome('files/test_full.gtf')
+        assert sg.get_tids_from_gid('test1_gid') == ['test1']
+
+        sg.t_df.sort_values('gname', ascending=False, inplace=True)
+        assert sg.get_tids_from_gid('test1_gid') == ['test1']
+        assert sg.get_tids_from_gid('test4_gid') == ['test4']
+
+        sg.t_df.drop('test4', inplace=True)
+        assert not sg.has_gene('test4_gid')
+
+        # columns the index doesn't use don't make it out of date
+        sg.get_tids_from_gid('test1_gid')
+        sg.t_df['new_col'] = 0
+        assert sg.get_current_index('gene') is not None
+
     # test get_transcript_min_max
     def test_get_transcript_min_max(self):
         sg = make_gene_sg()
@@ -244,6 +277,26 @@ class TestGraph(object):
     #         sg.check_datasets(query)
     #     assert 'Dataset test3 not' in str(e.value)
 
+    # test check_datasets - dataset index follows the dataset list
+    def test_check_datasets_4(self):
+        sg = swan.SwanGraph()
+        sg.datasets = ['test1', 'test2']
+        sg.check_datasets(['test1', 'test2'])
+        with pytest.raises(Exception) as e:
+            sg.check_datasets(['test1', 'test3'])
+        assert 'Dataset test3 not' in str(e.value)
+
+        # extending the list in place rebuilds the index
+        sg.datasets.append('test3')
+        sg.check_datasets('test3')
+
+        # replacing the list rebuilds the index
+        sg.datasets = ['test4']
+        sg.check_datasets('test4')
+        with pytest.raises(Exception) as e:
+            sg.check_datasets('test1')
+        assert 'Dataset test1 not' in str(e.value)
+
 
 
     # test get_ordered_id_map
@@ -276,136 +329,6 @@ class TestGraph(object):
         ctrl_id_map = {1: 0, 0: 1, 2: 2}
         assert id_map == ctrl_id_map
 
-    # test dicts_to_dfs
-    def test_dicts_to_dfs(self):
-        sg = swan.SwanGraph()
-        # loc
-        data = [[0, 'chr3', 20],
-             [1, 'chr1', 500],
-             [2, 'chr1', 20]]
-        cols = ['vertex_id', 'chrom', 'coord']
-        ctrl_loc_df = pd.DataFrame(data=data, columns=cols)
-        ctrl_loc_df.set_index('vertex_id', inplace=True)
-        sg.loc_df = {0: {'chrom': 'chr3', 'coord': 20},
-                     1: {'chrom': 'chr1', 'coord': 500},
-                     2: {'chrom': 'chr1', 'coord': 20}}
-
-        # edge
-        data = [[0, 0, 1],
-                [1, 1, 2],
-                [2, 0, 2]]
-        cols = ['edge_id', 'v1', 'v2']
-        ctrl_edge_df = pd.DataFrame(data=data, columns=cols)
-        ctrl_edge_df.set_index('edge_id', inplace=True)
-        sg.edge_df = {0: {'v1': 0, 'v2': 1},
-                      1: {'v1': 1, 'v2': 2},
-                      2: {'v1': 0, 'v2': 2}}
-
-        # t
-        data = [[0, [0,1], [0,1,2]],
-                [1, [2], [0,2]]]
-        cols = ['tid', 'path', 'loc_path']
-        ctrl_t_df = pd.DataFrame(data=data, columns=cols)
-        ctrl_t_df.set_index('tid', inplace=True)
-        sg.t_df = {0: {'path': [0,1], 'loc_path': [0,1,2]},
-                   1: {'path': [2], 'loc_path': [0,2]}}
-
-        sg.dicts_to_dfs()
-
-        check_dfs(sg.loc_df, ctrl_loc_df,
-                  sg.edge_df, ctrl_edge_df,
-                  sg.t_df, ctrl_t_df)
-
-    # test dfs_to_dicts
-    def test_dfs_to_dicts(self):
-        sg = swan.SwanGraph()
-
-        # loc
-        data = [[0, 'chr3', 20],
-             [1, 'chr1', 500],
-             [2, 'chr1', 20]]
-        cols = ['vertex_id', 'chrom', 'coord']
-        sg.loc_df = pd.DataFrame(data=data, columns=cols)
-        sg.loc_df = swan.set_dupe_index(sg.loc_df, 'vertex_id')
-
-        ctrl_loc_df = {0: {'chrom': 'chr3', 'coord': 20},
-                       1: {'chrom': 'chr1', 'coord': 500},
-                       2: {'chrom': 'chr1', 'coord': 20}}
-
-        # edge
-        data = [[0, 0, 1],
-                [1, 1, 2],
-                [2, 0, 2]]
-        cols = ['edge_id', 'v1', 'v2']
-        sg.edge_df = pd.DataFrame(data=data, columns=cols)
-        sg.edge_df = swan.set_dupe_index(sg.edge_df, 'edge_id')
-        ctrl_edge_df = {0: {'v1': 0, 'v2': 1},
-                        1: {'v1': 1, 'v2': 2},
-                        2: {'v1': 0, 'v2': 2}}
-
-        # t
-        data = [[0, [0,1], [0,1,2]],
-                [1, [2], [0,2]]]
-        cols = ['tid', 'path', 'loc_path']
-        sg.t_df = pd.DataFrame(data=data, columns=cols)
-        sg.t_df = swan.set_dupe_index(sg.t_df, 'tid')
-        ctrl_t_df = {0: {'path': [0,1], 'loc_path': [0,1,2]},
-                     1: {'path': [2], 'loc_path': [0,2]}}
-
-        sg.dfs_to_dicts()
-
-        print('t_df')
-        print('test')
-        print(sg.t_df)
-        print('control')
-        print(ctrl_t_df)
-        assert ctrl_t_df == sg.t_df
-
-        print('edge_df')
-        print('test')
-        print(sg.edge_df)
-        print('control')
-        print(ctrl_edge_df)
-        assert ctrl_edge_df == sg.edge_df
-
-        print('loc_df')
-        print('test')
-        print(sg.loc_df)
-        print('control')
-        print(ctrl_loc_df)
-        assert ctrl_loc_df == sg.loc_df
-
-    # tests update_loc_df_ids
-    def test_update_loc_df_ids(self):
-        sg = swan.SwanGraph()
-
-        # loc
-        sg.loc_df = {0: {'chrom': 'chr3', 'coord': 20},
-                     1: {'chrom': 'chr1', 'coord': 500},
-                     2: {'chrom': 'chr1', 'coord': 20}}
-        id_map = {2: 0, 1: 1, 0: 2}
-        sg.update_loc_df_ids(id_map, False)
-        ctrl_loc_df = {2: {'chrom': 'chr3', 'coord': 20, 'vertex_id': 2},
-                       1: {'chrom': 'chr1', 'coord': 500, 'vertex_id': 1},
-                       0: {'chrom': 'chr1', 'coord': 20, 'vertex_id': 0}}
-
-        display_test_ctrl(sg.loc_df, ctrl_loc_df)
-        assert sg.loc_df == ctrl_loc_df
-
-    # tests update_edge_df_ids
-    def test_update_edge_df_ids(self):
-        sg = swan.SwanGraph()
-        id_map = {2: 0, 1: 1, 0: 2}
-        sg.edge_df = {0: {'v1': 0, 'v2': 1},
-                      1: {'v1': 1, 'v2': 2},
-                      2: {'v1': 0, 'v2': 2}}
-        ctrl_edge_df = {0: {'v1': 2, 'v2': 1, 'edge_id': 0},
-                        1: {'v1': 1, 'v2': 0, 'edge_id': 1},
-                        2: {'v1': 2, 'v2': 0, 'edge_id': 2}}
-        sg.update_edge_df_ids(id_map, False)
-        display_test_ctrl(sg.edge_df, ctrl_edge_df)
-        assert sg.edge_df == ctrl_edge_df
-
     # tests get_loc_path
     def get_loc_path(self):
         sg = swan.SwanGraph()
@@ -484,6 +407,131 @@ class TestGraph(object):
                   sg.edge_df, ctrl_edge_df,
                   sg.t_df, ctrl_t_df)
 
+    # tests update_ids keeps the location and edge indexes up to date
+    def test_update_ids_indexes(self):
+        sg = swan.SwanGraph()
+        sg.add_transcriptome('files/test_full.gtf')
+        ids = sg.loc_df.vertex_id.tolist()
+        id_map = dict(zip(ids, ids[::-1]))
+        sg.update_ids(id_map)
+
+        loc_index = sg.get_current_index('loc')
+        edge_index = sg.get_current_index('edge')
+        sg.loc_index = None
+        sg.edge_index = None
+        assert loc_index.sort_index().equals(sg.get_loc_index().sort_index())
+        assert edge_index.sort_index().equals(sg.get_edge_index().sort_index())
+
+        # loc paths use the new ids
+        for tid, entry in sg.t_df.iterrows():
+            ctrl = [sg.edge_df.loc[entry.path[0], 'v1']]+\
+                   sg.edge_df.loc[entry.path, 'v2'].tolist()
+            assert sg.get_loc_path_from_tid(tid) == ctrl
+
+    # tests pickling keeps paths compact and doesn't store loc paths
+    def test_pickle_paths(self):
+        sg = swan.SwanGraph()
+        sg.add_transcriptome('files/test_full.gtf')
+        state = sg.__getstate__()
+        assert isinstance(state['t_df'].path.array, swan.PathArray)
+        assert 'loc_path' not in state['t_df'].columns
+
+        test = pickle.loads(pickle.dumps(sg))
+        pd.testing.assert_frame_equal(sg.t_df, test.t_df)
+
+    # tests loc paths are derived from the edge paths when they're needed
+    def test_get_paths_loc(self):
+        sg = swan.SwanGraph()
+        sg.add_transcriptome('files/test_full.gtf')
+        assert 'loc_path' not in sg.t_df.columns
+        assert isinstance(sg.t_df.path.array, swan.PathArray)
+
+        paths = sg.get_paths('loc')
+        assert paths is sg.get_paths('loc')
+        for tid in sg.t_df.index:
+            path = sg.get_path_from_tid(tid)
+            ctrl = [sg.edge_df.loc[path[0], 'v1']]+\
+                   sg.edge_df.loc[path, 'v2'].tolist()
+            assert paths.get_path(tid) == ctrl
+
+        # replacing edge_df derives them again
+        sg.edge_df = sg.edge_df.copy()
+        assert sg.get_paths('loc') is not paths
+        assert sg.get_paths('loc') == paths
+
+    # tests unpickling a SwanGraph w/ a networkx graph
+    def test_pickle_nx_graph(self):
+        sg = swan.SwanGraph()
+        sg.add_transcriptome('files/test_full.gtf')
+        edges = sg.G.edges
+        sg.G = sg.G.to_networkx()
+        test = pickle.loads(pickle.dumps(sg))
+        assert isinstance(test.G, swan.GenomeGraph)
+        assert test.G.edges == edges
+
+    # tests the path indexes are kept up to date when adding transcripts,
+    # removing ISMs, and reindexing
+    def test_path_index(self):
+        sg = swan.SwanGraph()
+        sg.add_annotation('files/test_known.gtf')
+        sg.get_path_index('edge')
+        sg.add_transcriptome('files/test_novel_talon.gtf', include_isms=False)
+        assert sg.get_current_index('path') is not None
+
+        for kind, get_path in [('edge', sg.get_path_from_tid),
+                               ('loc', sg.get_loc_path_from_tid)]:
+            index = sg.get_path_index(kind)
+            assert index.tids.tolist() == sg.t_df.index.tolist()
+            for tid in sg.t_df.index:
+                path = get_path(tid)
+                assert index.get_ids(tid).tolist() == sorted(set(path))
+            assert index.get_tids(path[0])
+
+        sg.order_transcripts('tid')
+        assert sg.get_path_index('edge').tids.tolist() == sg.t_df.index.tolist()
+
+    # tests querying the edges, transcripts, and genes in regions
+    def test_query_regions(self):
+        sg = swan.SwanGraph()
+        sg.add_transcriptome('files/test_regions.gtf.gz', include_isms=True)
+
+        # transcript spans vs. gene spans
+        assert sg.get_region_tids('chr1:12500-12600') == []
+        assert sg.get_region_tids('chr1:12500-12645') == ['ENST00000000001.1']
+        assert sg.get_region_gids('chr1:12500-12600') == ['ENSG00000000000']
+
+        # strand and whole chromosomes
+        assert sg.get_region_gids('chr2', strand='+') == []
+        assert set(sg.get_region_tids(['chr2', 'chr3'], strand='-')) == \
+            {'ENST00000000002.1', 'ENST00000000003.1',
+             'ENST00000000046.1', 'ENST00000000047.1'}
+
+        # same edges as checking the coordinates of every edge
+        edge_df = sg.add_edge_coords()
+        regions = [('chr1', 10000, 10300), ('chr2', 110600, 110700),
+                   ('chr5', 13000, 200000)]
+        ctrl = []
+        for chrom, start, stop in regions:
+            e_min = edge_df[['v1_coord', 'v2_coord']].min(axis=1)
+            e_max = edge_df[['v1_coord', 'v2_coord']].max(axis=1)
+            inds = (edge_df.chrom == chrom)&(e_min <= stop)&(e_max >= start)
+            ctrl += edge_df.loc[inds, 'edge_id'].tolist()
+        assert sorted(sg.get_region_edges(regions)) == sorted(set(ctrl))
+
+        # overlaps of each region
+        df = sg.query_regions(['chr1:110800-110810', 'chrZ', 'chr10'],
+                              by_region=True)
+        assert df.columns.tolist() == ['region', 'tid']
+        assert set(df.loc[df.region == 'chr1:110800-110810', 'tid']) == \
+            {'ENST00000000044.1', 'ENST00000000045.1'}
+        assert set(df.loc[df.region == 'chr10', 'tid']) == \
+            {'ENST00000000018.1', 'ENST00000000019.1'}
+
+        # rebuilt when t_df is replaced
+        sg.t_df = sg.t_df.loc[['ENST00000000001.1']]
+        assert sg.get_region_gids('chr1') == ['ENSG00000000000']
+        assert sg.get_region_tids('chr1:10262-10262') == []
+
     # tests update_ids with a given id_map
     def test_update_ids_id_map(self):
         sg = swan.SwanGraph()
@@ -706,8 +706,6 @@ class TestPlotting(object):
         ctrl_loc_df = swan.create_dupe_index(ctrl_loc_df, 'vertex_id')
         ctrl_loc_df = swan.set_dupe_index(ctrl_loc_df, 'vertex_id')
 
-        print(sg.t_df.loc_path)
-
         check_dfs(sg.pg.loc_df, ctrl_loc_df, sg.pg.edge_df, ctrl_edge_df)
 
     # test calc_edge_curves - >= 20 node_size
@@ -1,11 +1,14 @@
 import pytest
 import sys
+import os
 import numpy as np
 import swan_vis as swan
 import networkx as nx
 import math
 import pandas as pd
 import anndata
+import scipy.sparse as sparse
+import pickle
 
 ###########################################################################
 ###################### Utilities in utils.py ##############################
@@ -25,6 +28,135 @@ class TestUtils(object):
         ctrl = pd.DataFrame(data=data, columns=cols)
         assert test.equals(ctrl)
 
+    # test get_key_ids
+    def test_get_key_ids(self):
+        keys = np.array([7, 3, 7, 9, 5, 3], dtype=np.int64)
+        index = pd.Series([2, 1], index=[5, 8])
+        ids, new_inds, new_ids = swan.get_key_ids(keys, index, 2)
+        assert ids.tolist() == [3, 4, 3, 5, 2, 4]
+        assert new_inds.tolist() == [0, 1, 3]
+        assert new_ids.tolist() == [3, 4, 5]
+
+    # test PathStore
+    def test_path_store(self):
+        paths = [[0, 1], [2, 3], [4]]
+        store = swan.PathStore.from_lists(['a', 'b', 'c'], paths)
+        assert store.to_lists() == paths
+        assert store.lens().tolist() == [2, 2, 1]
+        assert store.get_path('b') == [2, 3]
+        assert store.get_ends('tss').tolist() == [0, 2, 4]
+        assert store.get_ends('tes').tolist() == [1, 3, 4]
+
+        tids, ids = store.explode()
+        assert tids.tolist() == ['a', 'a', 'b', 'b', 'c']
+        assert ids.tolist() == [0, 1, 2, 3, 4]
+
+        sub = store.subset(['c', 'a'])
+        assert sub.tids.tolist() == ['c', 'a']
+        assert sub.to_lists() == [[4], [0, 1]]
+
+        # edge v1, v2
+        edge_df = pd.DataFrame(index=[0, 1, 2, 3, 4],
+                               data={'v1': [2, 1, 0, 1, 3],
+                                     'v2': [1, 0, 1, 2, 4]})
+        loc_paths = store.get_loc_paths(edge_df)
+        assert loc_paths.to_lists() == [[2, 1, 0], [0, 1, 2], [3, 4]]
+
+    # test PathArray
+    def test_path_array(self):
+        paths = [[0, 1], [2, 3], [4]]
+        s = pd.Series(swan.PathArray.from_lists(paths), index=['a', 'b', 'c'])
+        assert s.dtype.name == 'path'
+        assert s.tolist() == paths
+        assert s['b'] == [2, 3]
+
+        # subsetting and sorting keep the paths in flat arrays
+        sub = s.loc[['c', 'a']]
+        assert isinstance(sub.array, swan.PathArray)
+        assert sub.tolist() == [[4], [0, 1]]
+        assert s.sort_index(ascending=False).tolist() == paths[::-1]
+
+        df = pd.DataFrame({'path': s})
+        df.at['c', 'path'] = [5, 6]
+        assert df.path.tolist() == [[0, 1], [2, 3], [5, 6]]
+        test = pd.concat([df, df.loc[['a']].rename({'a': 'd'})])
+        assert test.path.tolist() == [[0, 1], [2, 3], [5, 6], [0, 1]]
+        test = pickle.loads(pickle.dumps(test))
+        assert isinstance(test.path.array, swan.PathArray)
+
+        # stores share the arrays
+        store = swan.PathStore.from_series(sub)
+        assert store.tids.tolist() == ['c', 'a']
+        assert store.ids is sub.array.ids
+
+    # test GenomeGraph
+    def test_genome_graph(self):
+        paths = [[0, 1, 3], [0, 2, 3], [5], [4, 6]]
+        store = swan.PathStore.from_lists(['a', 'b', 'c', 'd'], paths)
+        G = swan.GenomeGraph.from_paths(store)
+
+        # same graph as adding each path w/ networkx
+        ctrl = nx.DiGraph()
+        for path in paths:
+            nx.add_path(ctrl, path)
+        assert G.nodes == sorted(ctrl.nodes)
+        assert G.edges == sorted(ctrl.edges)
+        assert G.number_of_edges() == 5
+
+        assert G.successors(0) == [1, 2]
+        assert G.predecessors(3) == [1, 2]
+        assert G.has_edge(4, 6)
+        assert not G.has_edge(3, 4)
+        assert 5 in G
+        with pytest.raises(KeyError):
+            G.successors(7)
+
+        # edges w/ both vertices strictly between two vertices
+        v1s, v2s = G.edges_between(0, 4)
+        assert list(zip(v1s.tolist(), v2s.tolist())) == [(1, 3), (2, 3)]
+        assert G.subgraph(range(1, 4)).edges == [(1, 3), (2, 3)]
+        assert G.edges_between(3, 4)[0].tolist() == []
+
+        # materialize for drawing
+        nx_G = G.to_networkx()
+        assert set(nx_G.edges) == set(ctrl.edges)
+        assert set(nx_G.nodes) == set(ctrl.nodes)
+
+    # test GeneIndex
+    def test_gene_index(self):
+        loc_df = pd.DataFrame(index=[0, 1, 2, 3, 4, 5],
+                              data={'chrom': ['chr1']*4+['chr2']*2,
+                                    'coord': [1, 10, 20, 30, 50, 40]})
+        edge_df = pd.DataFrame(index=[0, 1, 2, 3],
+                               data={'strand': ['+', '+', '-', '+']})
+        t_df = pd.DataFrame(index=['a', 'b', 'c', 'd'],
+                            data={'gid': ['g1', 'g2', 'g1', 'g1'],
+                                  'gname': ['n1', 'n2', 'n1', None],
+                                  'novelty': ['Known', 'Known',
+                                              'Known', 'Antisense'],
+                                  'path': [[0], [1], [0], [2]],
+                                  'loc_path': [[1, 2], [5, 4], [0, 3], [2, 1]]})
+        index = swan.GeneIndex.from_dfs(t_df, loc_df, edge_df)
+
+        assert len(index) == 2
+        assert 'g2' in index
+        assert 'g3' not in index
+        assert index.get_rows('g1').tolist() == [0, 2, 3]
+        assert index.get('g1', 'strand') == '+'
+        assert index.get('g2', 'chrom') == 'chr2'
+        assert index.get('g1', 'min_coord') == 1
+        assert index.get('g1', 'max_coord') == 30
+        assert index.get('g2', 'min_coord') == 40
+        assert index.get('g1', 'max_vertex') == 3
+        assert index.get_gid('n2') == 'g2'
+        assert index.get_gid('n3') is None
+
+        # minimal t_df w/o paths
+        t_df = pd.DataFrame(index=['a'], data={'gid': ['g1']})
+        index = swan.GeneIndex.from_dfs(t_df)
+        assert index.get_rows('g1').tolist() == [0]
+        assert index.get_gid('n1') is None
+
     # test reorder_exons - rev
     def test_reorder_exons_2(self):
         test_exons = ['chr2_100_80_-_exon', 'chr2_50_45_-_exon',
@@ -67,6 +199,197 @@ class TestUtils(object):
         fname = 'test/test.gtf'
         assert swan.gtf_or_db(fname) == 'gtf'
 
+    # test gtf_or_db - gzipped gtf
+    def test_gtf_or_db_3(self):
+        assert swan.gtf_or_db('test/test.gtf.gz') == 'gtf'
+        assert swan.gtf_or_db('test/test.gtf.bgz') == 'gtf'
+        with pytest.raises(Exception) as e:
+            swan.gtf_or_db('test/test.txt.gz')
+        assert 'must be' in str(e.value)
+
+    # test parse_regions
+    def test_parse_regions(self):
+        regions = swan.parse_regions(['chr1', 'chr2:1,000-2000'])
+        assert regions == [('chr1', None, None), ('chr2', 1000, 2000)]
+        assert swan.parse_regions('chr3:5-10') == [('chr3', 5, 10)]
+        with pytest.raises(ValueError) as e:
+            swan.parse_regions('chr1:10')
+        with pytest.raises(ValueError) as e:
+            swan.parse_regions('chr1:10-5')
+
+    # test read_bed_regions
+    def test_read_bed_regions(self, tmp_path):
+        fname = str(tmp_path/'test.bed')
+        with open(fname, 'w') as ofile:
+            ofile.write('track name=test\n')
+            ofile.write('chr1\t0\t10\tname\n')
+            ofile.write('chr2\t99\t200\n')
+        regions = swan.read_bed_regions(fname)
+        assert regions == [('chr1', 1, 10), ('chr2', 100, 200)]
+        assert swan.parse_regions(regions+['chr3']) == regions+[('chr3', None, None)]
+
+    # test IntervalIndex
+    def test_interval_index(self):
+        ids = np.array(['a', 'b', 'c', 'd', 'e'])
+        chroms = ['chr1', 'chr1', 'chr1', 'chr2', 'chr1']
+        strands = ['+', '+', '-', '+', '+']
+        starts = [100, 5, 10, 1, 40]
+        stops = [1, 20, 30, 50, 45]
+        index = swan.IntervalIndex.from_arrays(ids, chroms, strands,
+                                               starts, stops)
+        assert len(index) == 5
+
+        # long intervals that start before the region
+        assert index.query('chr1:60-70').tolist() == ['a']
+        assert index.query('chr1:20-20').tolist() == ['a', 'b', 'c']
+        assert index.query('chr1:20-20', strand='-').tolist() == ['c']
+        assert index.query('chr1:101-200').tolist() == []
+        assert index.query('chr1').tolist() == ['a', 'b', 'c', 'e']
+        assert index.query(['chr3', 'chr2:50-60']).tolist() == ['d']
+
+        region_inds, ids = index.query_regions(['chr1:46-50', 'chr2:1-1'])
+        assert region_inds.tolist() == [0, 1]
+        assert ids.tolist() == ['a', 'd']
+        region_inds, ids = index.query_regions([])
+        assert len(region_inds) == 0 and len(ids) == 0
+
+    # test PathIndex
+    def test_path_index(self):
+        paths = swan.PathStore.from_lists(['t1', 't2', 't3'],
+                                          [[5, 2], [2, 7, 9], [9]])
+        index = swan.PathIndex.from_paths(paths)
+        assert len(index) == 3
+        assert index.ids.tolist() == [2, 5, 7, 9]
+        assert index.has('t2', [2, 5, 9, 100]).tolist() == [True, False, True, False]
+        assert index.get_ids('t1').tolist() == [2, 5]
+        assert index.get_tids(9) == ['t2', 't3']
+        assert index.get_tids([5, 100]) == ['t1']
+        assert index.get_used_ids(['t1', 't3']).tolist() == [2, 5, 9]
+        assert index.counts().tolist() == [2, 1, 1, 2]
+        rows, ids = index.pairs()
+        assert rows.tolist() == [0, 0, 1, 1, 1, 2]
+        assert ids.tolist() == [2, 5, 2, 7, 9, 9]
+        with pytest.raises(KeyError):
+            index.get_ids('t4')
+
+        # unused ids are removed from subsets
+        sub = index.subset(['t3', 't1'])
+        assert sub.tids.tolist() == ['t3', 't1']
+        assert sub.ids.tolist() == [2, 5, 9]
+        assert sub.get_ids('t3').tolist() == [9]
+
+        # new transcripts w/ new ids
+        new = swan.PathIndex.from_paths(swan.PathStore.from_lists(['t4'],
+                                                                  [[1, 9]]))
+        test = index.append(new)
+        assert test.ids.tolist() == [1, 2, 5, 7, 9]
+        assert test.get_tids(9) == ['t2', 't3', 't4']
+        assert test.get_ids('t1').tolist() == [2, 5]
+
+        # renumbered ids
+        test = index.map_ids([2, 5, 7, 9], [3, 1, 0, 2])
+        assert test.ids.tolist() == [0, 1, 2, 3]
+        assert test.get_ids('t2').tolist() == [0, 2, 3]
+
+    # test get_group_indicator_matrix
+    def test_get_group_indicator_matrix(self):
+        df = pd.DataFrame({'gid': ['g2', 'g1', 'g2', 'g1', None],
+                           'vertex_id': [5, 3, 5, 1, 2]})
+        m, groups = swan.get_group_indicator_matrix(df, ['gid', 'vertex_id'])
+        assert groups.values.tolist() == [['g1', 1], ['g1', 3], ['g2', 5]]
+        assert m.toarray().tolist() == [[0, 0, 1], [0, 1, 0], [0, 0, 1],
+                                        [1, 0, 0], [0, 0, 0]]
+
+        # same as groupby sum
+        counts = np.array([[1, 2, 3, 4, 5], [0, 1, 0, 1, 0]])
+        ctrl = df.assign(c1=counts[0], c2=counts[1])\
+                 .groupby(['gid', 'vertex_id']).sum()
+        assert (counts @ m.toarray()).tolist() == ctrl.transpose().values.tolist()
+
+    # test write_backed_adata - blocks that don't match obs / var
+    def test_write_backed_adata(self, tmp_path):
+        fname = str(tmp_path / 'adata.h5ad')
+        obs = pd.DataFrame(index=pd.Index(['d1', 'd2', 'd3']))
+        var = pd.DataFrame(index=pd.Index(['t1', 't2']))
+        X = np.array([[1, 0], [2, 3], [0, 4]])
+        totals = swan.write_backed_adata(fname, obs, var,
+            [sparse.csr_matrix(X[:2]), sparse.csr_matrix(X[2:])])
+        assert totals.tolist() == [1, 5, 4]
+        adata = anndata.read_h5ad(fname)
+        assert adata.X.toarray().tolist() == X.tolist()
+
+        # too many columns
+        with pytest.raises(ValueError) as e:
+            swan.write_backed_adata(fname, obs, var,
+                [sparse.csr_matrix(np.ones((3, 3)))])
+        assert '3 columns' in str(e.value)
+        assert not os.path.exists(fname)
+
+        # too few rows
+        with pytest.raises(ValueError) as e:
+            swan.write_backed_adata(fname, obs, var,
+                [sparse.csr_matrix(X[:2])])
+        assert '2 rows' in str(e.value)
+        assert not os.path.exists(fname)
+
+    # test append_backed_adata - new rows and columns are added in place
+    def test_append_backed_adata(self, tmp_path):
+        fname = str(tmp_path / 'adata.h5ad')
+        obs = pd.DataFrame(index=pd.Index(['d1', 'd2']))
+        var = pd.DataFrame(index=pd.Index(['t1', 't3']))
+        X = np.array([[1, 0], [2, 3]])
+        swan.write_backed_adata(fname, obs, var, [sparse.csr_matrix(X)])
+
+        # t2 goes between the existing columns
+        obs = pd.DataFrame(index=pd.Index(['d1', 'd2', 'd3']))
+        var = pd.DataFrame(index=pd.Index(['t1', 't2', 't3']))
+        cols = np.array([0, 2])
+        assert swan.can_append_backed(fname, cols)
+        assert not swan.can_append_backed(fname, np.array([2, 0]))
+        new_X = np.array([[0, 5, 6]])
+
+        # too few rows leaves the file as it was
+        with pytest.raises(ValueError) as e:
+            swan.append_backed_adata(fname, obs, var, cols, [])
+        assert '2 rows' in str(e.value)
+        adata = anndata.read_h5ad(fname)
+        assert adata.X.toarray().tolist() == X.tolist()
+
+        totals = swan.append_backed_adata(fname, obs, var, cols,
+            [sparse.csr_matrix(new_X)])
+        assert totals.tolist() == [11]
+        adata = anndata.read_h5ad(fname)
+        assert adata.obs.index.tolist() == ['d1', 'd2', 'd3']
+        assert adata.var.index.tolist() == ['t1', 't2', 't3']
+        assert adata.X.toarray().tolist() == [[1, 0, 0], [2, 0, 3], [0, 5, 6]]
+
+    # test read_abundance
+    def test_read_abundance(self, tmp_path):
+        X, ids, datasets = swan.read_abundance('files/test_ab_1.tsv',
+            ids=['test1', 'test3', 'test4', 'test8', 'test9'], chunksize=2)
+        assert datasets == ['dataset1', 'dataset2']
+        assert ids.tolist() == ['test1', 'test3', 'test4', 'test8']
+        assert X.toarray().tolist() == [[5, 0, 10, 4], [5, 10, 10, 5]]
+
+        # gzipped TALON abundance, summed per gene
+        fname = str(tmp_path / 'abundance.tsv.gz')
+        df = pd.read_csv('files/chr11_and_Tcf3_talon_abundance.tsv', sep='\t')
+        df.to_csv(fname, sep='\t', index=False, compression='gzip')
+        X, ids, datasets = swan.read_abundance(fname, how='gene', chunksize=10)
+        assert datasets == ['PB65_B017', 'PB65_B018', 'D12']
+        ctrl = df.groupby('annot_gene_id')[datasets].sum()
+        ctrl = ctrl.loc[ctrl.sum(axis=1) >= 1]
+        assert ids.tolist() == ctrl.index.tolist()
+        assert X.toarray().tolist() == ctrl.transpose().values.tolist()
+
+    # test merge_regions
+    def test_merge_regions(self):
+        regions = [('chr1', 50, 60), ('chr1', 1, 10), ('chr1', 5, 20),
+                   ('chr2', 1, 10), ('chr2', None, None)]
+        merged = swan.merge_regions(regions)
+        assert merged == {'chr1': [(1, 20), (50, 60)],
+                          'chr2': [(None, None)]}
+
     # test gtf_or_db - db
     def test_gtf_or_db_1(self):
         fname = 'test/test.db'